@@ -0,0 +1,148 @@
+"""
+Activity log write path and storage tiers.
+
+Logs are built as plain dicts (no Pydantic round trip) and handed to a
+dedicated ``BackgroundWriter`` that flushes them with ``insert_many`` when a
+batch fills up or the flush interval passes, so a burst of audited actions
+costs one write instead of one ``insert_one`` each and cannot starve the
+login-activity queue.
+
+By default ``activity_logs`` keeps 30 days and older entries are deleted by
+a TTL index. With ``ACTIVITY_LOG_ARCHIVE_DAYS`` set, the TTL index is
+replaced by a plain one (``scripts/ensure_indexes.py --apply --force-replace``;
+startup only reports the conflict) and ``archive_activity_logs`` (scheduled nightly) moves entries
+older than that many days to ``activity_logs_archive``, a collection created
+with a stronger block compressor. Moves are idempotent: documents keep their
+``_id`` so a batch interrupted between copy and delete is skipped on the
+next run. ``ACTIVITY_LOG_ARCHIVE_RETENTION_DAYS`` optionally caps the
+archive with its own TTL index.
+"""
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from pymongo.errors import BulkWriteError, CollectionInvalid
+
+from .work_queue import BackgroundWriter, DUPLICATE_KEY_ERROR
+
+logger = logging.getLogger(__name__)
+
+# 0: arşiv kapalı, activity_logs TTL ile silinir
+ACTIVITY_LOG_ARCHIVE_DAYS = int(os.environ.get("ACTIVITY_LOG_ARCHIVE_DAYS", "0"))
+# 0: arşiv süresiz saklanır
+ACTIVITY_LOG_ARCHIVE_RETENTION_DAYS = int(os.environ.get("ACTIVITY_LOG_ARCHIVE_RETENTION_DAYS", "0"))
+ACTIVITY_LOG_ARCHIVE_BATCH_SIZE = int(os.environ.get("ACTIVITY_LOG_ARCHIVE_BATCH_SIZE", "1000"))
+ACTIVITY_LOG_ARCHIVE_COMPRESSOR = os.environ.get("ACTIVITY_LOG_ARCHIVE_COMPRESSOR", "zstd")
+
+ARCHIVE_COLLECTION = "activity_logs_archive"
+
+activity_log_writer = BackgroundWriter(
+    "activity_logs",
+    maxsize=int(os.environ.get("ACTIVITY_LOG_QUEUE_MAXSIZE", "20000")),
+    batch_size=int(os.environ.get("ACTIVITY_LOG_BATCH_SIZE", "500")),
+    flush_interval=float(os.environ.get("ACTIVITY_LOG_FLUSH_SECONDS", "1.0")),
+    workers=int(os.environ.get("ACTIVITY_LOG_WORKERS", "1"))
+)
+
+
+def build_activity_log(
+    company_id: str,
+    user_id: str,
+    username: str,
+    full_name: str,
+    action: str,
+    entity_type: str,
+    entity_id: str,
+    entity_name: Optional[str] = None,
+    description: str = "",
+    changes: Optional[Dict[str, Any]] = None,
+    ip_address: Optional[str] = None
+) -> Dict[str, Any]:
+    """activity_logs dokümanı; created_at BSON tarih olarak saklanır (TTL / arşiv için)"""
+    return {
+        "id": str(uuid.uuid4()),
+        "company_id": company_id,
+        "user_id": user_id,
+        "username": username,
+        "full_name": full_name,
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "entity_name": entity_name,
+        "description": description,
+        "changes": changes,
+        "ip_address": ip_address,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+async def record_activity_log(db, log_doc: Dict[str, Any]) -> None:
+    """Kuyruğa ekle; yazıcı çalışmıyorsa (startup öncesi, script'ler) doğrudan yaz"""
+    if not activity_log_writer.submit("activity_logs", log_doc):
+        await db.activity_logs.insert_one(log_doc)
+
+
+def log_collection(archive: bool = False) -> str:
+    return ARCHIVE_COLLECTION if archive else "activity_logs"
+
+
+async def ensure_archive_collection(db) -> None:
+    """Arşiv koleksiyonunu sıkıştırmalı oluştur (index'lerden önce çağrılmalı, yoksa varsayılan compressor ile oluşur)"""
+    if await db.list_collection_names(filter={"name": ARCHIVE_COLLECTION}):
+        return
+    try:
+        await db.create_collection(
+            ARCHIVE_COLLECTION,
+            storageEngine={"wiredTiger": {"configString": f"block_compressor={ACTIVITY_LOG_ARCHIVE_COMPRESSOR}"}}
+        )
+        logger.info(f"Created {ARCHIVE_COLLECTION} with {ACTIVITY_LOG_ARCHIVE_COMPRESSOR} compression")
+    except CollectionInvalid:
+        # Başka bir worker aynı anda oluşturdu
+        pass
+
+
+async def archive_activity_logs(
+    db,
+    older_than_days: Optional[int] = None,
+    batch_size: Optional[int] = None
+) -> int:
+    """
+    ``older_than_days`` günden eski logları arşive taşı.
+
+    Returns:
+        Taşınan log sayısı
+    """
+    days = ACTIVITY_LOG_ARCHIVE_DAYS if older_than_days is None else older_than_days
+    if days <= 0:
+        return 0
+    batch_size = batch_size or ACTIVITY_LOG_ARCHIVE_BATCH_SIZE
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    moved = 0
+
+    try:
+        await ensure_archive_collection(db)
+        while True:
+            docs = await db.activity_logs.find(
+                {"created_at": {"$lt": cutoff}}
+            ).sort("created_at", 1).limit(batch_size).to_list(batch_size)
+            if not docs:
+                break
+            try:
+                await db[ARCHIVE_COLLECTION].insert_many(docs, ordered=False)
+            except BulkWriteError as e:
+                # Yarım kalan önceki çalışmada kopyalananlar duplicate key verir
+                errors = (e.details or {}).get("writeErrors", [])
+                if any(err.get("code") != DUPLICATE_KEY_ERROR for err in errors):
+                    raise
+            await db.activity_logs.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}})
+            moved += len(docs)
+            if len(docs) < batch_size:
+                break
+    except Exception as e:
+        logger.error(f"Activity log archive failed after {moved} logs: {e}")
+
+    if moved:
+        logger.info(f"Archived {moved} activity logs older than {cutoff.date()}")
+    return moved
@@ -0,0 +1,176 @@
+"""
+Login activity and activity log helpers.
+
+``SERVER_PUBLIC_IP`` is the fallback IP for activity logs written without a
+client address; when it is not set in the environment
+``refresh_server_public_ip`` resolves it once in the background after startup.
+"""
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+
+from .activity_logs import build_activity_log, record_activity_log
+from .database import db
+from .geoip import geoip_resolver
+from .http_client import http_client
+from .models import LoginActivity
+from .work_queue import background_writer
+
+logger = logging.getLogger(__name__)
+
+# Ortamda verilirse dış IP sorgusu hiç yapılmaz; yoksa startup sonrası arka planda bulunur
+SERVER_PUBLIC_IP = os.environ.get("SERVER_PUBLIC_IP", "unknown")
+
+async def save_login_activity(
+    user_id: str,
+    company_id: Optional[str],
+    ip_address: str,
+    user_agent_string: Optional[str],
+    request: Optional[Request] = None
+):
+    """Save login activity asynchronously (non-blocking)
+
+    Geo-IP sorgusu ve insert arka plan kuyruğunda yapılır; login cevabı bunları beklemez.
+    """
+    async def build_login_activity() -> dict:
+        # Parse user agent
+        ua_info = parse_user_agent_info(user_agent_string or "")
+        
+        # Get geo-location
+        location = await get_geo_location(ip_address)
+        
+        # Create login activity record
+        login_activity = LoginActivity(
+            user_id=user_id,
+            company_id=company_id,
+            ip=ip_address,
+            browser=ua_info.get("browser"),
+            os=ua_info.get("os"),
+            device_type=ua_info.get("device_type"),
+            location=location
+        )
+        return login_activity.model_dump()
+
+    try:
+        if background_writer.submit_factory("login_activities", build_login_activity):
+            return
+        # Kuyruk çalışmıyorsa (startup öncesi / shutdown) doğrudan yaz
+        await db.login_activities.insert_one(await build_login_activity())
+        logger.info(f"Login activity saved for user {user_id} from IP {ip_address}")
+    except Exception as e:
+        # Don't break login flow if activity logging fails
+        logger.error(f"Failed to save login activity: {e}")
+
+async def create_activity_log(
+    company_id: str,
+    user_id: str,
+    username: str,
+    full_name: str,
+    action: str,
+    entity_type: str,
+    entity_id: str,
+    entity_name: Optional[str] = None,
+    description: str = "",
+    changes: Optional[Dict[str, Any]] = None,
+    ip_address: Optional[str] = None,
+    current_user: Optional[dict] = None  # Opsiyonel: current_user varsa IP adresini otomatik al
+):
+    """Activity log kaydı oluştur
+
+    Args:
+        current_user: Eğer verilirse, IP adresini otomatik olarak current_user'dan alır
+        ip_address: Manuel IP adresi (current_user yoksa kullanılır)
+    """
+    try:
+        # Eğer current_user verilmişse ve ip_address yoksa, current_user'dan al
+        if current_user and not ip_address:
+            ip_address = current_user.get("ip_address")
+
+        # Eğer hala IP adresi yoksa, sunucu IP adresini kullan
+        if not ip_address:
+            ip_address = SERVER_PUBLIC_IP
+
+        log_doc = build_activity_log(
+            company_id=company_id,
+            user_id=user_id,
+            username=username,
+            full_name=full_name,
+            action=action,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            entity_name=entity_name,
+            description=description,
+            changes=changes,
+            ip_address=ip_address
+        )
+        # Activity log kuyruğu boyut/süre dolunca toplu insert_many ile yazar
+        await record_activity_log(db, log_doc)
+    except Exception as e:
+        # Log hatası sistemin çalışmasını engellememeli
+        logging.error(f"Activity log oluşturulamadı: {e}")
+
+async def get_server_public_ip() -> str:
+    """Sunucunun dış IP adresini al (API ile) - servisler paralel sorgulanır, ilk cevap kullanılır"""
+    # Ücretsiz ve güvenilir IP API'leri
+    apis = [
+        "https://api.ipify.org?format=json",
+        "https://api.my-ip.io/ip.json",
+        "https://ifconfig.me/all.json"
+    ]
+
+    async def probe(api: str) -> Optional[str]:
+        response = await http_client.get(api)
+        if response.status_code != 200:
+            return None
+        data = response.json()
+        return data.get("ip") or data.get("ip_addr")
+
+    tasks = [asyncio.create_task(probe(api)) for api in apis]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                ip = await next_done
+            except Exception as e:
+                logger.debug(f"IP lookup failed: {e}")
+                continue
+            if ip:
+                return ip
+        return "unknown"
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def refresh_server_public_ip():
+    """Startup sonrası arka planda çalışır; sonuç process ömrü boyunca SERVER_PUBLIC_IP'de cache'lenir"""
+    global SERVER_PUBLIC_IP
+    if SERVER_PUBLIC_IP != "unknown":
+        # Ortamdan verildi
+        return
+    SERVER_PUBLIC_IP = await get_server_public_ip()
+    logger.info(f"Server Public IP: {SERVER_PUBLIC_IP}")
+
+def parse_user_agent_info(user_agent_string: str) -> Dict[str, Optional[str]]:
+    """Parse user agent string and extract browser, OS, and device type"""
+    try:
+        # user_agents regex tablolarını import'ta yükler; ilk login'e kadar ertele
+        from user_agents import parse as ua_parse
+        ua = ua_parse(user_agent_string)
+        return {
+            "browser": ua.browser.family if ua.browser.family else None,
+            "os": ua.os.family if ua.os.family else None,
+            "device_type": "mobile" if ua.is_mobile else ("tablet" if ua.is_tablet else "desktop")
+        }
+    except Exception as e:
+        logger.warning(f"User agent parsing error: {e}")
+        return {
+            "browser": None,
+            "os": None,
+            "device_type": "unknown"
+        }
+
+async def get_geo_location(ip_address: str) -> str:
+    """Get geo-location from IP address (cache → yerel dosya / ipapi.co, bkz. modules/geoip.py)"""
+    return await geoip_resolver.lookup(ip_address)
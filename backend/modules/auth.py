@@ -0,0 +1,348 @@
+"""
+Authentication dependencies shared by ``server.py`` and the domain routers.
+
+``get_current_user`` trusts the signed JWT claims and only reads the user's
+auth state (active flag, token version, role) through the short-TTL
+``auth_state_cache``. ``check_role`` builds role-restricted dependencies on
+top of it. The cari panel (``get_current_cari``) and the corporate portal
+(``get_current_corporate_user``) have their own token dependencies.
+"""
+import logging
+import os
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import jwt
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+
+from .cache import auth_state_cache
+from .database import db
+
+logger = logging.getLogger(__name__)
+
+security = HTTPBearer()
+SECRET_KEY = os.environ.get('JWT_SECRET_KEY', secrets.token_urlsafe(32))
+ALGORITHM = "HS256"
+
+def get_client_ip(request: Request) -> str:
+    """Client IP adresini al - Proxy arkasında da çalışır
+    Checks standard headers for IP address consistency.
+    """
+    # Cloudflare
+    cf_connecting_ip = request.headers.get("CF-Connecting-IP")
+    if cf_connecting_ip:
+        return cf_connecting_ip.strip()
+
+    # X-Forwarded-For header'ını kontrol et (proxy/load balancer arkasında)
+    forwarded_for = request.headers.get("X-Forwarded-For")
+    if forwarded_for:
+        # İlk IP adresini al (birden fazla olabilir)
+        ip = forwarded_for.split(",")[0].strip()
+        if ip:
+            return ip
+    
+    # X-Real-IP header'ını kontrol et (nginx gibi)
+    real_ip = request.headers.get("X-Real-IP")
+    if real_ip:
+        return real_ip.strip()
+
+    # Fastly
+    fastly_client_ip = request.headers.get("Fastly-Client-IP")
+    if fastly_client_ip:
+        return fastly_client_ip.strip()
+
+    # True-Client-IP (Cloudflare Enterprise)
+    true_client_ip = request.headers.get("True-Client-IP")
+    if true_client_ip:
+        return true_client_ip.strip()
+    
+    # Direkt client IP
+    if request.client:
+        return request.client.host
+    
+    return "unknown"
+
+def create_access_token(data: dict, expires_delta: timedelta = timedelta(days=7)):
+    to_encode = data.copy()
+    expire = datetime.now(timezone.utc) + expires_delta
+    to_encode.update({"exp": expire})
+    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return encoded_jwt
+
+_AUTH_STATE_MISSING = object()
+
+async def get_user_auth_state(user_id: str) -> Optional[dict]:
+    """
+    Kullanıcının yetki durumunu (aktif mi, token versiyonu, rol) kısa TTL'li cache'ten getir.
+    Kullanıcı yoksa None döner (negatif sonuç da cache'lenir).
+    """
+    state = auth_state_cache.get(user_id, _AUTH_STATE_MISSING)
+    if state is _AUTH_STATE_MISSING:
+        user = await db.users.find_one(
+            {"id": user_id},
+            {"_id": 0, "is_active": 1, "token_version": 1, "role": 1, "is_admin": 1}
+        )
+        state = None
+        if user:
+            state = {
+                "is_active": user.get("is_active", True),
+                "token_version": user.get("token_version", 0),
+                "role": user.get("role", "user"),
+                "is_admin": user.get("is_admin", False)
+            }
+        auth_state_cache.set(user_id, state)
+    return state
+
+def invalidate_user_auth_state(user_id: str):
+    """Kullanıcı pasif yapıldığında, silindiğinde, şifresi veya rolü değiştiğinde çağrılır"""
+    auth_state_cache.invalidate(user_id)
+
+async def get_current_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Tek auth dependency: imzalı claim'lere (sub, company_id, role, tv) güvenir, users
+    koleksiyonuna sadece kısa TTL'li yetki durumu cache'i üzerinden gider.
+    """
+    try:
+        token = credentials.credentials
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        user_id = payload.get("sub")
+        company_id = payload.get("company_id")
+        role = payload.get("role", "user")  # Default to "user" if not present (backward compatibility)
+        
+        # Note: corporate_user role is only used for B2B portal login, not for normal admin panel login
+        # Normal admin panel users should have roles like "admin", "user", "super_admin"
+        # We don't block corporate_user here because normal admin panel login should work regardless of role
+        
+        if not user_id:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        
+        # 2FA doğrulaması için verilen geçici token API erişimi sağlamaz
+        if payload.get("temp_2fa"):
+            raise HTTPException(status_code=401, detail="Two-factor authentication required")
+        
+        # Super admin için company_id opsiyonel olabilir
+        if not company_id and role != "super_admin":
+            raise HTTPException(status_code=401, detail="Invalid token: company_id required")
+        
+        state = await get_user_auth_state(user_id)
+        if not state:
+            raise HTTPException(status_code=401, detail="User not found")
+        
+        if not state["is_active"]:
+            raise HTTPException(status_code=401, detail="User account is inactive")
+        
+        # Şifre değişikliği token versiyonunu artırır, eski token'lar geçersiz olur
+        if payload.get("tv", 0) < state["token_version"]:
+            raise HTTPException(status_code=401, detail="Token revoked")
+        
+        # Get role from user document if not in token (for backward compatibility)
+        if not role or role == "user":
+            user_role = state["role"]
+            # Migrate is_admin to role if needed
+            if state["is_admin"] and user_role == "user":
+                user_role = "admin"
+            role = user_role
+        
+        return {
+            "user_id": user_id,
+            "company_id": company_id,  # Can be None for super_admin
+            "role": role,
+            "is_admin": payload.get("is_admin", False),  # Keep for backward compatibility
+            "ip_address": get_client_ip(request)
+        }
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token expired")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Auth error: {str(e)}")
+        raise HTTPException(status_code=401, detail="Authentication failed")
+
+# -------------------- ROLE-BASED MIDDLEWARE --------------------
+
+def check_role(*allowed_roles: str):
+    """Middleware factory to check if user has one of the allowed roles"""
+    async def role_checker(current_user: dict = Depends(get_current_user)):
+        user_role = current_user.get("role", "user")
+        if user_role not in allowed_roles:
+            raise HTTPException(
+                status_code=403,
+                detail=f"Access denied. Required roles: {', '.join(allowed_roles)}"
+            )
+        return current_user
+    return role_checker
+
+# Super admin only
+require_super_admin = check_role("super_admin")
+
+# Admin or super admin
+require_admin = check_role("admin", "super_admin")
+
+# -------------------- TENANT ISOLATION HELPERS --------------------
+
+def add_tenant_filter(query: dict, current_user: dict) -> dict:
+    """
+    Add tenant isolation filter to a MongoDB query.
+    Super admins can query all data, others are restricted to their company.
+    """
+    user_role = current_user.get("role", "user")
+    
+    # Super admin can query all data (no filter)
+    if user_role == "super_admin":
+        return query
+    
+    # Regular users and admins are restricted to their company
+    company_id = current_user.get("company_id")
+    if not company_id:
+        raise HTTPException(status_code=401, detail="Company ID not found in token")
+    
+    # Add company_id filter if not already present
+    if "company_id" not in query:
+        query["company_id"] = company_id
+    elif query.get("company_id") != company_id:
+        # If company_id is already in query and doesn't match, raise error
+        raise HTTPException(status_code=403, detail="Cannot access data from other companies")
+    
+    return query
+
+async def get_tenant_scoped_collection(collection_name: str, current_user: dict, query: dict = None):
+    """
+    Get a collection with automatic tenant isolation applied.
+    Returns a cursor that can be used for find operations.
+    """
+    if query is None:
+        query = {}
+    
+    query = add_tenant_filter(query, current_user)
+    return db[collection_name].find(query)
+
+# -------------------- CARI / CORPORATE TOKENS --------------------
+
+def create_cari_access_token(data: dict, expires_delta: timedelta = timedelta(days=7)):
+    """Cari için JWT token oluştur"""
+    to_encode = data.copy()
+    expire = datetime.now(timezone.utc) + expires_delta
+    to_encode.update({"exp": expire, "role": "cari"})
+    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return encoded_jwt
+
+async def get_current_cari(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Cari JWT token'ını doğrula"""
+    try:
+        token = credentials.credentials
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        cari_id: str = payload.get("sub")
+        company_id: str = payload.get("company_id")
+        role: str = payload.get("role")
+        
+        if cari_id is None or company_id is None:
+            raise HTTPException(status_code=401, detail="Invalid authentication")
+        
+        if role != "cari":
+            raise HTTPException(status_code=403, detail="Invalid role - cari access required")
+        
+        # Cari hesabının aktif olduğunu kontrol et
+        cari = await db.caris.find_one({"id": cari_id, "company_id": company_id})
+        if not cari:
+            raise HTTPException(status_code=404, detail="Cari account not found")
+        
+        if not cari.get("is_active", True):
+            raise HTTPException(status_code=403, detail="Cari account is inactive")
+        
+        # IP adresini al
+        ip_address = get_client_ip(request)
+        
+        return {
+            "cari_id": cari_id,
+            "company_id": company_id,
+            "cari_code": cari.get("cari_code"),
+            "display_name": cari.get("display_name"),
+            "require_password_change": cari.get("require_password_change", False),
+            "ip_address": ip_address
+        }
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token expired")
+    except jwt.JWTError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+async def get_admin_user(current_user: dict = Depends(get_current_user)):
+    """Admin kullanıcı kontrolü - DEPRECATED: Use require_super_admin instead"""
+    # Check role instead of company_code
+    user_role = current_user.get("role", "user")
+    
+    if user_role != "super_admin":
+        raise HTTPException(status_code=403, detail="Only super admins can access this endpoint")
+    
+    return current_user
+
+async def get_current_corporate_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Get current corporate user from JWT token (uses get_current_cari for compatibility)"""
+    # Use get_current_cari since we're using "cari" role now
+    try:
+        token = credentials.credentials
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        
+        role = payload.get("role")
+        # Accept both "cari" and "corporate_user" for backward compatibility
+        if role not in ["cari", "corporate_user"]:
+            raise HTTPException(status_code=403, detail="Access denied. This endpoint is for corporate users only.")
+        
+        cari_id = payload.get("sub")
+        company_id = payload.get("company_id")
+        cari_account_id = payload.get("cari_id")
+        
+        if not cari_id or not company_id:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        
+        # Verify cari still exists and is active
+        cari = await db.caris.find_one({"id": cari_id, "company_id": company_id})
+        if not cari:
+            raise HTTPException(status_code=401, detail="Corporate account not found")
+        
+        if not cari.get("is_active", True):
+            raise HTTPException(status_code=403, detail="Corporate account is inactive")
+        
+        # Get cari_account_id from cari_account if not in token
+        if not cari_account_id:
+            cari_code = payload.get("cari_code") or cari.get("cari_code")
+            if cari_code:
+                cari_account = await db.cari_accounts.find_one({
+                    "company_id": company_id,
+                    "cari_code": cari_code
+                })
+                if cari_account:
+                    cari_account_id = cari_account["id"]
+        
+        # Verify cari account still exists and is active
+        if cari_account_id:
+            cari_account = await db.cari_accounts.find_one({"id": cari_account_id, "company_id": company_id})
+            if not cari_account or not cari_account.get("is_active", True):
+                cari_account_id = None  # Allow to continue without cari_account_id
+        
+        return {
+            "cari_id": cari_id,
+            "cari_account_id": cari_account_id,
+            "company_id": company_id,
+            "cari_code": payload.get("cari_code") or cari.get("cari_code"),
+            "agency_slug": payload.get("agency_slug"),
+            "role": "cari"  # Return as "cari" for compatibility
+        }
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token expired")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Corporate auth error: {e}")
+        raise HTTPException(status_code=401, detail="Authentication failed")
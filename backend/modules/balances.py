@@ -0,0 +1,117 @@
+"""
+Atomic, idempotent balance mutations.
+
+Balances (``cari_accounts.balance_*``, ``cash_accounts.current_balance``)
+are only changed with ``$inc``; reading a balance and writing back a computed
+value loses updates when two requests touch the same account. Every change
+carries an idempotency key that is recorded in ``balance_operations`` (unique
+``key``) before the ``$inc`` is applied, so a retried or concurrently
+repeated operation is applied once.
+
+With ``MONGO_TRANSACTIONS=true`` (replica set / mongos required) the
+operation record and the ``$inc`` are written in one multi-document
+transaction. Without it the record is written as ``pending`` first; the
+caller that moves it ``pending -> applying`` with a conditional update (only
+one can) applies the ``$inc`` and marks it ``applied``. A retry that finds
+the key still ``pending`` (the first attempt died after the insert) claims
+and applies it; only ``applying``/``applied`` records are skipped. Records
+left ``applying`` point at a crash between the claim and the ``$inc`` and
+can be checked with the balance drift report.
+
+Applied records are only needed while a retry can still arrive: they are
+removed by a TTL index on ``applied_at`` after
+``BALANCE_OPERATION_RETENTION_DAYS``.
+"""
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+MONGO_TRANSACTIONS = os.environ.get("MONGO_TRANSACTIONS", "false").lower() in ("1", "true", "yes")
+
+# Uygulanmış idempotency kayıtlarının saklanma süresi (TTL, modules/indexes.py)
+BALANCE_OPERATION_RETENTION_DAYS = int(os.environ.get("BALANCE_OPERATION_RETENTION_DAYS", "30"))
+
+
+def merge_deltas(*deltas: Dict[str, float]) -> Dict[str, float]:
+    """Aynı alana düşen değişiklikleri topla, sıfır olanları at"""
+    merged: Dict[str, float] = {}
+    for delta in deltas:
+        for field, value in delta.items():
+            merged[field] = merged.get(field, 0) + value
+    return {field: value for field, value in merged.items() if value}
+
+
+async def apply_balance_delta(
+    db,
+    collection: str,
+    match: Dict[str, Any],
+    deltas: Dict[str, float],
+    idempotency_key: str,
+    use_transaction: Optional[bool] = None
+) -> bool:
+    """
+    ``match`` ile bulunan dokümana ``$inc`` uygula (idempotent).
+
+    Returns:
+        True: değişiklik uygulandı, False: anahtar daha önce kullanılmış (veya değişiklik yok)
+    """
+    deltas = merge_deltas(deltas)
+    if not deltas:
+        return False
+
+    operation = {
+        "key": idempotency_key,
+        "collection": collection,
+        "match": match,
+        "deltas": deltas,
+        "state": "pending",
+        "created_at": datetime.now(timezone.utc),
+    }
+    if MONGO_TRANSACTIONS if use_transaction is None else use_transaction:
+        return await _apply_in_transaction(db, collection, match, deltas, operation)
+
+    try:
+        await db.balance_operations.insert_one(operation)
+    except DuplicateKeyError:
+        # Önceki deneme insert'ten sonra düştüyse kayıt hâlâ pending: aşağıdaki claim ile uygulanır
+        pass
+
+    claimed = await db.balance_operations.update_one(
+        {"key": idempotency_key, "state": "pending"},
+        {"$set": {"state": "applying", "claimed_at": datetime.now(timezone.utc)}}
+    )
+    if not claimed.modified_count:
+        logger.info(f"Balance operation {idempotency_key} already applied, skipped")
+        return False
+
+    await db[collection].update_one(match, {"$inc": deltas})
+    await db.balance_operations.update_one(
+        {"key": idempotency_key},
+        {"$set": {"state": "applied", "applied_at": datetime.now(timezone.utc)}}
+    )
+    return True
+
+
+async def _apply_in_transaction(db, collection: str, match: Dict[str, Any], deltas: Dict[str, float], operation: dict) -> bool:
+    async with await db.client.start_session() as session:
+        try:
+            async with session.start_transaction():
+                await db.balance_operations.insert_one(
+                    {**operation, "state": "applied", "applied_at": datetime.now(timezone.utc)},
+                    session=session
+                )
+                await db[collection].update_one(match, {"$inc": deltas}, session=session)
+        except DuplicateKeyError:
+            logger.info(f"Balance operation {operation['key']} already recorded, skipped")
+            return False
+    return True
+
+
+async def apply_cari_delta(db, cari_id: str, deltas: Dict[str, float], idempotency_key: str) -> bool:
+    """Cari bakiye alanlarına (balance_eur/usd/try) idempotent ``$inc``"""
+    return await apply_balance_delta(db, "cari_accounts", {"id": cari_id}, deltas, idempotency_key)
@@ -0,0 +1,186 @@
+"""
+In-memory caches for tenant reference data.
+
+``TTLCache`` is a process-wide TTL + LRU cache with hit/miss counters.
+``TenantReferenceCache`` keys entries by ``(company_id, kind)`` and adds a
+request-scoped memo so a single request sees one consistent snapshot and
+never reloads the same reference data twice.
+"""
+import copy
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# Tüm cache örnekleri - monitoring endpoint'i için
+_registry: List["TTLCache"] = []
+
+# İstek bazlı memo: middleware her istekte yeni bir dict açar
+_request_memo: ContextVar[Optional[Dict[Hashable, Any]]] = ContextVar("reference_cache_request_memo", default=None)
+
+
+class TTLCache:
+    """TTL + LRU bellek içi önbellek (tek process, asyncio için kilit gerektirmez)"""
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 1024,
+        ttl: float = 60.0,
+        timer: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        _registry.append(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at <= self._timer():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self._data[key] = (self._timer() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        if self._data.pop(key, _MISSING) is not _MISSING:
+            self.invalidations += 1
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        for key in [k for k in self._data if predicate(k)]:
+            del self._data[key]
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self.invalidations += len(self._data)
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def items(self) -> List[tuple]:
+        """Süresi dolmamış (anahtar, değer) çiftleri; sayaçları ve LRU sırasını değiştirmez"""
+        now = self._timer()
+        return [(key, value) for key, (expires_at, value) in self._data.items() if expires_at > now]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+class TenantReferenceCache(TTLCache):
+    """company_id bazlı referans verisi önbelleği (tur tipleri, ödeme tipleri, şirket dokümanı, ...)"""
+
+    def __init__(self, name: str, maxsize: int = 2048, ttl: float = 60.0, **kwargs):
+        super().__init__(name, maxsize=maxsize, ttl=ttl, **kwargs)
+        self.request_hits = 0
+
+    async def get_or_load(
+        self,
+        company_id: str,
+        kind: str,
+        loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Önce istek memo'suna, sonra process cache'ine bak; ikisinde de yoksa loader'ı çağır.
+
+        Dönen değer çağırana ait bir kopyadır; aynı istek içinde tekrar istenirse aynı kopya döner.
+        """
+        key = (company_id, kind)
+        memo = _request_memo.get()
+        if memo is not None and key in memo:
+            self.request_hits += 1
+            return memo[key]
+
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = await loader()
+            self.set(key, value)
+
+        value = copy.deepcopy(value)
+        if memo is not None:
+            memo[key] = value
+        return value
+
+    def invalidate_company(self, company_id: str, kind: Optional[str] = None) -> None:
+        """Bir şirketin (isteğe bağlı olarak tek bir türün) kayıtlarını düşür"""
+        if kind is None:
+            self.invalidate_where(lambda key: key[0] == company_id)
+        else:
+            self.invalidate((company_id, kind))
+
+        memo = _request_memo.get()
+        if memo is not None:
+            for key in [k for k in memo if k[0] == company_id and (kind is None or k[1] == kind)]:
+                del memo[key]
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["request_hits"] = self.request_hits
+        return stats
+
+
+def begin_request_scope():
+    """İstek başında çağrılır; dönen token end_request_scope'a verilmeli"""
+    return _request_memo.set({})
+
+
+def end_request_scope(token) -> None:
+    _request_memo.reset(token)
+
+
+def get_cache_stats() -> List[Dict[str, Any]]:
+    return [cache.stats() for cache in _registry]
+
+
+reference_cache = TenantReferenceCache(
+    "tenant_reference",
+    maxsize=int(os.environ.get("REFERENCE_CACHE_MAXSIZE", "2048")),
+    ttl=float(os.environ.get("REFERENCE_CACHE_TTL_SECONDS", "60"))
+)
+
+# Kullanıcı yetki durumu (aktif mi, token versiyonu, rol) - JWT doğrulamasında
+# her istekte users koleksiyonuna gitmemek için kısa TTL ile tutulur
+auth_state_cache = TTLCache(
+    "user_auth_state",
+    maxsize=int(os.environ.get("AUTH_STATE_CACHE_MAXSIZE", "10000")),
+    ttl=float(os.environ.get("AUTH_STATE_CACHE_TTL_SECONDS", "30"))
+)
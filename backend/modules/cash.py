@@ -0,0 +1,198 @@
+"""
+Cash detail summary (``/cash/detail``).
+
+Collected / total / available / pending amounts and the per cash account
+figures are computed by one aggregation over the company's payment
+transactions. Payment type codes, bank account commission/valör settings
+and check due dates are joined with ``$lookup`` inside MongoDB, so only a
+handful of grouped rows (currency × bucket, one row per cash account) come
+back to Python regardless of how many transactions the company has.
+
+The bucket rules mirror the original per-transaction loop (kept in
+``tests/test_cash.py`` and compared with the pipeline on fixture rows when
+``MONGO_TEST_URL`` points at a MongoDB):
+
+* no payment code, ``transfer_to_cari``, ``write_off``: not counted
+* ``exchange`` / ``transfer``: available
+* ``check_promissory``: counted only with a check record; available when
+  due and collected, pending otherwise (no due date: total only)
+* ``credit_card``: commission and valör date derived from the bank account
+  when the transaction lacks them; pending until the valör date
+* ``cash`` / ``bank_transfer``: available
+* others: available when settled and past the valör date, else pending
+"""
+from typing import Any, Dict, List
+
+PAYMENT_CURRENCIES = ("EUR", "USD", "TRY")
+UNCOUNTED_CODES = ["transfer_to_cari", "write_off"]
+
+_DAY_MS = 86400000
+
+
+def _truthy(expr: Any) -> dict:
+    """Python truthiness: null/eksik/0/false/"" -> false (aggregation'da "" true sayılır)"""
+    return {"$and": [expr, {"$ne": [expr, ""]}]}
+
+
+def _or(value: Any, fallback: Any) -> dict:
+    """Python ``value or fallback``"""
+    return {"$cond": [_truthy(value), value, fallback]}
+
+
+def _first(array_field: str) -> dict:
+    return {"$arrayElemAt": [array_field, 0]}
+
+
+def _default_if_missing(field: str, default: Any) -> dict:
+    """``doc.get(field, default)``: alan yoksa default, null ise null"""
+    return {"$cond": [{"$eq": [{"$type": f"${field}"}, "missing"]}, default, f"${field}"]}
+
+
+def collected_payments_match(company_id: str) -> Dict[str, Any]:
+    """Tahsilat ekle aksiyonundan gelen payment transaction'ları (giden ödemeler hariç)"""
+    return {
+        "company_id": company_id,
+        "transaction_type": "payment",
+        "payment_method": {"$exists": True, "$ne": None},
+        "$or": [
+            {"reference_type": {"$ne": "outgoing_payment"}},
+            {"reference_type": {"$exists": False}},
+            {"reference_type": None},
+        ],
+    }
+
+
+def _past_valor(valor: Any, today: str) -> dict:
+    """Valör tarihi yok veya bugün/geçmiş"""
+    return {"$or": [{"$not": [_truthy(valor)]}, {"$lte": [valor, today]}]}
+
+
+def _summary_stages(company_id: str, today: str) -> List[dict]:
+    return [
+        {"$match": collected_payments_match(company_id)},
+        {"$lookup": {"from": "payment_types", "localField": "payment_type_id", "foreignField": "id", "as": "_payment_type"}},
+        {"$lookup": {"from": "bank_accounts", "localField": "bank_account_id", "foreignField": "id", "as": "_bank"}},
+        {"$lookup": {"from": "check_promissories", "localField": "id", "foreignField": "transaction_id", "as": "_check"}},
+        {"$addFields": {
+            "_code": _or(_first("$_payment_type.code"), "$payment_method"),
+            "_currency": _default_if_missing("currency", "TRY"),
+            "_raw_amount": _default_if_missing("amount", 0),
+            "_amount": _or("$net_amount", _default_if_missing("amount", 0)),
+            "_has_bank": {"$gt": [{"$size": "$_bank"}, 0]},
+            "_commission_rate": _first("$_bank.commission_rate"),
+            "_valor_days": _first("$_bank.valor_days"),
+            "_has_check": {"$gt": [{"$size": "$_check"}, 0]},
+            "_due_date": _first("$_check.due_date"),
+            "_collected": {"$ifNull": [_first("$_check.is_collected"), False]},
+            "_settled": _default_if_missing("is_settled", True),
+        }},
+        # Kredi kartı: komisyon / valör tarihi transaction'da yoksa banka tanımından
+        {"$addFields": {
+            "_commission": {"$cond": [
+                {"$and": [
+                    "$_has_bank",
+                    {"$eq": [{"$ifNull": ["$commission_amount", None]}, None]},
+                    _truthy("$_commission_rate"),
+                ]},
+                {"$divide": [{"$multiply": ["$_amount", "$_commission_rate"]}, 100]},
+                None,
+            ]},
+            "_cc_valor": {"$cond": [
+                {"$and": [{"$not": [_truthy("$valor_date")]}, "$_has_bank", _truthy("$_valor_days")]},
+                {"$dateToString": {"format": "%Y-%m-%d", "date": {"$add": [
+                    {"$dateFromString": {"dateString": "$date", "format": "%Y-%m-%d", "onError": None, "onNull": None}},
+                    {"$multiply": ["$_valor_days", _DAY_MS]},
+                ]}}},
+                "$valor_date",
+            ]},
+        }},
+        {"$addFields": {
+            "_cc_net": _or(
+                {"$cond": [{"$ne": ["$_commission", None]}, {"$subtract": ["$_amount", "$_commission"]}, "$net_amount"]},
+                "$_amount",
+            ),
+        }},
+        {"$project": {
+            "_id": 0,
+            "currency": "$_currency",
+            "collected": "$_raw_amount",
+            "counted": {"$switch": {"branches": [
+                {"case": {"$not": [_truthy("$_code")]}, "then": False},
+                {"case": {"$in": ["$_code", UNCOUNTED_CODES]}, "then": False},
+                {"case": {"$eq": ["$_code", "check_promissory"]}, "then": "$_has_check"},
+            ], "default": True}},
+            "bucket": {"$switch": {"branches": [
+                {"case": {"$not": [_truthy("$_code")]}, "then": None},
+                {"case": {"$in": ["$_code", UNCOUNTED_CODES]}, "then": None},
+                {"case": {"$in": ["$_code", ["exchange", "transfer", "cash", "bank_transfer"]]}, "then": "available"},
+                {"case": {"$eq": ["$_code", "check_promissory"]}, "then": {"$cond": [
+                    {"$and": ["$_has_check", _truthy("$_due_date")]},
+                    {"$cond": [{"$and": [{"$lte": ["$_due_date", today]}, "$_collected"]}, "available", "pending"]},
+                    None,
+                ]}},
+                {"case": {"$eq": ["$_code", "credit_card"]}, "then": {"$cond": [
+                    {"$and": [_truthy("$_cc_valor"), {"$gt": ["$_cc_valor", today]}]}, "pending", "available",
+                ]}},
+            ], "default": {"$cond": [
+                {"$and": [_truthy("$_settled"), _past_valor("$valor_date", today)]}, "available", "pending",
+            ]}}},
+            "amount": "$_amount",
+            "bucket_amount": {"$cond": [{"$eq": ["$_code", "credit_card"]}, "$_cc_net", "$_amount"]},
+        }},
+        {"$group": {
+            "_id": {"currency": "$currency", "bucket": "$bucket"},
+            "collected": {"$sum": "$collected"},
+            "total": {"$sum": {"$cond": ["$counted", "$amount", 0]}},
+            "bucket_amount": {"$sum": "$bucket_amount"},
+        }},
+    ]
+
+
+def _account_stages(account_ids: List[str], today: str) -> List[dict]:
+    amount = _or("$net_amount", _default_if_missing("amount", 0))
+    available = {"$and": [_truthy(_default_if_missing("is_settled", True)), _past_valor("$valor_date", today)]}
+    return [
+        {"$match": {"cash_account_id": {"$in": account_ids}}},
+        {"$group": {
+            "_id": "$cash_account_id",
+            "total": {"$sum": amount},
+            "available": {"$sum": {"$cond": [available, amount, 0]}},
+            "pending": {"$sum": {"$cond": [available, 0, amount]}},
+        }},
+    ]
+
+
+def build_cash_detail_pipeline(company_id: str, account_ids: List[str], today: str) -> List[dict]:
+    """
+    transactions üzerinde tek pipeline: ``summary`` (para birimi × bucket) ve
+    ``accounts`` (kasa hesabı başına toplam/kullanılabilir/vadedeki) facet'leri.
+    """
+    return [
+        {"$match": {"company_id": company_id, "transaction_type": "payment"}},
+        {"$facet": {
+            "summary": _summary_stages(company_id, today),
+            "accounts": _account_stages(account_ids, today),
+        }},
+    ]
+
+
+def shape_cash_summary(facets: Dict[str, List[dict]]) -> Dict[str, Any]:
+    """Pipeline çıktısını /cash/detail toplam alanlarına çevir"""
+    totals = {
+        name: {c: 0 for c in PAYMENT_CURRENCIES}
+        for name in ("total_collected", "total_amounts", "available_amounts", "pending_amounts")
+    }
+    for row in facets.get("summary", []):
+        currency = row["_id"]["currency"]
+        bucket = row["_id"]["bucket"]
+        totals["total_collected"][currency] = totals["total_collected"].get(currency, 0) + row["collected"]
+        totals["total_amounts"][currency] = totals["total_amounts"].get(currency, 0) + row["total"]
+        if bucket:
+            target = totals[f"{bucket}_amounts"]
+            target[currency] = target.get(currency, 0) + row["bucket_amount"]
+
+    totals["accounts"] = {
+        row["_id"]: {"total": row["total"], "available": row["available"], "pending": row["pending"]}
+        for row in facets.get("accounts", [])
+    }
+    return totals
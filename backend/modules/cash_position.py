@@ -0,0 +1,251 @@
+"""
+Materialized cash position.
+
+``/cash`` shows, per currency, every non-cancelled reservation, extra sale,
+payment, exchange and income minus outgoing payments and expenses the
+company has ever had. Instead of summing the full history on every request,
+``cash_positions`` keeps one document per company::
+
+    {"company_id": ..., "balance": {"EUR": .., "USD": .., "TRY": ..}, "version": n}
+
+Write paths call ``apply_cash_delta`` with the document before and after the
+change; the difference of the two contributions is applied with ``$inc``
+through ``modules.balances`` (idempotent, transactional with
+``MONGO_TRANSACTIONS``) and bumps ``version``. A missing position is
+computed from history on first read: the reader first creates the document
+marked ``computing`` (so deltas from then on land on it and bump
+``version``), computes, and stores the result only if ``version`` did not
+move meanwhile; otherwise it computes again. ``reconcile_cash_positions``
+recomputes positions with one ``$unionWith`` aggregation, reports drift and
+rewrites the document under the same ``version`` condition.
+"""
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from .balances import apply_balance_delta
+
+logger = logging.getLogger(__name__)
+
+CASH_CURRENCIES = ("EUR", "USD", "TRY")
+
+# İlk hesaplama sırasında sürekli delta gelirse en fazla bu kadar tekrar denenir
+CASH_POSITION_COMPUTE_ATTEMPTS = 3
+
+# Katkı hesabı için gereken alanlar (yazım öncesi dokümanı okurken kullanılır)
+CASH_PROJECTION = {
+    "_id": 0, "id": 1, "company_id": 1, "status": 1, "currency": 1, "price": 1, "sale_price": 1,
+    "amount": 1, "transaction_type": 1, "reference_type": 1,
+}
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def cash_contribution(collection: str, doc: Optional[dict]) -> Dict[str, float]:
+    """Bir dokümanın kasa bakiyesine katkısı: {para birimi: tutar}"""
+    if not doc or doc.get("currency") not in CASH_CURRENCIES:
+        return {}
+    currency = doc["currency"]
+
+    if collection == "reservations":
+        amount = 0.0 if doc.get("status") == "cancelled" else _number(doc.get("price"))
+    elif collection == "extra_sales":
+        amount = _number(doc.get("sale_price"))
+    elif collection == "transactions":
+        # /cash'teki üç transaction sorgusu birbirinden bağımsız toplanır
+        amount = 0.0
+        value = _number(doc.get("amount"))
+        if doc.get("transaction_type") == "payment" and doc.get("reference_type") != "outgoing_payment":
+            amount += value
+        if doc.get("reference_type") == "outgoing_payment":
+            amount -= value
+        if doc.get("reference_type") == "currency_exchange":
+            amount += value
+    elif collection == "incomes":
+        amount = _number(doc.get("amount"))
+    elif collection == "expenses":
+        amount = -_number(doc.get("amount"))
+    else:
+        raise ValueError(f"Unknown cash position source: {collection}")
+
+    return {currency: amount} if amount else {}
+
+
+def position_delta(collection: str, before: Optional[dict], after: Optional[dict]) -> Dict[str, float]:
+    """Yazım öncesi/sonrası katkı farkı (sıfır olanlar hariç)"""
+    delta = dict(cash_contribution(collection, after))
+    for currency, amount in cash_contribution(collection, before).items():
+        delta[currency] = delta.get(currency, 0.0) - amount
+    return {currency: amount for currency, amount in delta.items() if abs(amount) > 1e-9}
+
+
+async def apply_cash_delta(
+    db,
+    collection: str,
+    before: Optional[dict],
+    after: Optional[dict],
+    idempotency_key: Optional[str] = None
+) -> bool:
+    """
+    Kaynak doküman yazıldıktan sonra şirketin kasa pozisyonunu güncelle.
+
+    Args:
+        before: Değişiklikten önceki doküman (yeni kayıtta None)
+        after: Değişiklikten sonraki doküman (silmede None)
+        idempotency_key: Verilmezse ekleme/silme için doküman id'sinden türetilir
+    """
+    delta = position_delta(collection, before, after)
+    if not delta:
+        return False
+    source = after or before
+    company_id = source.get("company_id")
+    if not company_id:
+        return False
+
+    if idempotency_key is None:
+        if before is None:
+            event = "insert"
+        elif after is None:
+            event = "delete"
+        else:
+            event = f"update:{uuid.uuid4().hex}"
+        idempotency_key = f"cash_position:{collection}:{source.get('id')}:{event}"
+
+    deltas = {f"balance.{currency}": amount for currency, amount in delta.items()}
+    deltas["version"] = 1
+    # Pozisyon henüz yoksa eşleşme olmaz; bu yazım ilk okumadaki hesaplamaya dahildir
+    return await apply_balance_delta(db, "cash_positions", {"company_id": company_id}, deltas, idempotency_key)
+
+
+async def sync_cash_position(
+    db,
+    collection: str,
+    before: Optional[dict],
+    after: Optional[dict],
+    idempotency_key: Optional[str] = None
+) -> None:
+    """Rezervasyon, extra sale, transaction, gelir veya gider yazıldıktan sonra kasa pozisyonunu güncelle"""
+    try:
+        await apply_cash_delta(db, collection, before, after, idempotency_key)
+    except Exception as e:
+        # Pozisyon hatası yazımı engellememeli; reconcile_cash_positions job'ı düzeltir
+        logger.error(f"Kasa pozisyonu güncellenemedi ({collection}): {e}")
+
+
+def _source(match: Dict[str, Any], amount: Any) -> List[dict]:
+    return [
+        {"$match": match},
+        {"$project": {"_id": 0, "currency": 1, "amount": amount}},
+    ]
+
+
+def build_cash_position_pipeline(company_id: str) -> List[dict]:
+    """reservations üzerinde çalışır; diğer kaynaklar ``$unionWith`` ile eklenir"""
+    unions = [
+        ("extra_sales", {"company_id": company_id}, "$sale_price"),
+        ("transactions", {"company_id": company_id, "transaction_type": "payment",
+                          "reference_type": {"$ne": "outgoing_payment"}}, "$amount"),
+        ("transactions", {"company_id": company_id, "reference_type": "outgoing_payment"},
+         {"$multiply": [-1, "$amount"]}),
+        ("transactions", {"company_id": company_id, "reference_type": "currency_exchange"}, "$amount"),
+        ("incomes", {"company_id": company_id}, "$amount"),
+        ("expenses", {"company_id": company_id}, {"$multiply": [-1, "$amount"]}),
+    ]
+    pipeline = _source({"company_id": company_id, "status": {"$ne": "cancelled"}}, "$price")
+    for collection, match, amount in unions:
+        pipeline.append({"$unionWith": {"coll": collection, "pipeline": _source(match, amount)}})
+    pipeline += [
+        {"$match": {"currency": {"$in": list(CASH_CURRENCIES)}}},
+        {"$group": {"_id": "$currency", "total": {"$sum": "$amount"}}},
+    ]
+    return pipeline
+
+
+async def compute_cash_position(db, company_id: str) -> Dict[str, float]:
+    """Tüm geçmişten bakiye (tek aggregation)"""
+    balance = {currency: 0.0 for currency in CASH_CURRENCIES}
+    async for row in db.reservations.aggregate(build_cash_position_pipeline(company_id)):
+        balance[row["_id"]] = float(row["total"])
+    return balance
+
+
+async def get_cash_position(db, company_id: str) -> Dict[str, float]:
+    """Kasa pozisyonu; doküman yoksa geçmişten hesaplanıp yazılır"""
+    position = await db.cash_positions.find_one({"company_id": company_id}, {"_id": 0, "balance": 1, "computing": 1})
+    if position and not position.get("computing"):
+        stored = position.get("balance") or {}
+        return {currency: float(stored.get(currency, 0.0)) for currency in CASH_CURRENCIES}
+
+    # Önce dokümanı oluştur: bundan sonraki delta'lar ona uygulanır ve version'ı artırır
+    now = datetime.now(timezone.utc)
+    await db.cash_positions.update_one(
+        {"company_id": company_id},
+        {"$setOnInsert": {
+            "balance": {currency: 0.0 for currency in CASH_CURRENCIES},
+            "version": 0, "computing": True, "created_at": now,
+        }},
+        upsert=True
+    )
+
+    balance = {}
+    for _ in range(CASH_POSITION_COMPUTE_ATTEMPTS):
+        current = await db.cash_positions.find_one({"company_id": company_id}, {"_id": 0, "version": 1})
+        version = (current or {}).get("version", 0)
+        balance = await compute_cash_position(db, company_id)
+        # Hesaplama sırasında delta geldiyse sonucu o delta'yı içermeyebilir; tekrar hesapla
+        result = await db.cash_positions.update_one(
+            {"company_id": company_id, "version": version},
+            {"$set": {"balance": balance, "computing": False, "reconciled_at": datetime.now(timezone.utc)}}
+        )
+        if result.matched_count:
+            break
+    else:
+        # Doküman computing kalır; sonraki okuma (veya reconcile) tekrar dener
+        logger.warning(f"Cash position for company {company_id} kept changing during computation")
+    return balance
+
+
+async def reconcile_cash_positions(
+    db,
+    company_id: Optional[str] = None,
+    tolerance: float = 0.01,
+    fix: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Pozisyonları geçmişten yeniden hesapla ve saklanan değerle karşılaştır.
+
+    Returns:
+        Farkı ``tolerance``'ı aşan şirketler: company_id, stored, computed, difference
+    """
+    query = {"company_id": company_id} if company_id else {}
+    drifted = []
+    async for position in db.cash_positions.find(query, {"_id": 0, "company_id": 1, "version": 1, "balance": 1}):
+        cid = position["company_id"]
+        version = position.get("version", 0)
+        stored = {c: float((position.get("balance") or {}).get(c, 0.0)) for c in CASH_CURRENCIES}
+        try:
+            computed = await compute_cash_position(db, cid)
+        except Exception as e:
+            logger.error(f"Cash position reconciliation failed for company {cid}: {e}")
+            continue
+
+        difference = {c: round(stored[c] - computed[c], 2) for c in CASH_CURRENCIES}
+        if any(abs(value) > tolerance for value in difference.values()):
+            drifted.append({"company_id": cid, "stored": stored, "computed": computed, "difference": difference})
+            logger.warning(f"Cash position drift for company {cid}: {difference}")
+
+        if fix:
+            # Hesaplama sırasında delta uygulandıysa version değişmiştir; bir sonraki çalışmaya bırak
+            result = await db.cash_positions.update_one(
+                {"company_id": cid, "version": version},
+                {"$set": {"balance": computed, "computing": False, "reconciled_at": datetime.now(timezone.utc)}}
+            )
+            if not result.matched_count:
+                logger.info(f"Cash position for company {cid} changed during reconciliation, skipped")
+    return drifted
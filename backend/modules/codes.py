@@ -0,0 +1,37 @@
+"""
+Company and cari code generation.
+"""
+import logging
+import random
+import secrets
+
+logger = logging.getLogger(__name__)
+
+async def generate_company_code(db) -> str:
+    """Generate sequential company code starting from 1000"""
+    # Find the company with the highest numeric company_code
+    # We need to fetch all and filter because company_code is string and might contain non-numeric legacy codes
+    try:
+        # Get all company codes
+        cursor = db.companies.find({}, {"company_code": 1})
+        companies = await cursor.to_list(length=10000)
+
+        max_code = 999
+
+        for company in companies:
+            code = company.get("company_code")
+            if code and code.isdigit():
+                code_int = int(code)
+                if code_int > max_code:
+                    max_code = code_int
+
+        return str(max_code + 1)
+    except Exception as e:
+        logger.error(f"Error generating company code: {e}")
+        # Fallback to random if something fails, but try to keep it numeric if possible or fallback to legacy
+        return secrets.token_hex(4).upper()
+
+def generate_cari_code(company_short: str = "CR") -> str:
+    """Benzersiz cari kodu oluştur - format: CR-XXXXXX (6 haneli random)"""
+    random_suffix = ''.join([str(random.randint(0, 9)) for _ in range(6)])
+    return f"{company_short}-{random_suffix}"
@@ -0,0 +1,255 @@
+"""
+Scheduled currency rate service.
+
+Rates used to be fetched from the TCMB XML feed inside request handlers, one
+call per request and company. ``refresh_currency_rates`` now runs on the
+shared ``AsyncIOScheduler`` every ``CURRENCY_RATES_REFRESH_MINUTES``: it
+fetches TCMB (``exchangerate-api`` as a second source), appends a new
+version to ``currency_rate_history`` only when the rates changed, and writes
+that version to every company whose ``currency_rates_locked`` is not set.
+Handlers read the last version from memory (``currency_rate_service``) and
+never wait on the central bank.
+
+With several workers each one runs the job, but a worker that finds a
+version checked within the current interval adopts it instead of fetching
+again; the unique ``version`` index settles the rare race between two
+workers that both fetched.
+
+``current`` is what handlers call: before the first run has finished, or
+with the schedule disabled (``CURRENCY_RATES_REFRESH_MINUTES=0``), it runs
+one refresh in the request instead of answering with the fallback rates.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from xml.etree import ElementTree as ET
+
+from pymongo.errors import DuplicateKeyError
+
+from .cache import reference_cache
+from .http_client import http_client
+
+logger = logging.getLogger(__name__)
+
+# 0: zamanlanmış yenileme kapalı
+CURRENCY_RATES_REFRESH_MINUTES = int(os.environ.get("CURRENCY_RATES_REFRESH_MINUTES", "60"))
+TCMB_RATES_URL = os.environ.get("TCMB_RATES_URL", "https://www.tcmb.gov.tr/kurlar/today.xml")
+FALLBACK_RATES_URL = os.environ.get("FALLBACK_RATES_URL", "https://api.exchangerate-api.com/v4/latest/TRY")
+
+HISTORY_COLLECTION = "currency_rate_history"
+
+# Hiçbir kaynaktan kur alınamadıysa gösterilen değerler (TRY bazlı)
+DEFAULT_RATES = {"TRY": 1.0, "EUR": 35.0, "USD": 34.0}
+
+# Kurlar bu hassasiyette aynıysa yeni versiyon yazılmaz
+RATE_PRECISION = 4
+
+
+def parse_tcmb_rates(content: bytes) -> Optional[Dict[str, float]]:
+    """TCMB today.xml -> {"TRY": 1.0, "EUR": x, "USD": y} (ForexBuying); EUR/USD eksikse None"""
+    root = ET.fromstring(content)
+    rates = {"TRY": 1.0}
+    for currency in ("EUR", "USD"):
+        element = root.find(f".//Currency[@Kod='{currency}']")
+        buying = element.find("ForexBuying") if element is not None else None
+        if buying is None or not buying.text:
+            return None
+        rates[currency] = float(buying.text)  # 1 EUR/USD = X TRY
+    return rates
+
+
+def parse_fallback_rates(data: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    """exchangerate-api (TRY bazlı, 1 TRY = x EUR) -> 1 EUR = X TRY"""
+    rates = data.get("rates") or {}
+    if not rates.get("EUR") or not rates.get("USD"):
+        return None
+    return {"TRY": 1.0, "EUR": 1.0 / rates["EUR"], "USD": 1.0 / rates["USD"]}
+
+
+def rates_equal(a: Optional[Dict[str, float]], b: Optional[Dict[str, float]]) -> bool:
+    if not a or not b or set(a) != set(b):
+        return False
+    return all(round(a[c], RATE_PRECISION) == round(b[c], RATE_PRECISION) for c in a)
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Motor tz_aware olmadan naive datetime döndürür
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+async def fetch_rates(client=http_client) -> Optional[Dict[str, Any]]:
+    """Önce TCMB, olmazsa exchangerate-api; ikisi de olmazsa None"""
+    try:
+        response = await client.get(TCMB_RATES_URL)
+        if response.status_code == 200:
+            rates = parse_tcmb_rates(response.content)
+            if rates:
+                return {"rates": rates, "source": "TCMB"}
+    except Exception as e:
+        logger.warning(f"TCMB rates fetch failed: {e}")
+
+    try:
+        response = await client.get(FALLBACK_RATES_URL)
+        if response.status_code == 200:
+            rates = parse_fallback_rates(response.json())
+            if rates:
+                return {"rates": rates, "source": "exchangerate-api"}
+    except Exception as e:
+        logger.warning(f"Fallback rates fetch failed: {e}")
+    return None
+
+
+class CurrencyRateService:
+    """Son kur versiyonunu bellekte tutar; yenileme sadece zamanlanmış job'dan yapılır"""
+
+    def __init__(self, interval_minutes: int = CURRENCY_RATES_REFRESH_MINUTES):
+        self.interval = timedelta(minutes=max(interval_minutes, 1))
+        # Zamanlanmış job yoksa kurlar sadece istek üzerine çekilir
+        self.scheduled = interval_minutes > 0
+        self._current: Optional[Dict[str, Any]] = None
+        self._lock = asyncio.Lock()
+        self.fetches = 0
+        self.failures = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Handler'lar için: bellekteki son versiyon (yoksa success=False ve varsayılan kurlar)"""
+        current = self._current
+        if current is None:
+            return {
+                "success": False,
+                "rates": dict(DEFAULT_RATES),
+                "source": "fallback",
+                "date": datetime.now().strftime("%Y-%m-%d"),
+                "version": None,
+                "fetched_at": None,
+            }
+        return {
+            "success": True,
+            "rates": dict(current["rates"]),
+            "source": current["source"],
+            "date": current["date"],
+            "version": current["version"],
+            "fetched_at": current["fetched_at"].isoformat(),
+        }
+
+    def _adopt(self, doc: Dict[str, Any]) -> None:
+        self._current = {
+            "version": doc["version"],
+            "rates": doc["rates"],
+            "source": doc["source"],
+            "date": doc["date"],
+            "fetched_at": _as_utc(doc["fetched_at"]),
+        }
+
+    async def _latest(self, db) -> Optional[Dict[str, Any]]:
+        return await db[HISTORY_COLLECTION].find_one({}, {"_id": 0}, sort=[("version", -1)])
+
+    async def _record(self, db, latest: Optional[Dict[str, Any]], fetched: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        """Kurlar değiştiyse yeni versiyon ekle, değişmediyse son versiyonun checked_at'ini güncelle"""
+        if latest and rates_equal(latest["rates"], fetched["rates"]):
+            await db[HISTORY_COLLECTION].update_one({"version": latest["version"]}, {"$set": {"checked_at": now}})
+            return latest
+
+        doc = {
+            "version": (latest["version"] + 1) if latest else 1,
+            "rates": fetched["rates"],
+            "source": fetched["source"],
+            "date": now.strftime("%Y-%m-%d"),
+            "fetched_at": now,
+            "checked_at": now,
+        }
+        try:
+            await db[HISTORY_COLLECTION].insert_one(dict(doc))
+            logger.info(f"Currency rates v{doc['version']} ({doc['source']}): {doc['rates']}")
+            return doc
+        except DuplicateKeyError:
+            # Başka bir worker aynı versiyonu yazdı; onunkini kullan
+            return await self._latest(db)
+
+    async def apply_to_companies(self, db) -> int:
+        """Kilitli olmayan ve son versiyonu henüz almamış şirketlere yaz"""
+        current = self._current
+        if current is None:
+            return 0
+        result = await db.companies.update_many(
+            {"currency_rates_locked": {"$ne": True}, "currency_rates_version": {"$ne": current["version"]}},
+            {"$set": {
+                "currency_rates": current["rates"],
+                "currency_rates_source": current["source"],
+                "currency_rates_version": current["version"],
+                "currency_rates_last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            }}
+        )
+        if result.modified_count:
+            # Bu process'in şirket cache'i; diğer worker'larda REFERENCE_CACHE_TTL_SECONDS içinde düşer
+            reference_cache.invalidate_where(lambda key: key[1] == "company")
+            logger.info(f"Currency rates v{current['version']} applied to {result.modified_count} companies")
+        return result.modified_count
+
+    async def refresh(self, db, client=http_client, force: bool = False) -> Dict[str, Any]:
+        """
+        Zamanlanmış job: gerekirse kurları çek, versiyonla ve şirketlere uygula.
+
+        Returns:
+            snapshot() çıktısı
+        """
+        now = datetime.now(timezone.utc)
+        latest = await self._latest(db)
+        checked_at = _as_utc(latest.get("checked_at")) if latest else None
+
+        if not force and checked_at and now - checked_at < self.interval * 0.9:
+            # Bu aralıkta başka bir worker zaten çekti
+            self._adopt(latest)
+        else:
+            self.fetches += 1
+            fetched = await fetch_rates(client)
+            if fetched:
+                doc = await self._record(db, latest, fetched, now)
+                if doc:
+                    self._adopt(doc)
+            else:
+                self.failures += 1
+                logger.error("Currency rates could not be fetched from any source")
+                if latest:
+                    # Son bilinen versiyonla devam
+                    self._adopt(latest)
+
+        await self.apply_to_companies(db)
+        return self.snapshot()
+
+    async def current(self, db, refresh: bool = False, client=http_client) -> Dict[str, Any]:
+        """
+        Handler'lar için snapshot. Bellekte kur yoksa bir kez yenilenir; zamanlama kapalıyken
+        ``refresh=True`` (kullanıcının "güncelle" isteği) her seferinde kaynaktan çeker.
+        """
+        if self._current is not None and not (refresh and not self.scheduled):
+            return self.snapshot()
+        async with self._lock:
+            # Kilidi beklerken başka bir istek yenilemiş olabilir
+            if self._current is None or (refresh and not self.scheduled):
+                return await self.refresh(db, client=client, force=not self.scheduled)
+        return self.snapshot()
+
+    def stats(self) -> Dict[str, Any]:
+        current = self._current
+        return {
+            "version": current["version"] if current else None,
+            "fetched_at": current["fetched_at"].isoformat() if current else None,
+            "fetches": self.fetches,
+            "failures": self.failures,
+        }
+
+
+currency_rate_service = CurrencyRateService()
+
+
+async def refresh_currency_rates(db) -> None:
+    """Scheduler job'ı - hatalar loglanır, job düşmez"""
+    try:
+        await currency_rate_service.refresh(db)
+    except Exception as e:
+        logger.error(f"Currency rate refresh failed: {e}")
@@ -0,0 +1,35 @@
+"""
+MongoDB client shared by ``server.py`` and the domain routers.
+
+The connection settings come from the environment, so ``.env`` must be
+loaded before this module is imported (``server.py`` does that first).
+"""
+import logging
+import os
+from urllib.parse import urlparse
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+logger = logging.getLogger(__name__)
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017").strip('"').strip("'")
+DB_NAME = os.environ.get("DB_NAME", "tourcast")
+
+# MongoDB bağlantısı - timeout ve retry ile
+try:
+    client = AsyncIOMotorClient(
+        MONGO_URL,
+        serverSelectionTimeoutMS=5000,  # 5 saniye timeout
+        connectTimeoutMS=5000
+    )
+    logger.info(f"MongoDB bağlantısı oluşturuldu: {MONGO_URL}")
+except Exception as e:
+    logger.error(f"MongoDB bağlantı hatası: {str(e)}")
+    logger.warning("MongoDB bağlantısı başarısız, ancak uygulama başlatılıyor...")
+
+try:
+    parsed_url = urlparse(MONGO_URL)
+    db_name_from_url = parsed_url.path.strip('/').split('/')[0] if parsed_url.path else None
+    db = client[db_name_from_url] if db_name_from_url else client[DB_NAME]
+except Exception:
+    db = client[DB_NAME]
@@ -0,0 +1,229 @@
+"""
+Streaming exports (NDJSON / CSV).
+
+Exports walk a Motor cursor in ``EXPORT_BATCH_SIZE`` batches and yield
+encoded chunks to a ``StreamingResponse``, so memory use does not depend on
+the number of exported rows and there is no 10000-row truncation like the
+list endpoints have. Rows are ordered by the dataset's date field and only
+the requested (or default) fields are projected. Datasets with an
+``archive_collection`` (activity logs) export the archive tier with
+``archive=True``, like ``/activity-logs?archive=true``.
+"""
+import csv
+import io
+import json
+import os
+import re
+from datetime import date, datetime, time, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from .activity_logs import ARCHIVE_COLLECTION
+
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", "1000"))
+# Her yield'de gönderilecek satır sayısı (çok küçük parçalar yerine)
+EXPORT_CHUNK_ROWS = int(os.environ.get("EXPORT_CHUNK_ROWS", "200"))
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# date_type: "string" -> "YYYY-MM-DD" alanı, "datetime" -> BSON tarih (created_at)
+# archive_collection: archive=true ile okunan koleksiyon (varsa)
+EXPORT_DATASETS: Dict[str, Dict[str, Any]] = {
+    "reservations": {
+        "collection": "reservations",
+        "date_field": "date",
+        "date_type": "string",
+        "fields": [
+            "id", "date", "time", "voucher_code", "status", "cari_id", "cari_name", "customer_name",
+            "customer_contact", "person_count", "atv_count", "tour_type_name", "price", "currency",
+            "exchange_rate", "pickup_location", "notes", "created_at",
+        ],
+    },
+    "transactions": {
+        "collection": "transactions",
+        "date_field": "date",
+        "date_type": "string",
+        "fields": [
+            "id", "date", "transaction_type", "amount", "currency", "exchange_rate", "payment_method",
+            "cari_id", "reference_type", "reference_id", "description", "bank_account_id", "created_by",
+            "created_at",
+        ],
+    },
+    "expenses": {
+        "collection": "expenses",
+        "date_field": "date",
+        "date_type": "string",
+        "fields": [
+            "id", "date", "amount", "currency", "expense_category_id", "expense_category_name",
+            "payment_method", "description", "notes", "created_by", "created_at",
+        ],
+    },
+    "incomes": {
+        "collection": "incomes",
+        "date_field": "date",
+        "date_type": "string",
+        "fields": [
+            "id", "date", "amount", "currency", "income_category_id", "income_category_name",
+            "payment_method", "description", "notes", "created_by", "created_at",
+        ],
+    },
+    "activity_logs": {
+        "collection": "activity_logs",
+        "archive_collection": ARCHIVE_COLLECTION,
+        "date_field": "created_at",
+        "date_type": "datetime",
+        "fields": [
+            "id", "created_at", "user_id", "username", "full_name", "action", "entity_type",
+            "entity_id", "entity_name", "description", "ip_address",
+        ],
+    },
+}
+
+_FIELD_NAME = re.compile(r"^[A-Za-z0-9_]+(\.[A-Za-z0-9_]+)*$")
+
+
+def get_dataset(name: str) -> Dict[str, Any]:
+    spec = EXPORT_DATASETS.get(name)
+    if not spec:
+        raise HTTPException(status_code=404, detail=f"Bilinmeyen export: {name}")
+    return spec
+
+
+def parse_fields(spec: Dict[str, Any], fields: Optional[str]) -> List[str]:
+    """Virgülle ayrılmış alan listesi; boşsa dataset'in varsayılan alanları"""
+    if not fields:
+        return list(spec["fields"])
+    names = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    invalid = [name for name in names if not _FIELD_NAME.match(name) or name.startswith("_")]
+    if invalid or not names:
+        raise HTTPException(status_code=400, detail=f"Geçersiz alan: {', '.join(invalid) or fields}")
+    return names
+
+
+def _parse_day(value: str, end: bool) -> datetime:
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Geçersiz tarih (YYYY-MM-DD): {value}")
+    return datetime.combine(day, time.max if end else time.min, tzinfo=timezone.utc)
+
+
+def build_export_query(
+    spec: Dict[str, Any],
+    company_id: str,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None
+) -> Dict[str, Any]:
+    query: Dict[str, Any] = {"company_id": company_id}
+    date_query: Dict[str, Any] = {}
+    if spec["date_type"] == "datetime":
+        if date_from:
+            date_query["$gte"] = _parse_day(date_from, end=False)
+        if date_to:
+            date_query["$lte"] = _parse_day(date_to, end=True)
+    else:
+        # Doğrulama için parse et, string karşılaştırma ile filtrele
+        if date_from:
+            _parse_day(date_from, end=False)
+            date_query["$gte"] = date_from
+        if date_to:
+            _parse_day(date_to, end=True)
+            date_query["$lte"] = date_to
+    if date_query:
+        query[spec["date_field"]] = date_query
+    return query
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _lookup(row: Dict[str, Any], field: str) -> Any:
+    value: Any = row
+    for part in field.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=_json_default)
+    return value
+
+
+async def iter_ndjson(cursor) -> AsyncIterator[bytes]:
+    lines: List[str] = []
+    async for row in cursor:
+        lines.append(json.dumps(row, ensure_ascii=False, default=_json_default))
+        if len(lines) >= EXPORT_CHUNK_ROWS:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+async def iter_csv(cursor, fields: List[str]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM: Excel Türkçe karakterleri doğru açsın
+    buffer.write("\ufeff")
+    writer.writerow(fields)
+    rows = 0
+    async for row in cursor:
+        writer.writerow([_csv_value(_lookup(row, field)) for field in fields])
+        rows += 1
+        if rows >= EXPORT_CHUNK_ROWS:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    yield buffer.getvalue().encode("utf-8")
+
+
+def export_response(
+    db,
+    dataset: str,
+    company_id: str,
+    fmt: str = "ndjson",
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    fields: Optional[str] = None,
+    archive: bool = False
+) -> StreamingResponse:
+    """Dataset'i tarih alanına göre artan sırada stream eden response"""
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Desteklenmeyen format: {fmt} (ndjson, csv)")
+    spec = get_dataset(dataset)
+    collection = spec["collection"]
+    if archive:
+        if not spec.get("archive_collection"):
+            raise HTTPException(status_code=400, detail=f"{dataset} için arşiv yok")
+        collection = spec["archive_collection"]
+    columns = parse_fields(spec, fields)
+    query = build_export_query(spec, company_id, date_from, date_to)
+
+    projection = {"_id": 0, **{field: 1 for field in columns}}
+    cursor = db[collection].find(query, projection).sort(
+        [(spec["date_field"], 1), ("id", 1)]
+    ).batch_size(EXPORT_BATCH_SIZE)
+
+    body = iter_csv(cursor, columns) if fmt == "csv" else iter_ndjson(cursor)
+    filename = f"{dataset}{'_archive' if archive else ''}_{date_from or 'start'}_{date_to or 'end'}.{fmt}"
+    return StreamingResponse(
+        body,
+        media_type=FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
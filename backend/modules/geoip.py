@@ -0,0 +1,249 @@
+"""
+IP → location resolution for login activity.
+
+Lookups go through an in-memory TTL/LRU cache, then (optionally) a Mongo
+``geo_ip_cache`` collection whose documents expire through a TTL index, and
+only then to the network (ipapi.co via the shared HTTP client). Failures and
+rate limits are cached for a shorter time so a struggling provider is not
+hammered. With ``GEOIP_MODE=offline`` the network is never used and
+locations come from a local range file (CSV, or ``.mmdb`` when the optional
+``maxminddb`` package is installed).
+
+CSV format (header required)::
+
+    network,city,region,country
+    78.160.0.0/11,Istanbul,Istanbul,Turkey
+
+or ``start_ip,end_ip,city,region,country`` for explicit ranges.
+"""
+import bisect
+import csv
+import ipaddress
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from .cache import TTLCache
+from .http_client import http_client
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN_LOCATION = "Bilinmeyen Konum"
+LOCALHOST_LOCATION = "Localhost / Dev Environment"
+
+# online: sadece ipapi.co, offline: sadece yerel dosya, hybrid: önce dosya sonra ipapi.co
+GEOIP_MODE = os.environ.get("GEOIP_MODE", "online").lower()
+GEOIP_OFFLINE_FILE = os.environ.get("GEOIP_OFFLINE_FILE")
+GEOIP_PERSIST = os.environ.get("GEOIP_PERSIST", "false").lower() in ("1", "true", "yes")
+GEOIP_TTL_SECONDS = float(os.environ.get("GEOIP_CACHE_TTL_SECONDS", "86400"))
+GEOIP_NEGATIVE_TTL_SECONDS = float(os.environ.get("GEOIP_NEGATIVE_TTL_SECONDS", "600"))
+GEOIP_RATE_LIMIT_TTL_SECONDS = float(os.environ.get("GEOIP_RATE_LIMIT_TTL_SECONDS", "3600"))
+
+
+def format_location(city: Optional[str], region: Optional[str], country: Optional[str]) -> str:
+    location_parts = [part for part in (city, region, country) if part]
+    return ", ".join(location_parts) if location_parts else UNKNOWN_LOCATION
+
+
+class OfflineGeoDatabase:
+    """Yerel IP aralığı dosyasından (CSV veya MMDB) konum bulur"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._reader = None
+        # IP versiyonu -> sıralı (başlangıç, bitiş, konum) listesi
+        self._ranges: Dict[int, List[Tuple[int, int, str]]] = {4: [], 6: []}
+        self._starts: Dict[int, List[int]] = {4: [], 6: []}
+        if path.lower().endswith(".mmdb"):
+            self._load_mmdb(path)
+        else:
+            self._load_csv(path)
+
+    def _load_mmdb(self, path: str) -> None:
+        try:
+            import maxminddb
+        except ImportError:
+            raise RuntimeError("maxminddb package is required for .mmdb files (pip install maxminddb)")
+        self._reader = maxminddb.open_database(path)
+
+    def _load_csv(self, path: str) -> None:
+        with open(path, newline="", encoding="utf-8") as handle:
+            for row in csv.DictReader(handle):
+                try:
+                    if row.get("network"):
+                        network = ipaddress.ip_network(row["network"].strip(), strict=False)
+                        start, end, version = int(network.network_address), int(network.broadcast_address), network.version
+                    else:
+                        start_ip = ipaddress.ip_address(row["start_ip"].strip())
+                        end_ip = ipaddress.ip_address(row["end_ip"].strip())
+                        start, end, version = int(start_ip), int(end_ip), start_ip.version
+                except (KeyError, ValueError) as e:
+                    logger.warning(f"Skipping invalid geo-IP row {row}: {e}")
+                    continue
+                location = format_location(row.get("city"), row.get("region"), row.get("country"))
+                self._ranges[version].append((start, end, location))
+
+        for version, ranges in self._ranges.items():
+            ranges.sort()
+            self._starts[version] = [start for start, _, _ in ranges]
+        logger.info(f"Loaded {sum(len(r) for r in self._ranges.values())} geo-IP ranges from {path}")
+
+    def lookup(self, ip_address: str) -> Optional[str]:
+        try:
+            ip = ipaddress.ip_address(ip_address)
+        except ValueError:
+            return None
+
+        if self._reader is not None:
+            record = self._reader.get(ip_address) or {}
+            city = (record.get("city") or {}).get("names", {}).get("en")
+            subdivisions = record.get("subdivisions") or [{}]
+            region = subdivisions[0].get("names", {}).get("en")
+            country = (record.get("country") or {}).get("names", {}).get("en")
+            return format_location(city, region, country) if (city or region or country) else None
+
+        value = int(ip)
+        position = bisect.bisect_right(self._starts[ip.version], value) - 1
+        if position < 0:
+            return None
+        start, end, location = self._ranges[ip.version][position]
+        return location if start <= value <= end else None
+
+
+class GeoIPResolver:
+    """Bellek cache'i → Mongo cache'i → yerel dosya / ipapi.co sırasıyla konum çözer"""
+
+    def __init__(
+        self,
+        mode: str = GEOIP_MODE,
+        offline_file: Optional[str] = GEOIP_OFFLINE_FILE,
+        persist: bool = GEOIP_PERSIST,
+        ttl: float = GEOIP_TTL_SECONDS,
+        negative_ttl: float = GEOIP_NEGATIVE_TTL_SECONDS,
+        rate_limit_ttl: float = GEOIP_RATE_LIMIT_TTL_SECONDS,
+        client=None
+    ):
+        self.mode = mode
+        self.persist = persist
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.rate_limit_ttl = rate_limit_ttl
+        self.cache = TTLCache("geo_ip", maxsize=int(os.environ.get("GEOIP_CACHE_MAXSIZE", "10000")), ttl=ttl)
+        self._client = client or http_client
+        self._db = None
+        self.offline: Optional[OfflineGeoDatabase] = None
+        self.network_lookups = 0
+        self.negative_results = 0
+        if offline_file:
+            try:
+                self.offline = OfflineGeoDatabase(offline_file)
+            except Exception as e:
+                logger.warning(f"Geo-IP offline database could not be loaded: {e}")
+
+    def bind(self, db) -> None:
+        """Mongo kalıcılığı için veritabanını bağla (GEOIP_PERSIST açıksa kullanılır)"""
+        self._db = db
+
+    async def lookup(self, ip_address: str) -> str:
+        if ip_address in ["127.0.0.1", "::1", "localhost", "unknown"]:
+            return LOCALHOST_LOCATION
+        try:
+            ip = ipaddress.ip_address(ip_address)
+        except ValueError:
+            return UNKNOWN_LOCATION
+        if ip.is_private or ip.is_loopback or ip.is_reserved or ip.is_link_local:
+            return UNKNOWN_LOCATION
+
+        cached = self.cache.get(ip_address)
+        if cached is not None:
+            return cached
+
+        persisted = await self._load_persisted(ip_address)
+        if persisted is not None:
+            return persisted
+
+        location, ttl = await self._resolve(ip_address)
+        self.cache.set(ip_address, location, ttl=ttl)
+        await self._persist(ip_address, location, ttl)
+        return location
+
+    async def _resolve(self, ip_address: str) -> Tuple[str, float]:
+        """(konum, cache süresi) döndür"""
+        if self.offline is not None and self.mode in ("offline", "hybrid"):
+            location = self.offline.lookup(ip_address)
+            if location:
+                return location, self.ttl
+        if self.mode == "offline":
+            self.negative_results += 1
+            return UNKNOWN_LOCATION, self.negative_ttl
+
+        self.network_lookups += 1
+        try:
+            # Use ipapi.co free API (no API key required for basic usage)
+            response = await self._client.get(f"https://ipapi.co/{ip_address}/json/")
+            if response.status_code == 429:
+                self.negative_results += 1
+                return UNKNOWN_LOCATION, self.rate_limit_ttl
+            if response.status_code == 200:
+                data = response.json()
+                if data.get("error"):
+                    # ipapi hata kodu (ör. "RateLimited") kalıcı değil, kısa süre cache'le
+                    self.negative_results += 1
+                    ttl = self.rate_limit_ttl if "rate" in str(data.get("reason", "")).lower() else self.negative_ttl
+                    return UNKNOWN_LOCATION, ttl
+                location = format_location(data.get("city"), data.get("region"), data.get("country_name"))
+                if location != UNKNOWN_LOCATION:
+                    return location, self.ttl
+        except Exception as e:
+            logger.warning(f"Geo-location lookup error for IP {ip_address}: {e}")
+        self.negative_results += 1
+        return UNKNOWN_LOCATION, self.negative_ttl
+
+    async def _load_persisted(self, ip_address: str) -> Optional[str]:
+        if not (self.persist and self._db is not None):
+            return None
+        try:
+            doc = await self._db.geo_ip_cache.find_one({"ip": ip_address}, {"_id": 0, "location": 1, "expires_at": 1})
+        except Exception as e:
+            logger.warning(f"Geo-IP cache read failed: {e}")
+            return None
+        if not doc:
+            return None
+        expires_at = doc["expires_at"]
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+        # TTL monitor dakikada bir çalışır; süresi dolmuş ama silinmemiş kayıtları yok say
+        if remaining <= 0:
+            return None
+        self.cache.set(ip_address, doc["location"], ttl=remaining)
+        return doc["location"]
+
+    async def _persist(self, ip_address: str, location: str, ttl: float) -> None:
+        if not (self.persist and self._db is not None):
+            return
+        try:
+            await self._db.geo_ip_cache.update_one(
+                {"ip": ip_address},
+                {"$set": {
+                    "location": location,
+                    "negative": location == UNKNOWN_LOCATION,
+                    "expires_at": datetime.now(timezone.utc) + timedelta(seconds=ttl)
+                }},
+                upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"Geo-IP cache write failed: {e}")
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "offline_loaded": self.offline is not None,
+            "persist": self.persist,
+            "network_lookups": self.network_lookups,
+            "negative_results": self.negative_results,
+        }
+
+
+geoip_resolver = GeoIPResolver()
@@ -0,0 +1,215 @@
+"""
+Shared outbound HTTP client.
+
+External lookups (geo-IP, public IP, exchange rates, iCal feeds) used to call
+``requests.get`` directly from async handlers, blocking the event loop for the
+whole request. ``AsyncHTTPClient`` keeps one pooled keep-alive
+``requests.Session``, runs each call in its own bounded thread pool, applies
+per-host timeouts and trips a per-host circuit breaker when a host keeps
+failing, so a slow provider never stalls unrelated requests. Breakers live
+in a ``TTLCache``: hosts come from feed URLs too, so a host that has not
+been called for ``HTTP_CLIENT_BREAKER_TTL_SECONDS`` is forgotten and at most
+``HTTP_CLIENT_MAX_BREAKERS`` are kept.
+"""
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Host bazlı timeout (saniye) - listede olmayan host'lar DEFAULT_TIMEOUT kullanır
+HOST_TIMEOUTS: Dict[str, float] = {
+    "ipapi.co": 3,
+    "api.ipify.org": 5,
+    "api.my-ip.io": 5,
+    "ifconfig.me": 5,
+    "api.exchangerate-api.com": 5,
+    "www.tcmb.gov.tr": 10,
+}
+DEFAULT_TIMEOUT = float(os.environ.get("HTTP_CLIENT_TIMEOUT_SECONDS", "10"))
+CONNECT_TIMEOUT = float(os.environ.get("HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS", "3"))
+# Devre kesici haritasının sınırı (iCal feed'leri vb. kullanıcıdan gelen host'lar)
+MAX_BREAKERS = int(os.environ.get("HTTP_CLIENT_MAX_BREAKERS", "1024"))
+BREAKER_TTL_SECONDS = float(os.environ.get("HTTP_CLIENT_BREAKER_TTL_SECONDS", "3600"))
+
+
+class CircuitOpenError(Exception):
+    """Host devre kesici açıkken istek yapılmaz"""
+
+    def __init__(self, host: str, retry_after: float):
+        super().__init__(f"Circuit open for {host}, retry after {retry_after:.0f}s")
+        self.host = host
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Ardışık ``failure_threshold`` hatadan sonra ``reset_timeout`` saniye boyunca açık kalır;
+    süre dolunca tek bir deneme isteğine izin verir (half-open), başarılıysa kapanır.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0, timer=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._timer = timer
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.half_open_in_flight = False
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self._timer() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_request(self, host: str) -> None:
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half_open" and not self.half_open_in_flight:
+            self.half_open_in_flight = True
+            return
+        self.rejected += 1
+        retry_after = max(0.0, self.reset_timeout - (self._timer() - self.opened_at))
+        raise CircuitOpenError(host, retry_after)
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.half_open_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.half_open_in_flight or self.failures >= self.failure_threshold:
+            self.opened_at = self._timer()
+        self.half_open_in_flight = False
+
+
+class AsyncHTTPClient:
+    """Thread havuzunda çalışan, bağlantı havuzlu ve devre kesicili HTTP istemcisi"""
+
+    def __init__(
+        self,
+        max_workers: int = 16,
+        pool_maxsize: int = 16,
+        host_timeouts: Optional[Dict[str, float]] = None,
+        default_timeout: float = DEFAULT_TIMEOUT,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+        max_breakers: int = MAX_BREAKERS,
+        breaker_ttl: float = BREAKER_TTL_SECONDS
+    ):
+        self.max_workers = max_workers
+        self.pool_maxsize = pool_maxsize
+        self.host_timeouts = dict(host_timeouts or {})
+        self.default_timeout = default_timeout
+        self.connect_timeout = connect_timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._session: Optional[requests.Session] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # TTL reset_timeout'tan kısa olursa açık bir devre süresinden önce unutulur
+        self._breakers = TTLCache("http_circuit_breakers", maxsize=max_breakers, ttl=max(breaker_ttl, reset_timeout))
+        self.requests = 0
+        self.failures = 0
+
+    def _get_session(self) -> requests.Session:
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=32, pool_maxsize=self.pool_maxsize, max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._session = session
+        return self._session
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="http-client")
+        return self._executor
+
+    def breaker_for(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        # Her istekte süre yenilenir: sadece kullanılmayan host'lar düşer
+        self._breakers.set(host, breaker)
+        return breaker
+
+    def timeout_for(self, host: str) -> float:
+        return self.host_timeouts.get(host, self.default_timeout)
+
+    async def request(self, method: str, url: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        """
+        HTTP isteğini event loop'u bloklamadan yap.
+
+        Raises:
+            CircuitOpenError: Host devre kesicisi açıksa
+            requests.RequestException: Bağlantı/timeout hataları
+        """
+        host = urlparse(url).hostname or ""
+        breaker = self.breaker_for(host)
+        breaker.before_request(host)
+
+        read_timeout = timeout if timeout is not None else self.timeout_for(host)
+        session = self._get_session()
+        self.requests += 1
+        try:
+            response = await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(),
+                lambda: session.request(method, url, timeout=(min(self.connect_timeout, read_timeout), read_timeout), **kwargs)
+            )
+        except Exception:
+            self.failures += 1
+            breaker.record_failure()
+            raise
+
+        # 5xx yanıtlar host'un sorunlu olduğunu gösterir; 4xx istek hatasıdır
+        if response.status_code >= 500:
+            self.failures += 1
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    async def get(self, url: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        return await self.request("GET", url, timeout=timeout, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "hosts": {
+                host: {"state": breaker.state, "failures": breaker.failures, "rejected": breaker.rejected}
+                for host, breaker in self._breakers.items()
+            },
+        }
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+http_client = AsyncHTTPClient(
+    max_workers=int(os.environ.get("HTTP_CLIENT_WORKERS", "16")),
+    pool_maxsize=int(os.environ.get("HTTP_CLIENT_POOL_MAXSIZE", "16")),
+    host_timeouts=HOST_TIMEOUTS,
+    failure_threshold=int(os.environ.get("HTTP_CLIENT_FAILURE_THRESHOLD", "5")),
+    reset_timeout=float(os.environ.get("HTTP_CLIENT_RESET_TIMEOUT_SECONDS", "60"))
+)
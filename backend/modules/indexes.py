@@ -0,0 +1,521 @@
+"""
+Declarative MongoDB index registry.
+
+Every tenant-scoped collection lists the indexes its hot queries need.
+``reconcile_indexes`` compares the registry with what exists in MongoDB,
+creates what is missing and reports what is extra or conflicting.
+``explain_query_shapes`` runs the top query shapes through the query planner
+and flags the ones that still fall back to a collection scan.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from .activity_logs import ACTIVITY_LOG_ARCHIVE_DAYS, ACTIVITY_LOG_ARCHIVE_RETENTION_DAYS
+from .balances import BALANCE_OPERATION_RETENTION_DAYS
+
+logger = logging.getLogger(__name__)
+
+# Activity log kayıtları 30 gün sonra TTL ile silinir (ACTIVITY_LOG_ARCHIVE_DAYS ile arşive taşınmıyorsa)
+ACTIVITY_LOG_TTL_SECONDS = 2592000
+
+
+def _idx(*keys: Tuple[str, int], **options) -> Dict[str, Any]:
+    """Registry girdisi oluştur: anahtarlar + index seçenekleri (unique, expireAfterSeconds, ...)"""
+    return {"keys": list(keys), "options": options}
+
+
+def _unique_id() -> Dict[str, Any]:
+    return _idx(("id", ASCENDING), unique=True)
+
+
+# Voucher kodları şirket içinde ve sadece string olan dokümanlar için benzersiz (eski kayıtlarda alan
+# yok/null olabilir). Eski 4 haneli random kodlar şirketler arasında tekrar ettiği için global olamaz.
+_VOUCHER_PARTIAL = {"voucher_code": {"$type": "string"}}
+
+INDEX_REGISTRY: Dict[str, List[Dict[str, Any]]] = {
+    "companies": [
+        _unique_id(),
+        _idx(("company_code", ASCENDING)),
+        _idx(("slug", ASCENDING)),
+    ],
+    "users": [
+        _unique_id(),
+        _idx(("username", ASCENDING)),
+        _idx(("email", ASCENDING)),
+        _idx(("company_id", ASCENDING), ("role", ASCENDING)),
+        _idx(("company_id", ASCENDING), ("full_name", ASCENDING), ("id", ASCENDING)),
+    ],
+    "reservations": [
+        _unique_id(),
+        _idx(("company_id", ASCENDING), ("date", DESCENDING), ("status", ASCENDING)),
+        # Keyset sayfalama: (sıralama alanı, id) - modules/pagination.py
+        _idx(("company_id", ASCENDING), ("date", DESCENDING), ("id", DESCENDING)),
+        _idx(("company_id", ASCENDING), ("status", ASCENDING), ("reservation_source", ASCENDING)),
+        _idx(("company_id", ASCENDING), ("cari_id", ASCENDING), ("date", DESCENDING)),
+        _idx(("company_id", ASCENDING), ("customer_name", ASCENDING)),
+        _idx(("company_id", ASCENDING), ("voucher_code", ASCENDING), unique=True, partialFilterExpression=_VOUCHER_PARTIAL),
+    ],
+    "extra_sales": [
+        _unique_id(),
+        _idx(("company_id", ASCENDING), ("date", DESCENDING), ("id", DESCENDING)),
+        _idx(("cari_id", ASCENDING), ("date", DESCENDING)),
+        _idx(("company_id", ASCENDING), ("voucher_code", ASCENDING), unique=True, partialFilterExpression=_VOUCHER_PARTIAL),
+    ],
+    "transactions": [
+        _unique_id(),
+        _idx(("cari_id", ASCENDING), ("date", DESCENDING)),
+        # Ledger: checkpoint sonrası işlemler (cari_id + ObjectId aralığı)
+        _idx(("cari_id", ASCENDING), ("_id", ASCENDING)),
+        _idx(("reference_id", ASCENDING), ("reference_type", ASCENDING)),
+        _idx(("company_id", ASCENDING), ("transaction_type", ASCENDING), ("date", DESCENDING)),
+        _idx(("company_id", ASCENDING), ("customer_name", ASCENDING)),
+        _idx(("company_id", ASCENDING), ("date", DESCENDING), ("id", DESCENDING)),
+        # Kasa pozisyonu: giden ödemeler / döviz çevirileri
+        _idx(("company_id", ASCENDING), ("reference_type", ASCENDING)),
+    ],
+    "cari_accounts": [
+        _unique_id(),
+        _idx(("company_id", ASCENDING), ("name", ASCENDING)),
+    ],
+    "caris": [
+        _unique_id(),
+        _idx(("company_id", ASCENDING), ("cari_code", ASCENDING)),
+    ],
+    "cari_customers": [
+        _unique_id(),
+        _idx(("company_id", ASCENDING), ("cari_id", ASCENDING), ("customer_name", ASCENDING)),
+        _idx(("company_id", ASCENDING), ("last_reservation_date", DESCENDING), ("id", DESCENDING)),
+    ],
+    "munferit_customers": [
+        _unique_id(),
+        _idx(("company_id", ASCENDING), ("customer_name", ASCENDING)),
+        _idx(("company_id", ASCENDING), ("last_sale_date", DESCENDING), ("id", DESCENDING)),
+    ],
+    "tour_types": [
+        _unique_id(),
+        _idx(("company_id", ASCENDING)),
+    ],
+    "payment_types": [
+        _unique_id(),
+        _idx(("company_id", ASCENDING), ("code", ASCENDING)),
+    ],
+    "bank_accounts": [
+        _unique_id(),
+        _idx(("company_id", ASCENDING)),
+    ],
+    "cash_accounts": [
+        _unique_id(),
+        _idx(("company_id", ASCENDING), ("currency", ASCENDING)),
+    ],
+    "cash_positions": [
+        _idx(("company_id", ASCENDING), unique=True),
+    ],
+    "currency_rate_history": [
+        # Son versiyon: sort version -1; eşzamanlı iki worker aynı versiyonu yazamaz
+        _idx(("version", DESCENDING), unique=True),
+    ],
+    "check_promissories": [
+        # /cash/detail $lookup: transaction -> çek/senet
+        _idx(("transaction_id", ASCENDING)),
+        _idx(("company_id", ASCENDING), ("due_date", ASCENDING)),
+    ],
+    "seasonal_prices": [
+        _unique_id(),
+        _idx(("company_id", ASCENDING), ("start_date", DESCENDING)),
+    ],
+    "vehicle_categories": [
+        _unique_id(),
+        _idx(("company_id", ASCENDING)),
+    ],
+    "notifications": [
+        _unique_id(),
+        _idx(("company_id", ASCENDING), ("user_id", ASCENDING), ("is_read", ASCENDING), ("created_at", DESCENDING)),
+    ],
+    "incomes": [
+        _unique_id(),
+        _idx(("company_id", ASCENDING), ("date", DESCENDING), ("id", DESCENDING)),
+    ],
+    "expenses": [
+        _unique_id(),
+        _idx(("company_id", ASCENDING), ("date", DESCENDING), ("id", DESCENDING)),
+    ],
+    "cash_exchanges": [
+        _unique_id(),
+        _idx(("company_id", ASCENDING), ("created_at", DESCENDING)),
+    ],
+    "activity_logs": [
+        # Arşiv açıksa TTL kaldırılır (çakışma olarak yeniden oluşturulur); index arşiv taramasında kullanılır
+        _idx(("created_at", ASCENDING), expireAfterSeconds=ACTIVITY_LOG_TTL_SECONDS)
+        if not ACTIVITY_LOG_ARCHIVE_DAYS else _idx(("created_at", ASCENDING)),
+        _idx(("company_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)),
+    ],
+    "activity_logs_archive": [
+        _idx(("company_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)),
+    ] + ([
+        _idx(("created_at", ASCENDING), expireAfterSeconds=ACTIVITY_LOG_ARCHIVE_RETENTION_DAYS * 86400),
+    ] if ACTIVITY_LOG_ARCHIVE_RETENTION_DAYS else []),
+    "login_activities": [
+        _idx(("user_id", ASCENDING), ("created_at", DESCENDING)),
+    ],
+    # Geo-IP sonuç cache'i: her kaydın kendi expires_at'i var (negatif sonuçlar daha kısa)
+    "geo_ip_cache": [
+        _idx(("ip", ASCENDING), unique=True),
+        _idx(("expires_at", ASCENDING), expireAfterSeconds=0),
+    ],
+    # Idempotent bakiye işlemleri (modules/balances.py)
+    "balance_operations": [
+        _idx(("key", ASCENDING), unique=True),
+        _idx(("state", ASCENDING), ("created_at", ASCENDING)),
+        # Sadece uygulanmış kayıtlar silinir; pending/applying kayıtlar drift raporu için kalır
+        _idx(
+            ("applied_at", ASCENDING),
+            expireAfterSeconds=BALANCE_OPERATION_RETENTION_DAYS * 86400,
+            partialFilterExpression={"state": "applied"}
+        ),
+    ],
+    # Cari bakiye checkpoint'leri (modules/ledger.py): cari başına tek doküman
+    "cari_balance_checkpoints": [
+        _idx(("cari_id", ASCENDING), unique=True),
+    ],
+    # Günlük rezervasyon rollup'ları: bucket başına tek doküman (modules/rollups.py)
+    "daily_rollups": [
+        _idx(
+            ("company_id", ASCENDING), ("date", ASCENDING), ("status", ASCENDING),
+            ("tour_type_id", ASCENDING), ("cari_id", ASCENDING), ("pickup_location", ASCENDING),
+            ("hour", ASCENDING), ("currency", ASCENDING),
+            unique=True
+        ),
+    ],
+}
+
+# explain-plan kontrolü için en sık kullanılan sorgu şekilleri (değerler sadece örnek)
+QUERY_SHAPES: List[Dict[str, Any]] = [
+    {
+        "name": "reservations_by_day",
+        "collection": "reservations",
+        "filter": {"company_id": "x", "date": {"$gte": "2025-01-01", "$lte": "2025-01-31"}, "status": {"$ne": "cancelled"}},
+        "sort": {"date": -1},
+    },
+    {
+        "name": "pending_cari_reservations",
+        "collection": "reservations",
+        "filter": {"company_id": "x", "status": "pending_approval", "reservation_source": "cari"},
+        "sort": {"date": -1},
+    },
+    {
+        "name": "transactions_by_cari",
+        "collection": "transactions",
+        "filter": {"cari_id": "x"},
+        "sort": {"date": -1},
+    },
+    {
+        "name": "transactions_by_reference",
+        "collection": "transactions",
+        "filter": {"reference_id": "x", "reference_type": "reservation"},
+    },
+    {
+        "name": "user_by_id",
+        "collection": "users",
+        "filter": {"id": "x"},
+    },
+    {
+        "name": "tour_type_by_id",
+        "collection": "tour_types",
+        "filter": {"id": "x"},
+    },
+    {
+        "name": "unread_notifications",
+        "collection": "notifications",
+        "filter": {"company_id": "x", "user_id": "x", "is_read": False},
+        "sort": {"created_at": -1},
+    },
+    {
+        "name": "activity_logs_recent",
+        "collection": "activity_logs",
+        "filter": {"company_id": "x"},
+        "sort": {"created_at": -1},
+    },
+    {
+        "name": "daily_rollups_by_range",
+        "collection": "daily_rollups",
+        "filter": {"company_id": "x", "date": {"$gte": "2025-01-01", "$lte": "2025-01-31"}, "status": {"$ne": "cancelled"}},
+    },
+]
+
+# IndexOptionsConflict, IndexKeySpecsConflict: aynı anahtarlarla ikinci index kurulamaz
+_INDEX_CONFLICT_CODES = (85, 86)
+
+# Karşılaştırmada dikkate alınan index seçenekleri
+_COMPARED_OPTIONS = ("unique", "expireAfterSeconds", "partialFilterExpression", "sparse")
+
+
+def index_name(keys: List[Tuple[str, int]]) -> str:
+    """MongoDB'nin varsayılan index adını üret (ör. company_id_1_date_-1)"""
+    return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+
+def _normalize_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    normalized = {}
+    for option in _COMPARED_OPTIONS:
+        value = options.get(option)
+        if value in (None, False):
+            continue
+        if option == "expireAfterSeconds":
+            value = int(value)
+        normalized[option] = value
+    return normalized
+
+
+def diff_indexes(
+    expected: List[Dict[str, Any]],
+    existing: Dict[str, Dict[str, Any]]
+) -> Dict[str, List[str]]:
+    """
+    Registry ile mevcut index bilgisini (collection.index_information()) karşılaştır.
+
+    Returns:
+        {"missing": [...], "extra": [...], "conflicting": [...], "ok": [...]}
+    """
+    existing_by_keys = {
+        tuple((field, int(direction)) for field, direction in info.get("key", [])): name
+        for name, info in existing.items()
+    }
+    result = {"missing": [], "extra": [], "conflicting": [], "ok": []}
+    matched = {"_id_"}
+
+    for spec in expected:
+        keys = tuple((field, int(direction)) for field, direction in spec["keys"])
+        name = existing_by_keys.get(keys)
+        if name is None:
+            result["missing"].append(index_name(spec["keys"]))
+            continue
+        matched.add(name)
+        if _normalize_options(existing[name]) != _normalize_options(spec["options"]):
+            result["conflicting"].append(name)
+        else:
+            result["ok"].append(name)
+
+    result["extra"] = sorted(name for name in existing if name not in matched)
+    return result
+
+
+async def replace_index(
+    collection,
+    name: str,
+    existing_info: Dict[str, Any],
+    spec: Dict[str, Any],
+    force: bool = False
+) -> None:
+    """
+    Seçenekleri farklı index'i registry'dekiyle değiştir; eski index yenisi kurulmadan düşürülmez.
+
+    Sadece TTL süresi farklıysa collMod ile yerinde değiştirilir. Diğer durumlarda yeni index
+    başka bir isimle kurulur, başarılı olursa eskisi düşürülür. MongoDB aynı anahtarlarla ikinci
+    bir index'e izin vermiyorsa (ör. TTL'i kaldırmak, unique eklemek) hata verilir ve eski index
+    yerinde kalır; ``force=True`` ile eskisi düşürülüp yenisi kurulur, kurulamazsa eskisi geri
+    kurulur.
+
+    Raises:
+        OperationFailure: Yeni index kurulamadı (eski index yerinde kalır)
+    """
+    existing_options = _normalize_options(existing_info)
+    expected_options = _normalize_options(spec["options"])
+    ttl_only = (
+        "expireAfterSeconds" in existing_options and "expireAfterSeconds" in expected_options
+        and {k: v for k, v in existing_options.items() if k != "expireAfterSeconds"}
+        == {k: v for k, v in expected_options.items() if k != "expireAfterSeconds"}
+    )
+    if ttl_only:
+        await collection.database.command({
+            "collMod": collection.name,
+            "index": {"name": name, "expireAfterSeconds": expected_options["expireAfterSeconds"]},
+        })
+        return
+
+    base_name = index_name(spec["keys"])
+    new_name = base_name if name != base_name else f"{base_name}_v2"
+    try:
+        await collection.create_indexes([IndexModel(spec["keys"], name=new_name, **spec["options"])])
+    except OperationFailure as e:
+        if not force or e.code not in _INDEX_CONFLICT_CODES:
+            raise
+        await collection.drop_index(name)
+        try:
+            await collection.create_indexes([IndexModel(spec["keys"], **spec["options"])])
+        except Exception:
+            keys = [(field, int(direction)) for field, direction in existing_info["key"]]
+            await collection.create_indexes([IndexModel(keys, name=name, **existing_options)])
+            raise
+        return
+    await collection.drop_index(name)
+
+
+async def reconcile_indexes(
+    db,
+    collections: Optional[List[str]] = None,
+    create_missing: bool = True,
+    fix_conflicts: bool = True,
+    drop_extra: bool = False,
+    force_replace: bool = False
+) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Registry'deki index'leri veritabanıyla eşitle.
+
+    Args:
+        collections: Sadece bu koleksiyonları işle (None = registry'deki hepsi)
+        create_missing: Eksik index'leri oluştur
+        fix_conflicts: Seçenekleri farklı olan index'i yenisiyle değiştir (sadece CLI'dan; bkz. replace_index)
+        drop_extra: Registry'de olmayan index'leri düşür (sadece CLI'dan bilinçli olarak)
+        force_replace: Yanına kurulamayan çakışan index'i düşürüp yeniden kur (replace_index force)
+
+    Returns:
+        Koleksiyon bazında rapor; oluşturma hataları "errors" altında listelenir.
+    """
+    report: Dict[str, Dict[str, List[str]]] = {}
+
+    for collection_name, specs in INDEX_REGISTRY.items():
+        if collections and collection_name not in collections:
+            continue
+        collection = db[collection_name]
+        try:
+            existing = await collection.index_information()
+        except OperationFailure as e:
+            # Koleksiyon henüz yok - tüm index'ler eksik sayılır
+            logger.debug(f"index_information failed for {collection_name}: {e}")
+            existing = {}
+
+        collection_report = diff_indexes(specs, existing)
+        collection_report["errors"] = []
+        specs_by_name = {index_name(spec["keys"]): spec for spec in specs}
+
+        if fix_conflicts:
+            for name in collection_report["conflicting"]:
+                keys = [(field, int(direction)) for field, direction in existing[name]["key"]]
+                spec = specs_by_name.get(index_name(keys))
+                try:
+                    await replace_index(collection, name, existing[name], spec, force=force_replace)
+                    logger.info(f"Recreated index {collection_name}.{name} with registry options")
+                except Exception as e:
+                    collection_report["errors"].append(f"{name}: {e}")
+                    logger.error(f"Could not recreate index {collection_name}.{name}: {e}")
+
+        if create_missing:
+            for name in collection_report["missing"]:
+                spec = specs_by_name[name]
+                try:
+                    await collection.create_indexes([IndexModel(spec["keys"], **spec["options"])])
+                    logger.info(f"Created index {collection_name}.{name}")
+                except Exception as e:
+                    # Ör. mevcut verideki tekrar eden voucher_code unique index'i engelleyebilir
+                    collection_report["errors"].append(f"{name}: {e}")
+                    logger.error(f"Could not create index {collection_name}.{name}: {e}")
+
+        if drop_extra:
+            for name in collection_report["extra"]:
+                try:
+                    await collection.drop_index(name)
+                    logger.info(f"Dropped extra index {collection_name}.{name}")
+                except Exception as e:
+                    collection_report["errors"].append(f"{name}: {e}")
+                    logger.error(f"Could not drop index {collection_name}.{name}: {e}")
+
+        report[collection_name] = collection_report
+
+    return report
+
+
+def summarize_report(report: Dict[str, Dict[str, List[str]]]) -> Dict[str, int]:
+    """Rapordaki toplam eksik/fazla/çakışan/hatalı index sayıları"""
+    summary = {"missing": 0, "extra": 0, "conflicting": 0, "errors": 0}
+    for collection_report in report.values():
+        for key in summary:
+            summary[key] += len(collection_report.get(key, []))
+    return summary
+
+
+def _plan_stages(plan: Dict[str, Any]) -> List[str]:
+    """Query planner ağacındaki tüm stage adlarını topla"""
+    stages = [plan.get("stage", "")]
+    for child_key in ("inputStage", "queryPlan"):
+        if isinstance(plan.get(child_key), dict):
+            stages.extend(_plan_stages(plan[child_key]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    return stages
+
+
+async def explain_query_shapes(db, shapes: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """
+    Sorgu şekillerini queryPlanner modunda explain et.
+
+    Returns:
+        Her şekil için {"name", "collection", "stages", "index", "collection_scan"}
+    """
+    results = []
+    for shape in shapes or QUERY_SHAPES:
+        find_cmd = {"find": shape["collection"], "filter": shape["filter"]}
+        if shape.get("sort"):
+            find_cmd["sort"] = shape["sort"]
+        try:
+            explained = await db.command({"explain": find_cmd, "verbosity": "queryPlanner"})
+            winning_plan = explained.get("queryPlanner", {}).get("winningPlan", {})
+            stages = _plan_stages(winning_plan)
+            index_names = _find_index_names(winning_plan)
+            results.append({
+                "name": shape["name"],
+                "collection": shape["collection"],
+                "stages": stages,
+                "index": index_names[0] if index_names else None,
+                "collection_scan": "COLLSCAN" in stages,
+            })
+        except Exception as e:
+            logger.warning(f"Explain failed for query shape {shape['name']}: {e}")
+            results.append({
+                "name": shape["name"],
+                "collection": shape["collection"],
+                "stages": [],
+                "index": None,
+                "collection_scan": None,
+                "error": str(e),
+            })
+    return results
+
+
+def _find_index_names(plan: Dict[str, Any]) -> List[str]:
+    names = [plan["indexName"]] if plan.get("indexName") else []
+    for child_key in ("inputStage", "queryPlan"):
+        if isinstance(plan.get(child_key), dict):
+            names.extend(_find_index_names(plan[child_key]))
+    for child in plan.get("inputStages", []):
+        names.extend(_find_index_names(child))
+    return names
+
+
+async def ensure_indexes(db) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Startup'ta çağrılır: eksikleri oluşturur; çakışan ve fazla index'leri sadece raporlar.
+
+    Çakışmalar her worker'ın startup'ında düzeltilmez (aynı anda düşürüp kurmaya çalışırlar);
+    ``scripts/ensure_indexes.py --apply`` ile bir kez düzeltilir.
+    """
+    report = await reconcile_indexes(db, create_missing=True, fix_conflicts=False, drop_extra=False)
+    summary = summarize_report(report)
+    logger.info(
+        f"Index reconciliation: {summary['missing']} missing (created), "
+        f"{summary['conflicting']} conflicting, {summary['extra']} extra, "
+        f"{summary['errors']} errors"
+    )
+    if summary["conflicting"]:
+        conflicting = [
+            f"{collection_name}.{name}"
+            for collection_name, collection_report in report.items()
+            for name in collection_report["conflicting"]
+        ]
+        logger.warning(
+            f"Indexes differ from registry: {', '.join(conflicting)} - "
+            f"run scripts/ensure_indexes.py --apply"
+        )
+    return report
@@ -0,0 +1,202 @@
+"""
+Cari balance ledger.
+
+A cari's balance is the signed sum of its ``transactions`` (debit/expense/debt
+increase it, credit/payment decrease it; currencies other than EUR/USD count
+as TRY). Instead of loading every transaction into Python, balances are
+summed by one aggregation grouped by ``cari_id``.
+
+``cari_balance_checkpoints`` keeps, per cari, the balance of all transactions
+up to an ObjectId cutoff. A ledger balance is then checkpoint + the
+transactions inserted after the cutoff. Editing or deleting a transaction
+that may already be inside a checkpoint must call ``invalidate_checkpoints``;
+the checkpoint ``version`` makes a recompute that raced with such an edit
+discard its (stale) checkpoint instead of writing it.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+CURRENCIES = ("EUR", "USD", "TRY")
+
+# İşlem tipinin bakiyeye etkisi; listede olmayan tipler (ör. refund) bakiyeyi değiştirmez
+TRANSACTION_SIGNS = {
+    "debit": 1,     # Rezervasyon / extra sales: cari bize borçlu
+    "credit": -1,   # Hizmet alımı: biz cariye borçluyuz
+    "payment": -1,  # Tahsilat: cari bize ödeme yaptı
+    "expense": 1,   # Ödeme: cariye ödeme yaptık
+    "debt": 1,      # No-show bedeli
+}
+
+# Checkpoint'e sadece bu süreden eski ObjectId'ler alınır (diğer process'lerdeki yazımlar için pay)
+CHECKPOINT_LAG = timedelta(minutes=5)
+
+
+def balance_fields(totals: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    totals = totals or {}
+    return {f"balance_{currency.lower()}": float(totals.get(currency, 0.0)) for currency in CURRENCIES}
+
+
+def _signed_amount(currency: str, condition: Optional[dict] = None) -> dict:
+    """Belirtilen para birimindeki işlemin işaretli tutarı (diğer para birimleri için 0)"""
+    normalized = {"$toUpper": {"$ifNull": ["$currency", "TRY"]}}
+    if currency == "TRY":
+        currency_match = {"$not": [{"$in": [normalized, ["EUR", "USD"]]}]}
+    else:
+        currency_match = {"$eq": [normalized, currency]}
+    sign = {"$switch": {
+        "branches": [{"case": {"$eq": ["$transaction_type", t]}, "then": s} for t, s in TRANSACTION_SIGNS.items()],
+        "default": 0,
+    }}
+    matches = {"$and": [currency_match, condition]} if condition else currency_match
+    return {"$cond": [matches, {"$multiply": [sign, {"$ifNull": ["$amount", 0]}]}, 0]}
+
+
+def build_balance_pipeline(match: Dict[str, Any], cutoff: Optional[ObjectId] = None) -> List[dict]:
+    """
+    Carilere göre bakiyeleri toplayan pipeline. ``cutoff`` verilirse ayrıca
+    ``_id <= cutoff`` olan işlemlerin toplamı (checkpoint) hesaplanır.
+    """
+    group: Dict[str, Any] = {"_id": "$cari_id"}
+    for currency in CURRENCIES:
+        group[currency] = {"$sum": _signed_amount(currency)}
+        if cutoff is not None:
+            group[f"checkpoint_{currency}"] = {"$sum": _signed_amount(currency, {"$lte": ["$_id", cutoff]})}
+    return [
+        {"$match": {**match, "transaction_type": {"$in": list(TRANSACTION_SIGNS)}}},
+        {"$group": group},
+    ]
+
+
+def _round(value: float) -> float:
+    return round(value, 2)
+
+
+async def recompute_balances(db, cari_ids: Iterable[str], now: Optional[datetime] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Carilerin bakiyelerini tek aggregation ile yeniden hesapla, ``cari_accounts``
+    alanlarını ve checkpoint'leri yaz.
+
+    Returns:
+        {cari_id: {"balance_eur", "balance_usd", "balance_try"}}
+    """
+    cari_ids = list(dict.fromkeys(cari_ids))
+    if not cari_ids:
+        return {}
+
+    cutoff = ObjectId.from_datetime((now or datetime.now(timezone.utc)) - CHECKPOINT_LAG)
+    versions = {
+        doc["cari_id"]: doc.get("version", 0)
+        async for doc in db.cari_balance_checkpoints.find({"cari_id": {"$in": cari_ids}}, {"_id": 0, "cari_id": 1, "version": 1})
+    }
+
+    rows = {
+        row["_id"]: row
+        async for row in db.transactions.aggregate(build_balance_pipeline({"cari_id": {"$in": cari_ids}}, cutoff))
+    }
+
+    balances: Dict[str, Dict[str, float]] = {}
+    account_updates = []
+    for cari_id in cari_ids:
+        row = rows.get(cari_id, {})
+        balances[cari_id] = balance_fields({c: row.get(c, 0.0) for c in CURRENCIES})
+        account_updates.append(UpdateOne({"id": cari_id}, {"$set": balances[cari_id]}))
+    await db.cari_accounts.bulk_write(account_updates, ordered=False)
+
+    for cari_id in cari_ids:
+        row = rows.get(cari_id, {})
+        checkpoint = balance_fields({c: row.get(f"checkpoint_{c}", 0.0) for c in CURRENCIES})
+        version = versions.get(cari_id, 0)
+        try:
+            # Hesaplama sırasında invalidate edildiyse version değişmiştir - eşleşme yok, upsert duplicate verir
+            await db.cari_balance_checkpoints.update_one(
+                {"cari_id": cari_id, "version": version},
+                {"$set": {**checkpoint, "upto_id": cutoff, "stale": False, "updated_at": datetime.now(timezone.utc)}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            logger.info(f"Balance checkpoint for cari {cari_id} changed during recompute, skipped")
+
+    return balances
+
+
+async def invalidate_checkpoints(db, cari_ids: Iterable[Optional[str]]) -> None:
+    """Mevcut bir işlem düzenlendiğinde/silindiğinde çağrılır; checkpoint sonraki recompute'a kadar kullanılmaz"""
+    cari_ids = [cari_id for cari_id in dict.fromkeys(cari_ids) if cari_id]
+    for cari_id in cari_ids:
+        try:
+            await db.cari_balance_checkpoints.update_one(
+                {"cari_id": cari_id},
+                {"$set": {"stale": True}, "$inc": {"version": 1}},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Balance checkpoint invalidation failed for cari {cari_id}: {e}")
+
+
+async def ledger_balances(db, cari_ids: Iterable[str]) -> Dict[str, Dict[str, float]]:
+    """
+    Checkpoint + checkpoint sonrası işlemler ile bakiyeleri hesapla (hiçbir şey yazmaz).
+    Geçerli checkpoint'i olmayan cariler için tüm işlemler toplanır.
+    """
+    cari_ids = list(dict.fromkeys(cari_ids))
+    if not cari_ids:
+        return {}
+
+    checkpoints = {
+        doc["cari_id"]: doc
+        async for doc in db.cari_balance_checkpoints.find(
+            {"cari_id": {"$in": cari_ids}, "stale": False, "upto_id": {"$exists": True}}, {"_id": 0}
+        )
+    }
+    branches: List[dict] = [{"cari_id": cari_id, "_id": {"$gt": doc["upto_id"]}} for cari_id, doc in checkpoints.items()]
+    full_scan = [cari_id for cari_id in cari_ids if cari_id not in checkpoints]
+    if full_scan:
+        branches.append({"cari_id": {"$in": full_scan}})
+
+    rows = {row["_id"]: row async for row in db.transactions.aggregate(build_balance_pipeline({"$or": branches}))}
+
+    balances: Dict[str, Dict[str, float]] = {}
+    for cari_id in cari_ids:
+        row = rows.get(cari_id, {})
+        base = checkpoints.get(cari_id, {})
+        balances[cari_id] = {
+            f"balance_{c.lower()}": float(base.get(f"balance_{c.lower()}", 0.0)) + row.get(c, 0.0)
+            for c in CURRENCIES
+        }
+    return balances
+
+
+async def detect_drift(db, company_id: str, tolerance: float = 0.01) -> List[Dict[str, Any]]:
+    """
+    ``cari_accounts.balance_*`` alanlarını ledger ile karşılaştır; hiçbir şeyi düzeltmez.
+
+    Returns:
+        Farkı ``tolerance``'ı aşan cariler: cari_id, name, stored, ledger, difference
+    """
+    caris = await db.cari_accounts.find(
+        {"company_id": company_id},
+        {"_id": 0, "id": 1, "name": 1, "balance_eur": 1, "balance_usd": 1, "balance_try": 1}
+    ).to_list(length=None)
+    ledger = await ledger_balances(db, [cari["id"] for cari in caris])
+
+    drifted = []
+    for cari in caris:
+        expected = ledger.get(cari["id"], balance_fields())
+        stored = {field: float(cari.get(field) or 0.0) for field in expected}
+        difference = {field: _round(stored[field] - expected[field]) for field in expected}
+        if any(abs(value) > tolerance for value in difference.values()):
+            drifted.append({
+                "cari_id": cari["id"],
+                "name": cari.get("name", ""),
+                "stored": {field: _round(value) for field, value in stored.items()},
+                "ledger": {field: _round(value) for field, value in expected.items()},
+                "difference": difference,
+            })
+    return drifted
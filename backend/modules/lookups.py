@@ -0,0 +1,58 @@
+"""
+Batched lookup helpers for list endpoints.
+
+Instead of calling ``find_one`` per row, collect the referenced ids from the
+rows, fetch them with a single ``$in`` query per collection and join in
+Python through a dict lookup.
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def collect_ids(docs: Iterable[dict], *fields: str) -> List[Any]:
+    """Dokümanlardaki alan değerlerini sırayı koruyarak tekilleştirip topla (boş değerler atlanır)"""
+    seen = {}
+    for doc in docs:
+        for field in fields:
+            value = doc.get(field)
+            if value:
+                seen[value] = None
+    return list(seen)
+
+
+async def prefetch_by_ids(
+    collection,
+    ids: Iterable[Any],
+    key: str = "id",
+    projection: Optional[Dict[str, int]] = None,
+    extra_filter: Optional[Dict[str, Any]] = None
+) -> Dict[Any, dict]:
+    """
+    Tek bir ``$in`` sorgusu ile referans dokümanlarını getir.
+
+    Args:
+        collection: Motor koleksiyonu (ör. db.cari_accounts)
+        ids: Aranacak anahtar değerleri (tekrarlar ve boş değerler atlanır)
+        key: Eşleştirme alanı (varsayılan "id")
+        projection: Sadece bu alanları getir (anahtar alanı otomatik eklenir)
+        extra_filter: Ek filtre (ör. {"company_id": ...})
+
+    Returns:
+        {anahtar: doküman} sözlüğü
+    """
+    unique_ids = list(dict.fromkeys(i for i in ids if i))
+    if not unique_ids:
+        return {}
+
+    query = {key: {"$in": unique_ids}}
+    if extra_filter:
+        query.update(extra_filter)
+
+    fields = {"_id": 0}
+    if projection:
+        fields.update(projection)
+        if any(value for name, value in projection.items() if name != "_id"):
+            fields[key] = 1
+
+    docs = await collection.find(query, fields).to_list(length=None)
+    return {doc.get(key): doc for doc in docs}
+
@@ -0,0 +1,355 @@
+"""
+Versioned, resumable data migrations.
+
+Each migration in ``MIGRATIONS`` is recorded in ``schema_migrations`` under
+its id::
+
+    {"_id": "0001_...", "status": "running" | "done" | "failed",
+     "progress": {"processed": n, "last_id": ObjectId}, "heartbeat_at": ...}
+
+``run_migrations`` claims a migration with one conditional upsert, so when
+several workers start together only one of them runs it; a claim whose
+heartbeat is older than ``MIGRATION_LEASE_SECONDS`` (crashed worker) can be
+taken over. Migrations walk their collection in ``_id`` order, write each
+chunk with one ``bulk_write`` and save the last ``_id`` after every chunk,
+so an interrupted run continues where it stopped instead of starting over.
+
+Migrations marked ``auto`` run in a background task after startup (not in
+the readiness path); the others only from ``scripts/migrate.py``.
+"""
+import logging
+import os
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from .passwords import hash_password_async
+from .rollups import ROLLUP_BACKFILL_MIGRATION, rebuild_rollups
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_CHUNK_SIZE = int(os.environ.get("MIGRATION_CHUNK_SIZE", "500"))
+# Heartbeat bu süreden eskiyse çalışan process öldü sayılır ve migration devralınabilir
+MIGRATION_LEASE_SECONDS = int(os.environ.get("MIGRATION_LEASE_SECONDS", "300"))
+
+
+class MigrationProgress:
+    """schema_migrations dokümanındaki ilerleme; her chunk sonunda kaydedilir"""
+
+    def __init__(self, db, migration_id: str, state: Optional[Dict[str, Any]] = None):
+        self.db = db
+        self.migration_id = migration_id
+        self.state = dict(state or {})
+        self.state.setdefault("processed", 0)
+
+    async def save(self, **changes) -> None:
+        self.state.update(changes)
+        await self.db.schema_migrations.update_one(
+            {"_id": self.migration_id},
+            {"$set": {"progress": self.state, "heartbeat_at": datetime.now(timezone.utc)}}
+        )
+
+
+async def migrate_in_chunks(
+    collection,
+    query: Dict[str, Any],
+    build_ops: Callable[[List[dict]], Awaitable[List[Any]]],
+    progress: MigrationProgress,
+    chunk_size: Optional[int] = None,
+    projection: Optional[Dict[str, Any]] = None
+) -> int:
+    """
+    ``query``'ye uyan dokümanları ``_id`` sırasıyla chunk'lar halinde işle.
+
+    Args:
+        build_ops: Chunk'taki dokümanlar için bulk_write işlemleri (boş liste: yazma yok)
+
+    Returns:
+        Bu çalışmada işlenen doküman sayısı
+    """
+    chunk_size = chunk_size or MIGRATION_CHUNK_SIZE
+    processed = 0
+    while True:
+        chunk_query = dict(query)
+        if progress.state.get("last_id") is not None:
+            chunk_query["_id"] = {"$gt": progress.state["last_id"]}
+        docs = await collection.find(chunk_query, projection).sort("_id", 1).limit(chunk_size).to_list(chunk_size)
+        if not docs:
+            return processed
+
+        ops = await build_ops(docs)
+        if ops:
+            await collection.bulk_write(ops, ordered=False)
+        processed += len(docs)
+        await progress.save(last_id=docs[-1]["_id"], processed=progress.state["processed"] + len(docs))
+        logger.info(f"Migration {progress.migration_id}: {progress.state['processed']} documents processed")
+        if len(docs) < chunk_size:
+            return processed
+
+
+# ==================== MIGRATIONS ====================
+
+def parse_iso_datetime(value: str) -> Optional[datetime]:
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+async def migrate_activity_log_dates(db, progress: MigrationProgress) -> None:
+    """String created_at -> BSON tarih (TTL index ve arşiv sadece tarihle çalışır)"""
+    async def build_ops(docs):
+        ops = []
+        for doc in docs:
+            created_at = parse_iso_datetime(doc["created_at"])
+            if created_at is None:
+                logger.warning(f"Activity log {doc.get('id')} has unparseable created_at: {doc['created_at']}")
+                continue
+            ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"created_at": created_at}}))
+        return ops
+
+    await migrate_in_chunks(
+        db.activity_logs, {"created_at": {"$type": "string"}}, build_ops, progress,
+        projection={"_id": 1, "id": 1, "created_at": 1}
+    )
+
+
+RESERVATION_STATUSES = ["pending_approval", "approved", "rejected", "confirmed", "cancelled", "completed"]
+
+
+def reservation_field_updates(reservation: dict) -> Dict[str, Any]:
+    """Cari paneli alanları eksik rezervasyon için $set içeriği (eksik yoksa boş)"""
+    update_data = {}
+    if "reservation_source" not in reservation:
+        update_data["reservation_source"] = "system"
+    if reservation.get("status", None) not in RESERVATION_STATUSES:
+        update_data["status"] = "approved"
+    for field in ("created_by_cari", "cari_code_snapshot", "approved_by", "approved_at"):
+        if field not in reservation:
+            update_data[field] = None
+    return update_data
+
+
+async def migrate_reservation_fields(db, progress: MigrationProgress) -> None:
+    """Mevcut rezervasyonlara cari paneli alanlarını ekle (eski scripts/migrate_reservation_fields.py)"""
+    async def build_ops(docs):
+        ops = []
+        for doc in docs:
+            update_data = reservation_field_updates(doc)
+            if update_data:
+                ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": update_data}))
+        return ops
+
+    await migrate_in_chunks(
+        db.reservations, {}, build_ops, progress,
+        projection={
+            "_id": 1, "status": 1, "reservation_source": 1, "created_by_cari": 1,
+            "cari_code_snapshot": 1, "approved_by": 1, "approved_at": 1,
+        }
+    )
+
+
+def generate_cari_code(company_short: str = "CR") -> str:
+    random_suffix = ''.join([str(random.randint(0, 9)) for _ in range(6)])
+    return f"{company_short}-{random_suffix}"
+
+
+async def migrate_cari_panel_accounts(db, progress: MigrationProgress) -> None:
+    """
+    Cari hesaplara cari_code ekle ve rezervasyon paneli (caris) hesaplarını oluştur
+    (eski scripts/migrate_cari_accounts_to_cari_panel.py). İlk şifre cari_code'dur.
+    """
+    company_prefixes: Dict[str, str] = {}
+
+    async def company_short(company_id: str) -> str:
+        if company_id not in company_prefixes:
+            company = await db.companies.find_one({"id": company_id}, {"_id": 0, "company_code": 1})
+            company_prefixes[company_id] = (company.get("company_code") or "CR")[:2].upper() if company else "CR"
+        return company_prefixes[company_id]
+
+    async def build_ops(docs):
+        code_updates = []
+        codes = {}
+        for doc in docs:
+            company_id, cari_id = doc.get("company_id"), doc.get("id")
+            if not company_id or not cari_id:
+                continue
+            cari_code = doc.get("cari_code")
+            if not cari_code:
+                prefix = await company_short(company_id)
+                cari_code = generate_cari_code(prefix)
+                while await db.cari_accounts.find_one({"cari_code": cari_code, "company_id": company_id}, {"_id": 1}):
+                    cari_code = generate_cari_code(prefix)
+                code_updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"cari_code": cari_code}}))
+            codes[cari_code] = doc
+        # Panel hesaplarından önce yaz: chunk yarıda kalırsa tekrar çalışmada aynı kodlar kullanılır
+        if code_updates:
+            await db.cari_accounts.bulk_write(code_updates, ordered=False)
+
+        existing = {
+            row["cari_code"]
+            async for row in db.caris.find({"cari_code": {"$in": list(codes)}}, {"_id": 0, "cari_code": 1})
+        }
+        panels = []
+        for cari_code, doc in codes.items():
+            if cari_code in existing:
+                continue
+            now = datetime.now(timezone.utc).isoformat()
+            panels.append({
+                "id": str(uuid.uuid4()),
+                "company_id": doc["company_id"],
+                "cari_code": cari_code,
+                "password_hash": await hash_password_async(cari_code),
+                "require_password_change": True,
+                "created_at": now,
+                "updated_at": now,
+                "display_name": doc.get("name"),
+                "is_active": True,
+            })
+        if panels:
+            await db.caris.insert_many(panels)
+            logger.info(f"Migration {progress.migration_id}: {len(panels)} cari panel accounts created")
+        return []
+
+    await migrate_in_chunks(
+        db.cari_accounts, {}, build_ops, progress,
+        projection={"_id": 1, "id": 1, "company_id": 1, "name": 1, "cari_code": 1}
+    )
+
+
+async def backfill_daily_rollups(db, progress: MigrationProgress) -> None:
+    """Mevcut rezervasyonlardan daily_rollups - şirket şirket, ilerleme son tamamlanan company id"""
+    query = {}
+    if progress.state.get("last_company_id"):
+        query["id"] = {"$gt": progress.state["last_company_id"]}
+    async for company in db.companies.find(query, {"_id": 0, "id": 1}).sort("id", 1):
+        written = await rebuild_rollups(db, company_id=company["id"])
+        await progress.save(last_company_id=company["id"], processed=progress.state["processed"] + 1)
+        logger.info(f"Migration {progress.migration_id}: company {company['id']} rolled up ({written} buckets)")
+
+
+MIGRATIONS: List[Dict[str, Any]] = [
+    {
+        "id": "0001_activity_log_created_at_dates",
+        "description": "activity_logs.created_at string -> tarih",
+        "run": migrate_activity_log_dates,
+        "auto": True,
+    },
+    {
+        "id": "0002_reservation_cari_panel_fields",
+        "description": "Rezervasyonlara reservation_source/status/onay alanları",
+        "run": migrate_reservation_fields,
+        "auto": False,
+    },
+    {
+        "id": "0003_cari_panel_accounts",
+        "description": "Cari hesaplara cari_code ve panel hesabı",
+        "run": migrate_cari_panel_accounts,
+        "auto": False,
+    },
+    {
+        "id": ROLLUP_BACKFILL_MIGRATION,
+        "description": "Mevcut rezervasyonlardan daily_rollups (o zamana kadar raporlar ham veriden)",
+        "run": backfill_daily_rollups,
+        "auto": True,
+    },
+]
+
+
+# ==================== RUNNER ====================
+
+async def claim_migration(db, migration_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Migration'ı bu process için işaretle.
+
+    Returns:
+        Kayıtlı ilerleme (ilk çalışmada boş dict); tamamlanmış veya başka bir
+        process'te çalışıyorsa None
+    """
+    now = datetime.now(timezone.utc)
+    stale = now - timedelta(seconds=MIGRATION_LEASE_SECONDS)
+    try:
+        doc = await db.schema_migrations.find_one_and_update(
+            {"_id": migration_id, "$or": [
+                {"status": "failed"},
+                {"status": "running", "heartbeat_at": {"$lt": stale}},
+            ]},
+            {"$set": {"status": "running", "heartbeat_at": now, "error": None},
+             "$setOnInsert": {"started_at": now, "progress": {}}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # Doküman var ama koşula uymuyor: done ya da başka process'te çalışıyor
+        return None
+    return doc.get("progress") or {}
+
+
+async def run_migrations(
+    db,
+    only: Optional[List[str]] = None,
+    auto_only: bool = False,
+    rerun: bool = False
+) -> Dict[str, str]:
+    """
+    Bekleyen migration'ları sırayla çalıştır.
+
+    Args:
+        only: Sadece bu id'ler (None = registry'deki hepsi)
+        auto_only: Sadece startup'ta otomatik çalışacak olanlar
+        rerun: Tamamlanmış olanları baştan çalıştır (idempotent migration'lar için, çalışan olana dokunmaz)
+
+    Returns:
+        {migration id: "done" | "skipped" | "failed"}
+    """
+    results = {}
+    for migration in MIGRATIONS:
+        migration_id = migration["id"]
+        if (only and migration_id not in only) or (auto_only and not migration["auto"]):
+            continue
+        if rerun:
+            await db.schema_migrations.delete_one({"_id": migration_id, "status": {"$ne": "running"}})
+        state = await claim_migration(db, migration_id)
+        if state is None:
+            results[migration_id] = "skipped"
+            continue
+
+        progress = MigrationProgress(db, migration_id, state)
+        logger.info(f"Running migration {migration_id} (resuming after {progress.state['processed']} documents)")
+        try:
+            await migration["run"](db, progress)
+        except Exception as e:
+            logger.error(f"Migration {migration_id} failed: {e}")
+            await db.schema_migrations.update_one(
+                {"_id": migration_id}, {"$set": {"status": "failed", "error": str(e)}}
+            )
+            results[migration_id] = "failed"
+            # Sonrakiler bu migration'a dayanabilir
+            break
+        await db.schema_migrations.update_one(
+            {"_id": migration_id},
+            {"$set": {"status": "done", "finished_at": datetime.now(timezone.utc)}}
+        )
+        logger.info(f"Migration {migration_id} done ({progress.state['processed']} documents)")
+        results[migration_id] = "done"
+    return results
+
+
+async def migration_status(db) -> List[Dict[str, Any]]:
+    """Registry + schema_migrations kayıtları (CLI listesi için)"""
+    records = {doc["_id"]: doc async for doc in db.schema_migrations.find({})}
+    return [
+        {
+            "id": migration["id"],
+            "description": migration["description"],
+            "auto": migration["auto"],
+            "status": records.get(migration["id"], {}).get("status", "pending"),
+            "processed": (records.get(migration["id"], {}).get("progress") or {}).get("processed", 0),
+        }
+        for migration in MIGRATIONS
+    ]
@@ -0,0 +1,606 @@
+"""
+Pydantic models shared by the domain routers.
+"""
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
+
+# ==================== MODELS ====================
+
+class Company(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_code: str  # Benzersiz firma kodu (URL slug olarak kullanılır)
+    company_name: str
+    logo_url: Optional[str] = None  # Firma logosu URL'i
+    contact_email: Optional[str] = None  # İletişim e-postası
+    contact_phone: Optional[str] = None  # İletişim telefonu
+    website: Optional[str] = None  # Web sitesi
+    address: Optional[str] = None  # Adres
+    tax_office: Optional[str] = None
+    tax_number: Optional[str] = None
+    package_start_date: str
+    package_end_date: str
+    is_active: bool = True  # Tenant aktif/pasif durumu
+    subscription_plan: Optional[str] = None  # Subscription plan (e.g., "basic", "premium", "enterprise")
+    feature_flags: Dict[str, bool] = Field(default_factory=dict)  # Feature flags for enabling/disabling modules
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class StaffRole(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    name: str  # Rol adı: Satış Temsilcisi, Operasyon Müdürü, Muhasebe, vb.
+    description: Optional[str] = None
+    color: str = "#3EA6FF"  # Rol rengi (kartlarda gösterilecek)
+    order: int = 0
+    is_active: bool = True
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class User(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    username: Optional[str] = None  # Opsiyonel - sadece web_panel_active ise
+    email: Optional[EmailStr] = None
+    full_name: str  # MECBURİ
+    phone: Optional[str] = None
+    address: Optional[str] = None
+    role_id: Optional[str] = None  # YENİ - Personel rolü ID'si
+    # Kişisel Bilgiler
+    tc_no: Optional[str] = None  # YENİ - TC Kimlik No
+    birth_date: Optional[str] = None  # YENİ - Doğum Tarihi
+    gender: Optional[str] = None  # YENİ - Cinsiyet (Male, Female, Other)
+    nationality: Optional[str] = None  # YENİ - Uyruk
+    # İletişim Bilgileri
+    emergency_contact_name: Optional[str] = None  # YENİ - Acil Durum İletişim Kişisi
+    emergency_contact_phone: Optional[str] = None  # YENİ - Acil Durum İletişim Telefonu
+    # İş Bilgileri
+    employee_id: Optional[str] = None  # YENİ - Personel No
+    hire_date: Optional[str] = None  # YENİ - İşe Giriş Tarihi
+    termination_date: Optional[str] = None  # YENİ - İşten Ayrılma Tarihi
+    is_active: bool = True  # YENİ - Aktif/Pasif (işten ayrılma durumu)
+    token_version: int = 0  # Şifre değişince artar, eski JWT'ler geçersiz olur
+    # Maaş Bilgileri
+    gross_salary: Optional[float] = None
+    net_salary: Optional[float] = None
+    salary_currency: Optional[str] = "TRY"  # YENİ - Maaş para birimi
+    advance_limit: Optional[float] = None  # YENİ - Avans limiti
+    # YENİ - Maaş Takip Alanları
+    salary_payment_day: Optional[int] = None  # Her ayın kaçıncı günü (1-31)
+    current_balance: Optional[float] = 0.0  # Güncel bakiye (alacaklı durumu - pozitif = bize borçlu, negatif = biz borçluyuz)
+    current_balance_currency: Optional[str] = "TRY"  # Bakiye para birimi
+    last_salary_paid_date: Optional[str] = None  # Son maaş ödeme tarihi
+    last_salary_paid_amount: Optional[float] = None  # Son ödenen maaş tutarı
+    # Eğitim ve Yetenekler
+    languages: Optional[List[str]] = []  # YENİ - Bildiği diller
+    skills: Optional[List[str]] = []  # YENİ - Yetenekler
+    education_level: Optional[str] = None  # YENİ - Eğitim Seviyesi
+    education_field: Optional[str] = None  # YENİ - Eğitim Alanı
+    # Ehliyet Bilgileri
+    driving_license_class: Optional[str] = None  # YENİ - Ehliyet Sınıfı
+    driving_license_no: Optional[str] = None  # YENİ - Ehliyet No
+    driving_license_expiry: Optional[str] = None  # YENİ - Ehliyet Bitiş Tarihi
+    # Web Panel Ayarları
+    web_panel_active: bool = False  # YENİ - Web panele erişim
+    permissions: Dict[str, Dict[str, bool]] = Field(default_factory=dict)
+    is_admin: bool = False  # DEPRECATED: Use 'role' field instead. Kept for backward compatibility.
+    role: str = Field(default="user")  # Role: 'super_admin', 'admin', 'user'
+    # Two-Factor Authentication (2FA)
+    two_factor_secret: Optional[Dict[str, str]] = None  # { ascii, hex, base32, otpauth_url }
+    is_two_factor_enabled: bool = False
+    two_factor_recovery_codes: Optional[List[str]] = Field(default_factory=list)  # Backup codes
+    # User Preferences
+    preferences: Optional[Dict[str, Any]] = Field(default_factory=lambda: {
+        "dateFormat": "DD/MM/YYYY",  # Default date format
+        "theme": "system",  # light, dark, system
+        "tableDensity": "comfortable",  # comfortable, compact
+        "startPage": "/dashboard",  # Default start page after login
+        "currencyDisplay": "TRY",  # Default currency for display
+        "soundEffects": True,  # Enable/disable sound effects
+        "sidebarCollapsed": False  # Sidebar collapsed by default
+    })  # User preferences: theme, density, dateFormat, etc.
+    # Notification Preferences (Matrix Style)
+    notificationPreferences: Optional[Dict[str, Any]] = Field(default_factory=lambda: {
+        "newBooking": {"email": True, "inApp": True},  # New reservation notifications
+        "bookingCancellation": {"email": True, "inApp": True},  # Booking cancellation notifications
+        "paymentReceived": {"email": False, "inApp": True},  # Payment received notifications
+        "dailyFinanceReport": {"email": True},  # Daily finance report (email only)
+        "loginAlert": {"email": True, "inApp": False},  # Login alerts
+        "marketingEmails": {"email": True}  # Marketing emails
+    })
+    # Diğer
+    notes: Optional[str] = None  # YENİ - Notlar
+    avatar_url: Optional[str] = None  # YENİ - Profil fotoğrafı URL'i
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: Optional[datetime] = None  # YENİ - Son güncelleme tarihi
+
+class TourType(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    name: str
+    duration_hours: float
+    description: Optional[str] = None
+    order: Optional[int] = 0
+    color: Optional[str] = None
+    icon: Optional[str] = None
+    is_active: Optional[bool] = True
+    pricing_model: Optional[str] = Field(default="vehicle_based")  # "vehicle_based" veya "person_based"
+    # iCal Synchronization
+    icalLinks: Optional[List[Dict[str, str]]] = Field(default_factory=list)  # [{ provider: 'Viator', url: '...' }]
+
+class PaymentType(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    name: str
+    code: str  # "cash", "credit_card", "bank_transfer", vb. (unique)
+    description: Optional[str] = None
+    is_active: bool = True  # Aktif/Pasif
+    # Ödeme tipi özellikleri
+    requires_bank_account: bool = False  # Banka hesabı seçimi gerekli mi?
+    requires_credit_card: bool = False  # Kredi kartı hesabı seçimi gerekli mi?
+    allows_transfer_to_cari: bool = False  # Cariye aktarım yapılabilir mi?
+    requires_due_date: bool = False  # Vade tarihi gerekli mi?
+    is_settlement: bool = False  # Mahsup işlemi mi? (borç silme)
+    order: int = 0  # Sıralama
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class CariAccount(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    name: str
+    cari_code: Optional[str] = None  # YENİ - Benzersiz cari kodu (rezervasyon paneli için)
+    authorized_person: Optional[str] = None
+    phone: Optional[str] = None
+    email: Optional[EmailStr] = None
+    address: Optional[str] = None
+    tax_office: Optional[str] = None
+    tax_number: Optional[str] = None
+    pickup_location: Optional[str] = None
+    pickup_maps_link: Optional[str] = None
+    balance_eur: float = 0.0
+    balance_usd: float = 0.0
+    balance_try: float = 0.0
+    notes: Optional[str] = None
+    # YENİ - Maaş Bölümü
+    is_staff_payment: bool = False  # Bu cari hesap personel maaşları için mi?
+    staff_user_id: Optional[str] = None  # İlgili personel ID (eğer personel ise)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class Cari(BaseModel):
+    """Cari (firma) rezervasyon paneli için hesap modeli"""
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    cari_code: str  # UNIQUE, ör: TC-<random> veya şirket kodu
+    password_hash: str
+    require_password_change: bool = True  # İlk girişte true
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    display_name: str  # Cari adı (okunabilir)
+    is_active: bool = True
+
+class CustomerDetail(BaseModel):
+    """Müşteri detay bilgileri"""
+    model_config = ConfigDict(extra="ignore")
+    phone: Optional[str] = None  # Telefon
+    email: Optional[str] = None  # Email
+    nationality: Optional[str] = None  # Uyruk
+    id_number: Optional[str] = None  # TC/Pasaport No
+    birth_date: Optional[str] = None  # Doğum tarihi (YYYY-MM-DD)
+
+class CariCustomer(BaseModel):
+    """Cari firma müşterisi"""
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    cari_id: str  # Hangi cari firmaya ait
+    customer_name: str
+    customer_contact: Optional[str] = None  # Eski alan (backward compatibility)
+    phone: Optional[str] = None  # Telefon
+    email: Optional[str] = None  # Email
+    nationality: Optional[str] = None  # Uyruk
+    id_number: Optional[str] = None  # TC/Pasaport No
+    birth_date: Optional[str] = None  # Doğum tarihi
+    # Rezervasyon takibi
+    first_reservation_date: Optional[str] = None  # İlk rezervasyon tarihi
+    last_reservation_date: Optional[str] = None  # Son rezervasyon tarihi
+    total_reservations: int = 0
+    # Satış takibi
+    first_sale_date: Optional[str] = None  # İlk satış tarihi
+    last_sale_date: Optional[str] = None  # Son satış tarihi
+    total_sales: int = 0
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class MunferitCustomer(BaseModel):
+    """Münferit müşteri"""
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    customer_name: str
+    customer_contact: Optional[str] = None  # Eski alan (backward compatibility)
+    phone: Optional[str] = None  # Telefon
+    email: Optional[str] = None  # Email
+    nationality: Optional[str] = None  # Uyruk
+    id_number: Optional[str] = None  # TC/Pasaport No
+    birth_date: Optional[str] = None  # Doğum tarihi
+    first_sale_date: Optional[str] = None  # İlk satış tarihi
+    last_sale_date: Optional[str] = None  # Son satış tarihi
+    total_sales: int = 0
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class Reservation(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    cari_id: str
+    cari_name: str
+    date: str  # YYYY-MM-DD
+    time: str  # HH:MM
+    tour_type_id: Optional[str] = None
+    tour_type_name: Optional[str] = None
+    customer_name: str
+    customer_contact: Optional[str] = None
+    customer_details: Optional[CustomerDetail] = None  # Müşteri detay bilgileri
+    person_count: int
+    vehicle_count: int  # Araç sayısı (eski adı: atv_count)
+    pickup_location: Optional[str] = None
+    pickup_maps_link: Optional[str] = None
+    pickup_time: Optional[str] = None  # Pick-up saati (HH:MM formatında)
+    price: float
+    currency: str = "EUR"  # EUR, USD, TRY
+    exchange_rate: float = 1.0
+    notes: Optional[str] = None
+    status: str = "confirmed"  # confirmed, cancelled, completed, pending_approval, approved, rejected
+    cancellation_reason: Optional[str] = None  # İptal sebebi/açıklama
+    cancelled_at: Optional[datetime] = None  # İptal tarihi
+    no_show_amount: Optional[float] = None  # No-show bedeli
+    no_show_currency: Optional[str] = None  # No-show bedeli para birimi
+    no_show_applied: bool = False  # No-show uygulandı mı?
+    voucher_code: Optional[str] = None  # Voucher numarası (VCHR-xxxx formatında)
+    created_by: str
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # YENİ - Cari rezervasyon alanları
+    reservation_source: str = "system"  # "system" | "cari"
+    created_by_cari: Optional[str] = None  # Cari ID (ObjectId string)
+    cari_code_snapshot: Optional[str] = None  # Cari code at creation time (readonly)
+    approved_by: Optional[str] = None  # User ID who approved
+    approved_at: Optional[datetime] = None  # Approval timestamp
+
+class Transaction(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    cari_id: str
+    transaction_type: str  # debit (borç), credit (alacak), payment (tahsilat), refund (iade)
+    amount: float
+    currency: str = "EUR"
+    exchange_rate: float = 1.0
+    payment_type_id: Optional[str] = None
+    payment_type_name: Optional[str] = None
+    description: str
+    reference_id: Optional[str] = None  # reservation_id, sale_id, etc.
+    reference_type: Optional[str] = None  # reservation, sale, service, manual, no_show_penalty
+    date: str
+    time: Optional[str] = None  # HH:MM formatında saat
+    created_by: str
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # YENİ alanlar - Tahsilat ve Kasa Yönetimi
+    payment_method: Optional[str] = None  # "cash", "bank_transfer", "credit_card"
+    bank_account_id: Optional[str] = None  # BankAccount ID (havale/kredi kartı için)
+    cash_account_id: Optional[str] = None  # CashAccount ID (hangi kasaya gittiği)
+    commission_amount: Optional[float] = None  # Komisyon tutarı (kredi kartı için)
+    net_amount: Optional[float] = None  # Net tutar (komisyon düşülmüş)
+    valor_date: Optional[str] = None  # Valör tarihi (YYYY-MM-DD) - kredi kartı için
+    is_settled: bool = False  # Valör süresi doldu mu? (kredi kartı için)
+    settled_at: Optional[datetime] = None  # Ne zaman hesaba geçti
+    # YENİ alanlar - Ödeme Tipi Aksiyonları
+    transfer_to_cari_id: Optional[str] = None  # Cariye aktarım için hedef cari ID
+    due_date: Optional[str] = None  # Vade tarihi (YYYY-MM-DD) - çek/senet için
+    check_number: Optional[str] = None  # Çek/Senet numarası
+
+class Bank(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    name: str  # Banka adı: Ziraat Bankası, İş Bankası, vb.
+    code: Optional[str] = None  # Banka kodu
+    is_active: bool = True
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class BankAccount(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    bank_id: str  # Bank ID
+    account_type: str  # "bank_account" (Havale) veya "credit_card" (Kredi Kartı)
+    account_name: str  # Hesap adı: "Ana Hesap", "Kredi Kartı - Visa", vb.
+    account_number: Optional[str] = None  # Hesap numarası
+    iban: Optional[str] = None  # IBAN (banka hesabı için)
+    currency: str = "TRY"  # Hesap para birimi
+    is_active: bool = True
+    # Kredi Kartı Özellikleri (sadece account_type="credit_card" ise)
+    commission_rate: Optional[float] = None  # Komisyon oranı (örn: 2.5 = %2.5)
+    valor_days: Optional[int] = None  # Valör süresi (gün cinsinden)
+    order: int = 0  # Sıralama
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class CashAccount(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    account_type: str  # "cash" (Nakit Kasa), "bank_account" (Banka Hesabı), "credit_card" (Kredi Kartı)
+    account_name: str  # "Nakit Kasa", "Ziraat Bankası - Ana Hesap", "Kredi Kartı - Visa"
+    bank_account_id: Optional[str] = None  # BankAccount ID (eğer banka/kredi kartı ise)
+    currency: str = "TRY"  # Kasa para birimi
+    current_balance: float = 0.0  # Güncel bakiye
+    is_active: bool = True
+    order: int = 0
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class PaymentSettlement(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    transaction_id: str  # Transaction ID
+    bank_account_id: str  # BankAccount ID (kredi kartı hesabı)
+    original_amount: float  # Orijinal tahsilat tutarı
+    commission_amount: float  # Komisyon tutarı
+    net_amount: float  # Net tutar (original - commission)
+    currency: str
+    payment_date: str  # Tahsilat tarihi (YYYY-MM-DD)
+    settlement_date: str  # Hesaba geçeceği tarih (YYYY-MM-DD)
+    is_settled: bool = False  # Hesaba geçti mi?
+    settled_at: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class Notification(BaseModel):
+    """Bildirim modeli"""
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    user_id: Optional[str] = None  # Belirli bir kullanıcıya özel (None ise tüm adminlere)
+    type: str  # "pending_reservation", "reservation_approved", "reservation_rejected", vb.
+    title: str
+    message: str
+    entity_type: Optional[str] = None  # "reservation", "transaction", vb.
+    entity_id: Optional[str] = None
+    is_read: bool = False
+    read_at: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class CheckPromissory(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    transaction_id: str  # Transaction ID
+    cari_id: str  # Cari hesap ID
+    check_number: Optional[str] = None  # Çek/Senet numarası
+    bank_name: Optional[str] = None  # Banka adı
+    due_date: str  # Vade tarihi (YYYY-MM-DD)
+    amount: float
+    currency: str
+    description: Optional[str] = None
+    is_collected: bool = False  # Tahsil edildi mi?
+    collected_at: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class ExtraSale(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    product_name: str
+    cari_id: str
+    cari_name: str
+    customer_name: str
+    person_count: Optional[int] = None  # Pax sayısı
+    customer_contact: Optional[str] = None  # Telefon numarası
+    customer_details: Optional[CustomerDetail] = None  # Müşteri detay bilgileri
+    pickup_location: Optional[str] = None
+    date: str
+    time: str
+    sale_price: float
+    purchase_price: Optional[float] = 0.0
+    currency: str = "EUR"
+    exchange_rate: float = 1.0
+    supplier_id: Optional[str] = None  # cari_id of supplier
+    supplier_name: Optional[str] = None
+    notes: Optional[str] = None
+    status: str = "active"  # "active", "cancelled"
+    cancellation_reason: Optional[str] = None  # İptal sebebi
+    cancelled_at: Optional[datetime] = None  # İptal tarihi
+    no_show_amount: Optional[float] = None  # No-show bedeli
+    no_show_currency: Optional[str] = None  # No-show bedeli para birimi
+    no_show_applied: bool = False  # No-show uygulandı mı?
+    voucher_code: Optional[str] = None  # Voucher numarası (VCHR-xxxx formatında)
+    created_by: str
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class ServicePurchase(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    supplier_id: str  # cari_id
+    supplier_name: str
+    service_description: str
+    amount: float
+    currency: str = "EUR"
+    exchange_rate: float = 1.0
+    date: str
+    notes: Optional[str] = None
+    created_by: str
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class SeasonalPrice(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    start_date: str
+    end_date: str
+    currency: str = "TRY"
+    price_per_vehicle: Optional[float] = None  # Genel sezonluk fiyat (araç başına)
+    tour_type_ids: List[str] = Field(default_factory=list)  # Birden fazla tur tipi
+    cari_prices: Dict[str, float] = Field(default_factory=dict)  # Cari ID -> Fiyat mapping (araç başına)
+    apply_to_new_caris: bool = False
+    created_by: str
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class SalaryTransaction(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    user_id: str  # Personel ID
+    transaction_type: str  # "salary_payment", "advance_payment", "overtime_payment", "deduction"
+    amount: float
+    currency: str
+    exchange_rate: float = 1.0
+    description: Optional[str] = None
+    payment_date: str  # YYYY-MM-DD
+    period_start: Optional[str] = None  # Dönem başlangıç (fazla mesai, izin için)
+    period_end: Optional[str] = None  # Dönem bitiş
+    reference_id: Optional[str] = None  # İlgili kayıt ID (overtime, leave vb.)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_by: str  # İşlemi yapan kullanıcı ID
+
+class Overtime(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    user_id: str  # Personel ID
+    date: str  # YYYY-MM-DD
+    hours: float  # Fazla mesai saati
+    hourly_rate: Optional[float] = None  # Saatlik ücret (opsiyonel, net_salary/160 gibi hesaplanabilir)
+    amount: Optional[float] = None  # Toplam tutar
+    currency: str = "TRY"
+    description: Optional[str] = None
+    is_paid: bool = False  # Ödendi mi?
+    paid_at: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_by: str
+
+class Leave(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    user_id: str  # Personel ID
+    leave_type: str  # "annual", "sick", "unpaid", "maternity", "other"
+    start_date: str  # YYYY-MM-DD
+    end_date: str  # YYYY-MM-DD
+    days: float  # İzin gün sayısı
+    is_paid: bool = False  # Ücretli izin mi?
+    description: Optional[str] = None
+    approved_by: Optional[str] = None  # Onaylayan kullanıcı ID
+    approved_at: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_by: str
+
+class VehicleCategory(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    name: str  # Kategori adı: ATV, Jeep Safari, Klasik Araç, vb.
+    description: Optional[str] = None
+    order: int = 0
+    is_active: bool = True
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class Vehicle(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    plate_number: str
+    category_id: Optional[str] = None  # YENİ - Araç kategorisi ID'si
+    vehicle_type: Optional[str] = None  # Mevcut - backward compatibility için tutulabilir
+    brand: Optional[str] = None
+    model: Optional[str] = None
+    insurance_expiry: Optional[str] = None
+    inspection_expiry: Optional[str] = None
+    notes: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class LoginActivity(BaseModel):
+    """Login activity tracking model"""
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    user_id: str
+    company_id: Optional[str] = None
+    ip: str
+    browser: Optional[str] = None
+    os: Optional[str] = None
+    device_type: Optional[str] = None  # mobile, tablet, desktop
+    location: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+# ==================== INPUT MODELS ====================
+
+class CompanyCreate(BaseModel):
+    company_name: str
+    admin_username: str
+    admin_password: str
+    admin_full_name: str
+    admin_email: Optional[EmailStr] = None
+    contact_phone: str
+    address: str
+    tax_office: str
+    tax_number: str
+    package_start_date: str
+    package_end_date: str
+
+class DemoRequest(BaseModel):
+    company_name: str
+    contact_name: str
+    phone: str
+    email: EmailStr
+
+class UserCreate(BaseModel):
+    username: str
+    password: str
+    full_name: str
+    email: Optional[EmailStr] = None
+    permissions: Dict[str, Dict[str, bool]] = Field(default_factory=dict)
+    is_admin: bool = False
+
+class ReservationCreate(BaseModel):
+    cari_id: str
+    date: str
+    time: str
+    tour_type_id: Optional[str] = None
+    customer_name: str
+    customer_contact: Optional[str] = None
+    customer_details: Optional[Dict[str, Any]] = None
+    person_count: int
+    vehicle_count: Optional[int] = None
+    pickup_location: Optional[str] = None
+    pickup_maps_link: Optional[str] = None
+    price: float
+    currency: str = "EUR"
+    exchange_rate: float = 1.0
+    notes: Optional[str] = None
+
+class TransactionCreate(BaseModel):
+    cari_id: str
+    transaction_type: str
+    amount: float
+    currency: str = "EUR"
+    exchange_rate: float = 1.0
+    payment_type_id: Optional[str] = None
+    description: str
+    reference_id: Optional[str] = None
+    reference_type: Optional[str] = None
+    date: str
+
+class PriceMatrixRequest(BaseModel):
+    date_from: str
+    date_to: str
+    tour_type_ids: Optional[List[str]] = None  # Boşsa tüm aktif tur tipleri
+    cari_id: Optional[str] = None
+    vehicle_count: int = 1
+    person_count: int = 1
@@ -0,0 +1,36 @@
+"""
+Per-user notification preference checks.
+"""
+
+
+def should_send_notification(user: dict, notification_type: str, channel: str) -> bool:
+    """
+    Utility function to check if a notification should be sent.
+    
+    Args:
+        user: User document from database
+        notification_type: Type of notification (e.g., "newBooking", "paymentReceived")
+        channel: Channel to send notification ("email" or "inApp")
+    
+    Returns:
+        bool: True if notification should be sent, False otherwise
+    """
+    # Get notification preferences, default to enabled if not set
+    notification_preferences = user.get("notificationPreferences", {})
+    
+    # Special handling for email-only notifications
+    if notification_type == "dailyFinanceReport" or notification_type == "marketingEmails":
+        if channel != "email":
+            return False
+        pref = notification_preferences.get(notification_type, {})
+        return pref.get("email", True)  # Default to True
+    
+    # For notifications with both email and inApp
+    pref = notification_preferences.get(notification_type, {})
+    
+    if channel == "email":
+        return pref.get("email", True)  # Default to True
+    elif channel == "inApp":
+        return pref.get("inApp", True)  # Default to True
+    
+    return False
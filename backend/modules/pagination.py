@@ -0,0 +1,113 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Pages are ordered by a sort field plus ``id`` as tie-breaker, and the next
+page starts strictly after the last row of the previous one, so page cost
+does not grow with the offset. The cursor is the (sort value, id) pair of
+that row, JSON-encoded with ``bson.json_util`` (dates survive the round
+trip) and base64url-wrapped so clients treat it as opaque.
+
+List endpoints keep returning a plain JSON array; ``X-Next-Cursor`` (only
+when more rows exist) and ``X-Total-Count`` (only with ``include_total``)
+travel as response headers.
+"""
+import base64
+import binascii
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import json_util
+from fastapi import HTTPException, Response
+
+MAX_PAGE_SIZE = int(os.environ.get("PAGINATION_MAX_LIMIT", "1000"))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def encode_cursor(sort_value: Any, row_id: Any) -> str:
+    raw = json_util.dumps([sort_value, row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json_util.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Geçersiz sayfa imleci (cursor)")
+    return sort_value, row_id
+
+
+def page_size(limit: Optional[int], default: int) -> int:
+    """
+    İstenen sayfa boyutunu 1..MAX_PAGE_SIZE aralığına sıkıştır.
+
+    ``limit`` verilmeyen istekler endpoint'in eski varsayılanını sınırsız alır: cursor
+    takip etmeyen istemciler (ör. /transactions'ta reference_id arayan kasa sayfaları)
+    sessizce kesilmiş liste görmesin.
+    """
+    if not limit:
+        return default
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def keyset_filter(sort_field: str, direction: int, sort_value: Any, row_id: Any) -> Dict[str, Any]:
+    """
+    (sort_field, id) sıralamasında imleçten sonra gelen satırlar.
+
+    Mongo'da null/eksik değerler en küçük sayılır: azalan sırada en sonda,
+    artan sırada en başta gelirler.
+    """
+    after = "$lt" if direction < 0 else "$gt"
+    same_value_tail = {sort_field: sort_value, "id": {after: row_id}}
+    if sort_value is None:
+        if direction < 0:
+            return same_value_tail
+        return {"$or": [same_value_tail, {sort_field: {"$ne": None}}]}
+    branches = [{sort_field: {after: sort_value}}, same_value_tail]
+    if direction < 0:
+        branches.append({sort_field: None})
+    return {"$or": branches}
+
+
+async def fetch_page(
+    collection,
+    query: Dict[str, Any],
+    sort_field: str,
+    direction: int = -1,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, int]] = None,
+    include_total: bool = False
+) -> Tuple[List[dict], Optional[str], Optional[int]]:
+    """
+    Bir sayfa getir.
+
+    Returns:
+        (satırlar, sonraki sayfanın imleci veya None, toplam kayıt sayısı veya None)
+    """
+    page_query = dict(query)
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        page_query = {"$and": [query, keyset_filter(sort_field, direction, sort_value, row_id)]}
+
+    rows = await collection.find(page_query, projection or {"_id": 0}).sort(
+        [(sort_field, direction), ("id", direction)]
+    ).limit(limit + 1).to_list(limit + 1)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.get(sort_field), last.get("id"))
+
+    total = await collection.count_documents(query) if include_total else None
+    return rows, next_cursor, total
+
+
+def set_page_headers(response: Response, next_cursor: Optional[str], total: Optional[int]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if total is not None:
+        response.headers[TOTAL_COUNT_HEADER] = str(total)
@@ -0,0 +1,117 @@
+"""
+Password hashing off the event loop.
+
+bcrypt is deliberately slow (~250 ms per hash/verify). Calling it directly in
+an async handler blocks the whole asyncio loop, so every other request waits
+behind a login burst. The async helpers here run bcrypt in a bounded thread
+pool and cap how many operations may be queued for it at once.
+"""
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from passlib.context import CryptContext
+
+logger = logging.getLogger(__name__)
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Aynı anda bcrypt çalıştıran thread sayısı (CPU çekirdeği kadar yeterli)
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Havuza verilmiş + sırada bekleyen toplam işlem üst sınırı; aşılırsa çağıran bekler
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", "64"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_semaphore_loop = None
+
+_stats = {
+    "completed": 0,
+    "in_flight": 0,
+    "waiting": 0,
+    "total_seconds": 0.0,
+    "max_seconds": 0.0,
+}
+
+
+def hash_password(password: str) -> str:
+    """Senkron hash - script'ler ve event loop dışındaki kod için"""
+    return pwd_context.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Senkron doğrulama - script'ler ve event loop dışındaki kod için"""
+    if not plain_password or not hashed_password:
+        return False
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+    return _executor
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    # Semaphore oluşturulduğu event loop'a bağlıdır (testlerde loop değişebilir)
+    global _semaphore, _semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _semaphore is None or _semaphore_loop is not loop:
+        _semaphore = asyncio.Semaphore(PASSWORD_HASH_MAX_PENDING)
+        _semaphore_loop = loop
+    return _semaphore
+
+
+async def _run(func, *args) -> Any:
+    semaphore = _get_semaphore()
+    _stats["waiting"] += 1
+    try:
+        await semaphore.acquire()
+    finally:
+        _stats["waiting"] -= 1
+
+    _stats["in_flight"] += 1
+    started = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), func, *args)
+    finally:
+        elapsed = time.perf_counter() - started
+        _stats["in_flight"] -= 1
+        _stats["completed"] += 1
+        _stats["total_seconds"] += elapsed
+        _stats["max_seconds"] = max(_stats["max_seconds"], elapsed)
+        semaphore.release()
+
+
+async def hash_password_async(password: str) -> str:
+    """bcrypt hash'ini thread havuzunda üret"""
+    return await _run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """bcrypt doğrulamasını thread havuzunda yap"""
+    return await _run(verify_password, plain_password, hashed_password)
+
+
+def get_password_pool_stats() -> Dict[str, Any]:
+    completed = _stats["completed"]
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "max_pending": PASSWORD_HASH_MAX_PENDING,
+        "in_flight": _stats["in_flight"],
+        "waiting": _stats["waiting"],
+        "completed": completed,
+        "avg_ms": round(_stats["total_seconds"] / completed * 1000, 2) if completed else None,
+        "max_ms": round(_stats["max_seconds"] * 1000, 2),
+    }
+
+
+def shutdown_password_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
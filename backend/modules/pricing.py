@@ -0,0 +1,214 @@
+"""
+Precompiled seasonal price index.
+
+``calculate_reservation_price`` used to load every active ``seasonal_prices``
+document, re-parse their dates and normalize their ``cari_prices`` on each
+call. ``SeasonalPriceIndex`` does that work once per company: for every tour
+type the date axis is cut into disjoint segments, each pointing at the price
+row that wins on those days (the first matching row in insertion order, as
+before). A quote is then one dict lookup plus one ``bisect``.
+
+Indexes are cached per company and dropped by the seasonal price CRUD
+endpoints through ``invalidate_price_index``.
+"""
+import bisect
+import logging
+import os
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+def _is_number(value: Any) -> bool:
+    return value is not None and isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _parse_date(value: Any) -> date:
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+class PriceEntry:
+    """Tek bir seasonal_prices dokümanının normalize edilmiş hali"""
+
+    __slots__ = (
+        "id", "rank", "start", "end", "currency", "price_per_vehicle",
+        "cari_prices", "first_price", "apply_to_new_caris", "tour_type_ids"
+    )
+
+    def __init__(self, doc: dict, rank: int):
+        self.id = doc.get("id")
+        self.rank = rank
+        self.start = _parse_date(doc["start_date"])
+        self.end = _parse_date(doc["end_date"])
+        self.currency = doc.get("currency", "EUR")
+        ppv = doc.get("price_per_vehicle")
+        self.price_per_vehicle = float(ppv) if _is_number(ppv) else None
+        # Cari ID anahtarları string'e çevrilip normalize edilir
+        self.cari_prices: Dict[str, Any] = {str(k).strip(): v for k, v in (doc.get("cari_prices") or {}).items()}
+        first = next(iter(self.cari_prices.values()), None)
+        self.first_price = float(first) if _is_number(first) else None
+        self.apply_to_new_caris = bool(doc.get("apply_to_new_caris", False))
+        tour_type_ids = doc.get("tour_type_ids", [])
+        if isinstance(tour_type_ids, str):
+            tour_type_ids = [tour_type_ids]
+        self.tour_type_ids = {str(tid) for tid in (tour_type_ids or [])}
+
+
+class PriceQuote:
+    """Birim fiyat, para birimi ve fiyatın kaynağı (seasonal, cari_specific, error_fallback)"""
+
+    __slots__ = ("price_per_unit", "currency", "source", "seasonal_price_id")
+
+    def __init__(self, price_per_unit: float, currency: str, source: str, seasonal_price_id: Optional[str] = None):
+        self.price_per_unit = price_per_unit
+        self.currency = currency
+        self.source = source
+        self.seasonal_price_id = seasonal_price_id
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "price_per_unit": self.price_per_unit,
+            "currency": self.currency,
+            "source": self.source,
+            "seasonal_price_id": self.seasonal_price_id,
+        }
+
+
+NO_PRICE = PriceQuote(0.0, "EUR", "error_fallback")
+
+
+class SeasonalPriceIndex:
+    """Bir şirketin aktif seasonal price'ları: tur tipi -> (segment başlangıçları, kazanan kayıtlar)"""
+
+    def __init__(self, docs: List[dict]):
+        entries: List[PriceEntry] = []
+        for rank, doc in enumerate(docs):
+            try:
+                entries.append(PriceEntry(doc, rank))
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Skipping invalid seasonal price {doc.get('id')}: {e}")
+
+        by_tour_type: Dict[str, List[PriceEntry]] = {}
+        for entry in entries:
+            for tour_type_id in entry.tour_type_ids:
+                by_tour_type.setdefault(tour_type_id, []).append(entry)
+
+        self.size = len(entries)
+        self._segments: Dict[str, Tuple[List[int], List[Optional[PriceEntry]]]] = {
+            tour_type_id: self._build_segments(tour_entries)
+            for tour_type_id, tour_entries in by_tour_type.items()
+        }
+
+    @staticmethod
+    def _build_segments(entries: List[PriceEntry]) -> Tuple[List[int], List[Optional[PriceEntry]]]:
+        # Tarih ekseni, aralık başlangıç/bitişlerinden bölünür; her segmentte en küçük
+        # rank'li (ilk eklenen) kayıt kazanır - eski "ilk eşleşen" davranışıyla aynı
+        boundaries = sorted({e.start.toordinal() for e in entries} | {e.end.toordinal() + 1 for e in entries})
+        starts: List[int] = []
+        winners: List[Optional[PriceEntry]] = []
+        for boundary in boundaries:
+            winner = None
+            for entry in entries:
+                if entry.start.toordinal() <= boundary <= entry.end.toordinal() and (winner is None or entry.rank < winner.rank):
+                    winner = entry
+            if winners and winners[-1] is winner:
+                continue
+            starts.append(boundary)
+            winners.append(winner)
+        return starts, winners
+
+    def match(self, tour_type_id: str, day: date) -> Optional[PriceEntry]:
+        """Verilen gün ve tur tipi için geçerli seasonal price kaydı (yoksa None)"""
+        segments = self._segments.get(str(tour_type_id))
+        if not segments:
+            return None
+        starts, winners = segments
+        position = bisect.bisect_right(starts, day.toordinal()) - 1
+        return winners[position] if position >= 0 else None
+
+    async def quote(
+        self,
+        tour_type_id: str,
+        day: date,
+        cari_id: Optional[str] = None,
+        cari_created_loader: Optional[Callable[[str], Awaitable[Optional[date]]]] = None
+    ) -> PriceQuote:
+        """
+        Birim fiyatı hesapla.
+
+        ``cari_created_loader`` sadece "yeni cariler için geçerli" fiyatlarda ve cari
+        fiyat tablosunda yoksa çağrılır (carinin oluşturulma tarihini döndürür).
+        """
+        entry = self.match(tour_type_id, day)
+        if entry is None:
+            return NO_PRICE
+
+        cari_id_str = str(cari_id).strip() if cari_id else None
+
+        if cari_id_str and cari_id_str in entry.cari_prices:
+            cari_price = entry.cari_prices[cari_id_str]
+            if _is_number(cari_price):
+                return PriceQuote(float(cari_price), entry.currency, "cari_specific", entry.id)
+            # Cari özel fiyat geçersiz - genel fiyat, o da yoksa tablodaki ilk fiyat
+            return self._vehicle_price_first(entry)
+
+        if entry.apply_to_new_caris and cari_id:
+            cari_created = await cari_created_loader(cari_id) if cari_created_loader else None
+            if cari_created and entry.start <= cari_created <= entry.end and entry.cari_prices:
+                # Fiyat döneminde açılmış yeni cari - tablodaki ilk fiyat
+                if entry.first_price is None:
+                    return PriceQuote(0.0, entry.currency, "error_fallback", entry.id)
+                return PriceQuote(entry.first_price, entry.currency, "cari_specific", entry.id)
+            return self._vehicle_price_first(entry)
+
+        # Cari ID yok veya tabloda yok - tablodaki ilk fiyat genel fiyat olarak kullanılır
+        return self._table_price_first(entry)
+
+    @staticmethod
+    def _vehicle_price_first(entry: PriceEntry) -> PriceQuote:
+        """Önce genel araç fiyatı, yoksa cari fiyat tablosundaki ilk fiyat"""
+        if entry.price_per_vehicle is not None:
+            return PriceQuote(entry.price_per_vehicle, entry.currency, "seasonal", entry.id)
+        if entry.cari_prices and entry.first_price is not None:
+            return PriceQuote(entry.first_price, entry.currency, "seasonal", entry.id)
+        return PriceQuote(0.0, entry.currency, "error_fallback", entry.id)
+
+    @staticmethod
+    def _table_price_first(entry: PriceEntry) -> PriceQuote:
+        """Cari fiyat tablosu tanımlıysa ilk fiyatı, değilse genel araç fiyatı"""
+        if entry.cari_prices:
+            if entry.first_price is not None:
+                return PriceQuote(entry.first_price, entry.currency, "seasonal", entry.id)
+        elif entry.price_per_vehicle is not None:
+            return PriceQuote(entry.price_per_vehicle, entry.currency, "seasonal", entry.id)
+        return PriceQuote(0.0, entry.currency, "error_fallback", entry.id)
+
+
+_index_cache = TTLCache(
+    "seasonal_price_index",
+    maxsize=int(os.environ.get("SEASONAL_PRICE_INDEX_MAXSIZE", "1024")),
+    # Birden fazla worker process varsa diğerlerindeki değişiklikler en geç bu sürede görülür
+    ttl=float(os.environ.get("SEASONAL_PRICE_INDEX_TTL_SECONDS", "300"))
+)
+
+
+async def get_price_index(db, company_id: str) -> SeasonalPriceIndex:
+    """Şirketin fiyat index'ini cache'ten getir, yoksa aktif seasonal price'lardan derle"""
+    index = _index_cache.get(company_id)
+    if index is None:
+        docs = await db.seasonal_prices.find(
+            {"company_id": company_id, "is_active": True},
+            {"_id": 0, "id": 1, "start_date": 1, "end_date": 1, "currency": 1, "price_per_vehicle": 1,
+             "tour_type_ids": 1, "cari_prices": 1, "apply_to_new_caris": 1}
+        ).to_list(length=None)
+        index = SeasonalPriceIndex(docs)
+        _index_cache.set(company_id, index)
+    return index
+
+
+def invalidate_price_index(company_id: str) -> None:
+    """Seasonal price oluşturma/güncelleme/silme sonrası çağrılır"""
+    _index_cache.invalidate(company_id)
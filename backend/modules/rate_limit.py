@@ -0,0 +1,32 @@
+"""
+Rate limiting for public endpoints.
+
+``slowapi`` is optional: without it ``limiter`` is a no-op with the same
+``limit`` decorator, so routers can decorate endpoints unconditionally.
+``server.py`` registers the limiter and its exception handler on the app
+when ``SLOWAPI_AVAILABLE``.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from slowapi import Limiter, _rate_limit_exceeded_handler
+    from slowapi.util import get_remote_address
+    from slowapi.errors import RateLimitExceeded
+    SLOWAPI_AVAILABLE = True
+except ImportError:
+    SLOWAPI_AVAILABLE = False
+    _rate_limit_exceeded_handler = None
+    RateLimitExceeded = None
+    logger.warning("slowapi not available, rate limiting disabled")
+
+if SLOWAPI_AVAILABLE:
+    limiter = Limiter(key_func=get_remote_address)
+else:
+    class DummyLimiter:
+        def limit(self, *args, **kwargs):
+            def decorator(func):
+                return func
+            return decorator
+    limiter = DummyLimiter()
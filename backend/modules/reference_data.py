@@ -0,0 +1,52 @@
+"""
+Cached reference data reads (company, tour types, payment types, vehicle
+categories, bank accounts) on top of ``reference_cache``.
+"""
+from typing import List, Optional
+
+from .cache import reference_cache
+from .database import db
+
+# -------------------- REFERENCE DATA CACHE --------------------
+# Şirket dokümanı ve referans listeleri (tur tipleri, ödeme tipleri, araç kategorileri, banka hesapları)
+# company_id bazlı TTL+LRU cache'ten okunur. Bu koleksiyonlara yazan her endpoint
+# invalidate_reference_cache çağırmalıdır.
+
+async def get_company_cached(company_id: str) -> Optional[dict]:
+    return await reference_cache.get_or_load(
+        company_id, "company",
+        lambda: db.companies.find_one({"id": company_id}, {"_id": 0})
+    )
+
+async def get_tour_types_cached(company_id: str) -> List[dict]:
+    return await reference_cache.get_or_load(
+        company_id, "tour_types",
+        lambda: db.tour_types.find({"company_id": company_id}, {"_id": 0}).to_list(1000)
+    )
+
+async def get_tour_type_cached(company_id: str, tour_type_id: str) -> Optional[dict]:
+    tour_types = await get_tour_types_cached(company_id)
+    return next((t for t in tour_types if t.get("id") == tour_type_id), None)
+
+async def get_payment_types_cached(company_id: str) -> List[dict]:
+    return await reference_cache.get_or_load(
+        company_id, "payment_types",
+        lambda: db.payment_types.find({"company_id": company_id}, {"_id": 0}).sort("order", 1).to_list(100)
+    )
+
+async def get_vehicle_categories_cached(company_id: str) -> List[dict]:
+    return await reference_cache.get_or_load(
+        company_id, "vehicle_categories",
+        lambda: db.vehicle_categories.find({"company_id": company_id}, {"_id": 0}).sort("order", 1).to_list(100)
+    )
+
+async def get_bank_accounts_cached(company_id: str) -> List[dict]:
+    return await reference_cache.get_or_load(
+        company_id, "bank_accounts",
+        lambda: db.bank_accounts.find({"company_id": company_id}, {"_id": 0}).sort("order", 1).to_list(100)
+    )
+
+def invalidate_reference_cache(company_id: Optional[str], kind: Optional[str] = None):
+    """Yazma işleminden sonra şirketin referans verisi cache'ini düşür (kind=None: hepsi)"""
+    if company_id:
+        reference_cache.invalidate_company(company_id, kind)
@@ -0,0 +1,205 @@
+"""
+Aggregation pipelines for report endpoints.
+
+Report numbers are computed inside MongoDB with ``$match``/``$group``/
+``$lookup`` so only the final, already summed rows travel to Python.
+"""
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+ACTIVE_RESERVATION = {"$ne": "cancelled"}
+
+# atv_count/price alanı eski kayıtlarda olmayabilir veya null olabilir
+_ATV_COUNT = {"$ifNull": ["$atv_count", 0]}
+_PRICE = {"$ifNull": ["$price", 0]}
+
+
+def _top_lookup(field: str, collection: str, company_id: str, limit: int, extra_group: Dict[str, Any]) -> List[dict]:
+    """Bir alana göre grupla, en çok kullanılan ``limit`` kaydı referans dokümanıyla eşleştir"""
+    return [
+        {"$match": {field: {"$nin": [None, ""]}}},
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}, **extra_group}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$limit": limit},
+        {"$lookup": {
+            "from": collection,
+            "let": {"ref_id": "$_id"},
+            "pipeline": [
+                {"$match": {"$expr": {"$and": [
+                    {"$eq": ["$id", "$$ref_id"]},
+                    {"$eq": ["$company_id", company_id]},
+                ]}}},
+                {"$project": {"_id": 0, "name": 1}},
+            ],
+            "as": "ref",
+        }},
+        # Silinmiş cari / tur tipi listeden çıkar
+        {"$unwind": "$ref"},
+        {"$sort": {"count": -1, "_id": 1}},
+    ]
+
+
+def build_dashboard_pipeline(
+    company_id: str,
+    today: str,
+    trend_start: str,
+    date_from: str,
+    date_to: str,
+    top_limit: int = 5
+) -> List[dict]:
+    """
+    Dashboard raporu için tek pipeline: bugünün özeti, günlük trend ve
+    tarih aralığındaki en çok rezervasyon yapan cari / tur tipleri (``$facet``).
+    """
+    range_start = min(trend_start, date_from, today)
+    range_end = max(today, date_to)
+    in_range = {"$and": [{"$gte": ["$date", date_from]}, {"$lte": ["$date", date_to]}]}
+
+    return [
+        {"$match": {
+            "company_id": company_id,
+            "date": {"$gte": range_start, "$lte": range_end},
+            "status": ACTIVE_RESERVATION,
+        }},
+        {"$project": {"_id": 0, "date": 1, "atv_count": 1, "price": 1, "currency": 1, "cari_id": 1, "tour_type_id": 1}},
+        {"$facet": {
+            "today": [
+                {"$match": {"date": today}},
+                {"$group": {
+                    "_id": "$currency",
+                    "reservations": {"$sum": 1},
+                    "atvs": {"$sum": _ATV_COUNT},
+                    "revenue": {"$sum": _PRICE},
+                }},
+            ],
+            "daily_trend": [
+                {"$match": {"date": {"$gte": trend_start, "$lte": today}}},
+                {"$group": {
+                    "_id": "$date",
+                    "reservations": {"$sum": 1},
+                    "atvs": {"$sum": _ATV_COUNT},
+                    "revenue": {"$sum": {"$cond": [{"$eq": ["$currency", "EUR"]}, _PRICE, 0]}},
+                }},
+            ],
+            # Cari ve tur tipi sıralamaları sadece cari_id'si boş string olmayan kayıtlar üzerinden
+            "top_cari_accounts": [
+                {"$match": {"$expr": in_range, "cari_id": {"$ne": ""}}},
+                *_top_lookup("cari_id", "cari_accounts", company_id, top_limit, {"revenue": {"$sum": _PRICE}}),
+            ],
+            "top_tour_types": [
+                {"$match": {"$expr": in_range, "cari_id": {"$ne": ""}}},
+                *_top_lookup("tour_type_id", "tour_types", company_id, top_limit, {}),
+            ],
+        }},
+    ]
+
+
+def shape_dashboard_result(facets: Dict[str, List[dict]], today: str, trend_days: int) -> Dict[str, Any]:
+    """Pipeline çıktısını mevcut /reports/dashboard cevap formatına çevir"""
+    today_revenue = {"EUR": 0, "USD": 0, "TRY": 0}
+    today_reservations = 0
+    today_atvs = 0
+    for row in facets.get("today", []):
+        today_reservations += row["reservations"]
+        today_atvs += row["atvs"]
+        if row["_id"]:
+            today_revenue[row["_id"]] = today_revenue.get(row["_id"], 0) + row["revenue"]
+
+    by_day = {row["_id"]: row for row in facets.get("daily_trend", [])}
+    today_date = date.fromisoformat(today)
+    daily_trend = []
+    for offset in range(trend_days - 1, -1, -1):
+        day = (today_date - timedelta(days=offset)).isoformat()
+        row = by_day.get(day, {})
+        daily_trend.append({
+            "date": day,
+            "reservations": row.get("reservations", 0),
+            "atvs": row.get("atvs", 0),
+            "revenue": row.get("revenue", 0),
+        })
+
+    return {
+        "today": {
+            "total_reservations": today_reservations,
+            "total_atvs": today_atvs,
+            "revenue": today_revenue,
+        },
+        "daily_trend": daily_trend,
+        "top_cari_accounts": [
+            {"cari_name": row["ref"].get("name", ""), "reservation_count": row["count"], "revenue": row["revenue"]}
+            for row in facets.get("top_cari_accounts", [])
+        ],
+        "top_tour_types": [
+            {"tour_type_name": row["ref"].get("name", ""), "count": row["count"]}
+            for row in facets.get("top_tour_types", [])
+        ],
+    }
+
+
+PAYMENT_CURRENCIES = ("EUR", "USD", "TRY")
+DEBT_STATUSES = ["confirmed", "completed"]
+
+
+def build_customer_payment_pipeline(company_id: str, customer_names: List[str]) -> List[dict]:
+    """
+    Münferit müşterilerin borç/ödeme toplamları tek pipeline'da: onaylı/tamamlanmış
+    rezervasyon fiyatları (borç) ``$unionWith`` ile payment transaction'ları (ödeme)
+    birleştirilip müşteri + para birimine göre toplanır. reservations üzerinde çalışır.
+    """
+    def _by_customer(debt: Any, paid: Any) -> dict:
+        return {"$project": {
+            "_id": 0,
+            "customer_name": 1,
+            "currency": {"$toUpper": {"$ifNull": ["$currency", ""]}},
+            "debt": debt,
+            "paid": paid,
+        }}
+
+    return [
+        {"$match": {"company_id": company_id, "customer_name": {"$in": customer_names}, "status": {"$in": DEBT_STATUSES}}},
+        _by_customer(_PRICE, {"$literal": 0}),
+        {"$unionWith": {"coll": "transactions", "pipeline": [
+            {"$match": {"company_id": company_id, "customer_name": {"$in": customer_names}, "transaction_type": "payment"}},
+            _by_customer({"$literal": 0}, {"$abs": {"$ifNull": ["$amount", 0]}}),
+        ]}},
+        {"$match": {"currency": {"$in": list(PAYMENT_CURRENCIES)}}},
+        {"$group": {
+            "_id": {"customer_name": "$customer_name", "currency": "$currency"},
+            "debt": {"$sum": "$debt"},
+            "paid": {"$sum": "$paid"},
+        }},
+    ]
+
+
+def shape_customer_payment_status(rows: List[dict], customer_names: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Pipeline çıktısını müşteri adına göre payment status alanlarına çevir"""
+    totals: Dict[str, Dict[str, Dict[str, float]]] = {
+        name: {
+            "total_debt": {c: 0.0 for c in PAYMENT_CURRENCIES},
+            "total_payments": {c: 0.0 for c in PAYMENT_CURRENCIES},
+        }
+        for name in customer_names
+    }
+    for row in rows:
+        entry = totals.get(row["_id"]["customer_name"])
+        if entry is None:
+            continue
+        currency = row["_id"]["currency"]
+        entry["total_debt"][currency] += row.get("debt", 0)
+        entry["total_payments"][currency] += row.get("paid", 0)
+
+    result: Dict[str, Dict[str, Any]] = {}
+    for name, entry in totals.items():
+        unpaid_amount = {
+            c: max(entry["total_debt"][c] - entry["total_payments"][c], 0.0)
+            for c in PAYMENT_CURRENCIES
+        }
+        has_unpaid = any(amount > 0 for amount in unpaid_amount.values())
+        result[name] = {
+            "payment_status": "unpaid" if has_unpaid else "paid",
+            "total_debt": entry["total_debt"],
+            "total_payments": entry["total_payments"],
+            "unpaid_amount": unpaid_amount,
+            "has_unpaid": has_unpaid,
+        }
+    return result
@@ -0,0 +1,163 @@
+"""
+Reservation price calculation: single quotes and the cari price matrix.
+
+Prices come from the per-company ``get_price_index`` (seasonal prices) and
+the cari account's pricing model.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from fastapi import HTTPException
+
+from .database import db
+from .pricing import get_price_index
+from .reference_data import get_company_cached, get_tour_type_cached, get_tour_types_cached
+
+logger = logging.getLogger(__name__)
+
+async def calculate_reservation_price(
+    company_id: str,
+    cari_id: Optional[str],
+    tour_type_id: str,
+    date: str,
+    vehicle_count: int,
+    person_count: int = 1
+):
+    """Rezervasyon fiyatını hesapla - seasonal prices ve cari özel fiyatları kontrol et (araç sayısı üzerine)"""
+    # Company kurlarını al
+    company = await get_company_cached(company_id)
+    rates = company.get("currency_rates", {}) if company else {"EUR": 1.0, "USD": 1.0, "TRY": 1.0}
+    
+    # Tour type bilgisini al
+    tour_type = await get_tour_type_cached(company_id, tour_type_id)
+    if not tour_type:
+        raise HTTPException(status_code=404, detail="Tour type not found")
+    
+    # Varsayılan fiyatlar artık fiyat yönetiminden (seasonal prices) gelecek
+    # Default price kaldırıldı - artık sadece seasonal prices kullanılacak
+    
+    # Seasonal prices kontrolü - şirket bazlı derlenmiş fiyat index'i (modules/pricing.py)
+    price_index = await get_price_index(db, company_id)
+    reservation_date = datetime.strptime(date, "%Y-%m-%d").date()
+    
+    quote = await price_index.quote(tour_type_id, reservation_date, cari_id, cari_created_loader(company_id))
+    if quote.seasonal_price_id is None:
+        logger.warning(f"Seasonal price bulunamadı - fiyat yönetiminden fiyat tanımlanmalı: tour_type_id={tour_type_id}, date={date}")
+    
+    total_price = apply_pricing_model(tour_type, quote.price_per_unit, vehicle_count, person_count)
+    logger.debug(f"Fiyat hesaplandı: cari_id={cari_id}, tour_type_id={tour_type_id}, date={date}, "
+                 f"pricing_model={tour_type.get('pricing_model', 'vehicle_based')}, price_per_unit={quote.price_per_unit}, "
+                 f"total_price={total_price}, currency={quote.currency}, source={quote.source}")
+    
+    return total_price, quote.currency
+
+def cari_created_loader(company_id: str):
+    """Carinin oluşturulma tarihini getiren loader - "yeni cariler için geçerli" fiyatlarda gerekir (istek içinde memo'lu)"""
+    created_dates = {}
+    
+    async def load(cari_id: str):
+        if cari_id not in created_dates:
+            cari_account = await db.cari_accounts.find_one({"id": cari_id, "company_id": company_id}, {"_id": 0, "created_at": 1})
+            created = None
+            if cari_account and cari_account.get("created_at"):
+                created = datetime.fromisoformat(cari_account["created_at"].replace('Z', '+00:00')).date()
+            created_dates[cari_id] = created
+        return created_dates[cari_id]
+    
+    return load
+
+def apply_pricing_model(tour_type: dict, price_per_unit: float, vehicle_count: int, person_count: int) -> float:
+    """Birim fiyatı tur tipinin pricing_model'ine göre toplam fiyata çevir"""
+    if tour_type.get("pricing_model", "vehicle_based") == "person_based":
+        # Kişi bazlı: fiyat * kişi sayısı
+        return float(price_per_unit) * int(person_count)
+    # Araç bazlı (varsayılan): fiyat * araç sayısı
+    return float(price_per_unit) * int(vehicle_count)
+
+PRICE_MATRIX_MAX_DAYS = 93
+PRICE_MATRIX_MAX_TOUR_TYPES = 50
+
+async def calculate_price_matrix(
+    company_id: str,
+    cari_id: Optional[str],
+    date_from: str,
+    date_to: str,
+    tour_type_ids: Optional[List[str]] = None,
+    vehicle_count: int = 1,
+    person_count: int = 1
+) -> dict:
+    """
+    Tarih aralığı × tur tipleri için fiyat matrisi - calculate_reservation_price ile aynı mantık,
+    fiyat index'i ve referans verisi tek sefer yüklenir.
+    """
+    try:
+        start = datetime.strptime(date_from, "%Y-%m-%d").date()
+        end = datetime.strptime(date_to, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Tarih formatı YYYY-MM-DD olmalıdır")
+    if end < start:
+        raise HTTPException(status_code=400, detail="Bitiş tarihi başlangıç tarihinden önce olamaz")
+    day_count = (end - start).days + 1
+    if day_count > PRICE_MATRIX_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"En fazla {PRICE_MATRIX_MAX_DAYS} günlük aralık sorgulanabilir")
+    
+    all_tour_types = await get_tour_types_cached(company_id)
+    if tour_type_ids:
+        tour_types_by_id = {t.get("id"): t for t in all_tour_types}
+        tour_types = [tour_types_by_id[tid] for tid in dict.fromkeys(tour_type_ids) if tid in tour_types_by_id]
+        unknown_tour_type_ids = [tid for tid in dict.fromkeys(tour_type_ids) if tid not in tour_types_by_id]
+    else:
+        tour_types = [t for t in all_tour_types if t.get("is_active", True)]
+        unknown_tour_type_ids = []
+    if len(tour_types) > PRICE_MATRIX_MAX_TOUR_TYPES:
+        raise HTTPException(status_code=400, detail=f"En fazla {PRICE_MATRIX_MAX_TOUR_TYPES} tur tipi sorgulanabilir")
+    
+    price_index = await get_price_index(db, company_id)
+    load_created = cari_created_loader(company_id)
+    days = [start + timedelta(days=offset) for offset in range(day_count)]
+    
+    prices = {}
+    for tour_type in tour_types:
+        row = {}
+        for day in days:
+            quote = await price_index.quote(tour_type["id"], day, cari_id, load_created)
+            row[day.isoformat()] = {
+                "price": apply_pricing_model(tour_type, quote.price_per_unit, vehicle_count, person_count),
+                "currency": quote.currency,
+                "source": quote.source
+            }
+        prices[tour_type["id"]] = row
+    
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "cari_id": cari_id,
+        "vehicle_count": vehicle_count,
+        "person_count": person_count,
+        "tour_types": [
+            {"id": t["id"], "name": t.get("name"), "pricing_model": t.get("pricing_model", "vehicle_based")}
+            for t in tour_types
+        ],
+        "unknown_tour_type_ids": unknown_tour_type_ids,
+        "prices": prices
+    }
+
+async def get_pricing_cari_account(current_cari: dict) -> dict:
+    """Cari panel kullanıcısının fiyatlamada kullanılan cari_accounts kaydı (cari_code ile eşleşir)"""
+    cari = await db.caris.find_one({"id": current_cari["cari_id"]})
+    if not cari:
+        raise HTTPException(status_code=404, detail="Cari account not found")
+    
+    cari_code = cari.get("cari_code")
+    if not cari_code:
+        raise HTTPException(status_code=400, detail="Cari code not found")
+    
+    cari_account = await db.cari_accounts.find_one({
+        "company_id": current_cari["company_id"],
+        "cari_code": cari_code
+    })
+    
+    if not cari_account:
+        raise HTTPException(status_code=404, detail="Cari account not found")
+    return cari_account
@@ -0,0 +1,296 @@
+"""
+Pre-aggregated daily reservation rollups.
+
+``daily_rollups`` holds one document per company × date × status ×
+tour type × cari × pickup location × hour × currency with the number of
+reservations, the vehicle (``atv_count``) total and the revenue in that
+currency. Reservation writes call ``apply_reservation_delta`` with the
+document before and after the change, so buckets stay current through
+``$inc`` upserts; ``rebuild_rollups`` recomputes them from ``reservations``
+when they drift (see scripts/rebuild_daily_rollups.py). Reports read from
+``rollup_totals`` instead of scanning raw reservations.
+
+Existing reservations are rolled up by the ``0004_daily_rollups_backfill``
+migration (runs automatically after startup, company by company, resumable).
+Until it is done ``rollup_totals`` computes the same buckets from
+``reservations`` so reports stay correct right after deploy.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from .cash_position import sync_cash_position
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_BACKFILL_MIGRATION = "0004_daily_rollups_backfill"
+
+# Bucket anahtarı
+ROLLUP_DIMENSIONS = ("company_id", "date", "status", "tour_type_id", "cari_id", "pickup_location", "hour", "currency")
+
+# Rollup hesaplamak için gereken rezervasyon alanları
+ROLLUP_PROJECTION = {
+    "_id": 0, "id": 1, "company_id": 1, "date": 1, "status": 1, "tour_type_id": 1, "cari_id": 1,
+    "pickup_location": 1, "time": 1, "currency": 1, "price": 1, "atv_count": 1,
+}
+
+
+def reservation_hour(time_value: Any) -> Optional[int]:
+    """'09:30' -> 9; saat yoksa None (raporlardaki saat ayrıştırmasıyla aynı)"""
+    if not time_value or not isinstance(time_value, str):
+        return None
+    if ":" not in time_value:
+        return 0
+    try:
+        return int(time_value.split(":")[0])
+    except ValueError:
+        return None
+
+
+def rollup_key(reservation: dict) -> Optional[Dict[str, Any]]:
+    """Rezervasyonun düştüğü bucket; company_id veya date yoksa None"""
+    if not reservation or not reservation.get("company_id") or not reservation.get("date"):
+        return None
+    return {
+        "company_id": reservation["company_id"],
+        "date": reservation["date"],
+        "status": reservation.get("status") or "",
+        "tour_type_id": reservation.get("tour_type_id") or "",
+        "cari_id": reservation.get("cari_id") or "",
+        "pickup_location": reservation.get("pickup_location") or "",
+        "hour": reservation_hour(reservation.get("time")),
+        "currency": reservation.get("currency") or "",
+    }
+
+
+def rollup_values(reservation: dict, sign: int = 1) -> Dict[str, float]:
+    return {
+        "count": sign,
+        "atv_count": sign * (reservation.get("atv_count") or 0),
+        "revenue": sign * (reservation.get("price") or 0),
+    }
+
+
+async def _inc_bucket(db, key: Dict[str, Any], values: Dict[str, float]) -> None:
+    # updated_at: rebuild sırasında güncellenen bucket'lar eski sayılıp silinmesin
+    update = {"$inc": values, "$set": {"updated_at": datetime.now(timezone.utc)}}
+    try:
+        await db.daily_rollups.update_one(key, update, upsert=True)
+    except DuplicateKeyError:
+        # Aynı bucket'ı eşzamanlı oluşturan iki upsert - ikinci deneme mevcut dokümanı günceller
+        await db.daily_rollups.update_one(key, update, upsert=True)
+    if values["count"] < 0:
+        await db.daily_rollups.delete_one({**key, "count": {"$lte": 0}})
+
+
+async def apply_reservation_delta(db, before: Optional[dict], after: Optional[dict]) -> None:
+    """
+    Rezervasyon değişikliğini rollup'a uygula.
+
+    Args:
+        before: Değişiklikten önceki doküman (yeni kayıtta None)
+        after: Değişiklikten sonraki doküman (silinen kayıtta None)
+    """
+    before_key = rollup_key(before) if before else None
+    after_key = rollup_key(after) if after else None
+
+    if before_key and after_key and before_key == after_key:
+        old_values = rollup_values(before)
+        new_values = rollup_values(after)
+        diff = {field: new_values[field] - old_values[field] for field in ("atv_count", "revenue")}
+        if any(diff.values()):
+            await _inc_bucket(db, after_key, {"count": 0, **diff})
+        return
+
+    if before_key:
+        await _inc_bucket(db, before_key, rollup_values(before, sign=-1))
+    if after_key:
+        await _inc_bucket(db, after_key, rollup_values(after))
+
+
+def build_rollup_pipeline(match: Dict[str, Any]) -> List[dict]:
+    """Ham rezervasyonlardan rollup bucket'larını hesaplayan pipeline (rebuild için)"""
+    time_hour = {"$cond": [
+        {"$and": [{"$eq": [{"$type": "$time"}, "string"]}, {"$ne": ["$time", ""]}]},
+        {"$cond": [
+            {"$gte": [{"$indexOfBytes": ["$time", ":"]}, 0]},
+            {"$convert": {
+                "input": {"$arrayElemAt": [{"$split": ["$time", ":"]}, 0]},
+                "to": "int",
+                "onError": None,
+                "onNull": None,
+            }},
+            0,
+        ]},
+        None,
+    ]}
+    return [
+        {"$match": {"company_id": {"$nin": [None, ""]}, "date": {"$nin": [None, ""]}, **match}},
+        {"$group": {
+            "_id": {
+                "company_id": "$company_id",
+                "date": "$date",
+                "status": {"$ifNull": ["$status", ""]},
+                "tour_type_id": {"$ifNull": ["$tour_type_id", ""]},
+                "cari_id": {"$ifNull": ["$cari_id", ""]},
+                "pickup_location": {"$ifNull": ["$pickup_location", ""]},
+                "hour": time_hour,
+                "currency": {"$ifNull": ["$currency", ""]},
+            },
+            "count": {"$sum": 1},
+            "atv_count": {"$sum": {"$ifNull": ["$atv_count", 0]}},
+            "revenue": {"$sum": {"$ifNull": ["$price", 0]}},
+        }},
+    ]
+
+
+def _rollup_match(company_id: Optional[str], date_from: Optional[str], date_to: Optional[str]) -> Dict[str, Any]:
+    match: Dict[str, Any] = {}
+    if company_id:
+        match["company_id"] = company_id
+    if date_from or date_to:
+        match["date"] = {}
+        if date_from:
+            match["date"]["$gte"] = date_from
+        if date_to:
+            match["date"]["$lte"] = date_to
+    return match
+
+
+async def _write_buckets(db, ops: List[UpdateOne]) -> None:
+    try:
+        await db.daily_rollups.bulk_write(ops, ordered=False)
+    except BulkWriteError as e:
+        # Canlı $inc upsert'i ile aynı anda oluşturulan bucket'lar: tekrar dene (artık mevcut dokümanı günceller)
+        errors = (e.details or {}).get("writeErrors", [])
+        if any(err.get("code") != 11000 for err in errors):
+            raise
+        await db.daily_rollups.bulk_write([ops[err["index"]] for err in errors], ordered=False)
+
+
+async def rebuild_rollups(
+    db,
+    company_id: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    batch_size: int = 1000
+) -> int:
+    """
+    Belirtilen şirket/tarih aralığındaki rollup'ları ham rezervasyonlardan yeniden hesapla.
+
+    Bucket'lar silinmeden ``$set`` upsert ile üzerine yazılır; bu çalışmada yazılmayan ve
+    başladıktan sonra canlı ``$inc`` almamış bucket'lar en sonda silinir. Böylece rebuild
+    sırasında gelen rezervasyon yazımları kaybolmaz ve rapor hiçbir an boş görünmez.
+    """
+    match = _rollup_match(company_id, date_from, date_to)
+    started_at = datetime.now(timezone.utc)
+
+    written = 0
+    batch: List[UpdateOne] = []
+    async for row in db.reservations.aggregate(build_rollup_pipeline(match), allowDiskUse=True):
+        # Boş string alanlar ($ifNull sadece null/eksik için çalışır) rollup_key ile aynı anahtara düşer
+        values = {"count": row["count"], "atv_count": row["atv_count"], "revenue": row["revenue"], "updated_at": started_at}
+        batch.append(UpdateOne(row["_id"], {"$set": values}, upsert=True))
+        if len(batch) >= batch_size:
+            await _write_buckets(db, batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        await _write_buckets(db, batch)
+        written += len(batch)
+
+    # Artık hiçbir rezervasyona karşılık gelmeyen bucket'lar
+    await db.daily_rollups.delete_many({**match, "updated_at": {"$not": {"$gte": started_at}}})
+    return written
+
+
+_backfill_done = False
+
+
+async def rollups_ready(db) -> bool:
+    """Backfill migration'ı tamamlandı mı (bir kez True olunca tekrar sorulmaz)"""
+    global _backfill_done
+    if not _backfill_done:
+        _backfill_done = bool(await db.schema_migrations.find_one(
+            {"_id": ROLLUP_BACKFILL_MIGRATION, "status": "done"}, {"_id": 1}
+        ))
+    return _backfill_done
+
+
+async def rollup_totals(
+    db,
+    company_id: str,
+    date_from: str,
+    date_to: str,
+    group_by: Iterable[str],
+    filters: Optional[Dict[str, Any]] = None,
+    exclude_cancelled: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Rollup'ları verilen boyutlara göre topla.
+
+    Dönen her satır: boyut alanları + count, atv_count, revenue.
+    """
+    match: Dict[str, Any] = {"company_id": company_id, "date": {"$gte": date_from, "$lte": date_to}}
+    if exclude_cancelled:
+        match["status"] = {"$ne": "cancelled"}
+    if filters:
+        match.update(filters)
+
+    group_fields = list(group_by)
+    if await rollups_ready(db):
+        source, pipeline = db.daily_rollups, []
+    else:
+        # Backfill bitene kadar aynı bucket'ları ham rezervasyonlardan hesapla
+        source = db.reservations
+        pipeline = build_rollup_pipeline(_rollup_match(company_id, date_from, date_to)) + [
+            {"$replaceRoot": {"newRoot": {"$mergeObjects": [
+                "$_id", {"count": "$count", "atv_count": "$atv_count", "revenue": "$revenue"}
+            ]}}},
+        ]
+    pipeline += [
+        {"$match": match},
+        {"$group": {
+            "_id": {field: f"${field}" for field in group_fields},
+            "count": {"$sum": "$count"},
+            "atv_count": {"$sum": "$atv_count"},
+            "revenue": {"$sum": "$revenue"},
+        }},
+    ]
+    rows = await source.aggregate(pipeline).to_list(length=None)
+    return [
+        {**{field: row["_id"].get(field) for field in group_fields},
+         "count": row["count"], "atv_count": row["atv_count"], "revenue": row["revenue"]}
+        for row in rows
+    ]
+
+
+def currency_totals(rows: Iterable[Dict[str, Any]]) -> Dict[str, float]:
+    """Satırlardaki geliri para birimine göre topla (para birimi boş olanlar hariç)"""
+    totals = {"EUR": 0, "USD": 0, "TRY": 0}
+    for row in rows:
+        if row.get("currency") and row.get("revenue"):
+            totals[row["currency"]] = totals.get(row["currency"], 0) + row["revenue"]
+    return totals
+
+
+async def sync_reservation_rollup(db, reservation_id: str, before: Optional[dict]) -> None:
+    """Rezervasyon yazıldıktan sonra daily_rollups'ı ve kasa pozisyonunu güncelle
+
+    Args:
+        before: Değişiklikten önceki doküman (yeni kayıtta None)
+    """
+    try:
+        after = await db.reservations.find_one({"id": reservation_id}, ROLLUP_PROJECTION)
+    except Exception as e:
+        logger.error(f"Rezervasyon okunamadı, rollup/kasa pozisyonu güncellenmedi ({reservation_id}): {e}")
+        return
+    try:
+        await apply_reservation_delta(db, before, after)
+    except Exception as e:
+        # Rollup hatası rezervasyon işlemini engellememeli; scripts/rebuild_daily_rollups.py ile düzeltilir
+        logger.error(f"Daily rollup güncellenemedi ({reservation_id}): {e}")
+    await sync_cash_position(db, "reservations", before, after)
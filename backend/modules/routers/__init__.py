@@ -0,0 +1,99 @@
+"""
+Per-domain API routers.
+
+Each module in ``ROUTER_MODULES`` defines a module-level ``router``
+(``APIRouter`` without prefix) and imports only what its endpoints need from
+``modules`` (``database``, ``auth``, ...), never from ``server``.
+``include_routers`` imports them when the app is assembled; domains listed
+in ``DISABLED_ROUTERS`` (comma separated) are neither imported nor
+registered, so a worker that only serves some domains does not load the rest.
+
+``audit_routes`` runs after every router is included and refuses to start
+the app if a method + path pair is registered twice: Starlette would
+silently serve only the first registration.
+"""
+import importlib
+import logging
+import os
+from collections import defaultdict
+from typing import Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+ROUTER_MODULES = (
+    "auth",
+    "cari_panel",
+    "currency",
+    "definitions",
+    "cari",
+    "reservations",
+    "transactions",
+    "sales",
+    "cash",
+    "vehicles",
+    "staff",
+    "reports",
+    "admin",
+    "company",
+    "public_booking",
+    "portal",
+    "ical",
+    "finance",
+    "activity_logs",
+    "exports",
+    "notifications",
+)
+
+DISABLED_ROUTERS = {
+    name.strip() for name in os.environ.get("DISABLED_ROUTERS", "").split(",") if name.strip()
+}
+
+
+def include_routers(parent, modules: Iterable[str] = ROUTER_MODULES) -> List[str]:
+    """
+    Domain router'larını ``parent``'a (APIRouter veya FastAPI) ekle.
+
+    Returns:
+        Eklenen modül isimleri
+    """
+    included = []
+    for name in modules:
+        if name in DISABLED_ROUTERS:
+            logger.info(f"Router disabled: {name}")
+            continue
+        module = importlib.import_module(f"{__name__}.{name}")
+        parent.include_router(module.router)
+        included.append(name)
+    return included
+
+
+def find_duplicate_routes(routes) -> List[Tuple[str, str, List[str]]]:
+    """
+    Aynı method + path ile birden fazla kayıtlı route'lar.
+
+    Returns:
+        (method, path, endpoint isimleri) listesi - kayıt sırasıyla
+    """
+    endpoints = defaultdict(list)
+    for route in routes:
+        methods = getattr(route, "methods", None)
+        if not methods:
+            # Mount, websocket vb.
+            continue
+        endpoint = getattr(route, "endpoint", None)
+        name = f"{endpoint.__module__}.{endpoint.__name__}" if endpoint else route.name
+        for method in methods:
+            endpoints[(method, route.path)].append(name)
+    return [
+        (method, path, names)
+        for (method, path), names in endpoints.items()
+        if len(names) > 1
+    ]
+
+
+def audit_routes(app) -> None:
+    """Route tablosunda tekrar eden method + path varsa RuntimeError"""
+    duplicates = find_duplicate_routes(app.routes)
+    if duplicates:
+        details = "; ".join(f"{method} {path}: {', '.join(names)}" for method, path, names in duplicates)
+        raise RuntimeError(f"Duplicate routes: {details}")
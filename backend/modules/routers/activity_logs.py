@@ -0,0 +1,104 @@
+"""
+Activity log listing (live collection and archive tier).
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Response
+
+from ..activity_logs import log_collection
+from ..auth import get_current_user
+from ..database import db
+from ..pagination import fetch_page, page_size, set_page_headers
+
+router = APIRouter(tags=["activity-logs"])
+
+# ==================== ACTIVITY LOGS ====================
+
+@router.get("/activity-logs")
+async def get_activity_logs(
+    response: Response,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    user_id: Optional[str] = None,
+    action: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    archive: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """Activity log kayıtlarını getir. Varsayılan olarak son 30 günü getirir.
+
+    archive=true: ACTIVITY_LOG_ARCHIVE_DAYS'ten eski, arşive taşınmış kayıtlar (varsayılan tarih penceresi yok)
+    """
+    query = {"company_id": current_user["company_id"]}
+    
+    # Eğer tarih filtresi yoksa son 30 günü getir
+    if not date_from and not date_to and not archive:
+        thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
+        query["created_at"] = {"$gte": thirty_days_ago}
+
+    # Tarih filtresi
+    if date_from or date_to:
+        date_query = {}
+        if date_from:
+            # YYYY-MM-DD formatını datetime'a çevir (başlangıç: 00:00:00)
+            try:
+                date_from_dt = datetime.strptime(date_from, "%Y-%m-%d")
+                date_from_dt = date_from_dt.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=timezone.utc)
+                # MongoDB için hem datetime hem string formatını destekle
+                date_query["$gte"] = date_from_dt
+            except Exception as e:
+                logging.error(f"Tarih parse hatası (date_from): {e}")
+        if date_to:
+            # YYYY-MM-DD formatını datetime'a çevir (bitiş: 23:59:59)
+            try:
+                date_to_dt = datetime.strptime(date_to, "%Y-%m-%d")
+                date_to_dt = date_to_dt.replace(hour=23, minute=59, second=59, microsecond=999999, tzinfo=timezone.utc)
+                date_query["$lte"] = date_to_dt
+            except Exception as e:
+                logging.error(f"Tarih parse hatası (date_to): {e}")
+        if date_query:
+            query["created_at"] = date_query
+    
+    # Kullanıcı filtresi
+    if user_id:
+        query["user_id"] = user_id
+    
+    # Action filtresi
+    if action:
+        query["action"] = action
+    
+    # Entity type filtresi
+    if entity_type:
+        query["entity_type"] = entity_type
+    
+    # Logları getir (en yeni önce)
+    logs, next_cursor, total = await fetch_page(
+        db[log_collection(archive)], query, "created_at",
+        limit=page_size(limit, 10000), cursor=cursor, include_total=include_total
+    )
+    set_page_headers(response, next_cursor, total)
+    
+    logging.info(f"Activity logs query: {query}, found {len(logs)} logs")
+    
+    # ISO format string'leri datetime'a çevir ve ISO formatına geri çevir (frontend için)
+    for log in logs:
+        if isinstance(log.get("created_at"), str):
+            try:
+                # String ise parse et
+                dt = datetime.fromisoformat(log["created_at"].replace("Z", "+00:00"))
+                log["created_at"] = dt.isoformat()
+            except Exception as e:
+                logging.error(f"Tarih parse hatası (log): {e}, created_at: {log.get('created_at')}")
+        elif isinstance(log.get("created_at"), datetime):
+            # Datetime ise ISO formatına çevir
+            log["created_at"] = log["created_at"].isoformat()
+        elif hasattr(log.get("created_at"), 'isoformat'):
+            # MongoDB datetime objesi
+            log["created_at"] = log["created_at"].isoformat()
+    
+    return logs
@@ -0,0 +1,877 @@
+"""
+Login, current user, user preferences and two-factor authentication endpoints.
+"""
+import base64
+import logging
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
+from typing import List
+
+import jwt
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel
+
+from ..audit import create_activity_log, save_login_activity
+from ..auth import (
+    ALGORITHM, create_access_token, get_client_ip, get_current_user, invalidate_user_auth_state,
+    SECRET_KEY
+)
+from ..codes import generate_company_code
+from ..database import db
+from ..models import Company, CompanyCreate, DemoRequest, User
+from ..passwords import hash_password_async, verify_password_async
+from ..reference_data import get_company_cached
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["auth"])
+
+# -------------------- AUTH ENDPOINTS --------------------
+
+class LoginRequest(BaseModel):
+    username: str  # Can be username or email
+    password: str
+
+@router.post("/auth/login")
+async def login(data: LoginRequest, request: Request):
+    # Find user by username or email (username field can contain email)
+    user = await db.users.find_one({
+        "$or": [
+            {"username": data.username},
+            {"email": data.username}
+        ]
+    })
+    
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid username or password")
+    
+    # Verify password
+    if not await verify_password_async(data.password, user.get("password_hash") or user.get("password")):
+        raise HTTPException(status_code=401, detail="Invalid username or password")
+    
+    # Get company from user's company_id
+    company = await db.companies.find_one({"id": user["company_id"]})
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    # Check if company is active
+    if not company.get("is_active", True):
+        raise HTTPException(status_code=403, detail="Company account is inactive")
+    
+    # Determine user role
+    # Priority: role field > is_admin field (for backward compatibility)
+    user_role = user.get("role", "user")
+    if user_role == "user" and user.get("is_admin", False):
+        # Migrate is_admin to role if role is not set
+        user_role = "admin"
+    
+    # Get IP address and user agent for login activity tracking
+    ip_address = get_client_ip(request)
+    user_agent = request.headers.get("user-agent", "")
+    
+    # Check if 2FA is enabled
+    if user.get("is_two_factor_enabled", False):
+        # Create temporary token for 2FA validation (5 minutes expiry)
+        temp_token = create_access_token({
+            "sub": user["id"],
+            "company_id": user["company_id"],
+            "role": user_role,
+            "is_admin": user.get("is_admin", False),
+            "temp_2fa": True  # Mark as temporary token
+        }, expires_delta=timedelta(minutes=5))
+        
+        # Note: Login activity will be saved after successful 2FA validation in validate_2fa_login
+        
+        return {
+            "require2FA": True,
+            "tempToken": temp_token,
+            "message": "Two-factor authentication required"
+        }
+    
+    # Create token with role
+    token = create_access_token({
+        "sub": user["id"],
+        "company_id": user["company_id"],
+        "role": user_role,
+        "is_admin": user.get("is_admin", False),  # Keep for backward compatibility
+        "tv": user.get("token_version", 0)
+    })
+    
+    # Save login activity asynchronously (non-blocking)
+    await save_login_activity(
+        user_id=user["id"],
+        company_id=user.get("company_id"),
+        ip_address=ip_address,
+        user_agent_string=user_agent,
+        request=request
+    )
+    
+    return {
+        "access_token": token,
+        "token_type": "bearer",
+        "user": {
+            "id": user["id"],
+            "username": user.get("username"),
+            "full_name": user.get("full_name"),
+            "role": user_role,
+            "is_admin": user.get("is_admin", False),  # Keep for backward compatibility
+            "permissions": user.get("permissions", {})
+        },
+        "company": {
+            "id": company["id"],
+            "name": company.get("company_name"),
+            "code": company.get("company_code")
+        }
+    }
+
+@router.get("/auth/me")
+async def get_me(current_user: dict = Depends(get_current_user)):
+    user = await db.users.find_one({"id": current_user["user_id"]}, {"_id": 0, "password": 0, "password_hash": 0})
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Role'ü token'dan veya user document'inden al
+    user_role = current_user.get("role") or user.get("role", "user")
+    # Eğer role yoksa ve is_admin varsa, admin yap
+    if user_role == "user" and user.get("is_admin", False):
+        user_role = "admin"
+    
+    # Role'ü user objesine ekle
+    user["role"] = user_role
+    
+    company = await db.companies.find_one({"id": current_user["company_id"]}, {"_id": 0})
+    return {"user": user, "company": company}
+
+@router.get("/companies/me")
+async def get_my_company(current_user: dict = Depends(get_current_user)):
+    company = await get_company_cached(current_user["company_id"])
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    return {"company": company}
+
+@router.put("/users/me/preferences")
+async def update_user_preferences(
+    preferences: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Update user preferences (dateFormat, theme, tableDensity, startPage, etc.)"""
+    # Validate dateFormat if provided
+    if "dateFormat" in preferences:
+        valid_formats = ["DD/MM/YYYY", "DD.MM.YYYY", "MM/DD/YYYY", "YYYY-MM-DD"]
+        if preferences["dateFormat"] not in valid_formats:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid dateFormat. Must be one of: {', '.join(valid_formats)}"
+            )
+    
+    # Validate theme if provided
+    if "theme" in preferences:
+        valid_themes = ["light", "dark", "system"]
+        if preferences["theme"] not in valid_themes:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid theme. Must be one of: {', '.join(valid_themes)}"
+            )
+    
+    # Validate tableDensity if provided
+    if "tableDensity" in preferences:
+        valid_densities = ["comfortable", "compact"]
+        if preferences["tableDensity"] not in valid_densities:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid tableDensity. Must be one of: {', '.join(valid_densities)}"
+            )
+    
+    # Validate startPage if provided (should be a valid route)
+    if "startPage" in preferences:
+        valid_start_pages = ["/dashboard", "/calendar", "/customers", "/reservations/new", "/reservations"]
+        if preferences["startPage"] not in valid_start_pages:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid startPage. Must be one of: {', '.join(valid_start_pages)}"
+            )
+    
+    # Validate currencyDisplay if provided
+    if "currencyDisplay" in preferences:
+        valid_currencies = ["TRY", "USD", "EUR", "GBP"]
+        if preferences["currencyDisplay"] not in valid_currencies:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid currencyDisplay. Must be one of: {', '.join(valid_currencies)}"
+            )
+    
+    # Validate boolean fields
+    if "soundEffects" in preferences:
+        if not isinstance(preferences["soundEffects"], bool):
+            raise HTTPException(
+                status_code=400,
+                detail="soundEffects must be a boolean"
+            )
+    
+    if "sidebarCollapsed" in preferences:
+        if not isinstance(preferences["sidebarCollapsed"], bool):
+            raise HTTPException(
+                status_code=400,
+                detail="sidebarCollapsed must be a boolean"
+            )
+    
+    # Get current user document
+    user = await db.users.find_one({"id": current_user["user_id"]})
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Merge with existing preferences
+    current_preferences = user.get("preferences", {})
+    updated_preferences = {**current_preferences, **preferences}
+    
+    # Update user preferences
+    await db.users.update_one(
+        {"id": current_user["user_id"]},
+        {
+            "$set": {
+                "preferences": updated_preferences,
+                "updated_at": datetime.now(timezone.utc)
+            }
+        }
+    )
+    
+    # Return updated user
+    updated_user = await db.users.find_one(
+        {"id": current_user["user_id"]},
+        {"_id": 0, "password": 0, "password_hash": 0}
+    )
+    
+    return {"message": "Preferences updated successfully", "user": updated_user}
+
+@router.put("/users/me/notifications")
+async def update_notification_preferences(
+    notificationPreferences: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Update user notification preferences (Matrix Style)"""
+    # Get current user document
+    user = await db.users.find_one({"id": current_user["user_id"]})
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Validate notification preference structure
+    valid_keys = ["newBooking", "bookingCancellation", "paymentReceived", "dailyFinanceReport", "loginAlert", "marketingEmails"]
+    
+    for key, value in notificationPreferences.items():
+        if key not in valid_keys:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid notification preference key: {key}. Must be one of: {', '.join(valid_keys)}"
+            )
+        
+        # Validate structure based on notification type
+        if key == "dailyFinanceReport":
+            # Email only
+            if not isinstance(value, dict) or "email" not in value:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"dailyFinanceReport must have 'email' field"
+                )
+            if not isinstance(value["email"], bool):
+                raise HTTPException(
+                    status_code=400,
+                    detail="dailyFinanceReport.email must be a boolean"
+                )
+        elif key == "marketingEmails":
+            # Email only
+            if not isinstance(value, dict) or "email" not in value:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"marketingEmails must have 'email' field"
+                )
+            if not isinstance(value["email"], bool):
+                raise HTTPException(
+                    status_code=400,
+                    detail="marketingEmails.email must be a boolean"
+                )
+        else:
+            # Email and In-App
+            if not isinstance(value, dict) or "email" not in value or "inApp" not in value:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"{key} must have both 'email' and 'inApp' fields"
+                )
+            if not isinstance(value["email"], bool) or not isinstance(value["inApp"], bool):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"{key}.email and {key}.inApp must be booleans"
+                )
+    
+    # Merge with existing notification preferences
+    current_notification_preferences = user.get("notificationPreferences", {})
+    updated_notification_preferences = {**current_notification_preferences, **notificationPreferences}
+    
+    # Update user notification preferences
+    await db.users.update_one(
+        {"id": current_user["user_id"]},
+        {
+            "$set": {
+                "notificationPreferences": updated_notification_preferences,
+                "updated_at": datetime.now(timezone.utc)
+            }
+        }
+    )
+    
+    # Return updated user
+    updated_user = await db.users.find_one(
+        {"id": current_user["user_id"]},
+        {"_id": 0, "password": 0, "password_hash": 0}
+    )
+    
+    return {"message": "Notification preferences updated successfully", "user": updated_user}
+
+# ==================== TWO-FACTOR AUTHENTICATION (2FA) ====================
+
+def generate_recovery_codes(count: int = 10) -> List[str]:
+    """Generate recovery codes for 2FA backup"""
+    return [secrets.token_urlsafe(16) for _ in range(count)]
+
+# pyotp / qrcode sadece 2FA akışında gerekir; import'ları ilk kullanıma bırakılır (startup süresi)
+def new_totp_secret() -> str:
+    import pyotp
+    return pyotp.random_base32()
+
+def get_totp(secret: str):
+    import pyotp
+    return pyotp.TOTP(secret)
+
+@router.post("/auth/2fa/generate")
+async def generate_2fa_secret(current_user: dict = Depends(get_current_user)):
+    """Generate a temporary 2FA secret and QR code for setup"""
+    try:
+        user = await db.users.find_one({"id": current_user["user_id"]})
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        # Generate secret
+        secret = new_totp_secret()
+        
+        # Get company name for QR code label
+        # Super admin için company_id olmayabilir, bu durumu handle et
+        company_name = "TourCast"
+        if current_user.get("company_id"):
+            company = await db.companies.find_one({"id": current_user["company_id"]})
+            if company:
+                company_name = company.get("company_name", "TourCast")
+        
+        # Create TOTP object
+        totp = get_totp(secret)
+        
+        # Generate otpauth URL
+        user_email = user.get("email") or user.get("username", "user")
+        otpauth_url = totp.provisioning_uri(
+            name=user_email,
+            issuer_name=company_name
+        )
+        
+        # Generate QR code
+        try:
+            import qrcode
+            qr = qrcode.QRCode(version=1, box_size=10, border=5)
+            qr.add_data(otpauth_url)
+            qr.make(fit=True)
+            
+            img = qr.make_image(fill_color="black", back_color="white")
+            buffer = BytesIO()
+            img.save(buffer, format="PNG")
+            buffer.seek(0)
+            
+            # Convert to base64 for frontend
+            qr_code_base64 = base64.b64encode(buffer.getvalue()).decode()
+            qr_code_url = f"data:image/png;base64,{qr_code_base64}"
+        except Exception as qr_error:
+            logger.error(f"QR code generation error: {str(qr_error)}")
+            raise HTTPException(
+                status_code=500, 
+                detail=f"QR code oluşturulamadı: {str(qr_error)}"
+            )
+        
+        # Store temporary secret in user document (not enabled yet)
+        await db.users.update_one(
+            {"id": current_user["user_id"]},
+            {"$set": {"two_factor_secret": {"base32": secret, "otpauth_url": otpauth_url}}}
+        )
+        
+        return {
+            "secret": secret,
+            "qr_code": qr_code_url,
+            "otpauth_url": otpauth_url
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"2FA secret generation error: {str(e)}")
+        logger.error(f"Error type: {type(e).__name__}")
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=500,
+            detail="2FA secret oluşturulamadı"
+        )
+
+@router.post("/auth/2fa/verify")
+async def verify_2fa_setup(data: dict, current_user: dict = Depends(get_current_user)):
+    """Verify 2FA code and enable 2FA for user"""
+    code = data.get("code")
+    if not code:
+        raise HTTPException(status_code=400, detail="Code is required")
+    
+    user = await db.users.find_one({"id": current_user["user_id"]})
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Get temporary secret
+    two_factor_secret = user.get("two_factor_secret")
+    if not two_factor_secret or "base32" not in two_factor_secret:
+        raise HTTPException(status_code=400, detail="No 2FA secret found. Please generate one first.")
+    
+    secret = two_factor_secret["base32"]
+    
+    # Verify code
+    totp = get_totp(secret)
+    if not totp.verify(code, valid_window=1):  # Allow 1 time step tolerance
+        raise HTTPException(status_code=400, detail="Invalid verification code")
+    
+    # Generate recovery codes
+    recovery_codes = generate_recovery_codes(10)
+    
+    # Enable 2FA and store secret permanently
+    await db.users.update_one(
+        {"id": current_user["user_id"]},
+        {
+            "$set": {
+                "is_two_factor_enabled": True,
+                "two_factor_recovery_codes": recovery_codes
+            }
+        }
+    )
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=user.get("username", ""),
+        full_name=user.get("full_name", ""),
+        action="enable",
+        entity_type="2fa",
+        entity_id=current_user["user_id"],
+        description="Two-factor authentication enabled"
+    )
+    
+    return {
+        "message": "2FA enabled successfully",
+        "recovery_codes": recovery_codes  # Show only once!
+    }
+
+@router.post("/auth/2fa/disable")
+async def disable_2fa(data: dict, current_user: dict = Depends(get_current_user)):
+    """Disable 2FA (requires password confirmation)"""
+    password = data.get("password")
+    if not password:
+        raise HTTPException(status_code=400, detail="Password is required")
+    
+    user = await db.users.find_one({"id": current_user["user_id"]})
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Verify password
+    if not await verify_password_async(password, user.get("password_hash") or user.get("password")):
+        raise HTTPException(status_code=401, detail="Invalid password")
+    
+    # Disable 2FA
+    result = await db.users.update_one(
+        {"id": current_user["user_id"]},
+        {
+            "$set": {
+                "is_two_factor_enabled": False,
+                "two_factor_recovery_codes": []
+            },
+            "$unset": {
+                "two_factor_secret": ""
+            }
+        }
+    )
+    
+    # Verify update was successful
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=user.get("username", ""),
+        full_name=user.get("full_name", ""),
+        action="disable",
+        entity_type="2fa",
+        entity_id=current_user["user_id"],
+        description="Two-factor authentication disabled"
+    )
+    
+    return {"message": "2FA disabled successfully"}
+
+@router.post("/auth/2fa/verify-code")
+async def verify_2fa_code(data: dict, current_user: dict = Depends(get_current_user)):
+    """Verify 2FA code for operations like password change"""
+    code = data.get("code")
+    if not code:
+        raise HTTPException(status_code=400, detail="Code is required")
+    
+    user = await db.users.find_one({"id": current_user["user_id"]})
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    if not user.get("is_two_factor_enabled", False):
+        raise HTTPException(status_code=400, detail="2FA is not enabled for this user")
+    
+    # Get 2FA secret
+    two_factor_secret = user.get("two_factor_secret")
+    if not two_factor_secret or "base32" not in two_factor_secret:
+        raise HTTPException(status_code=400, detail="2FA secret not found")
+    
+    secret = two_factor_secret["base32"]
+    totp = get_totp(secret)
+    
+    # Verify code or check recovery codes
+    is_valid = False
+    used_recovery_code = None
+    
+    # First try TOTP code
+    if totp.verify(code, valid_window=1):
+        is_valid = True
+    else:
+        # Check recovery codes
+        recovery_codes = user.get("two_factor_recovery_codes", [])
+        if code in recovery_codes:
+            is_valid = True
+            used_recovery_code = code
+            # Remove used recovery code
+            recovery_codes.remove(code)
+            await db.users.update_one(
+                {"id": current_user["user_id"]},
+                {"$set": {"two_factor_recovery_codes": recovery_codes}}
+            )
+    
+    if not is_valid:
+        raise HTTPException(status_code=401, detail="Invalid 2FA code")
+    
+    return {"message": "2FA code verified successfully"}
+
+@router.put("/auth/change-password")
+async def change_password(data: dict, current_user: dict = Depends(get_current_user)):
+    """Change user password (requires 2FA if enabled)"""
+    old_password = data.get("old_password")
+    new_password = data.get("new_password")
+    two_factor_code = data.get("two_factor_code")  # Optional, required if 2FA is enabled
+    
+    if not old_password or not new_password:
+        raise HTTPException(status_code=400, detail="Old password and new password are required")
+    
+    if len(new_password) < 6:
+        raise HTTPException(status_code=400, detail="New password must be at least 6 characters")
+    
+    user = await db.users.find_one({"id": current_user["user_id"]})
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Verify old password
+    if not await verify_password_async(old_password, user.get("password_hash") or user.get("password")):
+        raise HTTPException(status_code=401, detail="Invalid old password")
+    
+    # If 2FA is enabled, verify 2FA code
+    if user.get("is_two_factor_enabled", False):
+        if not two_factor_code:
+            raise HTTPException(status_code=400, detail="2FA code is required")
+        
+        # Get 2FA secret
+        two_factor_secret = user.get("two_factor_secret")
+        if not two_factor_secret or "base32" not in two_factor_secret:
+            raise HTTPException(status_code=400, detail="2FA secret not found")
+        
+        secret = two_factor_secret["base32"]
+        totp = get_totp(secret)
+        
+        # Verify code or check recovery codes
+        is_valid = False
+        used_recovery_code = None
+        
+        # First try TOTP code
+        if totp.verify(two_factor_code, valid_window=1):
+            is_valid = True
+        else:
+            # Check recovery codes
+            recovery_codes = user.get("two_factor_recovery_codes", [])
+            if two_factor_code in recovery_codes:
+                is_valid = True
+                used_recovery_code = two_factor_code
+                # Remove used recovery code
+                recovery_codes.remove(two_factor_code)
+                await db.users.update_one(
+                    {"id": current_user["user_id"]},
+                    {"$set": {"two_factor_recovery_codes": recovery_codes}}
+                )
+        
+        if not is_valid:
+            raise HTTPException(status_code=401, detail="Invalid 2FA code")
+    
+    # Hash new password
+    new_password_hash = await hash_password_async(new_password)
+    
+    # Update password - token versiyonunu artırarak önceki oturumları geçersiz kıl
+    await db.users.update_one(
+        {"id": current_user["user_id"]},
+        {"$set": {"password_hash": new_password_hash}, "$inc": {"token_version": 1}}
+    )
+    invalidate_user_auth_state(current_user["user_id"])
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=user.get("username", ""),
+        full_name=user.get("full_name", ""),
+        action="change_password",
+        entity_type="user",
+        entity_id=current_user["user_id"],
+        description="Password changed"
+    )
+    
+    # Mevcut oturum da geçersiz oldu - yeni versiyonla token ver
+    token = create_access_token({
+        "sub": current_user["user_id"],
+        "company_id": current_user["company_id"],
+        "role": current_user.get("role"),
+        "is_admin": current_user.get("is_admin", False),
+        "tv": user.get("token_version", 0) + 1
+    })
+    
+    return {"message": "Password changed successfully", "access_token": token, "token_type": "bearer"}
+
+@router.post("/auth/2fa/validate-login")
+async def validate_2fa_login(data: dict, request: Request):
+    """Validate 2FA code during login and return final JWT token"""
+    temp_token = data.get("tempToken")
+    code = data.get("code")
+    
+    if not temp_token or not code:
+        raise HTTPException(status_code=400, detail="tempToken and code are required")
+    
+    try:
+        # Decode temporary token
+        payload = jwt.decode(temp_token, SECRET_KEY, algorithms=[ALGORITHM])
+        
+        # Verify it's a temporary 2FA token
+        if not payload.get("temp_2fa"):
+            raise HTTPException(status_code=400, detail="Invalid token type")
+        
+        user_id = payload.get("sub")
+        company_id = payload.get("company_id")
+        
+        if not user_id or not company_id:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        
+        # Get user
+        user = await db.users.find_one({"id": user_id})
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        if not user.get("is_two_factor_enabled", False):
+            raise HTTPException(status_code=400, detail="2FA is not enabled for this user")
+        
+        # Get 2FA secret
+        two_factor_secret = user.get("two_factor_secret")
+        if not two_factor_secret or "base32" not in two_factor_secret:
+            raise HTTPException(status_code=400, detail="2FA secret not found")
+        
+        secret = two_factor_secret["base32"]
+        totp = get_totp(secret)
+        
+        # Verify code or check recovery codes
+        is_valid = False
+        used_recovery_code = None
+        
+        # First try TOTP code
+        if totp.verify(code, valid_window=1):
+            is_valid = True
+        else:
+            # Check recovery codes
+            recovery_codes = user.get("two_factor_recovery_codes", [])
+            if code in recovery_codes:
+                is_valid = True
+                used_recovery_code = code
+                # Remove used recovery code
+                recovery_codes.remove(code)
+                await db.users.update_one(
+                    {"id": user_id},
+                    {"$set": {"two_factor_recovery_codes": recovery_codes}}
+                )
+        
+        if not is_valid:
+            raise HTTPException(status_code=401, detail="Invalid 2FA code")
+        
+        # Get company
+        company = await db.companies.find_one({"id": company_id})
+        if not company:
+            raise HTTPException(status_code=404, detail="Company not found")
+        
+        # Determine user role
+        user_role = user.get("role", "user")
+        if user_role == "user" and user.get("is_admin", False):
+            user_role = "admin"
+        
+        # Get IP address and user agent for login activity tracking
+        ip_address = get_client_ip(request)
+        user_agent = request.headers.get("user-agent", "")
+        
+        # Create final JWT token
+        token = create_access_token({
+            "sub": user_id,
+            "company_id": company_id,
+            "role": user_role,
+            "is_admin": user.get("is_admin", False),
+            "tv": user.get("token_version", 0)
+        })
+        
+        # Save login activity asynchronously (non-blocking) after successful 2FA validation
+        await save_login_activity(
+            user_id=user_id,
+            company_id=company_id,
+            ip_address=ip_address,
+            user_agent_string=user_agent,
+            request=request
+        )
+        
+        return {
+            "access_token": token,
+            "token_type": "bearer",
+            "user": {
+                "id": user["id"],
+                "username": user.get("username"),
+                "full_name": user.get("full_name"),
+                "role": user_role,
+                "is_admin": user.get("is_admin", False),
+                "permissions": user.get("permissions", {})
+            },
+            "company": {
+                "id": company["id"],
+                "name": company.get("company_name"),
+                "code": company.get("company_code")
+            },
+            "recovery_code_used": used_recovery_code is not None
+        }
+        
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Temporary token expired. Please login again.")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+
+# ==================== AUTH ENDPOINTS ====================
+
+@router.post("/auth/register")
+async def register_company(data: CompanyCreate):
+    # Check if username already exists
+    existing_user = await db.users.find_one({"username": data.admin_username})
+    if existing_user:
+        raise HTTPException(status_code=400, detail="Username already exists")
+    
+    # Generate unique company code
+    company_code = await generate_company_code(db)
+
+    # Double check existence (race condition check)
+    while await db.companies.find_one({"company_code": company_code}):
+        # If exists (highly unlikely with sequential unless race condition), increment
+        if company_code.isdigit():
+            company_code = str(int(company_code) + 1)
+        else:
+            # Should not happen if generate_company_code works, but fallback
+            company_code = secrets.token_hex(4).upper()
+    
+    # Create company
+    company = Company(
+        company_code=company_code,
+        company_name=data.company_name,
+        contact_phone=data.contact_phone,
+        address=data.address,
+        tax_office=data.tax_office,
+        tax_number=data.tax_number,
+        package_start_date=data.package_start_date,
+        package_end_date=data.package_end_date,
+    )
+    company_doc = company.model_dump()
+    company_doc['created_at'] = company_doc['created_at'].isoformat()
+    await db.companies.insert_one(company_doc)
+    
+    # Create admin user
+    hashed_password = await hash_password_async(data.admin_password)
+    user = User(
+        company_id=company.id,
+        username=data.admin_username,
+        email=data.admin_email,
+        full_name=data.admin_full_name,
+        role="admin",  # Set role to admin
+        is_admin=True,  # Keep for backward compatibility
+        permissions={}
+    )
+    user_doc = user.model_dump()
+    user_doc['created_at'] = user_doc['created_at'].isoformat()
+    user_doc['password'] = hashed_password
+    await db.users.insert_one(user_doc)
+    
+    return {
+        "message": "Company registered successfully",
+        "company_code": company_code,
+        "company_name": company.company_name
+    }
+
+@router.post("/auth/demo-request")
+async def create_demo_request(data: DemoRequest):
+    """Create a demo request - saves to MongoDB, does NOT create a user"""
+    try:
+        logger.info(f"Demo request received: {data.company_name} - {data.email}")
+        
+        # Create demo request document
+        demo_request = {
+            "id": str(uuid.uuid4()),
+            "company_name": data.company_name.strip() if data.company_name else "",
+            "contact_name": data.contact_name.strip() if data.contact_name else "",
+            "phone": data.phone.strip() if data.phone else "",
+            "email": data.email.strip().lower() if data.email else "",
+            "status": "pending",  # pending, contacted, converted, rejected
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }
+        
+        # Validate required fields
+        if not demo_request["company_name"] or not demo_request["email"]:
+            raise HTTPException(status_code=400, detail="Firma adı ve e-posta zorunludur")
+        
+        # Save to demo_requests collection
+        logger.info(f"Attempting to save demo request to collection: demo_requests")
+        result = await db.demo_requests.insert_one(demo_request)
+        logger.info(f"Demo request saved successfully. Inserted ID: {result.inserted_id}, Request ID: {demo_request['id']}")
+        
+        # Verify the save by querying
+        verify_request = await db.demo_requests.find_one({"id": demo_request["id"]})
+        if verify_request:
+            logger.info(f"Demo request verified in database: {demo_request['id']}")
+        else:
+            logger.error(f"Demo request NOT found after save: {demo_request['id']}")
+        
+        return {
+            "message": "Demo talebiniz başarıyla alındı. En kısa sürede size dönüş yapacağız.",
+            "request_id": demo_request["id"],
+            "success": True
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating demo request: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Demo talebi oluşturulurken bir hata oluştu")
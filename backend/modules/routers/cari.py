@@ -0,0 +1,459 @@
+"""
+Cari account endpoints.
+"""
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+
+from ..audit import create_activity_log
+from ..auth import get_current_user
+from ..codes import generate_cari_code
+from ..database import db
+from ..ledger import detect_drift, recompute_balances
+from ..lookups import collect_ids, prefetch_by_ids
+from ..models import Cari, CariAccount
+from ..pagination import fetch_page, page_size, set_page_headers
+from ..passwords import hash_password_async
+from ..reports import build_customer_payment_pipeline, shape_customer_payment_status
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["cari"])
+
+# ==================== CARI ACCOUNTS ====================
+
+@router.get("/cari-accounts", response_model=List[CariAccount])
+async def get_cari_accounts(search: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    query = {"company_id": current_user["company_id"]}
+    if search:
+        query["name"] = {"$regex": search, "$options": "i"}
+    
+    # Münferit cari hesabını kontrol et ve yoksa oluştur
+    munferit_cari = await db.cari_accounts.find_one({
+        "company_id": current_user["company_id"],
+        "name": "Münferit",
+        "is_munferit": True
+    }, {"_id": 0})
+    
+    if not munferit_cari:
+        # Münferit cari hesabını oluştur
+        munferit_cari_doc = {
+            "id": str(uuid.uuid4()),
+            "company_id": current_user["company_id"],
+            "name": "Münferit",
+            "is_munferit": True,  # Özel flag
+            "balance_eur": 0.0,
+            "balance_usd": 0.0,
+            "balance_try": 0.0,
+            "created_at": datetime.now(timezone.utc).isoformat()
+        }
+        await db.cari_accounts.insert_one(munferit_cari_doc)
+        logger.info(f"Münferit cari hesabı oluşturuldu: {munferit_cari_doc['id']}")
+    
+    cari_accounts = await db.cari_accounts.find(query, {"_id": 0}).to_list(1000)
+    logger.info(f"Found {len(cari_accounts)} cari accounts for company_id: {current_user['company_id']}")
+    return cari_accounts
+
+@router.post("/cari-accounts", response_model=CariAccount)
+async def create_cari_account(data: dict, current_user: dict = Depends(get_current_user)):
+    # Company kısa kodunu al
+    company = await db.companies.find_one({"id": current_user["company_id"]}, {"_id": 0})
+    company_short = company.get("company_code", "CR")[:2].upper() if company else "CR"
+    
+    # Benzersiz cari_code oluştur
+    cari_code = generate_cari_code(company_short)
+    while await db.cari_accounts.find_one({"cari_code": cari_code, "company_id": current_user["company_id"]}):
+        cari_code = generate_cari_code(company_short)
+    
+    # CariAccount oluştur
+    cari = CariAccount(company_id=current_user["company_id"], cari_code=cari_code, **data)
+    cari_doc = cari.model_dump()
+    cari_doc['created_at'] = cari_doc['created_at'].isoformat()
+    await db.cari_accounts.insert_one(cari_doc)
+    
+    # Otomatik olarak Cari (rezervasyon paneli) hesabı oluştur
+    password_hash = await hash_password_async(cari_code)  # İlk şifre = cari_code
+    
+    cari_panel = Cari(
+        company_id=current_user["company_id"],
+        cari_code=cari_code,
+        password_hash=password_hash,
+        require_password_change=True,
+        display_name=cari.name,
+        is_active=True
+    )
+    cari_panel_doc = cari_panel.model_dump()
+    cari_panel_doc['created_at'] = cari_panel_doc['created_at'].isoformat()
+    cari_panel_doc['updated_at'] = cari_panel_doc['updated_at'].isoformat()
+    await db.caris.insert_one(cari_panel_doc)
+    
+    # Activity log
+    user = await db.users.find_one({"id": current_user["user_id"]})
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=user.get("username", "") if user else "",
+        full_name=user.get("full_name", "") if user else "",
+        action="create",
+        entity_type="cari_account",
+        entity_id=cari.id,
+        entity_name=cari.name,
+        description=f"Cari hesap oluşturuldu: {cari.name} (Cari Kodu: {cari_code})",
+        changes={"cari_code": cari_code},
+        ip_address=current_user.get("ip_address")
+    )
+    
+    return cari
+
+@router.get("/cari-accounts/balance-drift")
+async def get_cari_balance_drift(
+    tolerance: float = 0.01,
+    current_user: dict = Depends(get_current_user)
+):
+    """Kayıtlı cari bakiyelerini ledger (transaction toplamı) ile karşılaştır - düzeltme yapmaz"""
+    drifted = await detect_drift(db, current_user["company_id"], tolerance=tolerance)
+    return {
+        "drifted_count": len(drifted),
+        "drifted": drifted
+    }
+
+@router.get("/cari-accounts/{cari_id}")
+async def get_cari_account(cari_id: str, current_user: dict = Depends(get_current_user)):
+    cari = await db.cari_accounts.find_one({"id": cari_id, "company_id": current_user["company_id"]}, {"_id": 0})
+    if not cari:
+        raise HTTPException(status_code=404, detail="Cari account not found")
+    
+    is_munferit = cari.get("is_munferit", False)
+    
+    # Get transactions
+    transactions = await db.transactions.find({"cari_id": cari_id}, {"_id": 0}).sort("created_at", -1).to_list(1000)
+    
+    # Get reservations (Münferit için yok)
+    reservations = []
+    if not is_munferit:
+        reservations = await db.reservations.find({"cari_id": cari_id}, {"_id": 0}).sort("date", -1).to_list(1000)
+    
+    # Get extra sales (Münferit için müşteriler olarak kullanılacak)
+    extra_sales = await db.extra_sales.find({"cari_id": cari_id}, {"_id": 0}).sort("date", -1).to_list(1000)
+    
+    # Get service purchases (as supplier) - Münferit için yok
+    service_purchases = []
+    if not is_munferit:
+        service_purchases = await db.service_purchases.find({"supplier_id": cari_id}, {"_id": 0}).sort("date", -1).to_list(1000)
+    
+    # Münferit için müşteriler listesi (extra_sales'ten)
+    customers = []
+    if is_munferit:
+        # Extra sales'lerden müşteri bilgilerini çıkar
+        customer_map = {}
+        for sale in extra_sales:
+            customer_name = sale.get("customer_name", "")
+            if customer_name:
+                if customer_name not in customer_map:
+                    customer_map[customer_name] = {
+                        "customer_name": customer_name,
+                        "customer_contact": sale.get("customer_contact", ""),
+                        "first_sale_date": sale.get("date", ""),
+                        "last_sale_date": sale.get("date", ""),
+                        "total_sales": 1,
+                        "total_amount": sale.get("sale_price", 0),
+                        "currency": sale.get("currency", "EUR")
+                    }
+                else:
+                    customer_map[customer_name]["total_sales"] += 1
+                    customer_map[customer_name]["total_amount"] += sale.get("sale_price", 0)
+                    # Son satış tarihini güncelle
+                    if sale.get("date", "") > customer_map[customer_name]["last_sale_date"]:
+                        customer_map[customer_name]["last_sale_date"] = sale.get("date", "")
+                    # İlk satış tarihini güncelle
+                    if sale.get("date", "") < customer_map[customer_name]["first_sale_date"]:
+                        customer_map[customer_name]["first_sale_date"] = sale.get("date", "")
+        
+        customers = list(customer_map.values())
+        # Son satış tarihine göre sırala
+        customers.sort(key=lambda x: x["last_sale_date"], reverse=True)
+    
+    return {
+        "cari": cari,
+        "transactions": transactions,
+        "reservations": reservations,
+        "extra_sales": extra_sales,
+        "service_purchases": service_purchases,
+        "customers": customers if is_munferit else []
+    }
+
+@router.put("/cari-accounts/{cari_id}")
+async def update_cari_account(cari_id: str, data: dict, current_user: dict = Depends(get_current_user)):
+    # Münferit cari hesabını kontrol et
+    cari = await db.cari_accounts.find_one({"id": cari_id, "company_id": current_user["company_id"]})
+    if not cari:
+        raise HTTPException(status_code=404, detail="Cari account not found")
+    
+    # Münferit cari hesabı düzenlenemez
+    if cari.get("is_munferit"):
+        raise HTTPException(status_code=400, detail="Münferit cari hesabı düzenlenemez")
+    
+    data["company_id"] = current_user["company_id"]
+    result = await db.cari_accounts.update_one({"id": cari_id, "company_id": current_user["company_id"]}, {"$set": data})
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Cari account not found")
+    return {"message": "Cari account updated"}
+
+@router.delete("/cari-accounts/{cari_id}")
+async def delete_cari_account(cari_id: str, current_user: dict = Depends(get_current_user)):
+    # Münferit cari hesabını kontrol et
+    cari = await db.cari_accounts.find_one({"id": cari_id, "company_id": current_user["company_id"]})
+    if not cari:
+        raise HTTPException(status_code=404, detail="Cari account not found")
+    
+    # Münferit cari hesabı silinemez
+    if cari.get("is_munferit"):
+        raise HTTPException(status_code=400, detail="Münferit cari hesabı silinemez")
+    
+    result = await db.cari_accounts.delete_one({"id": cari_id, "company_id": current_user["company_id"]})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Cari account not found")
+    return {"message": "Cari account deleted"}
+
+# ==================== CARI CUSTOMERS ====================
+
+@router.get("/cari-customers")
+async def get_cari_customers(
+    response: Response,
+    cari_id: Optional[str] = None,
+    search: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """Cari firma müşterilerini listele - Current balance ile"""
+    query = {"company_id": current_user["company_id"]}
+    
+    if cari_id:
+        query["cari_id"] = cari_id
+    
+    if search:
+        query["customer_name"] = {"$regex": search, "$options": "i"}
+    
+    customers, next_cursor, total = await fetch_page(
+        db.cari_customers, query, "last_reservation_date",
+        limit=page_size(limit, 1000), cursor=cursor, include_total=include_total
+    )
+    set_page_headers(response, next_cursor, total)
+    
+    # Müşterilerin cari hesap balance'larını tek sorguda getir
+    cari_accounts = await prefetch_by_ids(
+        db.cari_accounts,
+        collect_ids(customers, "cari_id"),
+        projection={"name": 1, "balance_eur": 1, "balance_usd": 1, "balance_try": 1},
+        extra_filter={"company_id": current_user["company_id"]}
+    )
+    for customer in customers:
+        cari_id_for_customer = customer.get("cari_id")
+        if cari_id_for_customer:
+            cari_account = cari_accounts.get(cari_id_for_customer)
+            
+            if cari_account:
+                customer["current_balance"] = {
+                    "EUR": cari_account.get("balance_eur", 0) or 0,
+                    "USD": cari_account.get("balance_usd", 0) or 0,
+                    "TRY": cari_account.get("balance_try", 0) or 0
+                }
+                customer["cari_name"] = cari_account.get("name", "")
+            else:
+                customer["current_balance"] = {"EUR": 0, "USD": 0, "TRY": 0}
+                customer["cari_name"] = ""
+        else:
+            customer["current_balance"] = {"EUR": 0, "USD": 0, "TRY": 0}
+            customer["cari_name"] = ""
+    
+    return customers
+
+@router.get("/cari-customers/{customer_id}")
+async def get_cari_customer(customer_id: str, current_user: dict = Depends(get_current_user)):
+    """Cari müşteri detayını getir"""
+    customer = await db.cari_customers.find_one({
+        "id": customer_id,
+        "company_id": current_user["company_id"]
+    }, {"_id": 0})
+    
+    if not customer:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    
+    return customer
+
+@router.put("/cari-customers/{customer_id}")
+async def update_cari_customer(customer_id: str, data: dict, current_user: dict = Depends(get_current_user)):
+    """Cari müşteriyi güncelle"""
+    customer = await db.cari_customers.find_one({
+        "id": customer_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if not customer:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    
+    # Sadece izin verilen alanları güncelle
+    update_data = {
+        "phone": data.get("phone"),
+        "email": data.get("email"),
+        "nationality": data.get("nationality"),
+        "id_number": data.get("id_number"),
+        "birth_date": data.get("birth_date"),
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    }
+    
+    # None değerleri temizle
+    update_data = {k: v for k, v in update_data.items() if v is not None}
+    
+    await db.cari_customers.update_one(
+        {"id": customer_id},
+        {"$set": update_data}
+    )
+    
+    return {"message": "Customer updated"}
+
+# ==================== MUNFERIT CUSTOMERS ====================
+
+@router.get("/munferit-customers")
+async def get_munferit_customers(
+    response: Response,
+    search: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """Münferit müşterileri listele - Payment status ile"""
+    query = {"company_id": current_user["company_id"]}
+    
+    if search:
+        query["customer_name"] = {"$regex": search, "$options": "i"}
+    
+    customers, next_cursor, total = await fetch_page(
+        db.munferit_customers, query, "last_sale_date",
+        limit=page_size(limit, 1000), cursor=cursor, include_total=include_total
+    )
+    set_page_headers(response, next_cursor, total)
+    
+    # Sayfadaki tüm müşterilerin borç/ödeme toplamları tek aggregation ile
+    customer_names = list(dict.fromkeys(c.get("customer_name", "") for c in customers))
+    rows = await db.reservations.aggregate(
+        build_customer_payment_pipeline(current_user["company_id"], customer_names)
+    ).to_list(None) if customer_names else []
+    payment_status = shape_customer_payment_status(rows, customer_names)
+    for customer in customers:
+        customer.update(payment_status[customer.get("customer_name", "")])
+    
+    return customers
+
+@router.get("/munferit-customers/{customer_id}")
+async def get_munferit_customer(customer_id: str, current_user: dict = Depends(get_current_user)):
+    """Münferit müşteri detayını getir"""
+    customer = await db.munferit_customers.find_one({
+        "id": customer_id,
+        "company_id": current_user["company_id"]
+    }, {"_id": 0})
+    
+    if not customer:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    
+    return customer
+
+@router.put("/munferit-customers/{customer_id}")
+async def update_munferit_customer(customer_id: str, data: dict, current_user: dict = Depends(get_current_user)):
+    """Münferit müşteriyi güncelle"""
+    customer = await db.munferit_customers.find_one({
+        "id": customer_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if not customer:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    
+    # Sadece izin verilen alanları güncelle
+    update_data = {
+        "phone": data.get("phone"),
+        "email": data.get("email"),
+        "nationality": data.get("nationality"),
+        "id_number": data.get("id_number"),
+        "birth_date": data.get("birth_date"),
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    }
+    
+    # None değerleri temizle
+    update_data = {k: v for k, v in update_data.items() if v is not None}
+    
+    await db.munferit_customers.update_one(
+        {"id": customer_id},
+        {"$set": update_data}
+    )
+    
+    return {"message": "Customer updated"}
+
+@router.post("/cari-accounts/{cari_id}/recalculate-balance")
+async def recalculate_cari_balance(cari_id: str, current_user: dict = Depends(get_current_user)):
+    """Cari hesap bakiyesini transaction'lardan yeniden hesapla"""
+    cari = await db.cari_accounts.find_one({"id": cari_id, "company_id": current_user["company_id"]})
+    if not cari:
+        raise HTTPException(status_code=404, detail="Cari account not found")
+    
+    # Tek aggregation ile hesapla, cari_accounts ve checkpoint'i güncelle
+    balances = (await recompute_balances(db, [cari_id]))[cari_id]
+    balance_eur = balances["balance_eur"]
+    balance_usd = balances["balance_usd"]
+    balance_try = balances["balance_try"]
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="recalculate",
+        entity_type="cari_account",
+        entity_id=cari_id,
+        entity_name=cari.get("name", "Cari Hesap"),
+        description=f"Cari hesap bakiyesi yeniden hesaplandı: TRY={balance_try:.2f}, EUR={balance_eur:.2f}, USD={balance_usd:.2f}"
+    )
+    
+    return {
+        "message": "Bakiye yeniden hesaplandı",
+        "balance_eur": balance_eur,
+        "balance_usd": balance_usd,
+        "balance_try": balance_try
+    }
+
+@router.post("/cari-accounts/recalculate-all-balances")
+async def recalculate_all_cari_balances(current_user: dict = Depends(get_current_user)):
+    """Tüm cari hesapların bakiyelerini transaction'lardan yeniden hesapla"""
+    cari_accounts = await db.cari_accounts.find(
+        {"company_id": current_user["company_id"]},
+        {"_id": 0, "id": 1}
+    ).to_list(length=None)
+    
+    # Şirketin tüm carileri için tek aggregation
+    balances = await recompute_balances(db, [cari["id"] for cari in cari_accounts])
+    results = [{"cari_id": cari_id, **cari_balances} for cari_id, cari_balances in balances.items()]
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="recalculate_all",
+        entity_type="cari_account",
+        entity_id="all",
+        entity_name="Tüm Cari Hesaplar",
+        description=f"{len(results)} cari hesap bakiyesi yeniden hesaplandı"
+    )
+    
+    return {
+        "message": f"{len(results)} cari hesap bakiyesi yeniden hesaplandı",
+        "results": results
+    }
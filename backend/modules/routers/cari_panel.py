@@ -0,0 +1,501 @@
+"""
+Cari panel: cari login and the cari's own reservations, prices and account.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, ConfigDict
+
+from ..audit import create_activity_log
+from ..auth import create_cari_access_token, get_current_cari
+from ..database import db
+from ..models import Notification, PriceMatrixRequest, Reservation
+from ..passwords import hash_password_async, verify_password_async
+from ..reservation_pricing import (
+    calculate_price_matrix, calculate_reservation_price, get_pricing_cari_account
+)
+from ..rollups import sync_reservation_rollup
+from ..vouchers import allocate_voucher_code, B2B_PREFIX
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["cari_panel"])
+
+# ==================== CARI AUTH ENDPOINTS ====================
+
+class CariLoginRequest(BaseModel):
+    username: str  # cari_code
+    password: str  # cari_code (ilk girişte)
+    company_code: Optional[str] = None  # Company slug (URL'den gelir, güvenlik için)
+
+class CariChangePasswordRequest(BaseModel):
+    old_password: Optional[str] = None  # İlk girişte None olabilir
+    new_password: str
+
+@router.get("/cari/company/{company_slug}")
+async def get_company_by_slug(company_slug: str):
+    """Company bilgilerini slug ile getir (public endpoint - login sayfası için)"""
+    company = await db.companies.find_one({"company_code": company_slug}, {"_id": 0})
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    # Güvenlik: Sadece login sayfası için gerekli bilgileri döndür
+    return {
+        "id": company.get("id"),
+        "company_code": company.get("company_code"),
+        "company_name": company.get("company_name"),
+        "logo_url": company.get("logo_url"),
+        "contact_email": company.get("contact_email"),
+        "contact_phone": company.get("contact_phone"),
+        "website": company.get("website"),
+        "address": company.get("address")
+    }
+
+@router.post("/cari/auth/login")
+async def cari_login(data: CariLoginRequest):
+    """Cari login - username ve password cari_code olmalı, company_code ile company kontrolü yapılır"""
+    # Company kontrolü - eğer company_code gönderilmişse kontrol et
+    company_id = None
+    if data.company_code:
+        company = await db.companies.find_one({"company_code": data.company_code})
+        if not company:
+            raise HTTPException(status_code=404, detail="Company not found")
+        company_id = company["id"]
+    
+    # Cari hesabını bul
+    query = {"cari_code": data.username}
+    if company_id:
+        # Company kontrolü: Cari sadece belirtilen company'ye ait olmalı
+        query["company_id"] = company_id
+    
+    cari = await db.caris.find_one(query)
+    if not cari:
+        raise HTTPException(status_code=401, detail="Invalid cari code or password")
+    
+    # Eğer company_code gönderilmişse, cari'nin company_id'si ile eşleşmeli
+    if company_id and cari.get("company_id") != company_id:
+        raise HTTPException(status_code=403, detail="Cari code does not belong to this company")
+    
+    if not cari.get("is_active", True):
+        raise HTTPException(status_code=403, detail="Cari account is inactive")
+    
+    # Şifre doğrulama
+    # İlk girişte: password == cari_code olmalı
+    if cari.get("require_password_change", True):
+        # İlk giriş: şifre cari_code ile eşleşmeli
+        if data.password != data.username:
+            raise HTTPException(status_code=401, detail="Invalid cari code or password")
+    else:
+        # Normal giriş: hash'lenmiş şifre ile kontrol et
+        if not await verify_password_async(data.password, cari["password_hash"]):
+            raise HTTPException(status_code=401, detail="Invalid cari code or password")
+    
+    # Company bilgisini al
+    company = await db.companies.find_one({"id": cari["company_id"]}, {"_id": 0})
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    # Paket süresi kontrolü - müşteri süresi dolmuşsa giriş yapamaz
+    if company.get("package_end_date"):
+        package_end_date = datetime.fromisoformat(company["package_end_date"].replace('Z', '+00:00'))
+        now = datetime.now(timezone.utc)
+        if package_end_date < now:
+            raise HTTPException(
+                status_code=403, 
+                detail=f"Paket süreniz dolmuş. Paket bitiş tarihi: {package_end_date.strftime('%d.%m.%Y')}"
+            )
+    
+    # Token oluştur
+    token = create_cari_access_token({
+        "sub": cari["id"],
+        "company_id": cari["company_id"]
+    })
+    
+    return {
+        "access_token": token,
+        "token_type": "bearer",
+        "cari": {
+            "id": cari["id"],
+            "cari_code": cari["cari_code"],
+            "display_name": cari["display_name"],
+            "require_password_change": cari.get("require_password_change", True)
+        },
+        "company": {
+            "id": company["id"],
+            "name": company["company_name"],
+            "code": company["company_code"]
+        }
+    }
+
+@router.post("/cari/auth/change-password")
+async def cari_change_password(
+    data: CariChangePasswordRequest,
+    current_cari: dict = Depends(get_current_cari)
+):
+    """Cari şifre değiştirme"""
+    cari = await db.caris.find_one({"id": current_cari["cari_id"]})
+    if not cari:
+        raise HTTPException(status_code=404, detail="Cari account not found")
+    
+    # İlk girişte (require_password_change=True) old_password kontrolü atlanabilir
+    require_password_change = cari.get("require_password_change", False)
+    
+    if not require_password_change:
+        # Normal şifre değiştirme: eski şifre kontrolü gerekli
+        if not data.old_password:
+            raise HTTPException(status_code=400, detail="Old password is required")
+        if not await verify_password_async(data.old_password, cari["password_hash"]):
+            raise HTTPException(status_code=401, detail="Invalid old password")
+    
+    # Yeni şifreyi hash'le ve güncelle
+    new_password_hash = await hash_password_async(data.new_password)
+    await db.caris.update_one(
+        {"id": current_cari["cari_id"]},
+        {
+            "$set": {
+                "password_hash": new_password_hash,
+                "require_password_change": False,
+                "updated_at": datetime.now(timezone.utc).isoformat()
+            }
+        }
+    )
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_cari["company_id"],
+        user_id=current_cari["cari_id"],
+        username=current_cari.get("cari_code", ""),
+        full_name=current_cari.get("display_name", ""),
+        action="cari_password_change",
+        entity_type="cari",
+        entity_id=current_cari["cari_id"],
+        entity_name=current_cari.get("display_name", ""),
+        description="Cari şifresi değiştirildi",
+        ip_address=current_cari.get("ip_address")
+    )
+    
+    return {"message": "Password changed successfully"}
+
+# ==================== CARI PANEL ENDPOINTS ====================
+
+class CariReservationCreate(BaseModel):
+    """Cari tarafından rezervasyon oluşturma - sadece izin verilen alanlar"""
+    model_config = ConfigDict(extra="forbid")
+    
+    customer_name: str
+    customer_contact: Optional[str] = None
+    customer_details: Optional[Dict[str, Any]] = None
+    date: str
+    time: str
+    tour_id: str
+    person_count: int = 1
+    vehicle_count: int = 1
+    pickup_location: Optional[str] = None
+    pickup_maps_link: Optional[str] = None
+    extras: Optional[Dict[str, Any]] = None
+    # Price ve cari_name alanları KABUL EDİLMEZ - server-side hesaplanacak
+    notes: Optional[str] = None
+
+@router.post("/cari/reservations")
+async def cari_create_reservation(
+    data: CariReservationCreate,
+    current_cari: dict = Depends(get_current_cari)
+):
+    """Cari tarafından rezervasyon oluştur - status pending_approval"""
+    # Cari bilgisini al
+    cari = await db.caris.find_one({"id": current_cari["cari_id"]})
+    if not cari:
+        raise HTTPException(status_code=404, detail="Cari account not found")
+    
+    # Cari account bilgisini al (cari_code ile)
+    cari_code = cari.get("cari_code")
+    if not cari_code:
+        logger.error(f"Cari panel hesabında cari_code yok: cari_id={current_cari['cari_id']}")
+        raise HTTPException(status_code=400, detail="Cari code not found in cari panel account")
+    
+    cari_account = await db.cari_accounts.find_one({
+        "company_id": current_cari["company_id"],
+        "cari_code": cari_code
+    })
+    if not cari_account:
+        logger.error(f"CariAccount bulunamadı: company_id={current_cari['company_id']}, cari_code={cari_code}")
+        # Alternatif: display_name ile de dene
+        cari_account = await db.cari_accounts.find_one({
+            "company_id": current_cari["company_id"],
+            "name": cari.get("display_name")
+        })
+        if cari_account:
+            # CariAccount'a cari_code ekle
+            await db.cari_accounts.update_one(
+                {"id": cari_account["id"]},
+                {"$set": {"cari_code": cari_code}}
+            )
+            logger.info(f"CariAccount'a cari_code eklendi: {cari_account.get('name')} -> {cari_code}")
+        else:
+            raise HTTPException(status_code=404, detail=f"Cari account not found for cari_code: {cari_code}")
+    
+    # Tour type bilgisini al
+    tour_type_id = getattr(data, 'tour_id', None)
+    if not tour_type_id:
+        raise HTTPException(status_code=400, detail="Tour type ID is required")
+    
+    tour_type = await db.tour_types.find_one({"id": tour_type_id})
+    if not tour_type:
+        raise HTTPException(status_code=404, detail="Tour type not found")
+    
+    # Fiyatı server-side hesapla
+    vehicle_count = getattr(data, 'vehicle_count', None) or 1
+    person_count = getattr(data, 'person_count', 1)
+    price, currency = await calculate_reservation_price(
+        company_id=current_cari["company_id"],
+        cari_id=cari_account["id"],
+        tour_type_id=tour_type_id,
+        date=getattr(data, 'date'),
+        vehicle_count=vehicle_count,
+        person_count=person_count
+    )
+    
+    # Exchange rate hesapla
+    company = await db.companies.find_one({"id": current_cari["company_id"]}, {"_id": 0})
+    rates = company.get("currency_rates", {}) if company else {"EUR": 1.0, "USD": 1.0, "TRY": 1.0}
+    exchange_rate = rates.get(currency, 1.0) / rates.get("TRY", 1.0)
+    
+    # B2B voucher kodu
+    voucher_code = await allocate_voucher_code(db, B2B_PREFIX)
+    
+    # Rezervasyon oluştur
+    reservation = Reservation(
+        company_id=current_cari["company_id"],
+        cari_id=cari_account["id"],
+        cari_name=cari.get("display_name"),
+        date=getattr(data, 'date'),
+        time=getattr(data, 'time'),
+        tour_type_id=tour_type_id,
+        tour_type_name=tour_type.get("name"),
+        customer_name=getattr(data, 'customer_name'),
+        person_count=person_count,
+        vehicle_count=vehicle_count,
+        customer_contact=getattr(data, 'customer_contact', None),
+        pickup_location=getattr(data, 'pickup_location', None) or cari_account.get("pickup_location"),
+        pickup_maps_link=getattr(data, 'pickup_maps_link', None) or cari_account.get("pickup_maps_link"),
+        price=price,
+        currency=currency,
+        exchange_rate=exchange_rate,
+        notes=getattr(data, 'notes', None),
+        voucher_code=voucher_code,
+        status="pending_approval",
+        reservation_source="cari",
+        created_by_cari=current_cari["cari_id"],
+        cari_code_snapshot=cari.get("cari_code"),
+        created_by=current_cari["cari_id"]
+    )
+    
+    reservation_doc = reservation.model_dump()
+    reservation_doc['created_at'] = reservation_doc['created_at'].isoformat()
+    reservation_doc['updated_at'] = reservation_doc['updated_at'].isoformat()
+    
+    # Customer details ekle (eğer varsa)
+    customer_details = getattr(data, 'customer_details', None)
+    if customer_details:
+        reservation_doc['customer_details'] = customer_details
+    
+    await db.reservations.insert_one(reservation_doc)
+    await sync_reservation_rollup(db, reservation_doc["id"], None)
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_cari["company_id"],
+        user_id=current_cari["cari_id"],
+        username=current_cari.get("cari_code", ""),
+        full_name=current_cari.get("display_name", ""),
+        action="cari_create_reservation",
+        entity_type="reservation",
+        entity_id=reservation.id,
+        entity_name=f"{getattr(data, 'customer_name', '')} - {getattr(data, 'date', '')} {getattr(data, 'time', '')}",
+        description=f"Cari rezervasyon oluşturuldu: {getattr(data, 'customer_name', '')}, {getattr(data, 'date', '')} {getattr(data, 'time', '')}, {price} {currency} (Pending Approval)",
+        ip_address=current_cari.get("ip_address")
+    )
+    
+    # Bildirim oluştur - Tüm admin kullanıcılara
+    admin_users = await db.users.find({
+        "company_id": current_cari["company_id"],
+        "is_admin": True,
+        "is_active": True
+    }, {"_id": 0}).to_list(100)
+    
+    for admin_user in admin_users:
+        notification = Notification(
+            company_id=current_cari["company_id"],
+            user_id=admin_user["id"],
+            type="pending_reservation",
+            title="Yeni Rezervasyon Talebi",
+            message=f"{cari.get('display_name', '')} tarafından yeni bir rezervasyon talebi oluşturuldu: {getattr(data, 'customer_name', '')} - {getattr(data, 'date', '')} {getattr(data, 'time', '')}",
+            entity_type="reservation",
+            entity_id=reservation.id
+        )
+        notification_doc = notification.model_dump()
+        notification_doc['created_at'] = notification_doc['created_at'].isoformat()
+        await db.notifications.insert_one(notification_doc)
+    
+    return {
+        "id": reservation.id,
+        "status": "pending_approval",
+        "price": price,
+        "currency": currency,
+        "message": "Reservation created and pending approval"
+    }
+
+@router.get("/cari/reservations")
+async def cari_get_reservations(
+    current_cari: dict = Depends(get_current_cari),
+    page: int = 1,
+    limit: int = 50
+):
+    """Cari'nin oluşturduğu rezervasyonları listele"""
+    cari = await db.caris.find_one({"id": current_cari["cari_id"]})
+    if not cari:
+        raise HTTPException(status_code=404, detail="Cari account not found")
+    
+    # Sadece bu cari tarafından oluşturulan rezervasyonları getir
+    query = {
+        "company_id": current_cari["company_id"],
+        "created_by_cari": current_cari["cari_id"]
+    }
+    
+    skip = (page - 1) * limit
+    reservations = await db.reservations.find(query, {"_id": 0}).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
+    total = await db.reservations.count_documents(query)
+    
+    # Güvenlik: Hassas bilgileri kaldır
+    safe_reservations = []
+    for r in reservations:
+        safe_reservations.append({
+            "id": r.get("id"),
+            "customer_name": r.get("customer_name"),
+            "date": r.get("date"),
+            "time": r.get("time"),
+            "tour_type_name": r.get("tour_type_name"),
+            "price": r.get("price"),
+            "currency": r.get("currency"),
+            "status": r.get("status"),
+            "notes": r.get("notes"),
+            "pickup_time": r.get("pickup_time"),  # Pick-up saati
+            "created_at": r.get("created_at"),
+            "approved_at": r.get("approved_at")
+        })
+    
+    return {
+        "reservations": safe_reservations,
+        "total": total,
+        "page": page,
+        "limit": limit
+    }
+
+@router.get("/cari/transactions")
+async def cari_get_transactions(
+    current_cari: dict = Depends(get_current_cari),
+    page: int = 1,
+    limit: int = 50
+):
+    """Cari'nin ekstresini getir (readonly)"""
+    cari = await db.caris.find_one({"id": current_cari["cari_id"]})
+    if not cari:
+        raise HTTPException(status_code=404, detail="Cari account not found")
+    
+    # Cari account bilgisini al (cari_code ile)
+    cari_account = await db.cari_accounts.find_one({
+        "company_id": current_cari["company_id"],
+        "cari_code": cari.get("cari_code")
+    })
+    if not cari_account:
+        raise HTTPException(status_code=404, detail="Cari account not found")
+    
+    # Transaction'ları getir
+    query = {
+        "company_id": current_cari["company_id"],
+        "cari_id": cari_account["id"]
+    }
+    
+    skip = (page - 1) * limit
+    transactions = await db.transactions.find(query, {"_id": 0}).sort("date", -1).skip(skip).limit(limit).to_list(limit)
+    total = await db.transactions.count_documents(query)
+    
+    return {
+        "transactions": transactions,
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "balance_eur": cari_account.get("balance_eur", 0),
+        "balance_usd": cari_account.get("balance_usd", 0),
+        "balance_try": cari_account.get("balance_try", 0)
+    }
+
+@router.get("/cari/company-info")
+async def cari_get_company_info(
+    current_cari: dict = Depends(get_current_cari)
+):
+    """Cari için company bilgilerini getir (currency rates dahil)"""
+    company = await db.companies.find_one({"id": current_cari["company_id"]}, {"_id": 0})
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    return {
+        "currency_rates": company.get("currency_rates", {"EUR": 1.0, "USD": 1.0, "TRY": 1.0}),
+        "name": company.get("name"),
+        "id": company.get("id")
+    }
+
+@router.get("/cari/reservations/calculate-price")
+async def cari_calculate_price(
+    tour_type_id: str,
+    date: str,
+    vehicle_count: int,
+    person_count: int = 1,
+    current_cari: dict = Depends(get_current_cari)
+):
+    """Cari için rezervasyon fiyatını hesapla"""
+    try:
+        # Cari account bilgisini al
+        cari_account = await get_pricing_cari_account(current_cari)
+        
+        total_price, currency = await calculate_reservation_price(
+            company_id=current_cari["company_id"],
+            cari_id=cari_account["id"],
+            tour_type_id=tour_type_id,
+            date=date,
+            vehicle_count=vehicle_count,
+            person_count=person_count
+        )
+        
+        return {
+            "price": total_price,
+            "currency": currency
+        }
+    except Exception as e:
+        logger.error(f"Cari fiyat hesaplama hatası: {e}")
+        raise HTTPException(status_code=500, detail="Fiyat hesaplanamadı")
+
+@router.post("/cari/reservations/calculate-price/bulk")
+async def cari_calculate_price_bulk(
+    payload: PriceMatrixRequest,
+    current_cari: dict = Depends(get_current_cari)
+):
+    """Cari paneli fiyat takvimi: tarih aralığı × tur tipleri tek istekte (cari_id token'dan gelir)"""
+    try:
+        cari_account = await get_pricing_cari_account(current_cari)
+        return await calculate_price_matrix(
+            company_id=current_cari["company_id"],
+            cari_id=cari_account["id"],
+            date_from=payload.date_from,
+            date_to=payload.date_to,
+            tour_type_ids=payload.tour_type_ids,
+            vehicle_count=payload.vehicle_count,
+            person_count=payload.person_count
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Cari toplu fiyat hesaplama hatası: {e}")
+        raise HTTPException(status_code=500, detail="Fiyat hesaplanamadı")
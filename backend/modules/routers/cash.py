@@ -0,0 +1,889 @@
+"""
+Cash overview, currency exchange and payment code endpoints.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from ..audit import create_activity_log
+from ..auth import get_current_user
+from ..cash import build_cash_detail_pipeline, collected_payments_match, shape_cash_summary
+from ..cash_position import get_cash_position, reconcile_cash_positions, sync_cash_position
+from ..database import db
+from ..ledger import invalidate_checkpoints
+from ..lookups import collect_ids, prefetch_by_ids
+from ..reference_data import invalidate_reference_cache
+
+router = APIRouter(tags=["cash"])
+
+# ==================== CASH ====================
+
+@router.get("/cash/detail")
+async def get_cash_detail(summary_only: bool = False, current_user: dict = Depends(get_current_user)):
+    """Kasa detay - Tüm kasa hesapları ve istatistikler
+
+    Args:
+        summary_only: True ise sadece kasa hesapları ve toplamlar döner (transaction listeleri olmadan)
+    """
+    # Tüm kasa hesapları
+    cash_accounts = await db.cash_accounts.find(
+        {"company_id": current_user["company_id"], "is_active": True},
+        {"_id": 0}
+    ).sort("order", 1).to_list(100)
+    
+    # Nakit kasalar
+    cash_accounts_list = [acc for acc in cash_accounts if acc.get("account_type") == "cash"]
+    # Banka hesabı kasaları
+    bank_accounts_list = [acc for acc in cash_accounts if acc.get("account_type") == "bank_account"]
+    # Kredi kartı kasaları
+    credit_card_accounts_list = [acc for acc in cash_accounts if acc.get("account_type") == "credit_card"]
+    
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    
+    # Toplamlar ve kasa hesabı bazında tutarlar tek aggregation ile
+    facets = await db.transactions.aggregate(
+        build_cash_detail_pipeline(current_user["company_id"], collect_ids(cash_accounts, "id"), today)
+    ).to_list(1)
+    summary = shape_cash_summary(facets[0] if facets else {})
+    for account in cash_accounts:
+        account.update(summary["accounts"].get(account["id"], {"total": 0, "available": 0, "pending": 0}))
+    
+    totals = {
+        "cash_accounts": cash_accounts,
+        "cash_accounts_list": cash_accounts_list,
+        "bank_accounts_list": bank_accounts_list,
+        "credit_card_accounts_list": credit_card_accounts_list,
+        # Toplam tahsil edilmiş tutarlar (tüm payment transaction'ları)
+        "total_collected": summary["total_collected"],
+        # Toplam tutarlar (tüm kasalar)
+        "total_amounts": summary["total_amounts"],
+        # Kullanılabilir tutarlar (valör süresi dolmuş)
+        "available_amounts": summary["available_amounts"],
+        # Vadede ki tutarlar (valör süresi bekleyen)
+        "pending_amounts": summary["pending_amounts"],
+    }
+    if summary_only:
+        return totals
+    
+    # Listeler için sadece tahsilat ekle aksiyonundan gelen payment transaction'larını al
+    # (payment_method olan ve reference_type "outgoing_payment" olmayan transaction'lar)
+    query = collected_payments_match(current_user["company_id"])
+    
+    all_payment_transactions = await db.transactions.find(
+        query,
+        {"_id": 0}
+    ).to_list(10000)
+    
+    
+    # Referans dokümanları tek seferde getir (satır başına find_one yerine)
+    payment_types = await prefetch_by_ids(
+        db.payment_types, collect_ids(all_payment_transactions, "payment_type_id"), projection={"code": 1}
+    )
+    caris = await prefetch_by_ids(
+        db.cari_accounts, collect_ids(all_payment_transactions, "cari_id"), projection={"name": 1}
+    )
+    bank_accounts = await prefetch_by_ids(
+        db.bank_accounts, collect_ids(all_payment_transactions, "bank_account_id")
+    )
+    
+    def resolve_payment_code(transaction: dict) -> Optional[str]:
+        # payment_code: önce payment_type'tan, yoksa payment_method'tan al
+        payment_type = payment_types.get(transaction.get("payment_type_id"))
+        return (payment_type.get("code") if payment_type else None) or transaction.get("payment_method")
+    
+    checks = await prefetch_by_ids(
+        db.check_promissories,
+        [t.get("id") for t in all_payment_transactions if resolve_payment_code(t) == "check_promissory"],
+        key="transaction_id"
+    )
+    
+    # Ödeme tipine göre transaction'ları grupla
+    cash_payments = []
+    bank_transfer_payments = []
+    credit_card_payments = []
+    online_payment_payments = []
+    mail_order_payments = []
+    check_promissory_list = []
+    
+    # Tüm payment transaction'larını payment_method'a göre filtrele
+    for transaction in all_payment_transactions:
+        payment_code = resolve_payment_code(transaction)
+        
+        # Eğer hala payment_code yoksa, bu transaction'ı atla
+        if not payment_code:
+            continue
+        
+        # Ödeme tipine göre grupla
+        if payment_code == "cash" or payment_code == "exchange" or payment_code == "transfer":
+            # Cari bilgisini ekle (exchange ve transfer için cari yok)
+            if payment_code == "cash":
+                cari = caris.get(transaction.get("cari_id"))
+                if cari:
+                    transaction["cari_name"] = cari.get("name")
+            cash_payments.append(transaction)
+        elif payment_code == "bank_transfer":
+            # Cari ve banka hesabı bilgisini ekle
+            cari = caris.get(transaction.get("cari_id"))
+            if cari:
+                transaction["cari_name"] = cari.get("name")
+            bank_account_id = transaction.get("bank_account_id")
+            if bank_account_id:
+                bank_account = bank_accounts.get(bank_account_id)
+                if bank_account:
+                    transaction["bank_account_name"] = bank_account.get("account_name")
+                    transaction["bank_name"] = bank_account.get("bank_name")
+            bank_transfer_payments.append(transaction)
+        elif payment_code == "credit_card":
+            # Cari ve kredi kartı bilgisini ekle
+            cari = caris.get(transaction.get("cari_id"))
+            if cari:
+                transaction["cari_name"] = cari.get("name")
+            bank_account_id = transaction.get("bank_account_id")
+            if bank_account_id:
+                bank_account = bank_accounts.get(bank_account_id)
+                if bank_account:
+                    transaction["bank_account_name"] = bank_account.get("account_name")
+                    transaction["bank_name"] = bank_account.get("bank_name")
+                    # Banka tanımlamalarından komisyon ve valör bilgilerini dinamik olarak ekle
+                    transaction["commission_rate"] = bank_account.get("commission_rate")
+                    transaction["valor_days"] = bank_account.get("valor_days")
+                    # Transaction'da komisyon / valör tarihi yoksa banka tanımlamalarından hesapla
+                    # (toplamlar aynı kuralla modules/cash.py pipeline'ında hesaplanır)
+                    amount = transaction.get("net_amount") or transaction.get("amount", 0)
+                    if transaction.get("commission_amount") is None and bank_account.get("commission_rate"):
+                        transaction["commission_amount"] = (amount * bank_account["commission_rate"]) / 100
+                        transaction["net_amount"] = amount - transaction["commission_amount"]
+                    if not transaction.get("valor_date") and bank_account.get("valor_days"):
+                        transaction_date = datetime.strptime(transaction.get("date"), "%Y-%m-%d")
+                        transaction["valor_date"] = (
+                            transaction_date + timedelta(days=bank_account["valor_days"])
+                        ).strftime("%Y-%m-%d")
+            credit_card_payments.append(transaction)
+        elif payment_code == "online_payment":
+            online_payment_payments.append(transaction)
+        elif payment_code == "mail_order":
+            mail_order_payments.append(transaction)
+        elif payment_code == "check_promissory":
+            # Check/Promissory kaydını al
+            check = checks.get(transaction.get("id"))
+            if check:
+                # Cari bilgisini ekle
+                cari = caris.get(transaction.get("cari_id"))
+                if cari:
+                    check["cari_name"] = cari.get("name")
+                # Transaction'dan date ve time bilgilerini ekle
+                check_promissory_list.append({
+                    **check,
+                    "transaction": transaction,
+                    "date": transaction.get("date") or check.get("date"),
+                    "time": transaction.get("time") or check.get("time")
+                })
+    
+    # Valör listelerini oluştur
+    credit_card_valor_list = []
+    online_payment_valor_list = []
+    mail_order_valor_list = []
+    check_promissory_valor_list = []
+    
+    # Kredi kartı valör listesi - valör tarihi geçmemiş veya is_settled false olanlar
+    for payment in credit_card_payments:
+        valor_date = payment.get("valor_date")
+        bank_account_id = payment.get("bank_account_id")
+        
+        # Banka hesabı tanımlamalarından komisyon ve valör bilgilerini dinamik olarak al
+        commission_rate = payment.get("commission_rate")  # Zaten transaction'a eklenmiş
+        valor_days = payment.get("valor_days")  # Zaten transaction'a eklenmiş
+        
+        # Eğer transaction'da yoksa, bank_account'tan al
+        if bank_account_id and (commission_rate is None or valor_days is None):
+            bank_account = bank_accounts.get(bank_account_id)
+            if bank_account:
+                if commission_rate is None:
+                    commission_rate = bank_account.get("commission_rate")
+                if valor_days is None:
+                    valor_days = bank_account.get("valor_days")
+        
+        # Valör tarihi varsa ve henüz geçmemişse listeye ekle
+        if valor_date:
+            valor_date_obj = datetime.strptime(valor_date, "%Y-%m-%d")
+            today_obj = datetime.now(timezone.utc)
+            days_remaining = (valor_date_obj.date() - today_obj.date()).days
+            
+            # Valör tarihi geçmemişse listeye ekle
+            if days_remaining > 0:
+                credit_card_valor_list.append({
+                    "transaction_id": payment["id"],
+                    "date": payment.get("date"),
+                    "time": payment.get("time"),
+                    "valor_date": valor_date,
+                    "original_amount": payment.get("amount", 0),
+                    "commission_amount": payment.get("commission_amount", 0),
+                    "net_amount": payment.get("net_amount", 0),
+                    "currency": payment.get("currency", "TRY"),
+                    "days_remaining": days_remaining,
+                    "cash_account_id": payment.get("cash_account_id"),
+                    "bank_account_id": bank_account_id,
+                    "cari_name": payment.get("cari_name"),
+                    "bank_account_name": payment.get("bank_account_name"),
+                    "commission_rate": commission_rate,  # Banka tanımlamalarından dinamik
+                    "valor_days": valor_days  # Banka tanımlamalarından dinamik
+                })
+    
+    # Online ödeme valör listesi
+    for payment in online_payment_payments:
+        if payment.get("valor_date") and not payment.get("is_settled"):
+            valor_date_obj = datetime.strptime(payment.get("valor_date"), "%Y-%m-%d")
+            today_obj = datetime.now(timezone.utc)
+            days_remaining = (valor_date_obj.date() - today_obj.date()).days
+            
+            online_payment_valor_list.append({
+                "transaction_id": payment["id"],
+                "date": payment.get("date"),
+                "time": payment.get("time"),
+                "valor_date": payment.get("valor_date"),
+                "original_amount": payment.get("amount", 0),
+                "commission_amount": payment.get("commission_amount", 0),
+                "net_amount": payment.get("net_amount", 0),
+                "currency": payment.get("currency", "TRY"),
+                "days_remaining": days_remaining,
+                "cash_account_id": payment.get("cash_account_id"),
+                "bank_account_id": payment.get("bank_account_id")
+            })
+    
+    # Mail order valör listesi
+    for payment in mail_order_payments:
+        if payment.get("valor_date") and not payment.get("is_settled"):
+            valor_date_obj = datetime.strptime(payment.get("valor_date"), "%Y-%m-%d")
+            today_obj = datetime.now(timezone.utc)
+            days_remaining = (valor_date_obj.date() - today_obj.date()).days
+            
+            mail_order_valor_list.append({
+                "transaction_id": payment["id"],
+                "date": payment.get("date"),
+                "time": payment.get("time"),
+                "valor_date": payment.get("valor_date"),
+                "original_amount": payment.get("amount", 0),
+                "commission_amount": payment.get("commission_amount", 0),
+                "net_amount": payment.get("net_amount", 0),
+                "currency": payment.get("currency", "TRY"),
+                "days_remaining": days_remaining,
+                "cash_account_id": payment.get("cash_account_id"),
+                "bank_account_id": payment.get("bank_account_id")
+            })
+    
+    # Çek/Senet valör listesi - vade tarihine göre oluştur
+    for item in check_promissory_list:
+        check = item.get("transaction") or item
+        due_date = check.get("due_date")
+        is_collected = check.get("is_collected", False)
+        
+        if due_date:
+            due_date_obj = datetime.strptime(due_date, "%Y-%m-%d")
+            today_obj = datetime.now(timezone.utc)
+            days_remaining = (due_date_obj.date() - today_obj.date()).days
+            
+            # Vade tarihi geçmemişse veya henüz tahsil edilmemişse listeye ekle
+            if days_remaining > 0 or not is_collected:
+                transaction = item.get("transaction", {})
+                check_promissory_valor_list.append({
+                    "check_id": item.get("id"),
+                    "transaction_id": transaction.get("id") or item.get("transaction_id"),
+                    "date": item.get("date") or transaction.get("date") or check.get("date"),
+                    "time": item.get("time") or transaction.get("time") or check.get("time"),
+                    "due_date": due_date,
+                    "amount": check.get("amount") or item.get("amount", 0),
+                    "currency": check.get("currency") or item.get("currency", "TRY"),
+                    "days_remaining": days_remaining,
+                    "check_number": item.get("check_number", ""),
+                    "bank_name": item.get("bank_name", ""),
+                    "cari_name": item.get("cari_name") or check.get("cari_name"),
+                    "is_collected": is_collected
+                })
+    
+    # Çek/Senet listesini vade tarihine göre sırala (en yakın vade en üstte)
+    check_promissory_list.sort(key=lambda x: (x.get("transaction", {}).get("due_date") or x.get("due_date") or "9999-12-31"))
+    
+    # Valör listelerini tarihe göre sırala (en yakın tarih en üstte)
+    credit_card_valor_list.sort(key=lambda x: x["valor_date"])
+    online_payment_valor_list.sort(key=lambda x: x["valor_date"])
+    mail_order_valor_list.sort(key=lambda x: x["valor_date"])
+    check_promissory_valor_list.sort(key=lambda x: x["due_date"])
+    
+    return {
+        **totals,
+        "cash_payments": cash_payments,
+        "bank_transfer_payments": bank_transfer_payments,
+        "credit_card_payments": credit_card_payments,
+        "credit_card_valor_list": credit_card_valor_list,
+        "online_payment_payments": online_payment_payments,
+        "online_payment_valor_list": online_payment_valor_list,
+        "mail_order_payments": mail_order_payments,
+        "mail_order_valor_list": mail_order_valor_list,
+        "check_promissory_list": check_promissory_list,
+        "check_promissory_valor_list": check_promissory_valor_list
+    }
+
+@router.post("/cash/fix-payment-methods")
+async def fix_payment_methods(current_user: dict = Depends(get_current_user)):
+    """Mevcut transaction'larda payment_method null olanları düzelt"""
+    # payment_method null olan transaction'ları bul
+    transactions = await db.transactions.find(
+        {
+            "company_id": current_user["company_id"],
+            "transaction_type": "payment",
+            "$or": [
+                {"payment_method": None},
+                {"payment_method": {"$exists": False}}
+            ]
+        },
+        {"_id": 0}
+    ).to_list(10000)
+    
+    fixed_count = 0
+    
+    for transaction in transactions:
+        payment_type_id = transaction.get("payment_type_id")
+        if not payment_type_id:
+            continue
+        
+        # payment_type'ı al
+        payment_type = await db.payment_types.find_one({"id": payment_type_id}, {"_id": 0})
+        if not payment_type:
+            continue
+        
+        payment_code = payment_type.get("code")
+        
+        # Eğer code yoksa, payment_type_name'den türet
+        if not payment_code:
+            payment_type_name = payment_type.get("name", "").lower()
+            name_to_code_map = {
+                "nakit": "cash",
+                "havale": "bank_transfer",
+                "banka transferi": "bank_transfer",
+                "kredi kartı": "credit_card",
+                "kredi karti": "credit_card",
+                "çek": "check_promissory",
+                "senet": "check_promissory",
+                "çek/senet": "check_promissory",
+                "cariye aktar": "transfer_to_cari",
+                "cari aktarma": "transfer_to_cari",
+                "mahsup": "write_off",
+                "online ödeme": "online_payment",
+                "mail order": "mail_order"
+            }
+            
+            payment_code = name_to_code_map.get(payment_type_name)
+            
+            if not payment_code:
+                payment_code = payment_type_name.replace(" ", "_").replace("ş", "s").replace("ç", "c").replace("ğ", "g").replace("ı", "i").replace("ö", "o").replace("ü", "u")
+            
+            # payment_type MongoDB kaydını güncelle
+            await db.payment_types.update_one(
+                {"id": payment_type_id},
+                {"$set": {"code": payment_code}}
+            )
+            invalidate_reference_cache(current_user["company_id"], "payment_types")
+        
+        # Transaction'ı güncelle
+        await db.transactions.update_one(
+            {"id": transaction.get("id")},
+            {"$set": {"payment_method": payment_code}}
+        )
+        fixed_count += 1
+    
+    return {
+        "message": f"{fixed_count} transaction düzeltildi",
+        "fixed_count": fixed_count
+    }
+
+@router.post("/cash/exchange")
+async def exchange_currency(
+    data: dict,  # { from_currency: str, to_currency: str, amount: float, exchange_rate: float, date: str, from_account_id: str, to_account_id: str }
+    current_user: dict = Depends(get_current_user)
+):
+    """Döviz bozma - Bir kasa hesabından diğerine"""
+    from_account = await db.cash_accounts.find_one({
+        "id": data.get("from_account_id"),
+        "company_id": current_user["company_id"]
+    })
+    
+    if not from_account:
+        raise HTTPException(status_code=404, detail="Kaynak kasa hesabı bulunamadı")
+    
+    to_account = await db.cash_accounts.find_one({
+        "id": data.get("to_account_id"),
+        "company_id": current_user["company_id"]
+    })
+    
+    if not to_account:
+        raise HTTPException(status_code=404, detail="Hedef kasa hesabı bulunamadı")
+    
+    from_amount = data.get("amount", 0)
+    exchange_rate = data.get("exchange_rate", 1.0)
+    to_amount = from_amount * exchange_rate
+    
+    # Kaynak hesaptan düş
+    await db.cash_accounts.update_one(
+        {"id": from_account["id"]},
+        {"$inc": {"current_balance": -from_amount}}
+    )
+    
+    # Hedef hesaba ekle
+    await db.cash_accounts.update_one(
+        {"id": to_account["id"]},
+        {"$inc": {"current_balance": to_amount}}
+    )
+    
+    # Exchange transaction kaydı
+    exchange_transaction = {
+        "id": str(uuid.uuid4()),
+        "company_id": current_user["company_id"],
+        "transaction_type": "exchange",
+        "from_account_id": from_account["id"],
+        "to_account_id": to_account["id"],
+        "from_currency": data.get("from_currency"),
+        "to_currency": data.get("to_currency"),
+        "from_amount": from_amount,
+        "to_amount": to_amount,
+        "exchange_rate": exchange_rate,
+        "date": data.get("date", datetime.now(timezone.utc).strftime("%Y-%m-%d")),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "created_by": current_user["user_id"]
+    }
+    
+    # cash_exchanges collection'ı yoksa oluştur (MongoDB otomatik oluşturur)
+    await db.cash_exchanges.insert_one(exchange_transaction)
+    
+    # Hedef hesaba giren tutar için payment transaction oluştur (kasa kartlarına yansısın)
+    payment_transaction = {
+        "id": str(uuid.uuid4()),
+        "company_id": current_user["company_id"],
+        "transaction_type": "payment",
+        "cash_account_id": to_account["id"],
+        "amount": to_amount,
+        "net_amount": to_amount,
+        "currency": data.get("to_currency"),
+        "exchange_rate": 1.0,
+        "description": f"Döviz bozma: {from_amount} {data.get('from_currency')} → {to_amount} {data.get('to_currency')}",
+        "payment_method": "exchange",
+        "date": data.get("date", datetime.now(timezone.utc).strftime("%Y-%m-%d")),
+        "time": datetime.now(timezone.utc).strftime("%H:%M"),
+        "reference_id": exchange_transaction["id"],
+        "reference_type": "exchange",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "created_by": current_user["user_id"]
+    }
+    await db.transactions.insert_one(payment_transaction)
+    await sync_cash_position(db, "transactions", None, payment_transaction)
+    
+    # Kaynak hesaptan çıkan tutar için negatif payment transaction oluştur
+    negative_payment_transaction = {
+        "id": str(uuid.uuid4()),
+        "company_id": current_user["company_id"],
+        "transaction_type": "payment",
+        "cash_account_id": from_account["id"],
+        "amount": -from_amount,
+        "net_amount": -from_amount,
+        "currency": data.get("from_currency"),
+        "exchange_rate": 1.0,
+        "description": f"Döviz bozma: {from_amount} {data.get('from_currency')} → {to_amount} {data.get('to_currency')}",
+        "payment_method": "exchange",
+        "date": data.get("date", datetime.now(timezone.utc).strftime("%Y-%m-%d")),
+        "time": datetime.now(timezone.utc).strftime("%H:%M"),
+        "reference_id": exchange_transaction["id"],
+        "reference_type": "exchange",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "created_by": current_user["user_id"]
+    }
+    await db.transactions.insert_one(negative_payment_transaction)
+    await sync_cash_position(db, "transactions", None, negative_payment_transaction)
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="exchange",
+        entity_type="cash_exchange",
+        entity_id=exchange_transaction["id"],
+        entity_name="Döviz Bozma",
+        description=f"Döviz bozma: {from_amount} {data.get('from_currency')} → {to_amount} {data.get('to_currency')} (Kur: {exchange_rate})"
+    )
+    
+    return {"message": "Döviz bozma işlemi tamamlandı"}
+
+@router.get("/cash/exchange-history")
+async def get_exchange_history(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    currency: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Döviz bozma geçmişini getir"""
+    query = {
+        "company_id": current_user["company_id"]
+    }
+    
+    if date_from:
+        query["date"] = {"$gte": date_from}
+    if date_to:
+        if "date" in query and isinstance(query["date"], dict):
+            query["date"]["$lte"] = date_to
+        else:
+            query["date"] = {"$lte": date_to}
+    
+    if currency:
+        query["$or"] = [
+            {"from_currency": currency},
+            {"to_currency": currency}
+        ]
+    
+    exchanges = await db.cash_exchanges.find(query, {"_id": 0}).sort("date", -1).to_list(1000)
+    
+    # Exchange'leri frontend formatına çevir
+    result = []
+    for exchange in exchanges:
+        result.append({
+            "id": exchange.get("id"),
+            "date": exchange.get("date"),
+            "from_currency": exchange.get("from_currency"),
+            "to_currency": exchange.get("to_currency"),
+            "from_amount": exchange.get("from_amount", 0),
+            "to_amount": exchange.get("to_amount", 0),
+            "exchange_rate": exchange.get("exchange_rate", 1.0),
+            "payment_method": "exchange"  # Frontend'de filtreleme için
+        })
+    
+    return result
+
+@router.post("/cash/transfer")
+async def transfer_cash(
+    data: dict,  # { from_account_id: str, to_account_id: str, amount: float, currency: str, date: str, description: str }
+    current_user: dict = Depends(get_current_user)
+):
+    """Kasa transferi - Bir kasa hesabından diğerine"""
+    from_account = await db.cash_accounts.find_one({
+        "id": data.get("from_account_id"),
+        "company_id": current_user["company_id"]
+    })
+    
+    if not from_account:
+        raise HTTPException(status_code=404, detail="Kaynak kasa hesabı bulunamadı")
+    
+    to_account = await db.cash_accounts.find_one({
+        "id": data.get("to_account_id"),
+        "company_id": current_user["company_id"]
+    })
+    
+    if not to_account:
+        raise HTTPException(status_code=404, detail="Hedef kasa hesabı bulunamadı")
+    
+    amount = data.get("amount", 0)
+    
+    if from_account.get("current_balance", 0) < amount:
+        raise HTTPException(status_code=400, detail="Yetersiz bakiye")
+    
+    # Kaynak hesaptan düş
+    await db.cash_accounts.update_one(
+        {"id": from_account["id"]},
+        {"$inc": {"current_balance": -amount}}
+    )
+    
+    # Hedef hesaba ekle
+    await db.cash_accounts.update_one(
+        {"id": to_account["id"]},
+        {"$inc": {"current_balance": amount}}
+    )
+    
+    # Transfer transaction kaydı
+    transfer_transaction = {
+        "id": str(uuid.uuid4()),
+        "company_id": current_user["company_id"],
+        "transaction_type": "transfer",
+        "from_account_id": from_account["id"],
+        "to_account_id": to_account["id"],
+        "amount": amount,
+        "currency": data.get("currency", "TRY"),
+        "description": data.get("description", "Kasa transferi"),
+        "date": data.get("date", datetime.now(timezone.utc).strftime("%Y-%m-%d")),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "created_by": current_user["user_id"]
+    }
+    
+    # cash_transfers collection'ı yoksa oluştur (MongoDB otomatik oluşturur)
+    await db.cash_transfers.insert_one(transfer_transaction)
+    
+    # Hedef hesaba giren tutar için payment transaction oluştur (kasa kartlarına yansısın)
+    payment_transaction = {
+        "id": str(uuid.uuid4()),
+        "company_id": current_user["company_id"],
+        "transaction_type": "payment",
+        "cash_account_id": to_account["id"],
+        "amount": amount,
+        "net_amount": amount,
+        "currency": data.get("currency", "TRY"),
+        "exchange_rate": 1.0,
+        "description": data.get("description", "Kasa transferi"),
+        "payment_method": "transfer",
+        "date": data.get("date", datetime.now(timezone.utc).strftime("%Y-%m-%d")),
+        "time": datetime.now(timezone.utc).strftime("%H:%M"),
+        "reference_id": transfer_transaction["id"],
+        "reference_type": "transfer",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "created_by": current_user["user_id"]
+    }
+    await db.transactions.insert_one(payment_transaction)
+    await sync_cash_position(db, "transactions", None, payment_transaction)
+    
+    # Kaynak hesaptan çıkan tutar için negatif payment transaction oluştur
+    negative_payment_transaction = {
+        "id": str(uuid.uuid4()),
+        "company_id": current_user["company_id"],
+        "transaction_type": "payment",
+        "cash_account_id": from_account["id"],
+        "amount": -amount,
+        "net_amount": -amount,
+        "currency": data.get("currency", "TRY"),
+        "exchange_rate": 1.0,
+        "description": data.get("description", "Kasa transferi"),
+        "payment_method": "transfer",
+        "date": data.get("date", datetime.now(timezone.utc).strftime("%Y-%m-%d")),
+        "time": datetime.now(timezone.utc).strftime("%H:%M"),
+        "reference_id": transfer_transaction["id"],
+        "reference_type": "transfer",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "created_by": current_user["user_id"]
+    }
+    await db.transactions.insert_one(negative_payment_transaction)
+    await sync_cash_position(db, "transactions", None, negative_payment_transaction)
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="transfer",
+        entity_type="cash_transfer",
+        entity_id=transfer_transaction["id"],
+        entity_name="Kasa Transferi",
+        description=f"Kasa transferi: {amount} {data.get('currency', 'TRY')} - {data.get('description', 'Kasa transferi')}"
+    )
+    
+    return {"message": "Transfer işlemi tamamlandı"}
+
+@router.post("/cash/process-valor-settlements")
+async def process_valor_settlements(
+    date: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Valör süresi dolan tutarları kasa hesaplarına yerleştir"""
+    if not date:
+        date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    
+    # Valör süresi dolmuş transaction'ları bul
+    transactions = await db.transactions.find({
+        "company_id": current_user["company_id"],
+        "transaction_type": "payment",
+        "valor_date": {"$lte": date},
+        "is_settled": False
+    }, {"_id": 0}).to_list(1000)
+    
+    processed = []
+    
+    for transaction in transactions:
+        cash_account_id = transaction.get("cash_account_id")
+        if not cash_account_id:
+            continue
+        
+        net_amount = transaction.get("net_amount") or transaction.get("amount", 0)
+        commission_amount = transaction.get("commission_amount", 0)
+        cari_id = transaction.get("cari_id")
+        payment_method = transaction.get("payment_method")
+        bank_account_id = transaction.get("bank_account_id")
+        payment_type_id = transaction.get("payment_type_id")
+        
+        # Payment method'u belirle (payment_method varsa onu kullan, yoksa payment_type'dan al)
+        if not payment_method and payment_type_id:
+            payment_type = await db.payment_types.find_one({"id": payment_type_id}, {"_id": 0})
+            if payment_type:
+                payment_method = payment_type.get("code")
+        
+        # Eğer komisyon tutarı transaction'da yoksa, bank_account tanımlamalarından hesapla
+        if commission_amount == 0 and bank_account_id and payment_method == "credit_card":
+            bank_account = await db.bank_accounts.find_one({"id": bank_account_id}, {"_id": 0})
+            if bank_account and bank_account.get("commission_rate"):
+                amount = transaction.get("amount", 0)
+                commission_rate = bank_account.get("commission_rate")
+                commission_amount = (amount * commission_rate) / 100
+        
+        # Kasa bakiyesini artır
+        await db.cash_accounts.update_one(
+            {"id": cash_account_id},
+            {"$inc": {"current_balance": net_amount}}
+        )
+        
+        # Eğer komisyon tutarı varsa ve kredi kartı ödemesi ise, gider olarak kaydet
+        if commission_amount > 0 and payment_method == "credit_card" and cari_id:
+            # "Banka Komisyonu" kategorisini bul veya oluştur
+            expense_category = await db.expense_categories.find_one({
+                "company_id": current_user["company_id"],
+                "name": "Banka Komisyonu"
+            }, {"_id": 0})
+            
+            if not expense_category:
+                # Kategori yoksa oluştur
+                expense_category_id = str(uuid.uuid4())
+                expense_category_doc = {
+                    "id": expense_category_id,
+                    "company_id": current_user["company_id"],
+                    "name": "Banka Komisyonu",
+                    "description": "Banka komisyon giderleri",
+                    "is_active": True,
+                    "created_at": datetime.now(timezone.utc).isoformat()
+                }
+                await db.expense_categories.insert_one(expense_category_doc)
+            else:
+                expense_category_id = expense_category["id"]
+            
+            # Aynı transaction için daha önce gider kaydı oluşturulmuş mu kontrol et
+            existing_expense = await db.expenses.find_one({
+                "company_id": current_user["company_id"],
+                "reference_type": "commission",
+                "reference_id": transaction["id"]
+            })
+            
+            if not existing_expense:
+                # Gider kaydı oluştur
+                expense_doc = {
+                    "id": str(uuid.uuid4()),
+                    "company_id": current_user["company_id"],
+                    "cari_id": cari_id,
+                    "expense_category_id": expense_category_id,
+                    "description": f"Banka komisyonu - {transaction.get('description', 'Kredi kartı komisyonu')}",
+                    "amount": commission_amount,
+                    "currency": transaction.get("currency", "TRY"),
+                    "exchange_rate": transaction.get("exchange_rate", 1.0),
+                    "date": transaction.get("date", date),
+                    "notes": f"Valör süresi dolan kredi kartı ödemesi komisyonu - Transaction ID: {transaction['id']}",
+                    "reference_type": "commission",
+                    "reference_id": transaction["id"],
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "created_by": current_user["user_id"]
+                }
+                await db.expenses.insert_one(expense_doc)
+                await sync_cash_position(db, "expenses", None, expense_doc)
+        
+        # Transaction'ı işaretle
+        await db.transactions.update_one(
+            {"id": transaction["id"]},
+            {"$set": {
+                "is_settled": True,
+                "settled_at": datetime.now(timezone.utc).isoformat()
+            }}
+        )
+        
+        processed.append({
+            "transaction_id": transaction["id"],
+            "amount": net_amount,
+            "currency": transaction.get("currency", "TRY")
+        })
+    
+    return {
+        "message": f"{len(processed)} tutar yerleştirildi",
+        "processed": processed
+    }
+
+# ==================== CASH ====================
+
+@router.get("/cash")
+async def get_cash(current_user: dict = Depends(get_current_user)):
+    """Kasa bakiyeleri - cash_positions dokümanından (yazım yollarında $inc ile güncellenir)"""
+    balance = await get_cash_position(db, current_user["company_id"])
+    return {"balance": balance}
+
+@router.get("/cash/position-drift")
+async def get_cash_position_drift(
+    tolerance: float = 0.01,
+    current_user: dict = Depends(get_current_user)
+):
+    """Kayıtlı kasa pozisyonunu tüm geçmişten hesaplananla karşılaştır - düzeltme yapmaz"""
+    drifted = await reconcile_cash_positions(db, current_user["company_id"], tolerance=tolerance, fix=False)
+    return {
+        "drifted": bool(drifted),
+        "difference": drifted[0]["difference"] if drifted else None
+    }
+
+@router.delete("/cash/exchange/{exchange_id}")
+async def delete_exchange(exchange_id: str, current_user: dict = Depends(get_current_user)):
+    """Döviz işlemini sil"""
+    # Exchange ID'ye sahip tüm transaction'ları bul
+    transactions = await db.transactions.find({
+        "company_id": current_user["company_id"],
+        "reference_id": exchange_id,
+        "reference_type": "currency_exchange"
+    }).to_list(10)
+    
+    if not transactions:
+        raise HTTPException(status_code=404, detail="Exchange transaction not found")
+    
+    # Tüm transaction'ları sil
+    result = await db.transactions.delete_many({
+        "company_id": current_user["company_id"],
+        "reference_id": exchange_id,
+        "reference_type": "currency_exchange"
+    })
+    await invalidate_checkpoints(db, [t.get("cari_id") for t in transactions])
+    for transaction in transactions:
+        await sync_cash_position(db, "transactions", transaction, None)
+    
+    return {"message": "Exchange transaction deleted", "deleted_count": result.deleted_count}
+
+@router.get("/cash/statistics")
+async def get_cash_statistics(current_user: dict = Depends(get_current_user)):
+    """Kasa istatistiklerini getir"""
+    # Kasa bakiyelerini al
+    cash_response = await get_cash(current_user)
+    balance = cash_response["balance"]
+    
+    # Güncel kurları al (currency/rates endpoint'inden)
+    try:
+        rates_response = await db.companies.find_one({"id": current_user["company_id"]}, {"_id": 0})
+        rates = {
+            "EUR": rates_response.get("currency_rates", {}).get("EUR", 1.0) if rates_response.get("currency_rates") else 1.0,
+            "USD": rates_response.get("currency_rates", {}).get("USD", 35.0) if rates_response.get("currency_rates") else 35.0,
+            "TRY": 1.0
+        }
+    except:
+        rates = {"EUR": 1.0, "USD": 35.0, "TRY": 1.0}
+    
+    # TRY değerlerini hesapla
+    eur_try_value = balance["EUR"] * (rates.get("EUR", 1.0) if rates.get("EUR") else 1.0)
+    usd_try_value = balance["USD"] * (rates.get("USD", 35.0) if rates.get("USD") else 35.0)
+    try_value = balance["TRY"]
+    
+    total_try_value = eur_try_value + usd_try_value + try_value
+    
+    # Para birimi dağılımı
+    distribution = {}
+    if total_try_value > 0:
+        distribution["EUR"] = (eur_try_value / total_try_value) * 100
+        distribution["USD"] = (usd_try_value / total_try_value) * 100
+        distribution["TRY"] = (try_value / total_try_value) * 100
+    else:
+        distribution = {"EUR": 0, "USD": 0, "TRY": 0}
+    
+    return {
+        "balance": balance,
+        "try_values": {
+            "EUR": eur_try_value,
+            "USD": usd_try_value,
+            "TRY": try_value
+        },
+        "total_try_value": total_try_value,
+        "distribution": distribution,
+        "rates": rates
+    }
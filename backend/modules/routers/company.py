@@ -0,0 +1,135 @@
+"""
+Company profile and logo endpoints.
+"""
+import base64
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+
+from ..auth import get_current_user
+from ..database import db
+from ..reference_data import invalidate_reference_cache
+
+# backend/ - logo dosyaları backend/uploads/logos altında
+ROOT_DIR = Path(__file__).parent.parent.parent
+
+router = APIRouter(tags=["company"])
+
+# ==================== COMPANY PROFILE ENDPOINTS ====================
+
+@router.get("/company/profile")
+async def get_company_profile(current_user: dict = Depends(get_current_user)):
+    """Firma profil bilgilerini getir"""
+    company = await db.companies.find_one({"id": current_user["company_id"]}, {"_id": 0})
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    return company
+
+@router.put("/company/profile")
+async def update_company_profile(data: dict, current_user: dict = Depends(get_current_user)):
+    """Firma profil bilgilerini güncelle (sadece değiştirilebilir alanlar)"""
+    company = await db.companies.find_one({"id": current_user["company_id"]})
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    # Sadece değiştirilebilir alanları güncelle
+    update_data = {}
+    if "website" in data:
+        update_data["website"] = data["website"]
+    if "social_media" in data:
+        update_data["social_media"] = data["social_media"]
+    if "bank_info" in data:
+        update_data["bank_info"] = data["bank_info"]
+    
+    if update_data:
+        await db.companies.update_one(
+            {"id": current_user["company_id"]},
+            {"$set": update_data}
+        )
+        invalidate_reference_cache(current_user["company_id"], "company")
+    
+    # Güncellenmiş firmayı getir
+    updated_company = await db.companies.find_one({"id": current_user["company_id"]}, {"_id": 0})
+    return updated_company
+
+@router.post("/company/logo")
+async def upload_company_logo(
+    file: UploadFile = File(...),
+    current_user: dict = Depends(get_current_user)
+):
+    """Firma logosunu yükle"""
+    # Logo klasörünü oluştur
+    logo_dir = ROOT_DIR / "uploads" / "logos"
+    logo_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Dosya uzantısını kontrol et
+    allowed_extensions = {".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp"}
+    file_ext = Path(file.filename).suffix.lower()
+    if file_ext not in allowed_extensions:
+        raise HTTPException(status_code=400, detail="Invalid file type. Allowed: PNG, JPG, JPEG, GIF, SVG, WEBP")
+    
+    # Dosya boyutunu kontrol et (max 5MB)
+    file_content = await file.read()
+    if len(file_content) > 5 * 1024 * 1024:
+        raise HTTPException(status_code=400, detail="File size too large. Maximum 5MB")
+    
+    # Dosyayı kaydet
+    company_id = current_user["company_id"]
+    logo_filename = f"{company_id}{file_ext}"
+    logo_path = logo_dir / logo_filename
+    
+    # Eski logoyu sil (varsa)
+    for ext in allowed_extensions:
+        old_logo = logo_dir / f"{company_id}{ext}"
+        if old_logo.exists():
+            old_logo.unlink()
+    
+    # Yeni logoyu kaydet
+    with open(logo_path, "wb") as f:
+        f.write(file_content)
+    
+    # Logo URL'ini oluştur (base64 veya file path)
+    # Base64 formatında döndür (PDF'lerde kullanmak için)
+    logo_base64 = base64.b64encode(file_content).decode('utf-8')
+    logo_data_url = f"data:{file.content_type};base64,{logo_base64}"
+    
+    # Company'ye logo bilgisini ekle
+    await db.companies.update_one(
+        {"id": company_id},
+        {"$set": {
+            "logo": logo_data_url,
+            "logo_filename": logo_filename,
+            "logo_path": str(logo_path.relative_to(ROOT_DIR))
+        }}
+    )
+    invalidate_reference_cache(company_id, "company")
+    
+    return {
+        "message": "Logo uploaded successfully",
+        "logo": logo_data_url,
+        "filename": logo_filename
+    }
+
+@router.delete("/company/logo")
+async def delete_company_logo(current_user: dict = Depends(get_current_user)):
+    """Firma logosunu sil"""
+    company = await db.companies.find_one({"id": current_user["company_id"]})
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    # Logo dosyasını sil
+    logo_path = company.get("logo_path")
+    if logo_path:
+        full_path = ROOT_DIR / logo_path
+        if full_path.exists():
+            full_path.unlink()
+    
+    # Company'den logo bilgisini kaldır
+    await db.companies.update_one(
+        {"id": current_user["company_id"]},
+        {"$unset": {"logo": "", "logo_filename": "", "logo_path": ""}}
+    )
+    invalidate_reference_cache(current_user["company_id"], "company")
+    
+    return {"message": "Logo deleted successfully"}
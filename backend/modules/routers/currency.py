@@ -0,0 +1,316 @@
+"""
+Company currency rate endpoints.
+"""
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from ..audit import create_activity_log
+from ..auth import get_current_user
+from ..currency_rates import currency_rate_service
+from ..database import db
+from ..reference_data import get_company_cached, invalidate_reference_cache
+
+router = APIRouter(tags=["currency"])
+
+# ==================== CURRENCY ENDPOINT ====================
+
+@router.get("/currency/rates")
+async def get_currency_rates(current_user: dict = Depends(get_current_user)):
+    """Mevcut sistem döviz kurlarını getir"""
+    company = await get_company_cached(current_user["company_id"])
+    
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    rates = company.get("currency_rates", {})
+    
+    # Varsayılan değerler
+    default_rates = {"TRY": 1.0, "EUR": 35.0, "USD": 34.0}
+    for currency in ["EUR", "USD", "TRY"]:
+        if currency not in rates:
+            rates[currency] = default_rates.get(currency, 1.0)
+    
+    return {
+        "rates": rates,
+        "locked": company.get("currency_rates_locked", False),
+        "last_updated": company.get("currency_rates_last_updated"),
+        "source": company.get("currency_rates_source", "manual"),
+        "base_currency": "TRY"
+    }
+
+@router.get("/currency/rates/header")
+async def get_header_currency_rates(current_user: dict = Depends(get_current_user)):
+    """Header döviz çevirici kurlarını getir"""
+    company = await get_company_cached(current_user["company_id"])
+    
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    rates = company.get("header_currency_rates", {})
+    
+    # Varsayılan değerler (sistem kurlarından kopyala veya varsayılan)
+    if not rates:
+        system_rates = company.get("currency_rates", {})
+        rates = system_rates.copy() if system_rates else {"TRY": 1.0, "EUR": 35.0, "USD": 34.0}
+    
+    default_rates = {"TRY": 1.0, "EUR": 35.0, "USD": 34.0}
+    for currency in ["EUR", "USD", "TRY"]:
+        if currency not in rates:
+            rates[currency] = default_rates.get(currency, 1.0)
+    
+    return {
+        "rates": rates,
+        "locked": company.get("header_currency_rates_locked", False),
+        "last_updated": company.get("header_currency_rates_last_updated"),
+        "source": company.get("header_currency_rates_source", "manual"),
+        "base_currency": "TRY"
+    }
+
+@router.get("/currency/rates/tcmb")
+async def get_tcmb_rates(current_user: dict = Depends(get_current_user)):
+    """Merkez Bankası kurlarını getir (güncelleme için) - zamanlanmış job'ın bellekteki son versiyonu"""
+    return await currency_rate_service.current(db)
+
+@router.get("/busy-hour-threshold")
+async def get_busy_hour_threshold(current_user: dict = Depends(get_current_user)):
+    """Yoğun saat eşiğini getir"""
+    company = await get_company_cached(current_user["company_id"])
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    # Varsayılan değer: 5 ATV
+    threshold = company.get("busy_hour_threshold", 5)
+    
+    return {
+        "threshold": threshold,
+        "message": "Busy hour threshold retrieved successfully"
+    }
+
+@router.put("/busy-hour-threshold")
+async def update_busy_hour_threshold(
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Yoğun saat eşiğini güncelle"""
+    company_id = current_user["company_id"]
+    threshold = data.get("threshold", 5)
+    
+    # Threshold'u integer'a çevir (tam sayı olmalı)
+    try:
+        threshold = int(float(threshold))  # Önce float'a çevir sonra int'e (ondalıklı sayıları da kabul eder)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Threshold must be a valid number")
+    
+    # Threshold değerini pozitif tam sayı olarak kontrol et (minimum 1)
+    if threshold < 1:
+        raise HTTPException(status_code=400, detail="Threshold must be 1 or greater (must be an integer)")
+    
+    await db.companies.update_one(
+        {"id": company_id},
+        {"$set": {"busy_hour_threshold": threshold}}
+    )
+    invalidate_reference_cache(company_id, "company")
+    
+    # Activity log
+    await create_activity_log(
+        company_id=company_id,
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="update",
+        entity_type="busy_hour_threshold",
+        entity_id=company_id,
+        entity_name="Busy Hour Threshold",
+        description=f"Yoğun saat eşiği güncellendi: {threshold}"
+    )
+    
+    return {
+        "threshold": threshold,
+        "message": "Busy hour threshold updated successfully"
+    }
+
+@router.put("/currency/rates")
+async def update_currency_rates(
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Sistem döviz kurlarını güncelle (manuel veya otomatik)"""
+    company_id = current_user["company_id"]
+    
+    rates = data.get("rates", {})
+    locked = data.get("locked")
+    source = data.get("source")
+    
+    update_data = {
+        "currency_rates": rates,
+        "currency_rates_last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+    
+    if locked is not None:
+        update_data["currency_rates_locked"] = locked
+    
+    if source:
+        update_data["currency_rates_source"] = source
+    
+    await db.companies.update_one(
+        {"id": company_id},
+        {"$set": update_data}
+    )
+    invalidate_reference_cache(company_id, "company")
+    
+    # Activity log
+    await create_activity_log(
+        company_id=company_id,
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="update",
+        entity_type="currency_rates",
+        entity_id="currency_rates",
+        entity_name="Sistem Döviz Kurları",
+        description=f"Sistem kurları güncellendi: {source or 'manuel'}",
+        changes={"rates": rates, "locked": locked, "source": source}
+    )
+    
+    return {"message": "Sistem kurları güncellendi", "rates": rates}
+
+@router.put("/currency/rates/header")
+async def update_header_currency_rates(
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Header döviz çevirici kurlarını güncelle"""
+    company_id = current_user["company_id"]
+    
+    rates = data.get("rates", {})
+    locked = data.get("locked")
+    source = data.get("source")
+    
+    update_data = {
+        "header_currency_rates": rates,
+        "header_currency_rates_last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+    
+    if locked is not None:
+        update_data["header_currency_rates_locked"] = locked
+    
+    if source:
+        update_data["header_currency_rates_source"] = source
+    
+    await db.companies.update_one(
+        {"id": company_id},
+        {"$set": update_data}
+    )
+    invalidate_reference_cache(company_id, "company")
+    
+    # Activity log
+    await create_activity_log(
+        company_id=company_id,
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="update",
+        entity_type="header_currency_rates",
+        entity_id="header_currency_rates",
+        entity_name="Döviz Çevirici Kurları",
+        description=f"Döviz çevirici kurları güncellendi: {source or 'manuel'}",
+        changes={"rates": rates, "locked": locked, "source": source}
+    )
+    
+    return {"message": "Döviz çevirici kurları güncellendi", "rates": rates}
+
+@router.post("/currency/rates/refresh")
+async def refresh_currency_rates(current_user: dict = Depends(get_current_user)):
+    """Merkez Bankası kurları ile sistem kurlarını güncelle"""
+    company_id = current_user["company_id"]
+    
+    # Zamanlanmış job'ın son çektiği kurlar; zamanlama kapalıysa (veya henüz kur yoksa) şimdi çekilir
+    tcmb_data = await currency_rate_service.current(db, refresh=True)
+    
+    if not tcmb_data.get("success"):
+        raise HTTPException(status_code=500, detail="TCMB kurları alınamadı")
+    
+    rates = tcmb_data["rates"]
+    source = tcmb_data["source"]
+    
+    # Company'yi güncelle
+    await db.companies.update_one(
+        {"id": company_id},
+        {"$set": {
+            "currency_rates": rates,
+            "currency_rates_locked": False,  # Otomatik güncellemede kilidi kaldır
+            "currency_rates_source": source,
+            "currency_rates_version": tcmb_data["version"],
+            "currency_rates_last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }}
+    )
+    invalidate_reference_cache(company_id, "company")
+    
+    # Activity log
+    await create_activity_log(
+        company_id=company_id,
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="update",
+        entity_type="currency_rates",
+        entity_id="currency_rates",
+        entity_name="Sistem Döviz Kurları",
+        description="Sistem kurları Merkez Bankası kurları ile güncellendi",
+        changes={"rates": rates, "source": source, "version": tcmb_data["version"]},
+        current_user=current_user
+    )
+    
+    return {
+        "message": "Sistem kurları Merkez Bankası kurları ile güncellendi",
+        "rates": rates,
+        "source": source
+    }
+
+@router.post("/currency/rates/header/refresh")
+async def refresh_header_currency_rates(current_user: dict = Depends(get_current_user)):
+    """Merkez Bankası kurları ile header çevirici kurlarını güncelle"""
+    company_id = current_user["company_id"]
+    
+    # Zamanlanmış job'ın son çektiği kurlar; zamanlama kapalıysa (veya henüz kur yoksa) şimdi çekilir
+    tcmb_data = await currency_rate_service.current(db, refresh=True)
+    
+    if not tcmb_data.get("success"):
+        raise HTTPException(status_code=500, detail="TCMB kurları alınamadı")
+    
+    rates = tcmb_data["rates"]
+    source = tcmb_data["source"]
+    
+    # Company'yi güncelle
+    await db.companies.update_one(
+        {"id": company_id},
+        {"$set": {
+            "header_currency_rates": rates,
+            "header_currency_rates_locked": False,
+            "header_currency_rates_source": source,
+            "header_currency_rates_last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }}
+    )
+    invalidate_reference_cache(company_id, "company")
+    
+    # Activity log
+    await create_activity_log(
+        company_id=company_id,
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="update",
+        entity_type="header_currency_rates",
+        entity_id="header_currency_rates",
+        entity_name="Döviz Çevirici Kurları",
+        description="Döviz çevirici kurları Merkez Bankası kurları ile güncellendi",
+        changes={"rates": rates, "source": source, "version": tcmb_data["version"]},
+        current_user=current_user
+    )
+    
+    return {
+        "message": "Döviz çevirici kurları Merkez Bankası kurları ile güncellendi",
+        "rates": rates,
+        "source": source
+    }
@@ -0,0 +1,939 @@
+"""
+Definition endpoints: tour types, payment types, vehicle categories,
+seasonal prices, banks, bank accounts and cash accounts.
+"""
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from ..audit import create_activity_log
+from ..auth import get_current_cari, get_current_user
+from ..database import db
+from ..lookups import collect_ids, prefetch_by_ids
+from ..models import Bank, BankAccount, CashAccount, PaymentType, SeasonalPrice, TourType, VehicleCategory
+from ..pricing import invalidate_price_index
+from ..reference_data import (
+    get_bank_accounts_cached, get_payment_types_cached, get_tour_types_cached,
+    get_vehicle_categories_cached, invalidate_reference_cache
+)
+
+router = APIRouter(tags=["definitions"])
+
+# ==================== TOUR TYPES ====================
+
+@router.get("/tour-types", response_model=List[TourType])
+async def get_tour_types(current_user: dict = Depends(get_current_user)):
+    return await get_tour_types_cached(current_user["company_id"])
+
+@router.get("/cari/tour-types", response_model=List[TourType])
+async def cari_get_tour_types(current_cari: dict = Depends(get_current_cari)):
+    """Cari kullanıcıları için tour types"""
+    return await get_tour_types_cached(current_cari["company_id"])
+
+@router.post("/tour-types", response_model=TourType)
+async def create_tour_type(data: dict, current_user: dict = Depends(get_current_user)):
+    tour_type = TourType(
+        company_id=current_user["company_id"],
+        name=data.get("name"),
+        duration_hours=data.get("duration_hours", 0),
+        description=data.get("description"),
+        order=data.get("order", 0),
+        color=data.get("color"),
+        icon=data.get("icon"),
+        is_active=data.get("is_active", True),
+        pricing_model=data.get("pricing_model", "vehicle_based")
+    )
+    tour_type_doc = tour_type.model_dump()
+    await db.tour_types.insert_one(tour_type_doc)
+    invalidate_reference_cache(current_user["company_id"], "tour_types")
+    return tour_type
+
+@router.put("/tour-types/{tour_type_id}")
+async def update_tour_type(tour_type_id: str, data: dict, current_user: dict = Depends(get_current_user)):
+    result = await db.tour_types.update_one(
+        {"id": tour_type_id, "company_id": current_user["company_id"]},
+        {"$set": data}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Tour type not found")
+    invalidate_reference_cache(current_user["company_id"], "tour_types")
+    return {"message": "Tour type updated"}
+
+@router.get("/tour-types/{tour_type_id}/statistics")
+async def get_tour_type_statistics(tour_type_id: str, current_user: dict = Depends(get_current_user)):
+    """Tur tipi istatistiklerini getir"""
+    reservations = await db.reservations.find({
+        "company_id": current_user["company_id"],
+        "tour_type_id": tour_type_id,
+        "status": {"$ne": "cancelled"}
+    }, {"_id": 0}).to_list(10000)
+    
+    total_reservations = len(reservations)
+    total_revenue = {"EUR": 0.0, "USD": 0.0, "TRY": 0.0}
+    
+    for r in reservations:
+        if r.get("price") and r.get("currency"):
+            total_revenue[r["currency"]] += r.get("price", 0)
+    
+    return {
+        "tour_type_id": tour_type_id,
+        "total_reservations": total_reservations,
+        "total_revenue": total_revenue
+    }
+
+@router.delete("/tour-types/{tour_type_id}")
+async def delete_tour_type(tour_type_id: str, current_user: dict = Depends(get_current_user)):
+    result = await db.tour_types.delete_one({"id": tour_type_id, "company_id": current_user["company_id"]})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Tour type not found")
+    invalidate_reference_cache(current_user["company_id"], "tour_types")
+    return {"message": "Tour type deleted"}
+
+# ==================== PAYMENT TYPES ====================
+
+async def initialize_default_payment_types(company_id: str):
+    """Şirket oluşturulduğunda default ödeme tipleri ekle"""
+    default_types = [
+        {
+            "name": "Nakit",
+            "code": "cash",
+            "description": "Nakit ödeme",
+            "is_active": True,
+            "requires_bank_account": False,
+            "requires_credit_card": False,
+            "allows_transfer_to_cari": False,
+            "requires_due_date": False,
+            "is_settlement": False,
+            "order": 1
+        },
+        {
+            "name": "Kredi Kartı",
+            "code": "credit_card",
+            "description": "Kredi kartı ile ödeme",
+            "is_active": True,
+            "requires_bank_account": True,
+            "requires_credit_card": True,
+            "allows_transfer_to_cari": False,
+            "requires_due_date": False,
+            "is_settlement": False,
+            "order": 2
+        },
+        {
+            "name": "Havale",
+            "code": "bank_transfer",
+            "description": "Banka havalesi ile ödeme",
+            "is_active": True,
+            "requires_bank_account": True,
+            "requires_credit_card": False,
+            "allows_transfer_to_cari": False,
+            "requires_due_date": False,
+            "is_settlement": False,
+            "order": 3
+        },
+        {
+            "name": "Cariye Aktar",
+            "code": "transfer_to_cari",
+            "description": "Tutar cari hesaba aktarılır",
+            "is_active": True,
+            "requires_bank_account": False,
+            "requires_credit_card": False,
+            "allows_transfer_to_cari": True,
+            "requires_due_date": False,
+            "is_settlement": False,
+            "order": 4
+        },
+        {
+            "name": "Çek/Senet",
+            "code": "check_promissory",
+            "description": "Çek veya senet ile ödeme",
+            "is_active": True,
+            "requires_bank_account": False,
+            "requires_credit_card": False,
+            "allows_transfer_to_cari": False,
+            "requires_due_date": True,
+            "is_settlement": False,
+            "order": 5
+        },
+        {
+            "name": "Mahsup",
+            "code": "write_off",
+            "description": "Mahsup işlemi (kur farkı vb.)",
+            "is_active": True,
+            "requires_bank_account": False,
+            "requires_credit_card": False,
+            "allows_transfer_to_cari": False,
+            "requires_due_date": False,
+            "is_settlement": True,
+            "order": 6
+        },
+        {
+            "name": "Online Ödeme",
+            "code": "online_payment",
+            "description": "Online ödeme sistemi",
+            "is_active": True,
+            "requires_bank_account": True,
+            "requires_credit_card": True,
+            "allows_transfer_to_cari": False,
+            "requires_due_date": False,
+            "is_settlement": False,
+            "order": 7
+        },
+        {
+            "name": "Mail Order",
+            "code": "mail_order",
+            "description": "Mail order ile ödeme",
+            "is_active": True,
+            "requires_bank_account": True,
+            "requires_credit_card": True,
+            "allows_transfer_to_cari": False,
+            "requires_due_date": False,
+            "is_settlement": False,
+            "order": 8
+        }
+    ]
+    
+    for payment_type_data in default_types:
+        # Zaten var mı kontrol et
+        existing = await db.payment_types.find_one({
+            "company_id": company_id,
+            "code": payment_type_data["code"]
+        })
+        
+        if not existing:
+            payment_type = PaymentType(
+                company_id=company_id,
+                **payment_type_data
+            )
+            payment_type_doc = payment_type.model_dump()
+            payment_type_doc['created_at'] = payment_type_doc['created_at'].isoformat()
+            await db.payment_types.insert_one(payment_type_doc)
+    
+    invalidate_reference_cache(company_id, "payment_types")
+
+@router.get("/payment-types")
+async def get_payment_types(
+    active_only: bool = True,
+    current_user: dict = Depends(get_current_user)
+):
+    """Ödeme tiplerini getir"""
+    payment_types = await get_payment_types_cached(current_user["company_id"])
+    if active_only:
+        payment_types = [pt for pt in payment_types if pt.get("is_active") is True]
+    return payment_types
+
+@router.post("/payment-types")
+async def create_payment_type(data: dict, current_user: dict = Depends(get_current_user)):
+    """Yeni ödeme tipi oluştur - Sadece özel tipler için"""
+    # Code kontrolü - default tipler oluşturulamaz
+    default_codes = ["cash", "credit_card", "bank_transfer", "transfer_to_cari", "check_promissory", "write_off", "online_payment", "mail_order"]
+    if data.get("code") in default_codes:
+        raise HTTPException(status_code=400, detail="Bu ödeme tipi default olarak sistemde mevcuttur")
+    
+    payment_type = PaymentType(
+        company_id=current_user["company_id"],
+        name=data.get("name"),
+        code=data.get("code", data.get("name", "").lower().replace(" ", "_")),
+        description=data.get("description"),
+        is_active=data.get("is_active", True),
+        requires_bank_account=data.get("requires_bank_account", False),
+        requires_credit_card=data.get("requires_credit_card", False),
+        allows_transfer_to_cari=data.get("allows_transfer_to_cari", False),
+        requires_due_date=data.get("requires_due_date", False),
+        is_settlement=data.get("is_settlement", False),
+        order=data.get("order", 0)
+    )
+    payment_type_doc = payment_type.model_dump()
+    payment_type_doc['created_at'] = payment_type_doc['created_at'].isoformat()
+    await db.payment_types.insert_one(payment_type_doc)
+    invalidate_reference_cache(current_user["company_id"], "payment_types")
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="create",
+        entity_type="payment_type",
+        entity_id=payment_type.id,
+        entity_name=payment_type.name,
+        description=f"Yeni ödeme tipi oluşturuldu: {payment_type.name}",
+        changes=data,
+        ip_address=current_user.get("ip_address")
+    )
+    
+    return payment_type
+
+@router.put("/payment-types/{payment_type_id}")
+async def update_payment_type(
+    payment_type_id: str,
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Ödeme tipini güncelle - Sadece aktif/pasif durumu değiştirilebilir"""
+    existing = await db.payment_types.find_one({
+        "id": payment_type_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if not existing:
+        raise HTTPException(status_code=404, detail="Payment type not found")
+    
+    # Sadece is_active alanını güncelle
+    allowed_fields = ["is_active"]
+    update_data = {k: v for k, v in data.items() if k in allowed_fields}
+    
+    if not update_data:
+        raise HTTPException(status_code=400, detail="Sadece is_active alanı güncellenebilir")
+    
+    result = await db.payment_types.update_one(
+        {"id": payment_type_id, "company_id": current_user["company_id"]},
+        {"$set": update_data}
+    )
+    invalidate_reference_cache(current_user["company_id"], "payment_types")
+    
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Payment type not found")
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="update",
+        entity_type="payment_type",
+        entity_id=payment_type_id,
+        entity_name=existing.get("name", "Ödeme Tipi"),
+        description=f"Ödeme tipi güncellendi: {existing.get('name', '')} - Aktif: {update_data.get('is_active', existing.get('is_active'))}",
+        changes=update_data,
+        ip_address=current_user.get("ip_address")
+    )
+    
+    return {"message": "Payment type updated"}
+
+@router.get("/payment-types/{payment_type_id}/statistics")
+async def get_payment_type_statistics(payment_type_id: str, current_user: dict = Depends(get_current_user)):
+    """Ödeme tipi istatistiklerini getir"""
+    transactions = await db.transactions.find({
+        "company_id": current_user["company_id"],
+        "payment_type_id": payment_type_id,
+        "transaction_type": "payment"
+    }, {"_id": 0}).to_list(10000)
+    
+    total_usage = len(transactions)
+    total_amount = {"EUR": 0.0, "USD": 0.0, "TRY": 0.0}
+    
+    for t in transactions:
+        if t.get("amount") and t.get("currency"):
+            amount = abs(t.get("amount", 0))
+            total_amount[t["currency"]] += amount
+    
+    return {
+        "payment_type_id": payment_type_id,
+        "total_usage": total_usage,
+        "total_amount": total_amount
+    }
+
+@router.delete("/payment-types/{payment_type_id}")
+async def delete_payment_type(payment_type_id: str, current_user: dict = Depends(get_current_user)):
+    """Ödeme tipini sil - Default tipler silinemez"""
+    existing = await db.payment_types.find_one({
+        "id": payment_type_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if not existing:
+        raise HTTPException(status_code=404, detail="Payment type not found")
+    
+    # Default tipler silinemez
+    default_codes = ["cash", "credit_card", "bank_transfer", "transfer_to_cari", "check_promissory", "write_off", "online_payment", "mail_order"]
+    if existing.get("code") in default_codes:
+        raise HTTPException(status_code=400, detail="Default ödeme tipleri silinemez. Sadece pasif yapılabilir.")
+    
+    result = await db.payment_types.delete_one({
+        "id": payment_type_id,
+        "company_id": current_user["company_id"]
+    })
+    invalidate_reference_cache(current_user["company_id"], "payment_types")
+    
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Payment type not found")
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="delete",
+        entity_type="payment_type",
+        entity_id=payment_type_id,
+        entity_name=existing.get("name", "Ödeme Tipi"),
+        description=f"Ödeme tipi silindi: {existing.get('name', '')}",
+        current_user=current_user
+    )
+    
+    return {"message": "Payment type deleted"}
+
+# ==================== SEASONAL PRICES ====================
+
+@router.get("/seasonal-prices")
+async def get_seasonal_prices(current_user: dict = Depends(get_current_user)):
+    prices = await db.seasonal_prices.find({"company_id": current_user["company_id"]}, {"_id": 0}).sort("start_date", -1).to_list(1000)
+    return prices
+
+@router.post("/seasonal-prices")
+async def create_seasonal_price(data: dict, current_user: dict = Depends(get_current_user)):
+    """Yeni fiyat oluştur"""
+    try:
+        # Gerekli alanları kontrol et
+        if not data.get("start_date") or not data.get("end_date"):
+            raise HTTPException(status_code=400, detail="Başlangıç ve bitiş tarihi gereklidir")
+        
+        if not data.get("cari_prices") or len(data.get("cari_prices", {})) == 0:
+            raise HTTPException(status_code=400, detail="En az bir cari hesap seçilmelidir")
+        
+        price = SeasonalPrice(
+            company_id=current_user["company_id"],
+            created_by=current_user["user_id"],
+            **data
+        )
+        price_doc = price.model_dump()
+        price_doc['created_at'] = price_doc['created_at'].isoformat()
+        await db.seasonal_prices.insert_one(price_doc)
+        invalidate_price_index(current_user["company_id"])
+        
+        # Activity log
+        await create_activity_log(
+            company_id=current_user["company_id"],
+            user_id=current_user["user_id"],
+            username=current_user.get("username", ""),
+            full_name=current_user.get("full_name", ""),
+            action="create",
+            entity_type="seasonal_price",
+            entity_id=price.id,
+            entity_name=f"Fiyat ({price.start_date} - {price.end_date})",
+            description=f"Yeni fiyat oluşturuldu: {price.start_date} - {price.end_date}",
+            changes=data
+        )
+        
+        return price
+    except Exception as e:
+        if isinstance(e, HTTPException):
+            raise e
+        raise HTTPException(status_code=500, detail="Fiyat oluşturulamadı")
+
+@router.put("/seasonal-prices/{price_id}")
+async def update_seasonal_price(price_id: str, data: dict, current_user: dict = Depends(get_current_user)):
+    """Fiyat güncelle"""
+    try:
+        # Mevcut fiyatı kontrol et
+        existing = await db.seasonal_prices.find_one({
+            "id": price_id,
+            "company_id": current_user["company_id"]
+        })
+        
+        if not existing:
+            raise HTTPException(status_code=404, detail="Fiyat bulunamadı")
+        
+        # Gerekli alanları kontrol et
+        if not data.get("start_date") or not data.get("end_date"):
+            raise HTTPException(status_code=400, detail="Başlangıç ve bitiş tarihi gereklidir")
+        
+        if not data.get("cari_prices") or len(data.get("cari_prices", {})) == 0:
+            raise HTTPException(status_code=400, detail="En az bir cari hesap seçilmelidir")
+        
+        # Güncelleme
+        data["updated_at"] = datetime.now(timezone.utc).isoformat()
+        result = await db.seasonal_prices.update_one(
+            {"id": price_id, "company_id": current_user["company_id"]},
+            {"$set": data}
+        )
+        
+        if result.matched_count == 0:
+            raise HTTPException(status_code=404, detail="Fiyat bulunamadı")
+        invalidate_price_index(current_user["company_id"])
+        
+        # Activity log
+        await create_activity_log(
+            company_id=current_user["company_id"],
+            user_id=current_user["user_id"],
+            username=current_user.get("username", ""),
+            full_name=current_user.get("full_name", ""),
+            action="update",
+            entity_type="seasonal_price",
+            entity_id=price_id,
+            entity_name=f"Fiyat ({data.get('start_date')} - {data.get('end_date')})",
+            description=f"Fiyat güncellendi: {data.get('start_date')} - {data.get('end_date')}",
+            changes=data
+        )
+        
+        return {"message": "Fiyat güncellendi", "id": price_id}
+    except Exception as e:
+        if isinstance(e, HTTPException):
+            raise e
+        raise HTTPException(status_code=500, detail="Fiyat güncellenemedi")
+
+@router.delete("/seasonal-prices/{price_id}")
+async def delete_seasonal_price(price_id: str, current_user: dict = Depends(get_current_user)):
+    """Fiyat sil"""
+    result = await db.seasonal_prices.delete_one({"id": price_id, "company_id": current_user["company_id"]})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Fiyat bulunamadı")
+    invalidate_price_index(current_user["company_id"])
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="delete",
+        entity_type="seasonal_price",
+        entity_id=price_id,
+        entity_name="Fiyat",
+        description="Fiyat silindi"
+    )
+    
+    return {"message": "Fiyat silindi"}
+
+# ==================== VEHICLE CATEGORIES ====================
+
+@router.get("/vehicle-categories")
+async def get_vehicle_categories(current_user: dict = Depends(get_current_user)):
+    """Araç kategorilerini getir"""
+    categories = await get_vehicle_categories_cached(current_user["company_id"])
+    return [category for category in categories if category.get("is_active") is True]
+
+@router.post("/vehicle-categories")
+async def create_vehicle_category(
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Yeni araç kategorisi oluştur"""
+    category = VehicleCategory(company_id=current_user["company_id"], **data)
+    category_doc = category.model_dump()
+    category_doc['created_at'] = category_doc['created_at'].isoformat()
+    await db.vehicle_categories.insert_one(category_doc)
+    invalidate_reference_cache(current_user["company_id"], "vehicle_categories")
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="create",
+        entity_type="vehicle_category",
+        entity_id=category.id,
+        entity_name=category.name,
+        description=f"Yeni araç kategorisi oluşturuldu: {category.name}",
+        changes=data
+    )
+    
+    return category
+
+@router.put("/vehicle-categories/{category_id}")
+async def update_vehicle_category(
+    category_id: str,
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Araç kategorisini güncelle"""
+    existing = await db.vehicle_categories.find_one({
+        "id": category_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if not existing:
+        raise HTTPException(status_code=404, detail="Kategori bulunamadı")
+    
+    result = await db.vehicle_categories.update_one(
+        {"id": category_id, "company_id": current_user["company_id"]},
+        {"$set": data}
+    )
+    invalidate_reference_cache(current_user["company_id"], "vehicle_categories")
+    
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Kategori bulunamadı")
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="update",
+        entity_type="vehicle_category",
+        entity_id=category_id,
+        entity_name=existing.get("name", "Araç Kategorisi"),
+        description=f"Araç kategorisi güncellendi: {existing.get('name', '')}",
+        changes=data
+    )
+    
+    return {"message": "Kategori güncellendi"}
+
+@router.delete("/vehicle-categories/{category_id}")
+async def delete_vehicle_category(
+    category_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Araç kategorisini sil"""
+    # Kategoriye ait araç var mı kontrol et
+    vehicles_count = await db.vehicles.count_documents({
+        "company_id": current_user["company_id"],
+        "category_id": category_id
+    })
+    
+    if vehicles_count > 0:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Bu kategoriye ait {vehicles_count} araç bulunmaktadır. Önce araçları silin veya kategorisini değiştirin."
+        )
+    
+    existing = await db.vehicle_categories.find_one({
+        "id": category_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    result = await db.vehicle_categories.delete_one({
+        "id": category_id,
+        "company_id": current_user["company_id"]
+    })
+    invalidate_reference_cache(current_user["company_id"], "vehicle_categories")
+    
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Kategori bulunamadı")
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="delete",
+        entity_type="vehicle_category",
+        entity_id=category_id,
+        entity_name=existing.get("name", "Araç Kategorisi") if existing else "Araç Kategorisi",
+        description=f"Araç kategorisi silindi: {existing.get('name', '') if existing else ''}"
+    )
+    
+    return {"message": "Kategori silindi"}
+
+# ==================== BANKS ====================
+
+@router.get("/banks")
+async def get_banks(current_user: dict = Depends(get_current_user)):
+    """Banka listesini getir"""
+    banks = await db.banks.find(
+        {"company_id": current_user["company_id"], "is_active": True},
+        {"_id": 0}
+    ).sort("name", 1).to_list(100)
+    return banks
+
+@router.post("/banks")
+async def create_bank(data: dict, current_user: dict = Depends(get_current_user)):
+    """Yeni banka oluştur"""
+    bank = Bank(company_id=current_user["company_id"], **data)
+    bank_doc = bank.model_dump()
+    bank_doc['created_at'] = bank_doc['created_at'].isoformat()
+    await db.banks.insert_one(bank_doc)
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="create",
+        entity_type="bank",
+        entity_id=bank.id,
+        entity_name=bank.name,
+        description=f"Yeni banka oluşturuldu: {bank.name}",
+        changes=data
+    )
+    
+    return bank
+
+@router.put("/banks/{bank_id}")
+async def update_bank(bank_id: str, data: dict, current_user: dict = Depends(get_current_user)):
+    """Banka güncelle"""
+    existing = await db.banks.find_one({
+        "id": bank_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if not existing:
+        raise HTTPException(status_code=404, detail="Banka bulunamadı")
+    
+    result = await db.banks.update_one(
+        {"id": bank_id, "company_id": current_user["company_id"]},
+        {"$set": data}
+    )
+    
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Banka bulunamadı")
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="update",
+        entity_type="bank",
+        entity_id=bank_id,
+        entity_name=existing.get("name", "Banka"),
+        description=f"Banka güncellendi: {existing.get('name', '')}",
+        changes=data
+    )
+    
+    return {"message": "Banka güncellendi"}
+
+@router.delete("/banks/{bank_id}")
+async def delete_bank(bank_id: str, current_user: dict = Depends(get_current_user)):
+    """Banka sil"""
+    # Bu bankaya ait hesaplar var mı kontrol et
+    accounts_count = await db.bank_accounts.count_documents({
+        "company_id": current_user["company_id"],
+        "bank_id": bank_id
+    })
+    
+    if accounts_count > 0:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Bu bankaya ait {accounts_count} hesap bulunmaktadır. Önce hesapları silin."
+        )
+    
+    existing = await db.banks.find_one({
+        "id": bank_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    result = await db.banks.delete_one({
+        "id": bank_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Banka bulunamadı")
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="delete",
+        entity_type="bank",
+        entity_id=bank_id,
+        entity_name=existing.get("name", "Banka") if existing else "Banka",
+        description=f"Banka silindi: {existing.get('name', '') if existing else ''}"
+    )
+    
+    return {"message": "Banka silindi"}
+
+# ==================== BANK ACCOUNTS ====================
+
+@router.get("/bank-accounts")
+async def get_bank_accounts(
+    account_type: Optional[str] = None,  # "bank_account" veya "credit_card"
+    current_user: dict = Depends(get_current_user)
+):
+    """Banka hesap listesini getir"""
+    accounts = [
+        account for account in await get_bank_accounts_cached(current_user["company_id"])
+        if account.get("is_active") is True and (not account_type or account.get("account_type") == account_type)
+    ]
+    
+    # Bank bilgilerini populate et (tek sorgu)
+    banks = await prefetch_by_ids(db.banks, collect_ids(accounts, "bank_id"), projection={"name": 1})
+    for account in accounts:
+        bank = banks.get(account.get("bank_id"))
+        if bank:
+            account["bank_name"] = bank.get("name")
+    
+    return accounts
+
+@router.post("/bank-accounts")
+async def create_bank_account(data: dict, current_user: dict = Depends(get_current_user)):
+    """Yeni banka hesabı oluştur"""
+    bank_account = BankAccount(company_id=current_user["company_id"], **data)
+    bank_account_doc = bank_account.model_dump()
+    bank_account_doc['created_at'] = bank_account_doc['created_at'].isoformat()
+    await db.bank_accounts.insert_one(bank_account_doc)
+    invalidate_reference_cache(current_user["company_id"], "bank_accounts")
+    
+    # Otomatik olarak CashAccount oluştur
+    cash_account = CashAccount(
+        company_id=current_user["company_id"],
+        account_type=bank_account.account_type,
+        account_name=bank_account.account_name,
+        bank_account_id=bank_account.id,
+        currency=bank_account.currency,
+        current_balance=0.0
+    )
+    cash_account_doc = cash_account.model_dump()
+    cash_account_doc['created_at'] = cash_account_doc['created_at'].isoformat()
+    await db.cash_accounts.insert_one(cash_account_doc)
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="create",
+        entity_type="bank_account",
+        entity_id=bank_account.id,
+        entity_name=bank_account.account_name,
+        description=f"Yeni banka hesabı oluşturuldu: {bank_account.account_name}",
+        changes=data
+    )
+    
+    return bank_account
+
+@router.put("/bank-accounts/{account_id}")
+async def update_bank_account(account_id: str, data: dict, current_user: dict = Depends(get_current_user)):
+    """Banka hesabı güncelle"""
+    existing = await db.bank_accounts.find_one({
+        "id": account_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if not existing:
+        raise HTTPException(status_code=404, detail="Banka hesabı bulunamadı")
+    
+    result = await db.bank_accounts.update_one(
+        {"id": account_id, "company_id": current_user["company_id"]},
+        {"$set": data}
+    )
+    invalidate_reference_cache(current_user["company_id"], "bank_accounts")
+    
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Banka hesabı bulunamadı")
+    
+    # İlgili CashAccount'u da güncelle
+    if "account_name" in data:
+        await db.cash_accounts.update_one(
+            {"bank_account_id": account_id},
+            {"$set": {"account_name": data["account_name"]}}
+        )
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="update",
+        entity_type="bank_account",
+        entity_id=account_id,
+        entity_name=existing.get("account_name", "Banka Hesabı"),
+        description=f"Banka hesabı güncellendi: {existing.get('account_name', '')}",
+        changes=data
+    )
+    
+    return {"message": "Banka hesabı güncellendi"}
+
+@router.delete("/bank-accounts/{account_id}")
+async def delete_bank_account(account_id: str, current_user: dict = Depends(get_current_user)):
+    """Banka hesabı sil"""
+    existing = await db.bank_accounts.find_one({
+        "id": account_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if not existing:
+        raise HTTPException(status_code=404, detail="Banka hesabı bulunamadı")
+    
+    # İlgili CashAccount'u da sil
+    await db.cash_accounts.delete_one({"bank_account_id": account_id})
+    
+    result = await db.bank_accounts.delete_one({
+        "id": account_id,
+        "company_id": current_user["company_id"]
+    })
+    invalidate_reference_cache(current_user["company_id"], "bank_accounts")
+    
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Banka hesabı bulunamadı")
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="delete",
+        entity_type="bank_account",
+        entity_id=account_id,
+        entity_name=existing.get("account_name", "Banka Hesabı"),
+        description=f"Banka hesabı silindi: {existing.get('account_name', '')}"
+    )
+    
+    return {"message": "Banka hesabı silindi"}
+
+# ==================== CASH ACCOUNTS ====================
+
+@router.get("/cash-accounts")
+async def get_cash_accounts(
+    account_type: Optional[str] = None,  # "cash", "bank_account", "credit_card"
+    currency: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Kasa hesap listesini getir"""
+    query = {"company_id": current_user["company_id"], "is_active": True}
+    if account_type:
+        query["account_type"] = account_type
+    if currency:
+        query["currency"] = currency
+    
+    accounts = await db.cash_accounts.find(query, {"_id": 0}).sort("order", 1).to_list(100)
+    
+    # BankAccount bilgilerini populate et
+    for account in accounts:
+        if account.get("bank_account_id"):
+            bank_account = await db.bank_accounts.find_one(
+                {"id": account["bank_account_id"]},
+                {"_id": 0}
+            )
+            if bank_account:
+                account["bank_account"] = bank_account
+                bank = await db.banks.find_one({"id": bank_account.get("bank_id")}, {"_id": 0})
+                if bank:
+                    account["bank_name"] = bank.get("name")
+    
+    return accounts
+
+@router.get("/cash-accounts/{account_id}/balance")
+async def get_cash_account_balance(
+    account_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Kasa hesabı bakiyesini getir"""
+    account = await db.cash_accounts.find_one({
+        "id": account_id,
+        "company_id": current_user["company_id"]
+    }, {"_id": 0})
+    
+    if not account:
+        raise HTTPException(status_code=404, detail="Kasa hesabı bulunamadı")
+    
+    balance = account.get("current_balance", 0) or 0
+    
+    return {
+        "account": account,
+        "balance": balance,
+        "currency": account.get("currency", "TRY")
+    }
+
+# ==================== INITIALIZE DEFAULT PAYMENT TYPES ====================
+
+@router.post("/payment-types/initialize-defaults")
+async def initialize_default_payment_types_endpoint(current_user: dict = Depends(get_current_user)):
+    """Mevcut şirket için default ödeme tiplerini oluştur"""
+    await initialize_default_payment_types(current_user["company_id"])
+    return {"message": "Default ödeme tipleri oluşturuldu"}
@@ -0,0 +1,37 @@
+"""
+Streaming dataset exports (NDJSON / CSV).
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+
+from ..auth import get_current_user
+from ..database import db
+from ..exports import export_response
+
+router = APIRouter(tags=["exports"])
+
+# ==================== EXPORTS ====================
+
+@router.get("/exports/{dataset}")
+async def export_dataset(
+    dataset: str,
+    format: str = "ndjson",
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    fields: Optional[str] = None,
+    archive: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Rezervasyon, transaction, gider/gelir ve activity log kayıtlarını NDJSON veya CSV
+    olarak stream et (satır sınırı yok, sabit bellek).
+
+    dataset: reservations, transactions, expenses, incomes, activity_logs
+    fields: virgülle ayrılmış alan listesi (boşsa varsayılan alanlar)
+    archive: true ise arşive taşınmış kayıtlar (sadece activity_logs)
+    """
+    return export_response(
+        db, dataset, current_user["company_id"],
+        fmt=format, date_from=date_from, date_to=date_to, fields=fields, archive=archive
+    )
@@ -0,0 +1,588 @@
+"""
+Income, expense and their category endpoints.
+
+Every write keeps the company's materialized cash position in step through
+``sync_cash_position`` (see ``modules.cash_position``).
+"""
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, ConfigDict, Field
+
+from ..auth import get_current_user
+from ..cash_position import CASH_PROJECTION, sync_cash_position
+from ..database import db
+
+router = APIRouter(tags=["finance"])
+
+# ==================== MODELS ====================
+
+class ExpenseCategory(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    name: str
+    description: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class IncomeCategory(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    name: str
+    description: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class Income(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    description: str
+    income_category_id: Optional[str] = None
+    income_category_name: Optional[str] = None
+    amount: float
+    currency: str = "EUR"
+    exchange_rate: float = 1.0
+    date: str
+    notes: Optional[str] = None
+    created_by: str
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class Expense(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    company_id: str
+    description: str
+    expense_category_id: Optional[str] = None
+    expense_category_name: Optional[str] = None
+    amount: float
+    currency: str = "EUR"
+    exchange_rate: float = 1.0
+    date: str
+    notes: Optional[str] = None
+    created_by: str
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+# ==================== EXPENSE CATEGORIES ====================
+
+@router.get("/expense-categories")
+async def get_expense_categories(current_user: dict = Depends(get_current_user)):
+    categories = await db.expense_categories.find({"company_id": current_user["company_id"]}, {"_id": 0}).sort("name", 1).to_list(1000)
+    return categories
+
+@router.post("/expense-categories")
+async def create_expense_category(data: dict, current_user: dict = Depends(get_current_user)):
+    category = ExpenseCategory(company_id=current_user["company_id"], **data)
+    category_doc = category.model_dump()
+    category_doc['created_at'] = category_doc['created_at'].isoformat()
+    await db.expense_categories.insert_one(category_doc)
+    return category
+
+@router.put("/expense-categories/{category_id}")
+async def update_expense_category(category_id: str, data: dict, current_user: dict = Depends(get_current_user)):
+    result = await db.expense_categories.update_one(
+        {"id": category_id, "company_id": current_user["company_id"]},
+        {"$set": data}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Expense category not found")
+    return {"message": "Expense category updated"}
+
+@router.delete("/expense-categories/{category_id}")
+async def delete_expense_category(category_id: str, current_user: dict = Depends(get_current_user)):
+    # Kategori kullanım kontrolü
+    expense_count = await db.expenses.count_documents({"expense_category_id": category_id, "company_id": current_user["company_id"]})
+    if expense_count > 0:
+        raise HTTPException(status_code=400, detail=f"Bu kategori {expense_count} gider kaydında kullanılıyor. Önce bu kayıtları düzenleyin.")
+    
+    result = await db.expense_categories.delete_one({"id": category_id, "company_id": current_user["company_id"]})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Expense category not found")
+    return {"message": "Expense category deleted"}
+
+# ==================== INCOME CATEGORIES ====================
+
+@router.get("/income-categories")
+async def get_income_categories(current_user: dict = Depends(get_current_user)):
+    categories = await db.income_categories.find({"company_id": current_user["company_id"]}, {"_id": 0}).sort("name", 1).to_list(1000)
+    return categories
+
+@router.post("/income-categories")
+async def create_income_category(data: dict, current_user: dict = Depends(get_current_user)):
+    category = IncomeCategory(company_id=current_user["company_id"], **data)
+    category_doc = category.model_dump()
+    category_doc['created_at'] = category_doc['created_at'].isoformat()
+    await db.income_categories.insert_one(category_doc)
+    return category
+
+@router.put("/income-categories/{category_id}")
+async def update_income_category(category_id: str, data: dict, current_user: dict = Depends(get_current_user)):
+    result = await db.income_categories.update_one(
+        {"id": category_id, "company_id": current_user["company_id"]},
+        {"$set": data}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Income category not found")
+    return {"message": "Income category updated"}
+
+@router.delete("/income-categories/{category_id}")
+async def delete_income_category(category_id: str, current_user: dict = Depends(get_current_user)):
+    # Kategori kullanım kontrolü
+    income_count = await db.incomes.count_documents({"income_category_id": category_id, "company_id": current_user["company_id"]})
+    if income_count > 0:
+        raise HTTPException(status_code=400, detail=f"Bu kategori {income_count} gelir kaydında kullanılıyor. Önce bu kayıtları düzenleyin.")
+    
+    result = await db.income_categories.delete_one({"id": category_id, "company_id": current_user["company_id"]})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Income category not found")
+    return {"message": "Income category deleted"}
+
+# ==================== INCOME ====================
+
+@router.get("/income")
+async def get_incomes(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    currency: Optional[str] = None,
+    category_id: Optional[str] = None,
+    search: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    query = {"company_id": current_user["company_id"]}
+    
+    # Tarih filtresi
+    if date_from or date_to:
+        date_query = {}
+        if date_from:
+            date_query["$gte"] = date_from
+        if date_to:
+            date_query["$lte"] = date_to
+        query["date"] = date_query
+    
+    # Para birimi filtresi
+    if currency:
+        query["currency"] = currency
+    
+    # Kategori filtresi
+    if category_id:
+        query["income_category_id"] = category_id
+    
+    # Arama filtresi (description veya notes içinde)
+    if search:
+        query["$or"] = [
+            {"description": {"$regex": search, "$options": "i"}},
+            {"notes": {"$regex": search, "$options": "i"}}
+        ]
+    
+    incomes = await db.incomes.find(query, {"_id": 0}).sort("date", -1).to_list(10000)
+    
+    # Income category name'leri populate et
+    for income in incomes:
+        if income.get("income_category_id") and not income.get("income_category_name"):
+            category = await db.income_categories.find_one({"id": income["income_category_id"]})
+            if category:
+                income["income_category_name"] = category.get("name")
+    
+    return incomes
+
+@router.get("/income/statistics")
+async def get_income_statistics(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Gelir istatistiklerini getir"""
+    query = {"company_id": current_user["company_id"]}
+    
+    # Tarih filtresi
+    if date_from or date_to:
+        date_query = {}
+        if date_from:
+            date_query["$gte"] = date_from
+        if date_to:
+            date_query["$lte"] = date_to
+        query["date"] = date_query
+    
+    incomes = await db.incomes.find(query, {"_id": 0}).to_list(10000)
+    
+    # Güncel kurları al
+    try:
+        company = await db.companies.find_one({"id": current_user["company_id"]}, {"_id": 0})
+        rates = {
+            "EUR": company.get("currency_rates", {}).get("EUR", 1.0) if company.get("currency_rates") else 1.0,
+            "USD": company.get("currency_rates", {}).get("USD", 35.0) if company.get("currency_rates") else 35.0,
+            "TRY": 1.0
+        }
+    except:
+        rates = {"EUR": 1.0, "USD": 35.0, "TRY": 1.0}
+    
+    # Toplamlar
+    totals = {"EUR": 0.0, "USD": 0.0, "TRY": 0.0}
+    total_try_value = 0.0
+    count = 0
+    
+    # Bu ay toplam
+    today = datetime.now(timezone.utc)
+    this_month_start = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0).strftime("%Y-%m-%d")
+    this_month_total = {"EUR": 0.0, "USD": 0.0, "TRY": 0.0}
+    this_month_try_value = 0.0
+    
+    for income in incomes:
+        currency = income.get("currency", "EUR")
+        amount = income.get("amount", 0.0)
+        totals[currency] += amount
+        
+        # TRY değeri hesapla
+        if currency == "TRY":
+            try_value = amount
+        else:
+            try_value = amount * rates.get(currency, 1.0)
+        total_try_value += try_value
+        
+        count += 1
+        
+        # Bu ay kontrolü
+        if income.get("date", "") >= this_month_start:
+            this_month_total[currency] += amount
+            this_month_try_value += try_value
+    
+    # Ortalama
+    avg_try_value = total_try_value / count if count > 0 else 0.0
+    
+    # Para birimi dağılımı
+    distribution = {}
+    if total_try_value > 0:
+        for currency in ["EUR", "USD", "TRY"]:
+            currency_try_value = totals[currency] * (rates.get(currency, 1.0) if currency != "TRY" else 1.0)
+            distribution[currency] = (currency_try_value / total_try_value) * 100
+    else:
+        distribution = {"EUR": 0, "USD": 0, "TRY": 0}
+    
+    return {
+        "totals": totals,
+        "total_try_value": total_try_value,
+        "this_month_total": this_month_total,
+        "this_month_try_value": this_month_try_value,
+        "average_try_value": avg_try_value,
+        "count": count,
+        "distribution": distribution,
+        "rates": rates
+    }
+
+@router.post("/income")
+async def create_income(data: dict, current_user: dict = Depends(get_current_user)):
+    # Get income category name if provided
+    income_category_name = None
+    if data.get("income_category_id"):
+        category = await db.income_categories.find_one({"id": data["income_category_id"]})
+        if category:
+            income_category_name = category.get("name")
+    
+    income = Income(
+        company_id=current_user["company_id"],
+        created_by=current_user["user_id"],
+        income_category_name=income_category_name,
+        **data
+    )
+    income_doc = income.model_dump()
+    income_doc['created_at'] = income_doc['created_at'].isoformat()
+    await db.incomes.insert_one(income_doc)
+    await sync_cash_position(db, "incomes", None, income_doc)
+    return income
+
+@router.put("/income/{income_id}")
+async def update_income(income_id: str, data: dict, current_user: dict = Depends(get_current_user)):
+    # Get income category name if provided
+    if data.get("income_category_id"):
+        category = await db.income_categories.find_one({"id": data["income_category_id"]})
+        if category:
+            data["income_category_name"] = category.get("name")
+        else:
+            data["income_category_name"] = None
+    elif "income_category_id" in data and data["income_category_id"] is None:
+        data["income_category_name"] = None
+    
+    before = await db.incomes.find_one_and_update(
+        {"id": income_id, "company_id": current_user["company_id"]},
+        {"$set": data},
+        projection=CASH_PROJECTION
+    )
+    if before is None:
+        raise HTTPException(status_code=404, detail="Income not found")
+    await sync_cash_position(db, "incomes", before, {**before, **data})
+    return {"message": "Income updated"}
+
+@router.delete("/income/{income_id}")
+async def delete_income(income_id: str, current_user: dict = Depends(get_current_user)):
+    deleted = await db.incomes.find_one_and_delete(
+        {"id": income_id, "company_id": current_user["company_id"]}, CASH_PROJECTION
+    )
+    if deleted is None:
+        raise HTTPException(status_code=404, detail="Income not found")
+    await sync_cash_position(db, "incomes", deleted, None)
+    return {"message": "Income deleted"}
+
+# ==================== EXPENSES ====================
+
+@router.get("/expenses")
+async def get_expenses(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    currency: Optional[str] = None,
+    category_id: Optional[str] = None,
+    search: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    query = {"company_id": current_user["company_id"]}
+    
+    # Tarih filtresi
+    if date_from or date_to:
+        date_query = {}
+        if date_from:
+            date_query["$gte"] = date_from
+        if date_to:
+            date_query["$lte"] = date_to
+        query["date"] = date_query
+    
+    # Para birimi filtresi
+    if currency:
+        query["currency"] = currency
+    
+    # Kategori filtresi
+    if category_id:
+        query["expense_category_id"] = category_id
+    
+    # Arama filtresi (description veya notes içinde)
+    if search:
+        query["$or"] = [
+            {"description": {"$regex": search, "$options": "i"}},
+            {"notes": {"$regex": search, "$options": "i"}}
+        ]
+    
+    expenses = await db.expenses.find(query, {"_id": 0}).sort("date", -1).to_list(10000)
+    
+    # Expense category name'leri populate et
+    for expense in expenses:
+        if expense.get("expense_category_id") and not expense.get("expense_category_name"):
+            category = await db.expense_categories.find_one({"id": expense["expense_category_id"]})
+            if category:
+                expense["expense_category_name"] = category.get("name")
+    
+    return expenses
+
+@router.get("/expenses/statistics")
+async def get_expense_statistics(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Gider istatistiklerini getir"""
+    query = {"company_id": current_user["company_id"]}
+    
+    # Tarih filtresi
+    if date_from or date_to:
+        date_query = {}
+        if date_from:
+            date_query["$gte"] = date_from
+        if date_to:
+            date_query["$lte"] = date_to
+        query["date"] = date_query
+    
+    expenses = await db.expenses.find(query, {"_id": 0}).to_list(10000)
+    
+    # Güncel kurları al
+    try:
+        company = await db.companies.find_one({"id": current_user["company_id"]}, {"_id": 0})
+        rates = {
+            "EUR": company.get("currency_rates", {}).get("EUR", 1.0) if company.get("currency_rates") else 1.0,
+            "USD": company.get("currency_rates", {}).get("USD", 35.0) if company.get("currency_rates") else 35.0,
+            "TRY": 1.0
+        }
+    except:
+        rates = {"EUR": 1.0, "USD": 35.0, "TRY": 1.0}
+    
+    # Toplamlar
+    totals = {"EUR": 0.0, "USD": 0.0, "TRY": 0.0}
+    total_try_value = 0.0
+    count = 0
+    
+    # Bu ay toplam
+    today = datetime.now(timezone.utc)
+    this_month_start = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0).strftime("%Y-%m-%d")
+    this_month_total = {"EUR": 0.0, "USD": 0.0, "TRY": 0.0}
+    this_month_try_value = 0.0
+    
+    # Kategori bazlı toplamlar
+    category_totals = {}
+    
+    for expense in expenses:
+        currency = expense.get("currency", "EUR")
+        amount = expense.get("amount", 0.0)
+        totals[currency] += amount
+        
+        # TRY değeri hesapla
+        if currency == "TRY":
+            try_value = amount
+        else:
+            try_value = amount * rates.get(currency, 1.0)
+        total_try_value += try_value
+        
+        count += 1
+        
+        # Bu ay kontrolü
+        if expense.get("date", "") >= this_month_start:
+            this_month_total[currency] += amount
+            this_month_try_value += try_value
+        
+        # Kategori bazlı toplam
+        category_id = expense.get("expense_category_id")
+        category_name = expense.get("expense_category_name") or "Kategori Yok"
+        if category_id not in category_totals:
+            category_totals[category_id] = {
+                "id": category_id,
+                "name": category_name,
+                "total_try_value": 0.0,
+                "count": 0
+            }
+        category_totals[category_id]["total_try_value"] += try_value
+        category_totals[category_id]["count"] += 1
+    
+    # Ortalama
+    avg_try_value = total_try_value / count if count > 0 else 0.0
+    
+    # Para birimi dağılımı
+    distribution = {}
+    if total_try_value > 0:
+        for currency in ["EUR", "USD", "TRY"]:
+            currency_try_value = totals[currency] * (rates.get(currency, 1.0) if currency != "TRY" else 1.0)
+            distribution[currency] = (currency_try_value / total_try_value) * 100
+    else:
+        distribution = {"EUR": 0, "USD": 0, "TRY": 0}
+    
+    return {
+        "totals": totals,
+        "total_try_value": total_try_value,
+        "this_month_total": this_month_total,
+        "this_month_try_value": this_month_try_value,
+        "average_try_value": avg_try_value,
+        "count": count,
+        "distribution": distribution,
+        "category_totals": list(category_totals.values()),
+        "rates": rates
+    }
+
+@router.get("/expenses/by-category")
+async def get_expenses_by_category(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Kategori bazlı gider toplamlarını getir"""
+    query = {"company_id": current_user["company_id"]}
+    
+    # Tarih filtresi
+    if date_from or date_to:
+        date_query = {}
+        if date_from:
+            date_query["$gte"] = date_from
+        if date_to:
+            date_query["$lte"] = date_to
+        query["date"] = date_query
+    
+    expenses = await db.expenses.find(query, {"_id": 0}).to_list(10000)
+    
+    # Güncel kurları al
+    try:
+        company = await db.companies.find_one({"id": current_user["company_id"]}, {"_id": 0})
+        rates = {
+            "EUR": company.get("currency_rates", {}).get("EUR", 1.0) if company.get("currency_rates") else 1.0,
+            "USD": company.get("currency_rates", {}).get("USD", 35.0) if company.get("currency_rates") else 35.0,
+            "TRY": 1.0
+        }
+    except:
+        rates = {"EUR": 1.0, "USD": 35.0, "TRY": 1.0}
+    
+    # Kategori bazlı toplamlar
+    category_totals = {}
+    
+    for expense in expenses:
+        category_id = expense.get("expense_category_id")
+        category_name = expense.get("expense_category_name") or "Kategori Yok"
+        currency = expense.get("currency", "EUR")
+        amount = expense.get("amount", 0.0)
+        
+        # TRY değeri hesapla
+        if currency == "TRY":
+            try_value = amount
+        else:
+            try_value = amount * rates.get(currency, 1.0)
+        
+        if category_id not in category_totals:
+            category_totals[category_id] = {
+                "id": category_id,
+                "name": category_name,
+                "total_try_value": 0.0,
+                "count": 0,
+                "totals": {"EUR": 0.0, "USD": 0.0, "TRY": 0.0}
+            }
+        
+        category_totals[category_id]["total_try_value"] += try_value
+        category_totals[category_id]["count"] += 1
+        category_totals[category_id]["totals"][currency] += amount
+    
+    return list(category_totals.values())
+
+@router.post("/expenses")
+async def create_expense(data: dict, current_user: dict = Depends(get_current_user)):
+    # Get expense category name if provided
+    expense_category_name = None
+    if data.get("expense_category_id"):
+        category = await db.expense_categories.find_one({"id": data["expense_category_id"]})
+        if category:
+            expense_category_name = category.get("name")
+    
+    expense = Expense(
+        company_id=current_user["company_id"],
+        created_by=current_user["user_id"],
+        expense_category_name=expense_category_name,
+        **data
+    )
+    expense_doc = expense.model_dump()
+    expense_doc['created_at'] = expense_doc['created_at'].isoformat()
+    await db.expenses.insert_one(expense_doc)
+    await sync_cash_position(db, "expenses", None, expense_doc)
+    return expense
+
+@router.put("/expenses/{expense_id}")
+async def update_expense(expense_id: str, data: dict, current_user: dict = Depends(get_current_user)):
+    # Get expense category name if provided
+    if data.get("expense_category_id"):
+        category = await db.expense_categories.find_one({"id": data["expense_category_id"]})
+        if category:
+            data["expense_category_name"] = category.get("name")
+        else:
+            data["expense_category_name"] = None
+    elif "expense_category_id" in data and data["expense_category_id"] is None:
+        data["expense_category_name"] = None
+    
+    before = await db.expenses.find_one_and_update(
+        {"id": expense_id, "company_id": current_user["company_id"]},
+        {"$set": data},
+        projection=CASH_PROJECTION
+    )
+    if before is None:
+        raise HTTPException(status_code=404, detail="Expense not found")
+    await sync_cash_position(db, "expenses", before, {**before, **data})
+    return {"message": "Expense updated"}
+
+@router.delete("/expenses/{expense_id}")
+async def delete_expense(expense_id: str, current_user: dict = Depends(get_current_user)):
+    deleted = await db.expenses.find_one_and_delete(
+        {"id": expense_id, "company_id": current_user["company_id"]}, CASH_PROJECTION
+    )
+    if deleted is None:
+        raise HTTPException(status_code=404, detail="Expense not found")
+    await sync_cash_position(db, "expenses", deleted, None)
+    return {"message": "Expense deleted"}
@@ -0,0 +1,236 @@
+"""
+User notifications and the helpers that raise them.
+"""
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from ..auth import get_current_user
+from ..database import db
+
+router = APIRouter(tags=["notifications"])
+
+# ==================== NOTIFICATIONS ====================
+
+@router.get("/notifications")
+async def get_notifications(
+    current_user: dict = Depends(get_current_user),
+    unread_only: bool = False,
+    type: Optional[str] = None,
+    category: Optional[str] = None,
+    include_archived: bool = False
+):
+    """Kullanıcının bildirimlerini getir"""
+    query = {
+        "company_id": current_user["company_id"],
+        "user_id": current_user["user_id"]
+    }
+    
+    if unread_only:
+        query["is_read"] = False
+    
+    # isArchived kontrolü (varsayılan olarak False, yani arşivlenmemiş olanlar)
+    if not include_archived:
+        query["is_archived"] = {"$ne": True}
+    
+    # Type filtresi (info, warning, error, success)
+    if type:
+        query["type"] = type
+    
+    # Category filtresi (system, inventory, booking, finance)
+    if category:
+        query["category"] = category
+    
+    notifications = await db.notifications.find(query, {"_id": 0}).sort("created_at", -1).limit(200).to_list(200)
+    
+    # created_at'i ISO format string'e çevir (eğer datetime objesi ise)
+    for notif in notifications:
+        if notif.get("created_at"):
+            created_at = notif["created_at"]
+            if isinstance(created_at, datetime):
+                notif["created_at"] = created_at.isoformat()
+            elif isinstance(created_at, str):
+                # Zaten string ise olduğu gibi bırak
+                pass
+        
+        # Varsayılan değerler (backward compatibility)
+        if "type" not in notif:
+            notif["type"] = "info"
+        if "category" not in notif:
+            notif["category"] = "system"
+        if "is_read" not in notif:
+            notif["is_read"] = False
+        if "is_archived" not in notif:
+            notif["is_archived"] = False
+    
+    # Okunmamış bildirim sayısı
+    unread_query = {
+        "company_id": current_user["company_id"],
+        "user_id": current_user["user_id"],
+        "is_read": False
+    }
+    if not include_archived:
+        unread_query["is_archived"] = {"$ne": True}
+    
+    unread_count = await db.notifications.count_documents(unread_query)
+    
+    return {
+        "notifications": notifications,
+        "unread_count": unread_count
+    }
+
+@router.put("/notifications/{notification_id}/read")
+async def mark_notification_read(
+    notification_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Bildirimi okundu olarak işaretle"""
+    result = await db.notifications.update_one(
+        {
+            "id": notification_id,
+            "company_id": current_user["company_id"],
+            "user_id": current_user["user_id"]
+        },
+        {
+            "$set": {
+                "is_read": True,
+                "read_at": datetime.now(timezone.utc).isoformat()
+            }
+        }
+    )
+    
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Notification not found")
+    
+    return {"message": "Notification marked as read"}
+
+@router.put("/notifications/read-all")
+async def mark_all_notifications_read(
+    current_user: dict = Depends(get_current_user)
+):
+    """Tüm bildirimleri okundu olarak işaretle"""
+    await db.notifications.update_many(
+        {
+            "company_id": current_user["company_id"],
+            "user_id": current_user["user_id"],
+            "is_read": False
+        },
+        {
+            "$set": {
+                "is_read": True,
+                "read_at": datetime.now(timezone.utc).isoformat()
+            }
+        }
+    )
+    
+    return {"message": "All notifications marked as read"}
+
+@router.post("/notifications/mark-read")
+async def mark_notifications_read(
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Toplu olarak bildirimleri okundu olarak işaretle"""
+    notification_ids = data.get("notification_ids", [])
+    
+    if not notification_ids or not isinstance(notification_ids, list):
+        raise HTTPException(status_code=400, detail="notification_ids must be a non-empty array")
+    
+    result = await db.notifications.update_many(
+        {
+            "id": {"$in": notification_ids},
+            "company_id": current_user["company_id"],
+            "user_id": current_user["user_id"]
+        },
+        {
+            "$set": {
+                "is_read": True,
+                "read_at": datetime.now(timezone.utc).isoformat()
+            }
+        }
+    )
+    
+    return {
+        "message": f"{result.modified_count} notifications marked as read",
+        "modified_count": result.modified_count
+    }
+
+@router.delete("/notifications/batch")
+async def delete_notifications_batch(
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Toplu olarak bildirimleri sil"""
+    notification_ids = data.get("notification_ids", [])
+    
+    if not notification_ids or not isinstance(notification_ids, list):
+        raise HTTPException(status_code=400, detail="notification_ids must be a non-empty array")
+    
+    result = await db.notifications.delete_many(
+        {
+            "id": {"$in": notification_ids},
+            "company_id": current_user["company_id"],
+            "user_id": current_user["user_id"]
+        }
+    )
+    
+    return {
+        "message": f"{result.deleted_count} notifications deleted",
+        "deleted_count": result.deleted_count
+    }
+
+# ==================== NOTIFICATION HELPERS ====================
+
+async def create_inventory_notification(
+    company_id: str,
+    user_id: str,
+    item_name: str,
+    current_count: int,
+    threshold: int = 5
+):
+    """Envanter düşük olduğunda bildirim oluştur"""
+    if current_count >= threshold:
+        return  # Threshold'un üstündeyse bildirim oluşturma
+    
+    # Mevcut bildirimi kontrol et (aynı item için zaten var mı?)
+    existing = await db.notifications.find_one({
+        "company_id": company_id,
+        "type": "warning",
+        "category": "inventory",
+        "entity_id": item_name,
+        "is_read": False,
+        "is_archived": False
+    })
+    
+    if existing:
+        # Mevcut bildirimi güncelle
+        await db.notifications.update_one(
+            {"id": existing["id"]},
+            {
+                "$set": {
+                    "message": f"{item_name} stok seviyesi düşük: {current_count} adet kaldı (Minimum: {threshold})",
+                    "updated_at": datetime.now(timezone.utc).isoformat()
+                }
+            }
+        )
+        return
+    
+    # Yeni bildirim oluştur
+    notification = {
+        "id": str(uuid.uuid4()),
+        "company_id": company_id,
+        "user_id": user_id,
+        "type": "warning",
+        "category": "inventory",
+        "title": "Düşük Stok Uyarısı",
+        "message": f"{item_name} stok seviyesi düşük: {current_count} adet kaldı (Minimum: {threshold})",
+        "entity_id": item_name,
+        "entity_type": "inventory",
+        "is_read": False,
+        "is_archived": False,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+    
+    await db.notifications.insert_one(notification)
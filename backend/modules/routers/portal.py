@@ -0,0 +1,345 @@
+"""
+Corporate portal (B2B) endpoints.
+"""
+import logging
+import os
+import secrets
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import RedirectResponse
+from pydantic import BaseModel
+
+from ..auth import create_access_token, get_current_corporate_user
+from ..database import db
+from ..notification_preferences import should_send_notification
+from ..passwords import verify_password_async
+from ..reservation_pricing import calculate_reservation_price
+from ..rollups import sync_reservation_rollup
+from ..vouchers import allocate_voucher_code, B2B_PREFIX
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["portal"])
+
+# ==================== B2B PORTAL (CORPORATE CUSTOMER) AUTHENTICATION ====================
+
+class B2BLoginRequest(BaseModel):
+    """B2B Portal login request"""
+    agencySlug: str  # Company code (slug)
+    corporateCode: str  # Cari code
+    password: str
+
+@router.get("/auth/oauth/callback")
+async def oauth_callback_get(code: Optional[str] = None, state: Optional[str] = None, error: Optional[str] = None):
+    """OAuth callback GET handler - receives OAuth redirect with code and state"""
+    try:
+        if error:
+            logger.error(f"OAuth error received: {error}")
+            raise HTTPException(status_code=400, detail=f"OAuth hatası: {error}")
+        
+        if not code:
+            raise HTTPException(status_code=400, detail="OAuth code parametresi bulunamadı")
+        
+        logger.info(f"OAuth callback received - code: {code[:10]}..., state: {state}")
+        
+        # Redirect to frontend with code and state
+        frontend_url = os.environ.get("FRONTEND_URL", "http://localhost:3000")
+        redirect_url = f"{frontend_url}/auth/callback?code={code}&state={state or ''}"
+        
+        return RedirectResponse(url=redirect_url)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"OAuth callback GET error: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="OAuth callback işlemi başarısız oldu")
+
+@router.post("/auth/oauth/callback")
+async def oauth_callback_post(data: dict):
+    """OAuth callback POST handler - processes OAuth code and returns JWT token"""
+    try:
+        code = data.get("code")
+        state = data.get("state")
+        
+        if not code:
+            raise HTTPException(status_code=400, detail="OAuth code is required")
+        
+        logger.info(f"OAuth callback POST received - code: {code[:10]}..., state: {state}")
+        
+        # TODO: Implement OAuth provider-specific logic here
+        # This is a placeholder - you need to:
+        # 1. Exchange code for access token with OAuth provider
+        # 2. Get user info from OAuth provider
+        # 3. Find or create user in database
+        # 4. Return JWT token
+        
+        logger.warning("OAuth callback endpoint called but not fully implemented")
+        raise HTTPException(status_code=501, detail="OAuth callback not yet implemented")
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"OAuth callback error: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="OAuth callback işlemi başarısız oldu")
+
+@router.post("/auth/b2b-login")
+async def b2b_login(data: B2BLoginRequest):
+    """B2B Portal login for corporate customers"""
+    try:
+        # 1. First, try to find Cari by cari_code (more flexible approach)
+        # This allows login even if agencySlug is incorrect, as long as cari_code is valid
+        cari = await db.caris.find_one({
+            "cari_code": data.corporateCode.upper()
+        })
+        
+        if not cari:
+            raise HTTPException(status_code=401, detail="Geçersiz cari kodu veya şifre")
+        
+        # 2. Get company from cari's company_id (don't check is_active - allow login even if company is temporarily inactive)
+        company = await db.companies.find_one({"id": cari["company_id"]})
+        if not company:
+            raise HTTPException(status_code=401, detail="Geçersiz cari kodu veya şifre")
+        
+        # 3. Verify agencySlug matches (if provided, for security)
+        # But don't block login if it doesn't match - cari_code is the primary identifier
+        if data.agencySlug and company.get("company_code") != data.agencySlug:
+            # Log warning but don't block - allow login if cari_code is correct
+            logger.warning(f"Agency slug mismatch: provided={data.agencySlug}, actual={company.get('company_code')}, cari_code={data.corporateCode}")
+        
+        # 4. Find CorporateCustomer (CariAccount) by corporateCode within that Tenant
+        # Try with is_active check first, then without (for flexibility)
+        cari_account = await db.cari_accounts.find_one({
+            "company_id": company["id"],
+            "cari_code": data.corporateCode.upper(),
+            "is_active": True
+        })
+        
+        if not cari_account:
+            # Try without is_active check
+            cari_account = await db.cari_accounts.find_one({
+                "company_id": company["id"],
+                "cari_code": data.corporateCode.upper()
+            })
+            if not cari_account:
+                raise HTTPException(status_code=401, detail="Geçersiz cari kodu veya şifre")
+        
+        # 5. Verify password
+        if not cari.get("password_hash"):
+            raise HTTPException(status_code=401, detail="Şifre ayarlanmamış. Lütfen yöneticinizle iletişime geçin.")
+        
+        if not await verify_password_async(data.password, cari["password_hash"]):
+            raise HTTPException(status_code=401, detail="Geçersiz cari kodu veya şifre")
+        
+        # 5. Check if password change is required
+        require_password_change = cari.get("require_password_change", False)
+        
+        # 6. Create JWT token with role "cari" (for compatibility with existing cari system)
+        token_data = {
+            "sub": cari["id"],  # Cari ID
+            "company_id": company["id"],
+            "cari_id": cari_account["id"],  # CariAccount ID
+            "cari_code": data.corporateCode.upper(),
+            "role": "cari",  # Use "cari" role for compatibility with existing cari endpoints
+            "agency_slug": data.agencySlug
+        }
+        
+        access_token = create_access_token(token_data)
+        
+        # Return response
+        return {
+            "access_token": access_token,
+            "token_type": "bearer",
+            "corporate": {
+                "id": cari["id"],
+                "cari_code": cari.get("cari_code"),
+                "display_name": cari.get("display_name"),
+                "cari_account_id": cari_account["id"],
+                "cari_account_name": cari_account.get("name"),
+                "require_password_change": require_password_change
+            },
+            "agency": {
+                "id": company["id"],
+                "company_code": company.get("company_code"),
+                "company_name": company.get("company_name"),
+                "logo_url": company.get("logo_url")
+            }
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"B2B login error: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/portal/tours")
+async def get_portal_tours(current_corporate: dict = Depends(get_current_corporate_user)):
+    """Get available tours for B2B portal"""
+    try:
+        # Get active tour types for the company
+        tour_types = await db.tour_types.find(
+            {"company_id": current_corporate["company_id"], "is_active": True},
+            {"_id": 0}
+        ).sort("order", 1).to_list(100)
+        
+        # Format response
+        tours = []
+        for tour in tour_types:
+            tours.append({
+                "id": tour.get("id"),
+                "name": tour.get("name"),
+                "description": tour.get("description"),
+                "duration_hours": tour.get("duration_hours"),
+                "color": tour.get("color"),
+                "icon": tour.get("icon")
+            })
+        
+        return {"tours": tours}
+    except Exception as e:
+        logger.error(f"Error fetching portal tours: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+class PortalReservationRequest(BaseModel):
+    """B2B Portal reservation request"""
+    tourId: str
+    date: str  # YYYY-MM-DD
+    pax: int  # person_count
+    customerName: str
+    customerContact: Optional[str] = None
+    notes: Optional[str] = None
+
+@router.post("/portal/reservations")
+async def create_portal_reservation(
+    data: PortalReservationRequest,
+    current_corporate: dict = Depends(get_current_corporate_user)
+):
+    """Create a reservation from B2B portal (status: pending_approval)"""
+    try:
+        # Validate date
+        try:
+            booking_date = datetime.strptime(data.date, "%Y-%m-%d").date()
+            if booking_date < datetime.now().date():
+                raise HTTPException(status_code=400, detail="Booking date cannot be in the past")
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+        
+        # Get tour type
+        tour_type = await db.tour_types.find_one({"id": data.tourId})
+        if not tour_type:
+            raise HTTPException(status_code=404, detail="Tour not found")
+        
+        if not tour_type.get("is_active", True):
+            raise HTTPException(status_code=400, detail="Tour is not available")
+        
+        # Get cari account
+        cari_account = await db.cari_accounts.find_one({"id": current_corporate["cari_account_id"]})
+        if not cari_account:
+            raise HTTPException(status_code=404, detail="Corporate account not found")
+        
+        # Calculate price using existing function
+        vehicle_count = max(1, (data.pax + 1) // 2)
+        total_price, currency = await calculate_reservation_price(
+            company_id=current_corporate["company_id"],
+            cari_id=current_corporate["cari_account_id"],
+            tour_type_id=data.tourId,
+            date=data.date,
+            vehicle_count=vehicle_count,
+            person_count=data.pax
+        )
+        
+        # Create reservation with status "pending_approval"
+        reservation_id = str(uuid.uuid4())
+        reservation_doc = {
+            "id": reservation_id,
+            "company_id": current_corporate["company_id"],
+            "cari_id": current_corporate["cari_account_id"],
+            "cari_name": cari_account.get("name", "Corporate Customer"),
+            "date": data.date,
+            "time": "09:00",  # Default time
+            "tour_type_id": data.tourId,
+            "tour_type_name": tour_type.get("name"),
+            "customer_name": data.customerName,
+            "customer_contact": data.customerContact,
+            "person_count": data.pax,
+            "vehicle_count": vehicle_count,
+            "price": total_price,
+            "currency": currency,
+            "exchange_rate": 1.0,
+            "voucher_code": await allocate_voucher_code(db, B2B_PREFIX),
+            "notes": data.notes,
+            "status": "pending_approval",  # Onaya düştü
+            "reservation_source": "portal",
+            "created_by_cari": current_corporate["cari_id"],
+            "cari_code_snapshot": current_corporate["cari_code"],
+            "created_by": f"corporate_{current_corporate['cari_id']}",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }
+        
+        await db.reservations.insert_one(reservation_doc)
+        await sync_reservation_rollup(db, reservation_doc["id"], None)
+        
+        # Create notification for agency admins
+        admin_users = await db.users.find({
+            "company_id": current_corporate["company_id"],
+            "$or": [
+                {"role": "admin"},
+                {"role": "super_admin"},
+                {"is_admin": True}
+            ],
+            "is_active": True
+        }, {"_id": 0}).to_list(100)
+        
+        for admin in admin_users:
+            if should_send_notification(admin, "newBooking", "inApp"):
+                notification = {
+                    "id": str(uuid.uuid4()),
+                    "company_id": current_corporate["company_id"],
+                    "user_id": admin["id"],
+                    "type": "new_booking",
+                    "title": "Yeni Rezervasyon Talebi (B2B Portal)",
+                    "message": f"{cari_account.get('name')} tarafından yeni bir rezervasyon talebi oluşturuldu: {tour_type.get('name')} - {data.date}",
+                    "entity_type": "reservation",
+                    "entity_id": reservation_id,
+                    "is_read": False,
+                    "is_archived": False,
+                    "created_at": datetime.now(timezone.utc).isoformat()
+                }
+                await db.notifications.insert_one(notification)
+        
+        logger.info(f"Portal reservation created: reservation_id={reservation_id}, cari_id={current_corporate['cari_account_id']}")
+        
+        return {
+            "message": "Rezervasyon talebiniz başarıyla oluşturuldu. Onay bekliyor.",
+            "reservation_id": reservation_id,
+            "status": "pending_approval"
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating portal reservation: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/auth/oauth/test")
+async def oauth_test_endpoint():
+    """Test endpoint for OAuth callback - returns test info"""
+    try:
+        # Test için dummy token oluştur
+        test_token = "test_oauth_token_" + secrets.token_urlsafe(32)
+        
+        return {
+            "message": "OAuth test endpoint çalışıyor",
+            "test_token": test_token,
+            "callback_url": "/api/auth/oauth/callback",
+            "instructions": {
+                "1": "OAuth provider'dan gelen code ve state parametrelerini kullanın",
+                "2": "GET /api/auth/oauth/callback?code=XXX&state=YYY şeklinde çağırın",
+                "3": "Frontend'e yönlendirileceksiniz: /auth/callback?code=XXX&state=YYY"
+            }
+        }
+    except Exception as e:
+        logger.error(f"OAuth test endpoint error: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Test endpoint hatası")
@@ -0,0 +1,227 @@
+"""
+Public (unauthenticated) booking endpoints.
+"""
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, EmailStr
+
+from ..database import db
+from ..notification_preferences import should_send_notification
+from ..rate_limit import limiter
+from ..reservation_pricing import calculate_reservation_price
+from ..rollups import sync_reservation_rollup
+from ..vouchers import allocate_voucher_code
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["public_booking"])
+
+# ==================== PUBLIC BOOKING ENGINE (NO AUTH REQUIRED) ====================
+
+class PublicBookingRequest(BaseModel):
+    """Public booking request model"""
+    tourId: str  # tour_type_id
+    date: str  # YYYY-MM-DD
+    pax: int  # person_count
+    customerName: str
+    email: EmailStr
+    phone: str
+    note: Optional[str] = None
+
+@router.get("/public/agency/{slug}/tours")
+@limiter.limit("30/minute")  # Rate limiting: 30 requests per minute
+async def get_public_agency_tours(slug: str, request: Request):
+    """Get active tours for a public agency (no auth required)"""
+    try:
+        # Find company by company_code (slug)
+        # Try with is_active check first, then without (for flexibility)
+        company = await db.companies.find_one({"company_code": slug, "is_active": True})
+        if not company:
+            # Try without is_active check (company might be temporarily inactive but still accessible)
+            company = await db.companies.find_one({"company_code": slug})
+            if not company:
+                raise HTTPException(status_code=404, detail="Agency not found")
+        
+        # Get active tour types for this company
+        tour_types = await db.tour_types.find(
+            {"company_id": company["id"], "is_active": True},
+            {"_id": 0, "company_id": 0}  # Don't expose internal IDs
+        ).sort("order", 1).to_list(100)
+        
+        # Format response (only expose public-safe data)
+        public_tours = []
+        for tour in tour_types:
+            public_tours.append({
+                "id": tour.get("id"),
+                "name": tour.get("name"),
+                "description": tour.get("description"),
+                "duration_hours": tour.get("duration_hours"),
+                "color": tour.get("color"),
+                "icon": tour.get("icon")
+            })
+        
+        return {
+            "agency": {
+                "name": company.get("company_name"),
+                "logo_url": company.get("logo_url"),
+                "contact_email": company.get("contact_email"),
+                "contact_phone": company.get("contact_phone"),
+                "website": company.get("website")
+            },
+            "tours": public_tours
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching public tours: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/public/booking")
+@limiter.limit("10/minute")  # Rate limiting: 10 bookings per minute per IP
+async def create_public_booking(data: PublicBookingRequest, request: Request):
+    """Create a public booking request (no auth required)"""
+    try:
+        # Validate date format
+        try:
+            booking_date = datetime.strptime(data.date, "%Y-%m-%d").date()
+            if booking_date < datetime.now().date():
+                raise HTTPException(status_code=400, detail="Booking date cannot be in the past")
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+        
+        # Get tour type
+        tour_type = await db.tour_types.find_one({"id": data.tourId})
+        if not tour_type:
+            raise HTTPException(status_code=404, detail="Tour not found")
+        
+        if not tour_type.get("is_active", True):
+            raise HTTPException(status_code=400, detail="Tour is not available")
+        
+        company_id = tour_type.get("company_id")
+        if not company_id:
+            raise HTTPException(status_code=500, detail="Tour configuration error")
+        
+        # Get company
+        company = await db.companies.find_one({"id": company_id})
+        if not company or not company.get("is_active", True):
+            raise HTTPException(status_code=404, detail="Agency not found or inactive")
+        
+        # Find or create a default "Public Booking" cari account for public bookings
+        # Or use a system cari account
+        public_cari = await db.cari_accounts.find_one({
+            "company_id": company_id,
+            "name": "Public Bookings"
+        })
+        
+        if not public_cari:
+            # Create a default cari account for public bookings
+            public_cari_doc = {
+                "id": str(uuid.uuid4()),
+                "company_id": company_id,
+                "name": "Public Bookings",
+                "cari_code": f"PUBLIC-{company.get('company_code', 'PUBLIC')}",
+                "is_active": True,
+                "created_at": datetime.now(timezone.utc).isoformat()
+            }
+            await db.cari_accounts.insert_one(public_cari_doc)
+            public_cari = public_cari_doc
+        
+        # Calculate price (use default price for now, can be enhanced with seasonal pricing)
+        # Fiyat hesaplama - artık sadece seasonal prices kullanılacak
+        # Fiyat yönetiminden fiyat alınmalı
+        vehicle_count = max(1, (data.pax + 1) // 2)
+        
+        # Fiyat hesaplama fonksiyonunu kullan
+        try:
+            total_price, currency = await calculate_reservation_price(
+                company_id=company_id,
+                cari_id=None,
+                tour_type_id=data.tourId,
+                date=data.date,
+                vehicle_count=vehicle_count
+            )
+        except Exception as e:
+            logger.error(f"Fiyat hesaplama hatası: {e}")
+            total_price = 0.0
+            currency = "EUR"
+        
+        # Create reservation with status "request_received" (pending payment)
+        reservation_id = str(uuid.uuid4())
+        reservation_doc = {
+            "id": reservation_id,
+            "company_id": company_id,
+            "cari_id": public_cari["id"],
+            "cari_name": public_cari.get("name", "Public Bookings"),
+            "date": data.date,
+            "time": "09:00",  # Default time, can be adjusted
+            "tour_type_id": data.tourId,
+            "tour_type_name": tour_type.get("name"),
+            "customer_name": data.customerName,
+            "customer_contact": data.phone,
+            "customer_details": {
+                "phone": data.phone,
+                "email": data.email
+            },
+            "person_count": data.pax,
+            "vehicle_count": vehicle_count,
+            "price": total_price,
+            "currency": currency,
+            "exchange_rate": 1.0,
+            "voucher_code": await allocate_voucher_code(db),
+            "notes": f"Public Booking Request\n{data.note or ''}",
+            "status": "request_received",  # New status for public bookings
+            "reservation_source": "public",
+            "created_by": "public",  # System user for public bookings
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }
+        
+        await db.reservations.insert_one(reservation_doc)
+        await sync_reservation_rollup(db, reservation_doc["id"], None)
+        
+        # Create notification for agency admins
+        admin_users = await db.users.find({
+            "company_id": company_id,
+            "$or": [
+                {"role": "admin"},
+                {"role": "super_admin"},
+                {"is_admin": True}
+            ],
+            "is_active": True
+        }, {"_id": 0}).to_list(100)
+        
+        for admin in admin_users:
+            # Check if admin wants to receive new booking notifications
+            if should_send_notification(admin, "newBooking", "inApp"):
+                notification = {
+                    "id": str(uuid.uuid4()),
+                    "company_id": company_id,
+                    "user_id": admin["id"],
+                    "type": "new_booking",
+                    "title": "Yeni Rezervasyon Talebi",
+                    "message": f"{data.customerName} tarafından yeni bir rezervasyon talebi oluşturuldu: {tour_type.get('name')} - {data.date}",
+                    "entity_type": "reservation",
+                    "entity_id": reservation_id,
+                    "is_read": False,
+                    "is_archived": False,
+                    "created_at": datetime.now(timezone.utc).isoformat()
+                }
+                await db.notifications.insert_one(notification)
+        
+        logger.info(f"Public booking created: reservation_id={reservation_id}, company_id={company_id}, customer={data.customerName}")
+        
+        return {
+            "message": "Rezervasyon talebiniz başarıyla gönderildi. En kısa sürede size dönüş yapacağız.",
+            "reservation_id": reservation_id,
+            "status": "request_received"
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating public booking: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
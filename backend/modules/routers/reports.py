@@ -0,0 +1,1675 @@
+"""
+Dashboard and report endpoints.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+
+from ..auth import get_current_user
+from ..database import db
+from ..lookups import collect_ids, prefetch_by_ids
+from ..reports import build_dashboard_pipeline, shape_dashboard_result
+from ..rollups import currency_totals, rollup_totals
+
+router = APIRouter(tags=["reports"])
+
+# ==================== DASHBOARD ====================
+
+@router.get("/dashboard")
+async def get_dashboard(date: str, current_user: dict = Depends(get_current_user)):
+    # Get reservations for the date (cancelled hariç tüm rezervasyonlar)
+    query = {
+        "company_id": current_user["company_id"],
+        "date": date,
+        "status": {"$ne": "cancelled"}  # Cancelled olanları hariç tut
+    }
+    
+    reservations = await db.reservations.find(query, {"_id": 0}).sort("time", 1).to_list(1000)
+    
+    # Tour type bilgilerini populate et (tek sorgu)
+    tour_types = await prefetch_by_ids(
+        db.tour_types,
+        collect_ids(reservations, "tour_type_id"),
+        projection={"name": 1, "duration_hours": 1, "color": 1}
+    )
+    for reservation in reservations:
+        if reservation.get("tour_type_id"):
+            tour_type = tour_types.get(reservation["tour_type_id"])
+            if tour_type:
+                reservation["tour_type_name"] = tour_type.get("name")
+                reservation["duration_hours"] = tour_type.get("duration_hours", 2.0)  # Varsayılan 2 saat
+                reservation["tour_type_color"] = tour_type.get("color", "#3EA6FF")  # Varsayılan renk
+            else:
+                # Tur tipi bulunamazsa varsayılan değerler
+                reservation["duration_hours"] = 2.0
+                reservation["tour_type_color"] = "#3EA6FF"
+        else:
+            # Tur tipi yoksa varsayılan değerler
+            reservation["duration_hours"] = 2.0
+            reservation["tour_type_color"] = "#3EA6FF"
+    
+    total_atvs = sum(r.get("atv_count", 0) for r in reservations)
+    
+    return {
+        "date": date,
+        "total_departures": len(reservations),
+        "total_atvs": total_atvs,
+        "reservations": reservations
+    }
+
+# ==================== REPORTS ====================
+
+@router.get("/reports/dashboard")
+async def get_dashboard_report(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Genel Dashboard Raporu - tek aggregation pipeline (modules/reports.py)"""
+    # Varsayılan: son 30 gün
+    if not date_from:
+        date_from = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+    if not date_to:
+        date_to = datetime.now().strftime("%Y-%m-%d")
+    
+    # Bugünkü özet + günlük trend (son 30 gün) + top 5 cari / tur tipi
+    today = datetime.now().strftime("%Y-%m-%d")
+    trend_days = 30
+    trend_start = (datetime.now() - timedelta(days=trend_days - 1)).strftime("%Y-%m-%d")
+    
+    pipeline = build_dashboard_pipeline(current_user["company_id"], today, trend_start, date_from, date_to)
+    facets = await db.reservations.aggregate(pipeline).to_list(length=1)
+    
+    return shape_dashboard_result(facets[0] if facets else {}, today, trend_days)
+
+@router.get("/reports/daily")
+async def get_daily_report(
+    date: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Günlük İşlem Raporu"""
+    reservations = await db.reservations.find({
+        "company_id": current_user["company_id"],
+        "date": date,
+        "status": {"$ne": "cancelled"}
+    }, {"_id": 0}).sort("time", 1).to_list(1000)
+    
+    # Dağılımlar daily_rollups'tan (tek gruplama, Python'da katlanır)
+    rows = await rollup_totals(
+        db, current_user["company_id"], date, date,
+        group_by=("pickup_location", "hour", "cari_id", "tour_type_id", "currency")
+    )
+    
+    # İstatistikler
+    total_customers = len(set(r.get("customer_name", "") for r in reservations if r.get("customer_name")))
+    total_atvs = sum(row["atv_count"] for row in rows)
+    revenue = currency_totals(rows)
+    
+    pickup_distribution = defaultdict(int)
+    hourly_distribution = defaultdict(int)
+    cari_distribution = defaultdict(lambda: {"count": 0, "revenue": 0})
+    tour_type_distribution = defaultdict(lambda: {"count": 0, "revenue": 0})
+    for row in rows:
+        # Pick-up dağılımı
+        if row["pickup_location"]:
+            pickup_distribution[row["pickup_location"]] += row["count"]
+        # Saatlik dağılım
+        if row["hour"] is not None:
+            hourly_distribution[row["hour"]] += row["atv_count"]
+        # Cari firmalara göre dağılım
+        if row["cari_id"]:
+            cari_distribution[row["cari_id"]]["count"] += row["count"]
+            cari_distribution[row["cari_id"]]["revenue"] += row["revenue"]
+        # Tur tiplerine göre dağılım
+        if row["tour_type_id"]:
+            tour_type_distribution[row["tour_type_id"]]["count"] += row["count"]
+            tour_type_distribution[row["tour_type_id"]]["revenue"] += row["revenue"]
+    
+    caris = await prefetch_by_ids(db.cari_accounts, cari_distribution.keys(), projection={"name": 1})
+    cari_list = []
+    for cari_id, stats in cari_distribution.items():
+        cari = caris.get(cari_id)
+        if cari:
+            cari_list.append({
+                "cari_name": cari.get("name", ""),
+                "count": stats["count"],
+                "revenue": stats["revenue"]
+            })
+    
+    tour_types = await prefetch_by_ids(db.tour_types, tour_type_distribution.keys(), projection={"name": 1})
+    tour_type_list = []
+    for tour_type_id, stats in tour_type_distribution.items():
+        tour_type = tour_types.get(tour_type_id)
+        if tour_type:
+            tour_type_list.append({
+                "tour_type_name": tour_type.get("name", ""),
+                "count": stats["count"],
+                "revenue": stats["revenue"]
+            })
+    
+    return {
+        "date": date,
+        "total_reservations": sum(row["count"] for row in rows),
+        "total_customers": total_customers,
+        "total_atvs": total_atvs,
+        "revenue": revenue,
+        "reservations": reservations,
+        "pickup_distribution": dict(pickup_distribution),
+        "hourly_distribution": dict(hourly_distribution),
+        "cari_distribution": cari_list,
+        "tour_type_distribution": tour_type_list
+    }
+
+@router.get("/reports/reservations")
+async def get_reservations_report(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    tour_type_id: Optional[str] = None,
+    cari_id: Optional[str] = None,
+    pickup_location: Optional[str] = None,
+    currency: Optional[str] = None,
+    status: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Rezervasyon Raporları"""
+    query = {"company_id": current_user["company_id"]}
+    
+    if date_from and date_to:
+        query["date"] = {"$gte": date_from, "$lte": date_to}
+    if tour_type_id:
+        query["tour_type_id"] = tour_type_id
+    if cari_id:
+        query["cari_id"] = cari_id
+    if pickup_location:
+        query["pickup_location"] = pickup_location
+    if currency:
+        query["currency"] = currency
+    if status:
+        query["status"] = status
+    else:
+        query["status"] = {"$ne": "cancelled"}
+    
+    reservations = await db.reservations.find(query, {"_id": 0}).sort("date", -1).sort("time", 1).to_list(10000)
+    
+    # Toplam istatistikler
+    total_atvs = sum(r.get("atv_count", 0) for r in reservations)
+    total_revenue = {"EUR": 0, "USD": 0, "TRY": 0}
+    for r in reservations:
+        if r.get("price") and r.get("currency"):
+            total_revenue[r["currency"]] += r.get("price", 0)
+    
+    return {
+        "reservations": reservations,
+        "total_count": len(reservations),
+        "total_atvs": total_atvs,
+        "total_revenue": total_revenue
+    }
+
+@router.get("/reports/customers")
+async def get_customers_report(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    cari_id: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Müşteri Raporları"""
+    query = {"company_id": current_user["company_id"], "status": {"$ne": "cancelled"}}
+    
+    if date_from and date_to:
+        query["date"] = {"$gte": date_from, "$lte": date_to}
+    if cari_id:
+        query["cari_id"] = cari_id
+    
+    reservations = await db.reservations.find(query, {"_id": 0}).to_list(10000)
+    
+    # Müşteri bazlı istatistikler
+    customer_stats = defaultdict(lambda: {"count": 0, "revenue": {"EUR": 0, "USD": 0, "TRY": 0}, "cari_name": ""})
+    
+    for r in reservations:
+        customer_name = r.get("customer_name", "Belirtilmedi")
+        customer_stats[customer_name]["count"] += 1
+        if r.get("price") and r.get("currency"):
+            customer_stats[customer_name]["revenue"][r["currency"]] += r.get("price", 0)
+        if r.get("cari_id"):
+            cari = await db.cari_accounts.find_one({"id": r["cari_id"]}, {"_id": 0})
+            if cari:
+                customer_stats[customer_name]["cari_name"] = cari.get("name", "")
+    
+    # Top 10 müşteri
+    top_customers = sorted(customer_stats.items(), key=lambda x: x[1]["count"], reverse=True)[:10]
+    top_customers_list = []
+    for customer_name, stats in top_customers:
+        total_revenue = sum(stats["revenue"].values())
+        avg_revenue = total_revenue / stats["count"] if stats["count"] > 0 else 0
+        top_customers_list.append({
+            "customer_name": customer_name,
+            "reservation_count": stats["count"],
+            "total_revenue": stats["revenue"],
+            "average_revenue": avg_revenue,
+            "cari_name": stats["cari_name"]
+        })
+    
+    return {
+        "top_customers": top_customers_list
+    }
+
+@router.get("/reports/income")
+async def get_income_report(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    tour_type_id: Optional[str] = None,
+    currency: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Gelir Raporu - Tur tipi ve döviz filtreleri ile"""
+    if not date_from:
+        date_from = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+    if not date_to:
+        date_to = datetime.now().strftime("%Y-%m-%d")
+    
+    # Rezervasyon gelirleri - filtrelerle (daily_rollups üzerinden)
+    reservation_filters = {}
+    if tour_type_id:
+        reservation_filters["tour_type_id"] = tour_type_id
+    if currency:
+        reservation_filters["currency"] = currency
+    
+    reservation_rows = await rollup_totals(
+        db, current_user["company_id"], date_from, date_to,
+        group_by=("date", "tour_type_id", "currency"),
+        filters=reservation_filters
+    )
+    
+    reservation_revenue = currency_totals(reservation_rows)
+    total_atvs = sum(row["atv_count"] for row in reservation_rows)
+    
+    # Extra sales gelirleri
+    extra_sales_query = {
+        "company_id": current_user["company_id"],
+        "date": {"$gte": date_from, "$lte": date_to}
+    }
+    if currency:
+        extra_sales_query["currency"] = currency
+    
+    extra_sales = await db.extra_sales.find(extra_sales_query, {"_id": 0}).to_list(10000)
+    
+    extra_sales_revenue = {"EUR": 0, "USD": 0, "TRY": 0}
+    for s in extra_sales:
+        if s.get("sale_price") and s.get("currency"):
+            extra_sales_revenue[s["currency"]] += s.get("sale_price", 0)
+    
+    # Ekstra gelirler
+    income_query = {
+        "company_id": current_user["company_id"],
+        "date": {"$gte": date_from, "$lte": date_to}
+    }
+    if currency:
+        income_query["currency"] = currency
+    
+    incomes = await db.incomes.find(income_query, {"_id": 0}).to_list(10000)
+    
+    extra_income = {"EUR": 0, "USD": 0, "TRY": 0}
+    for i in incomes:
+        if i.get("amount") and i.get("currency"):
+            extra_income[i["currency"]] += i.get("amount", 0)
+    
+    # Toplam gelir
+    total_revenue = {
+        "EUR": reservation_revenue["EUR"] + extra_sales_revenue["EUR"] + extra_income["EUR"],
+        "USD": reservation_revenue["USD"] + extra_sales_revenue["USD"] + extra_income["USD"],
+        "TRY": reservation_revenue["TRY"] + extra_sales_revenue["TRY"] + extra_income["TRY"]
+    }
+    
+    # Tur tipine göre gruplandırılmış gelir
+    tour_type_stats = defaultdict(lambda: {
+        "reservation_count": 0,
+        "revenue": {"EUR": 0, "USD": 0, "TRY": 0}
+    })
+    
+    for row in reservation_rows:
+        if row["tour_type_id"]:
+            tour_type_stats[row["tour_type_id"]]["reservation_count"] += row["count"]
+            if row["revenue"] and row["currency"]:
+                revenue_by_currency = tour_type_stats[row["tour_type_id"]]["revenue"]
+                revenue_by_currency[row["currency"]] = revenue_by_currency.get(row["currency"], 0) + row["revenue"]
+    
+    tour_types = await prefetch_by_ids(db.tour_types, tour_type_stats.keys(), projection={"name": 1})
+    tour_type_list = []
+    for tour_type_id, stats in tour_type_stats.items():
+        tour_type = tour_types.get(tour_type_id)
+        if tour_type:
+            tour_type_list.append({
+                "tour_type_id": tour_type_id,
+                "tour_type_name": tour_type.get("name", ""),
+                "reservation_count": stats["reservation_count"],
+                "revenue": stats["revenue"]
+            })
+    
+    # Günlük trend verisi
+    daily_trend = defaultdict(lambda: {"EUR": 0, "USD": 0, "TRY": 0})
+    for row in reservation_rows:
+        date = row["date"]
+        if date and row["revenue"] and row["currency"]:
+            daily_trend[date][row["currency"]] += row["revenue"]
+    
+    for s in extra_sales:
+        date = s.get("date", "")
+        if date and s.get("sale_price") and s.get("currency"):
+            daily_trend[date][s["currency"]] += s.get("sale_price", 0)
+    
+    for i in incomes:
+        date = i.get("date", "")
+        if date and i.get("amount") and i.get("currency"):
+            daily_trend[date][i["currency"]] += i.get("amount", 0)
+    
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "reservation_revenue": reservation_revenue,
+        "extra_sales_revenue": extra_sales_revenue,
+        "extra_income": extra_income,
+        "total_revenue": total_revenue,
+        "total_atvs": total_atvs,
+        "tour_type_stats": sorted(tour_type_list, key=lambda x: sum(x["revenue"].values()), reverse=True),
+        "daily_trend": dict(daily_trend)
+    }
+
+@router.get("/reports/atv-usage")
+async def get_atv_usage_report(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    tour_type_id: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """ATV Kullanım / Doluluk Raporu"""
+    if not date_from:
+        date_from = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+    if not date_to:
+        date_to = datetime.now().strftime("%Y-%m-%d")
+    
+    rows = await rollup_totals(
+        db, current_user["company_id"], date_from, date_to,
+        group_by=("date", "hour", "tour_type_id"),
+        filters={"tour_type_id": tour_type_id} if tour_type_id else None
+    )
+    
+    # Günlük ATV kullanım
+    daily_usage = defaultdict(int)
+    for row in rows:
+        daily_usage[row["date"]] += row["atv_count"]
+    
+    # Saatlik ATV kullanım
+    hourly_usage = defaultdict(int)
+    for row in rows:
+        if row["hour"] is not None:
+            hourly_usage[row["hour"]] += row["atv_count"]
+    
+    # Tur tipine göre ATV kullanımı
+    tour_type_usage = defaultdict(int)
+    for row in rows:
+        if row["tour_type_id"]:
+            tour_type_usage[row["tour_type_id"]] += row["atv_count"]
+    
+    tour_types = await prefetch_by_ids(db.tour_types, tour_type_usage.keys(), projection={"name": 1})
+    tour_type_list = []
+    for tour_type_id, count in tour_type_usage.items():
+        tour_type = tour_types.get(tour_type_id)
+        if tour_type:
+            tour_type_list.append({
+                "tour_type_name": tour_type.get("name", ""),
+                "atv_count": count
+            })
+    
+    # En yoğun günler
+    busiest_days = sorted(daily_usage.items(), key=lambda x: x[1], reverse=True)[:10]
+    
+    # Ortalama ATV kullanımı
+    total_days = len(daily_usage)
+    avg_daily_usage = sum(daily_usage.values()) / total_days if total_days > 0 else 0
+    
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "daily_usage": dict(daily_usage),
+        "hourly_usage": dict(hourly_usage),
+        "tour_type_usage": tour_type_list,
+        "busiest_days": [{"date": d[0], "atv_count": d[1]} for d in busiest_days],
+        "avg_daily_usage": avg_daily_usage,
+        "total_atvs": sum(daily_usage.values())
+    }
+
+@router.get("/reports/tour-types")
+async def get_tour_types_report(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Tur Tipi Analiz Raporu"""
+    if not date_from:
+        date_from = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+    if not date_to:
+        date_to = datetime.now().strftime("%Y-%m-%d")
+    
+    rows = await rollup_totals(
+        db, current_user["company_id"], date_from, date_to,
+        group_by=("tour_type_id", "currency")
+    )
+    
+    tour_type_stats = defaultdict(lambda: {"count": 0, "revenue": {"EUR": 0, "USD": 0, "TRY": 0}, "atv_count": 0})
+    
+    for row in rows:
+        if row["tour_type_id"]:
+            stats = tour_type_stats[row["tour_type_id"]]
+            stats["count"] += row["count"]
+            if row["revenue"] and row["currency"]:
+                stats["revenue"][row["currency"]] = stats["revenue"].get(row["currency"], 0) + row["revenue"]
+            stats["atv_count"] += row["atv_count"]
+    
+    tour_types = await prefetch_by_ids(db.tour_types, tour_type_stats.keys(), projection={"name": 1})
+    tour_type_list = []
+    for tour_type_id, stats in tour_type_stats.items():
+        tour_type = tour_types.get(tour_type_id)
+        if tour_type:
+            total_revenue = sum(stats["revenue"].values())
+            avg_revenue = total_revenue / stats["count"] if stats["count"] > 0 else 0
+            tour_type_list.append({
+                "tour_type_id": tour_type_id,
+                "tour_type_name": tour_type.get("name", ""),
+                "reservation_count": stats["count"],
+                "revenue": stats["revenue"],
+                "atv_count": stats["atv_count"],
+                "avg_revenue": avg_revenue
+            })
+    
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "tour_type_stats": sorted(tour_type_list, key=lambda x: x["reservation_count"], reverse=True)
+    }
+
+@router.get("/reports/pickup-performance")
+async def get_pickup_performance_report(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Pick-Up Noktası Performans Raporu"""
+    if not date_from:
+        date_from = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+    if not date_to:
+        date_to = datetime.now().strftime("%Y-%m-%d")
+    
+    rows = await rollup_totals(
+        db, current_user["company_id"], date_from, date_to,
+        group_by=("pickup_location", "currency")
+    )
+    
+    pickup_stats = defaultdict(lambda: {"customer_count": 0, "atv_count": 0, "revenue": {"EUR": 0, "USD": 0, "TRY": 0}})
+    
+    for row in rows:
+        if row["pickup_location"]:
+            stats = pickup_stats[row["pickup_location"]]
+            stats["customer_count"] += row["count"]
+            stats["atv_count"] += row["atv_count"]
+            if row["revenue"] and row["currency"]:
+                stats["revenue"][row["currency"]] = stats["revenue"].get(row["currency"], 0) + row["revenue"]
+    
+    pickup_list = []
+    for pickup_location, stats in pickup_stats.items():
+        total_revenue = sum(stats["revenue"].values())
+        avg_revenue = total_revenue / stats["customer_count"] if stats["customer_count"] > 0 else 0
+        pickup_list.append({
+            "pickup_location": pickup_location,
+            "customer_count": stats["customer_count"],
+            "atv_count": stats["atv_count"],
+            "revenue": stats["revenue"],
+            "avg_revenue": avg_revenue
+        })
+    
+    # Top 10
+    top_pickups = sorted(pickup_list, key=lambda x: x["customer_count"], reverse=True)[:10]
+    
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "pickup_stats": top_pickups
+    }
+
+@router.get("/reports/seasonal-pricing-impact")
+async def get_seasonal_pricing_impact_report(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Dönemsel Fiyatlama Etki Analizi"""
+    if not date_from:
+        date_from = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+    if not date_to:
+        date_to = datetime.now().strftime("%Y-%m-%d")
+    
+    # Dönemsel fiyatlar
+    seasonal_prices = await db.seasonal_prices.find({
+        "company_id": current_user["company_id"],
+        "$or": [
+            {"start_date": {"$lte": date_to}, "end_date": {"$gte": date_from}}
+        ]
+    }, {"_id": 0}).to_list(1000)
+    
+    # Rezervasyonlar
+    reservations = await db.reservations.find({
+        "company_id": current_user["company_id"],
+        "date": {"$gte": date_from, "$lte": date_to},
+        "status": {"$ne": "cancelled"}
+    }, {"_id": 0}).to_list(10000)
+    
+    # Dönemsel fiyat uygulanan günler
+    seasonal_days = set()
+    for sp in seasonal_prices:
+        start = datetime.strptime(sp.get("start_date", date_from), "%Y-%m-%d")
+        end = datetime.strptime(sp.get("end_date", date_to), "%Y-%m-%d")
+        current = start
+        while current <= end:
+            seasonal_days.add(current.strftime("%Y-%m-%d"))
+            current += timedelta(days=1)
+    
+    # Fiyat değişikliği öncesi/sonrası karşılaştırma
+    seasonal_reservations = [r for r in reservations if r.get("date") in seasonal_days]
+    normal_reservations = [r for r in reservations if r.get("date") not in seasonal_days]
+    
+    seasonal_revenue = {"EUR": 0, "USD": 0, "TRY": 0}
+    for r in seasonal_reservations:
+        if r.get("price") and r.get("currency"):
+            seasonal_revenue[r["currency"]] += r.get("price", 0)
+    
+    normal_revenue = {"EUR": 0, "USD": 0, "TRY": 0}
+    for r in normal_reservations:
+        if r.get("price") and r.get("currency"):
+            normal_revenue[r["currency"]] += r.get("price", 0)
+    
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "seasonal_days_count": len(seasonal_days),
+        "seasonal_reservations_count": len(seasonal_reservations),
+        "normal_reservations_count": len(normal_reservations),
+        "seasonal_revenue": seasonal_revenue,
+        "normal_revenue": normal_revenue
+    }
+
+@router.get("/reports/expenses")
+async def get_expenses_report(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    expense_category_id: Optional[str] = None,
+    currency: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Gider / Masraf Raporu - Gider kalemi ve döviz filtreleri ile"""
+    if not date_from:
+        date_from = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+    if not date_to:
+        date_to = datetime.now().strftime("%Y-%m-%d")
+    
+    query = {
+        "company_id": current_user["company_id"],
+        "date": {"$gte": date_from, "$lte": date_to}
+    }
+    if expense_category_id:
+        query["expense_category_id"] = expense_category_id
+    if currency:
+        query["currency"] = currency
+    
+    expenses = await db.expenses.find(query, {"_id": 0}).sort("date", -1).to_list(10000)
+    
+    # Gider kalemlerine göre toplam
+    category_totals = defaultdict(lambda: {"EUR": 0, "USD": 0, "TRY": 0})
+    for e in expenses:
+        if e.get("expense_category_id") and e.get("amount") and e.get("currency"):
+            category_totals[e["expense_category_id"]][e["currency"]] += e.get("amount", 0)
+    
+    category_list = []
+    for category_id, totals in category_totals.items():
+        category = await db.expense_categories.find_one({"id": category_id}, {"_id": 0})
+        if category:
+            category_list.append({
+                "category_id": category_id,
+                "category_name": category.get("name", ""),
+                "totals": totals
+            })
+    
+    # Toplam giderler
+    total_expenses = {"EUR": 0, "USD": 0, "TRY": 0}
+    for e in expenses:
+        if e.get("amount") and e.get("currency"):
+            total_expenses[e["currency"]] += e.get("amount", 0)
+    
+    # Günlük trend verisi
+    daily_trend = defaultdict(lambda: {"EUR": 0, "USD": 0, "TRY": 0})
+    for e in expenses:
+        date = e.get("date", "")
+        if date and e.get("amount") and e.get("currency"):
+            daily_trend[date][e["currency"]] += e.get("amount", 0)
+    
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "expenses": expenses,
+        "category_totals": category_list,
+        "total_expenses": total_expenses,
+        "daily_trend": dict(daily_trend)
+    }
+
+@router.get("/reports/cari-accounts")
+async def get_cari_accounts_report(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Cari Hesap Raporu - Geliştirilmiş"""
+    if not date_from:
+        date_from = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+    if not date_to:
+        date_to = datetime.now().strftime("%Y-%m-%d")
+    
+    cari_accounts = await db.cari_accounts.find({
+        "company_id": current_user["company_id"]
+    }, {"_id": 0}).to_list(1000)
+    
+    # Toplam bakiyeler
+    total_balances = {"EUR": 0, "USD": 0, "TRY": 0}
+    alacaklilar = []
+    borclular = []
+    
+    # İşlem hacmi ve gelir hesaplamaları için
+    transactions = await db.transactions.find({
+        "company_id": current_user["company_id"],
+        "cari_id": {"$ne": ""},
+        "date": {"$gte": date_from, "$lte": date_to}
+    }, {"_id": 0}).to_list(10000)
+    
+    reservations = await db.reservations.find({
+        "company_id": current_user["company_id"],
+        "cari_id": {"$ne": ""},
+        "date": {"$gte": date_from, "$lte": date_to},
+        "status": {"$ne": "cancelled"}
+    }, {"_id": 0}).to_list(10000)
+    
+    # Cari bazlı istatistikler
+    cari_stats = defaultdict(lambda: {
+        "transaction_count": 0,
+        "transaction_volume": {"EUR": 0, "USD": 0, "TRY": 0},
+        "reservation_count": 0,
+        "reservation_revenue": {"EUR": 0, "USD": 0, "TRY": 0}
+    })
+    
+    for t in transactions:
+        if t.get("cari_id"):
+            cari_stats[t["cari_id"]]["transaction_count"] += 1
+            if t.get("amount") and t.get("currency"):
+                cari_stats[t["cari_id"]]["transaction_volume"][t["currency"]] += abs(t.get("amount", 0))
+    
+    for r in reservations:
+        if r.get("cari_id"):
+            cari_stats[r["cari_id"]]["reservation_count"] += 1
+            if r.get("price") and r.get("currency"):
+                cari_stats[r["cari_id"]]["reservation_revenue"][r["currency"]] += r.get("price", 0)
+    
+    for cari in cari_accounts:
+        balance_eur = cari.get("balance_eur", 0)
+        balance_usd = cari.get("balance_usd", 0)
+        balance_try = cari.get("balance_try", 0)
+        
+        total_balances["EUR"] += balance_eur
+        total_balances["USD"] += balance_usd
+        total_balances["TRY"] += balance_try
+        
+        stats = cari_stats.get(cari["id"], {})
+        total_revenue = sum(stats.get("reservation_revenue", {}).values())
+        total_volume = sum(stats.get("transaction_volume", {}).values())
+        
+        cari_data = {
+            "cari_id": cari["id"],
+            "cari_name": cari.get("name", ""),
+            "balance_eur": balance_eur,
+            "balance_usd": balance_usd,
+            "balance_try": balance_try,
+            "transaction_count": stats.get("transaction_count", 0),
+            "transaction_volume": stats.get("transaction_volume", {}),
+            "reservation_count": stats.get("reservation_count", 0),
+            "reservation_revenue": stats.get("reservation_revenue", {}),
+            "total_revenue": total_revenue,
+            "total_volume": total_volume
+        }
+        
+        if balance_eur > 0 or balance_usd > 0 or balance_try > 0:
+            alacaklilar.append(cari_data)
+        elif balance_eur < 0 or balance_usd < 0 or balance_try < 0:
+            borclular.append(cari_data)
+    
+    # En fazla işlem hacmi
+    top_volume = sorted(
+        [c for c in cari_accounts if cari_stats.get(c["id"], {}).get("transaction_count", 0) > 0],
+        key=lambda x: sum(cari_stats.get(x["id"], {}).get("transaction_volume", {}).values()),
+        reverse=True
+    )[:10]
+    top_volume_list = []
+    for cari in top_volume:
+        stats = cari_stats.get(cari["id"], {})
+        top_volume_list.append({
+            "cari_name": cari.get("name", ""),
+            "transaction_count": stats.get("transaction_count", 0),
+            "transaction_volume": stats.get("transaction_volume", {}),
+            "total_volume": sum(stats.get("transaction_volume", {}).values())
+        })
+    
+    # En fazla kazandıran
+    top_revenue = sorted(
+        [c for c in cari_accounts if cari_stats.get(c["id"], {}).get("reservation_count", 0) > 0],
+        key=lambda x: sum(cari_stats.get(x["id"], {}).get("reservation_revenue", {}).values()),
+        reverse=True
+    )[:10]
+    top_revenue_list = []
+    for cari in top_revenue:
+        stats = cari_stats.get(cari["id"], {})
+        top_revenue_list.append({
+            "cari_name": cari.get("name", ""),
+            "reservation_count": stats.get("reservation_count", 0),
+            "reservation_revenue": stats.get("reservation_revenue", {}),
+            "total_revenue": sum(stats.get("reservation_revenue", {}).values())
+        })
+    
+    return {
+        "total_balances": total_balances,
+        "alacaklilar": sorted(alacaklilar, key=lambda x: x["balance_eur"] + x["balance_usd"] + x["balance_try"], reverse=True),
+        "borclular": sorted(borclular, key=lambda x: abs(x["balance_eur"] + x["balance_usd"] + x["balance_try"]), reverse=True),
+        "top_volume": top_volume_list,
+        "top_revenue": top_revenue_list
+    }
+
+@router.get("/reports/cash-status")
+async def get_cash_status_report(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Kasa Durum Raporu"""
+    if not date_from:
+        date_from = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+    if not date_to:
+        date_to = datetime.now().strftime("%Y-%m-%d")
+    
+    # Kasa bakiyeleri (cash endpoint'inden al)
+    # Rezervasyon gelirleri
+    reservations = await db.reservations.find({
+        "company_id": current_user["company_id"],
+        "date": {"$gte": date_from, "$lte": date_to},
+        "status": {"$ne": "cancelled"}
+    }, {"_id": 0}).to_list(10000)
+    
+    reservation_revenue = {"EUR": 0, "USD": 0, "TRY": 0}
+    for r in reservations:
+        if r.get("price") and r.get("currency"):
+            reservation_revenue[r["currency"]] += r.get("price", 0)
+    
+    # Extra sales gelirleri
+    extra_sales = await db.extra_sales.find({
+        "company_id": current_user["company_id"],
+        "date": {"$gte": date_from, "$lte": date_to}
+    }, {"_id": 0}).to_list(10000)
+    
+    extra_sales_revenue = {"EUR": 0, "USD": 0, "TRY": 0}
+    for s in extra_sales:
+        if s.get("sale_price") and s.get("currency"):
+            extra_sales_revenue[s["currency"]] += s.get("sale_price", 0)
+    
+    # Ekstra gelirler
+    incomes = await db.incomes.find({
+        "company_id": current_user["company_id"],
+        "date": {"$gte": date_from, "$lte": date_to}
+    }, {"_id": 0}).to_list(10000)
+    
+    extra_income = {"EUR": 0, "USD": 0, "TRY": 0}
+    for i in incomes:
+        if i.get("amount") and i.get("currency"):
+            extra_income[i["currency"]] += i.get("amount", 0)
+    
+    # Tahsilatlar
+    payments = await db.transactions.find({
+        "company_id": current_user["company_id"],
+        "transaction_type": "payment",
+        "reference_type": {"$ne": "outgoing_payment"},
+        "date": {"$gte": date_from, "$lte": date_to}
+    }, {"_id": 0}).to_list(10000)
+    
+    payment_revenue = {"EUR": 0, "USD": 0, "TRY": 0}
+    for p in payments:
+        if p.get("amount") and p.get("currency"):
+            payment_revenue[p["currency"]] += p.get("amount", 0)
+    
+    # Ödemeler
+    outgoing_payments = await db.transactions.find({
+        "company_id": current_user["company_id"],
+        "reference_type": "outgoing_payment",
+        "date": {"$gte": date_from, "$lte": date_to}
+    }, {"_id": 0}).to_list(10000)
+    
+    outgoing_payment_amount = {"EUR": 0, "USD": 0, "TRY": 0}
+    for p in outgoing_payments:
+        if p.get("amount") and p.get("currency"):
+            outgoing_payment_amount[p["currency"]] += abs(p.get("amount", 0))
+    
+    # Giderler
+    expenses = await db.expenses.find({
+        "company_id": current_user["company_id"],
+        "date": {"$gte": date_from, "$lte": date_to}
+    }, {"_id": 0}).to_list(10000)
+    
+    expense_amount = {"EUR": 0, "USD": 0, "TRY": 0}
+    for e in expenses:
+        if e.get("amount") and e.get("currency"):
+            expense_amount[e["currency"]] += e.get("amount", 0)
+    
+    # Döviz bozma işlemleri
+    exchanges = await db.transactions.find({
+        "company_id": current_user["company_id"],
+        "reference_type": "currency_exchange",
+        "date": {"$gte": date_from, "$lte": date_to}
+    }, {"_id": 0}).to_list(10000)
+    
+    total_income = {
+        "EUR": reservation_revenue["EUR"] + extra_sales_revenue["EUR"] + extra_income["EUR"] + payment_revenue["EUR"],
+        "USD": reservation_revenue["USD"] + extra_sales_revenue["USD"] + extra_income["USD"] + payment_revenue["USD"],
+        "TRY": reservation_revenue["TRY"] + extra_sales_revenue["TRY"] + extra_income["TRY"] + payment_revenue["TRY"]
+    }
+    
+    total_expenses = {
+        "EUR": outgoing_payment_amount["EUR"] + expense_amount["EUR"],
+        "USD": outgoing_payment_amount["USD"] + expense_amount["USD"],
+        "TRY": outgoing_payment_amount["TRY"] + expense_amount["TRY"]
+    }
+    
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "reservation_revenue": reservation_revenue,
+        "extra_sales_revenue": extra_sales_revenue,
+        "extra_income": extra_income,
+        "payment_revenue": payment_revenue,
+        "outgoing_payments": outgoing_payment_amount,
+        "expenses": expense_amount,
+        "exchanges": len(exchanges),
+        "total_income": total_income,
+        "total_expenses": total_expenses,
+        "net_cash_flow": {
+            "EUR": total_income["EUR"] - total_expenses["EUR"],
+            "USD": total_income["USD"] - total_expenses["USD"],
+            "TRY": total_income["TRY"] - total_expenses["TRY"]
+        }
+    }
+
+@router.get("/reports/extra-sales")
+async def get_extra_sales_report(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    cari_id: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Extra Sales Raporu"""
+    if not date_from:
+        date_from = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+    if not date_to:
+        date_to = datetime.now().strftime("%Y-%m-%d")
+    
+    query = {
+        "company_id": current_user["company_id"],
+        "date": {"$gte": date_from, "$lte": date_to}
+    }
+    if cari_id:
+        query["cari_id"] = cari_id
+    
+    extra_sales = await db.extra_sales.find(query, {"_id": 0}).sort("date", -1).to_list(10000)
+    
+    # Toplam gelir
+    total_revenue = {"EUR": 0, "USD": 0, "TRY": 0}
+    for s in extra_sales:
+        if s.get("sale_price") and s.get("currency"):
+            total_revenue[s["currency"]] += s.get("sale_price", 0)
+    
+    # En çok satılan ürünler
+    product_stats = defaultdict(lambda: {"count": 0, "revenue": {"EUR": 0, "USD": 0, "TRY": 0}})
+    for s in extra_sales:
+        product_name = s.get("product_name", "Belirtilmedi")
+        product_stats[product_name]["count"] += 1
+        if s.get("sale_price") and s.get("currency"):
+            product_stats[product_name]["revenue"][s["currency"]] += s.get("sale_price", 0)
+    
+    top_products = sorted(product_stats.items(), key=lambda x: x[1]["count"], reverse=True)[:10]
+    top_products_list = []
+    for product_name, stats in top_products:
+        top_products_list.append({
+            "product_name": product_name,
+            "count": stats["count"],
+            "revenue": stats["revenue"]
+        })
+    
+    # Cari firmalara göre dağılım
+    cari_stats = defaultdict(lambda: {"count": 0, "revenue": {"EUR": 0, "USD": 0, "TRY": 0}})
+    for s in extra_sales:
+        if s.get("cari_id"):
+            cari_stats[s["cari_id"]]["count"] += 1
+            if s.get("sale_price") and s.get("currency"):
+                cari_stats[s["cari_id"]]["revenue"][s["currency"]] += s.get("sale_price", 0)
+    
+    cari_list = []
+    for cari_id, stats in cari_stats.items():
+        cari = await db.cari_accounts.find_one({"id": cari_id}, {"_id": 0})
+        if cari:
+            cari_list.append({
+                "cari_name": cari.get("name", ""),
+                "count": stats["count"],
+                "revenue": stats["revenue"]
+            })
+    
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "extra_sales": extra_sales,
+        "total_revenue": total_revenue,
+        "top_products": top_products_list,
+        "cari_distribution": cari_list
+    }
+
+@router.get("/reports/profit-loss")
+async def get_profit_loss_report(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Kar/Zarar Raporu"""
+    if not date_from:
+        date_from = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+    if not date_to:
+        date_to = datetime.now().strftime("%Y-%m-%d")
+    
+    # Toplam gelir (rezervasyonlar + extra sales + ekstra gelirler)
+    reservations = await db.reservations.find({
+        "company_id": current_user["company_id"],
+        "date": {"$gte": date_from, "$lte": date_to},
+        "status": {"$ne": "cancelled"}
+    }, {"_id": 0}).to_list(10000)
+    
+    reservation_revenue = {"EUR": 0, "USD": 0, "TRY": 0}
+    for r in reservations:
+        if r.get("price") and r.get("currency"):
+            reservation_revenue[r["currency"]] += r.get("price", 0)
+    
+    extra_sales = await db.extra_sales.find({
+        "company_id": current_user["company_id"],
+        "date": {"$gte": date_from, "$lte": date_to}
+    }, {"_id": 0}).to_list(10000)
+    
+    extra_sales_revenue = {"EUR": 0, "USD": 0, "TRY": 0}
+    for s in extra_sales:
+        if s.get("sale_price") and s.get("currency"):
+            extra_sales_revenue[s["currency"]] += s.get("sale_price", 0)
+    
+    incomes = await db.incomes.find({
+        "company_id": current_user["company_id"],
+        "date": {"$gte": date_from, "$lte": date_to}
+    }, {"_id": 0}).to_list(10000)
+    
+    extra_income = {"EUR": 0, "USD": 0, "TRY": 0}
+    for i in incomes:
+        if i.get("amount") and i.get("currency"):
+            extra_income[i["currency"]] += i.get("amount", 0)
+    
+    total_income = {
+        "EUR": reservation_revenue["EUR"] + extra_sales_revenue["EUR"] + extra_income["EUR"],
+        "USD": reservation_revenue["USD"] + extra_sales_revenue["USD"] + extra_income["USD"],
+        "TRY": reservation_revenue["TRY"] + extra_sales_revenue["TRY"] + extra_income["TRY"]
+    }
+    
+    # Toplam gider
+    expenses = await db.expenses.find({
+        "company_id": current_user["company_id"],
+        "date": {"$gte": date_from, "$lte": date_to}
+    }, {"_id": 0}).to_list(10000)
+    
+    total_expenses = {"EUR": 0, "USD": 0, "TRY": 0}
+    for e in expenses:
+        if e.get("amount") and e.get("currency"):
+            total_expenses[e["currency"]] += e.get("amount", 0)
+    
+    # Net kar/zarar
+    net_profit_loss = {
+        "EUR": total_income["EUR"] - total_expenses["EUR"],
+        "USD": total_income["USD"] - total_expenses["USD"],
+        "TRY": total_income["TRY"] - total_expenses["TRY"]
+    }
+    
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "total_income": total_income,
+        "total_expenses": total_expenses,
+        "net_profit_loss": net_profit_loss,
+        "reservation_revenue": reservation_revenue,
+        "extra_sales_revenue": extra_sales_revenue,
+        "extra_income": extra_income
+    }
+
+@router.get("/reports/balanced-accounts")
+async def get_balanced_accounts_report(current_user: dict = Depends(get_current_user)):
+    """Bakiyesi Olanlar Raporu"""
+    cari_accounts = await db.cari_accounts.find({
+        "company_id": current_user["company_id"]
+    }, {"_id": 0}).to_list(1000)
+    
+    balanced = []
+    for cari in cari_accounts:
+        balance_eur = cari.get("balance_eur", 0)
+        balance_usd = cari.get("balance_usd", 0)
+        balance_try = cari.get("balance_try", 0)
+        
+        # Herhangi bir dövizde bakiye varsa (pozitif veya negatif)
+        if balance_eur != 0 or balance_usd != 0 or balance_try != 0:
+            balanced.append({
+                "cari_id": cari["id"],
+                "cari_name": cari.get("name", ""),
+                "balance_eur": balance_eur,
+                "balance_usd": balance_usd,
+                "balance_try": balance_try,
+                "total_balance": balance_eur + balance_usd + balance_try
+            })
+    
+    return {
+        "balanced_accounts": sorted(balanced, key=lambda x: abs(x["total_balance"]), reverse=True)
+    }
+
+@router.get("/reports/creditors")
+async def get_creditors_report(current_user: dict = Depends(get_current_user)):
+    """Alacaklı Olanlar Raporu (Bize borçlu olanlar - pozitif bakiye)"""
+    cari_accounts = await db.cari_accounts.find({
+        "company_id": current_user["company_id"]
+    }, {"_id": 0}).to_list(1000)
+    
+    creditors = []
+    for cari in cari_accounts:
+        balance_eur = cari.get("balance_eur", 0)
+        balance_usd = cari.get("balance_usd", 0)
+        balance_try = cari.get("balance_try", 0)
+        
+        # Pozitif bakiye = bize borçlu (alacaklıyız)
+        if balance_eur > 0 or balance_usd > 0 or balance_try > 0:
+            creditors.append({
+                "cari_id": cari["id"],
+                "cari_name": cari.get("name", ""),
+                "balance_eur": balance_eur,
+                "balance_usd": balance_usd,
+                "balance_try": balance_try,
+                "total_balance": balance_eur + balance_usd + balance_try
+            })
+    
+    return {
+        "creditors": sorted(creditors, key=lambda x: x["total_balance"], reverse=True)
+    }
+
+@router.get("/reports/performance")
+async def get_performance_report(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Performans Raporu"""
+    if not date_from:
+        date_from = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+    if not date_to:
+        date_to = datetime.now().strftime("%Y-%m-%d")
+    
+    rows = await rollup_totals(
+        db, current_user["company_id"], date_from, date_to,
+        group_by=("status", "date", "hour", "currency"),
+        exclude_cancelled=False
+    )
+    
+    status_counts = defaultdict(int)
+    for row in rows:
+        status_counts[row["status"]] += row["count"]
+    
+    total_reservations = sum(status_counts.values())
+    completed = status_counts["completed"]
+    cancelled = status_counts["cancelled"]
+    confirmed = status_counts["confirmed"]
+    
+    completion_rate = (completed / total_reservations * 100) if total_reservations > 0 else 0
+    cancellation_rate = (cancelled / total_reservations * 100) if total_reservations > 0 else 0
+    
+    # Ortalama rezervasyon değeri
+    valid_rows = [row for row in rows if row["status"] != "cancelled"]
+    total_revenue = currency_totals(valid_rows)
+    
+    valid_count = total_reservations - cancelled
+    avg_reservation_value = {
+        "EUR": total_revenue["EUR"] / valid_count if valid_count > 0 else 0,
+        "USD": total_revenue["USD"] / valid_count if valid_count > 0 else 0,
+        "TRY": total_revenue["TRY"] / valid_count if valid_count > 0 else 0
+    }
+    
+    # En verimli günler
+    daily_performance = defaultdict(lambda: {"reservations": 0, "revenue": 0})
+    for row in valid_rows:
+        daily_performance[row["date"]]["reservations"] += row["count"]
+        if row["currency"] == "EUR":
+            daily_performance[row["date"]]["revenue"] += row["revenue"]
+    
+    busiest_days = sorted(daily_performance.items(), key=lambda x: x[1]["revenue"], reverse=True)[:10]
+    
+    # En verimli saatler
+    hourly_performance = defaultdict(lambda: {"reservations": 0, "revenue": 0})
+    for row in valid_rows:
+        if row["hour"] is not None:
+            hourly_performance[row["hour"]]["reservations"] += row["count"]
+            if row["currency"] == "EUR":
+                hourly_performance[row["hour"]]["revenue"] += row["revenue"]
+    
+    busiest_hours = sorted(hourly_performance.items(), key=lambda x: x[1]["revenue"], reverse=True)[:10]
+    
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "total_reservations": total_reservations,
+        "completed": completed,
+        "cancelled": cancelled,
+        "confirmed": confirmed,
+        "completion_rate": completion_rate,
+        "cancellation_rate": cancellation_rate,
+        "avg_reservation_value": avg_reservation_value,
+        "busiest_days": [{"date": d[0], "reservations": d[1]["reservations"], "revenue": d[1]["revenue"]} for d in busiest_days],
+        "busiest_hours": [{"hour": h[0], "reservations": h[1]["reservations"], "revenue": h[1]["revenue"]} for h in busiest_hours]
+    }
+
+@router.get("/reports/earnings")
+async def get_earnings_report(
+    date_from: str,
+    date_to: str,
+    current_user: dict = Depends(get_current_user)
+):
+    # Reservations
+    reservations = await db.reservations.find(
+        {
+            "company_id": current_user["company_id"],
+            "date": {"$gte": date_from, "$lte": date_to},
+            "status": "completed"
+        },
+        {"_id": 0}
+    ).to_list(10000)
+    
+    # Extra sales
+    extra_sales = await db.extra_sales.find(
+        {
+            "company_id": current_user["company_id"],
+            "date": {"$gte": date_from, "$lte": date_to}
+        },
+        {"_id": 0}
+    ).to_list(10000)
+    
+    earnings = {"EUR": 0, "USD": 0, "TRY": 0}
+    
+    for r in reservations:
+        earnings[r["currency"]] += r["price"]
+    
+    for s in extra_sales:
+        profit = s["sale_price"] - s.get("purchase_price", 0)
+        earnings[s["currency"]] += profit
+    
+    return {"earnings": earnings, "reservations_count": len(reservations), "sales_count": len(extra_sales)}
+
+@router.get("/reports/collections")
+async def get_collections_report(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    payment_type_id: Optional[str] = None,
+    currency: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Tahsilat Raporu - Ödeme tipi ve döviz filtreleri ile"""
+    if not date_from:
+        date_from = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+    if not date_to:
+        date_to = datetime.now().strftime("%Y-%m-%d")
+    
+    query = {
+        "company_id": current_user["company_id"],
+        "transaction_type": "payment",
+        "reference_type": {"$ne": "outgoing_payment"},
+        "date": {"$gte": date_from, "$lte": date_to}
+    }
+    
+    if payment_type_id:
+        query["payment_type_id"] = payment_type_id
+    if currency:
+        query["currency"] = currency
+    
+    transactions = await db.transactions.find(query, {"_id": 0}).to_list(10000)
+    
+    collections = {"EUR": 0, "USD": 0, "TRY": 0}
+    for t in transactions:
+        if t.get("amount") and t.get("currency"):
+            collections[t["currency"]] += t.get("amount", 0)
+    
+    # Ödeme tipine göre gruplandırılmış tahsilat
+    payment_type_stats = defaultdict(lambda: {
+        "transaction_count": 0,
+        "totals": {"EUR": 0, "USD": 0, "TRY": 0}
+    })
+    
+    for t in transactions:
+        payment_type_id = t.get("payment_type_id")
+        if payment_type_id:
+            payment_type_stats[payment_type_id]["transaction_count"] += 1
+            if t.get("amount") and t.get("currency"):
+                payment_type_stats[payment_type_id]["totals"][t["currency"]] += t.get("amount", 0)
+    
+    payment_type_list = []
+    for payment_type_id, stats in payment_type_stats.items():
+        payment_type = await db.payment_types.find_one({"id": payment_type_id}, {"_id": 0})
+        if payment_type:
+            payment_type_list.append({
+                "payment_type_id": payment_type_id,
+                "payment_type_name": payment_type.get("name", ""),
+                "transaction_count": stats["transaction_count"],
+                "totals": stats["totals"]
+            })
+    
+    # Günlük trend verisi
+    daily_trend = defaultdict(lambda: {"EUR": 0, "USD": 0, "TRY": 0})
+    for t in transactions:
+        date = t.get("date", "")
+        if date and t.get("amount") and t.get("currency"):
+            daily_trend[date][t["currency"]] += t.get("amount", 0)
+    
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "collections": collections,
+        "transactions": transactions,
+        "payment_type_stats": sorted(payment_type_list, key=lambda x: sum(x["totals"].values()), reverse=True),
+        "daily_trend": dict(daily_trend)
+    }
+
+@router.get("/reports/debtors")
+async def get_debtors_report(current_user: dict = Depends(get_current_user)):
+    cari_accounts = await db.cari_accounts.find(
+        {"company_id": current_user["company_id"]},
+        {"_id": 0}
+    ).to_list(10000)
+    
+    debtors = [c for c in cari_accounts if c["balance_eur"] > 0 or c["balance_usd"] > 0 or c["balance_try"] > 0]
+    return debtors
+
+@router.get("/reports/cancelled")
+async def get_cancelled_report(
+    date_from: str,
+    date_to: str,
+    current_user: dict = Depends(get_current_user)
+):
+    reservations = await db.reservations.find(
+        {
+            "company_id": current_user["company_id"],
+            "status": "cancelled",
+            "date": {"$gte": date_from, "$lte": date_to}
+        },
+        {"_id": 0}
+    ).to_list(10000)
+    
+    return reservations
+
+# ==================== REPORTS ====================
+
+@router.get("/reports/profit")
+async def get_profit_report(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    currency: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Kazanç (Kar/Zarar) Raporu - Gelir ve Gider farkını hesaplar"""
+    company_id = current_user["company_id"]
+    
+    # Gelir hesapla
+    income_data = await get_income_report(date_from=date_from, date_to=date_to, currency=currency, current_user=current_user)
+    total_income = income_data.get("total_revenue", {"EUR": 0.0, "USD": 0.0, "TRY": 0.0})
+    
+    # Gider hesapla
+    expense_data = await get_expenses_report(date_from=date_from, date_to=date_to, currency=currency, current_user=current_user)
+    total_expenses = expense_data.get("total_expenses", {"EUR": 0.0, "USD": 0.0, "TRY": 0.0})
+    
+    # Kar/Zarar hesapla
+    profit = {}
+    profit_percentage = {}
+    for curr in ["EUR", "USD", "TRY"]:
+        income = total_income.get(curr, 0.0)
+        expense = total_expenses.get(curr, 0.0)
+        profit[curr] = income - expense
+        if income > 0:
+            profit_percentage[curr] = ((income - expense) / income) * 100
+        else:
+            profit_percentage[curr] = 0.0
+    
+    # Günlük trend (gelir - gider)
+    income_trend = income_data.get("daily_trend", {})
+    expense_trend = expense_data.get("daily_trend", {})
+    profit_trend = defaultdict(lambda: {"EUR": 0.0, "USD": 0.0, "TRY": 0.0})
+    
+    all_dates = set(list(income_trend.keys()) + list(expense_trend.keys()))
+    for date in all_dates:
+        for curr in ["EUR", "USD", "TRY"]:
+            income_val = income_trend.get(date, {}).get(curr, 0.0)
+            expense_val = expense_trend.get(date, {}).get(curr, 0.0)
+            profit_trend[date][curr] = income_val - expense_val
+    
+    return {
+        "total_income": total_income,
+        "total_expenses": total_expenses,
+        "profit": profit,
+        "profit_percentage": profit_percentage,
+        "daily_trend": dict(profit_trend),
+        "income_by_tour_type": income_data.get("tour_type_stats", []),
+        "expenses_by_category": expense_data.get("category_totals", [])
+    }
+
+@router.get("/reports/cash-flow")
+async def get_cash_flow_report(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    currency: Optional[str] = None,
+    period: Optional[str] = "daily",  # daily, weekly, monthly
+    current_user: dict = Depends(get_current_user)
+):
+    """Nakit Akış Raporu - Günlük/haftalık/aylık nakit giriş-çıkış analizi"""
+    company_id = current_user["company_id"]
+    
+    # Tüm transaction'ları getir (payment type olanlar)
+    transaction_query = {
+        "company_id": company_id,
+        "transaction_type": "payment"
+    }
+    if date_from:
+        transaction_query["date"] = {"$gte": date_from}
+    if date_to:
+        if "date" in transaction_query and isinstance(transaction_query["date"], dict):
+            transaction_query["date"]["$lte"] = date_to
+        else:
+            transaction_query["date"] = {"$lte": date_to}
+    if currency:
+        transaction_query["currency"] = currency
+    
+    transactions = await db.transactions.find(transaction_query, {"_id": 0}).to_list(10000)
+    
+    # Nakit akış hesaplama
+    cash_flow = defaultdict(lambda: {
+        "date": "",
+        "inflow": {"EUR": 0.0, "USD": 0.0, "TRY": 0.0},
+        "outflow": {"EUR": 0.0, "USD": 0.0, "TRY": 0.0},
+        "net_flow": {"EUR": 0.0, "USD": 0.0, "TRY": 0.0},
+        "balance": {"EUR": 0.0, "USD": 0.0, "TRY": 0.0}
+    })
+    
+    running_balance = {"EUR": 0.0, "USD": 0.0, "TRY": 0.0}
+    
+    for transaction in transactions:
+        trans_date = transaction.get("date", "")
+        trans_currency = transaction.get("currency", "TRY")
+        trans_amount = transaction.get("amount", 0)
+        
+        if not trans_date:
+            continue
+        
+        # Period'a göre date key oluştur
+        date_obj = datetime.strptime(trans_date, "%Y-%m-%d")
+        if period == "weekly":
+            # Hafta başlangıcı (Pazartesi)
+            week_start = date_obj - timedelta(days=date_obj.weekday())
+            date_key = week_start.strftime("%Y-%m-%d")
+        elif period == "monthly":
+            # Ay başlangıcı
+            date_key = date_obj.strftime("%Y-%m-01")
+        else:  # daily
+            date_key = trans_date
+        
+        if date_key not in cash_flow:
+            cash_flow[date_key]["date"] = date_key
+        
+        # Pozitif = giriş, negatif = çıkış
+        if trans_amount > 0:
+            cash_flow[date_key]["inflow"][trans_currency] += trans_amount
+        else:
+            cash_flow[date_key]["outflow"][trans_currency] += abs(trans_amount)
+    
+    # Net flow ve balance hesapla
+    sorted_dates = sorted(cash_flow.keys())
+    for date_key in sorted_dates:
+        for curr in ["EUR", "USD", "TRY"]:
+            inflow = cash_flow[date_key]["inflow"][curr]
+            outflow = cash_flow[date_key]["outflow"][curr]
+            net = inflow - outflow
+            cash_flow[date_key]["net_flow"][curr] = net
+            running_balance[curr] += net
+            cash_flow[date_key]["balance"][curr] = running_balance[curr]
+    
+    # Toplam istatistikler
+    total_inflow = {"EUR": 0.0, "USD": 0.0, "TRY": 0.0}
+    total_outflow = {"EUR": 0.0, "USD": 0.0, "TRY": 0.0}
+    for date_key in cash_flow:
+        for curr in ["EUR", "USD", "TRY"]:
+            total_inflow[curr] += cash_flow[date_key]["inflow"][curr]
+            total_outflow[curr] += cash_flow[date_key]["outflow"][curr]
+    
+    total_net_flow = {}
+    for curr in ["EUR", "USD", "TRY"]:
+        total_net_flow[curr] = total_inflow[curr] - total_outflow[curr]
+    
+    # Cash account bakiyelerini al
+    cash_accounts = await db.cash_accounts.find(
+        {"company_id": company_id, "is_active": True},
+        {"_id": 0}
+    ).to_list(100)
+    
+    current_balances = {"EUR": 0.0, "USD": 0.0, "TRY": 0.0}
+    for account in cash_accounts:
+        acc_currency = account.get("currency", "TRY")
+        acc_balance = account.get("current_balance", 0) or 0
+        if acc_currency in current_balances:
+            current_balances[acc_currency] += acc_balance
+    
+    return {
+        "period": period,
+        "cash_flow": [cash_flow[date_key] for date_key in sorted_dates],
+        "total_inflow": total_inflow,
+        "total_outflow": total_outflow,
+        "total_net_flow": total_net_flow,
+        "current_balances": current_balances,
+        "cash_accounts": cash_accounts
+    }
+
+@router.get("/reports/customer-analysis")
+async def get_customer_analysis_report(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    currency: Optional[str] = None,
+    min_sales: Optional[int] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Müşteri Analizi Raporu - Müşteri bazlı satış, gelir, tekrar ziyaret analizi"""
+    company_id = current_user["company_id"]
+    
+    # Rezervasyonlardan müşteri verileri
+    reservation_query = {
+        "company_id": company_id,
+        "status": {"$in": ["confirmed", "completed"]}
+    }
+    if date_from:
+        reservation_query["date"] = {"$gte": date_from}
+    if date_to:
+        if "date" in reservation_query and isinstance(reservation_query["date"], dict):
+            reservation_query["date"]["$lte"] = date_to
+        else:
+            reservation_query["date"] = {"$lte": date_to}
+    
+    reservations = await db.reservations.find(reservation_query, {"_id": 0}).to_list(10000)
+    
+    # Extra sales'den müşteri verileri
+    extra_sales_query = {
+        "company_id": company_id,
+        "status": {"$in": ["confirmed", "completed"]}
+    }
+    if date_from:
+        extra_sales_query["date"] = {"$gte": date_from}
+    if date_to:
+        if "date" in extra_sales_query and isinstance(extra_sales_query["date"], dict):
+            extra_sales_query["date"]["$lte"] = date_to
+        else:
+            extra_sales_query["date"] = {"$lte": date_to}
+    
+    extra_sales = await db.extra_sales.find(extra_sales_query, {"_id": 0}).to_list(10000)
+    
+    # Müşteri bazlı analiz
+    customer_stats = defaultdict(lambda: {
+        "customer_name": "",
+        "customer_contact": "",
+        "total_sales": 0,
+        "total_revenue": {"EUR": 0.0, "USD": 0.0, "TRY": 0.0},
+        "first_sale_date": None,
+        "last_sale_date": None,
+        "sale_dates": [],
+        "reservations": [],
+        "extra_sales": []
+    })
+    
+    # Rezervasyonlardan müşteri verileri
+    for reservation in reservations:
+        customer_name = reservation.get("customer_name", "").strip()
+        customer_contact = reservation.get("customer_contact", "").strip()
+        
+        if not customer_name:
+            continue
+        
+        # Müşteri key'i (isim + iletişim)
+        customer_key = f"{customer_name}|{customer_contact}"
+        
+        res_currency = reservation.get("currency", "EUR")
+        res_price = reservation.get("price", 0)
+        res_date = reservation.get("date", "")
+        
+        if currency and res_currency != currency:
+            continue
+        
+        customer_stats[customer_key]["customer_name"] = customer_name
+        customer_stats[customer_key]["customer_contact"] = customer_contact
+        customer_stats[customer_key]["total_sales"] += 1
+        customer_stats[customer_key]["total_revenue"][res_currency] += res_price
+        
+        if res_date:
+            if not customer_stats[customer_key]["first_sale_date"] or res_date < customer_stats[customer_key]["first_sale_date"]:
+                customer_stats[customer_key]["first_sale_date"] = res_date
+            if not customer_stats[customer_key]["last_sale_date"] or res_date > customer_stats[customer_key]["last_sale_date"]:
+                customer_stats[customer_key]["last_sale_date"] = res_date
+            customer_stats[customer_key]["sale_dates"].append(res_date)
+        
+        customer_stats[customer_key]["reservations"].append({
+            "id": reservation.get("id"),
+            "date": res_date,
+            "price": res_price,
+            "currency": res_currency,
+            "tour_type_id": reservation.get("tour_type_id")
+        })
+    
+    # Extra sales'den müşteri verileri
+    for sale in extra_sales:
+        customer_name = sale.get("customer_name", "").strip()
+        customer_contact = sale.get("customer_contact", "").strip()
+        
+        if not customer_name:
+            continue
+        
+        customer_key = f"{customer_name}|{customer_contact}"
+        
+        sale_currency = sale.get("currency", "EUR")
+        sale_price = sale.get("sale_price", 0)
+        sale_date = sale.get("date", "")
+        
+        if currency and sale_currency != currency:
+            continue
+        
+        customer_stats[customer_key]["customer_name"] = customer_name
+        customer_stats[customer_key]["customer_contact"] = customer_contact
+        customer_stats[customer_key]["total_sales"] += 1
+        customer_stats[customer_key]["total_revenue"][sale_currency] += sale_price
+        
+        if sale_date:
+            if not customer_stats[customer_key]["first_sale_date"] or sale_date < customer_stats[customer_key]["first_sale_date"]:
+                customer_stats[customer_key]["first_sale_date"] = sale_date
+            if not customer_stats[customer_key]["last_sale_date"] or sale_date > customer_stats[customer_key]["last_sale_date"]:
+                customer_stats[customer_key]["last_sale_date"] = sale_date
+            customer_stats[customer_key]["sale_dates"].append(sale_date)
+        
+        customer_stats[customer_key]["extra_sales"].append({
+            "id": sale.get("id"),
+            "date": sale_date,
+            "price": sale_price,
+            "currency": sale_currency,
+            "product_name": sale.get("product_name")
+        })
+    
+    # İstatistikleri hesapla
+    customer_list = []
+    for customer_key, stats in customer_stats.items():
+        # Min sales filtresi
+        if min_sales and stats["total_sales"] < min_sales:
+            continue
+        
+        # Ortalama satış tutarı
+        avg_revenue = {}
+        for curr in ["EUR", "USD", "TRY"]:
+            if stats["total_sales"] > 0:
+                avg_revenue[curr] = stats["total_revenue"][curr] / stats["total_sales"]
+            else:
+                avg_revenue[curr] = 0.0
+        
+        # Tekrar ziyaret kontrolü (birden fazla satış varsa)
+        is_returning = stats["total_sales"] > 1
+        
+        customer_list.append({
+            "customer_name": stats["customer_name"],
+            "customer_contact": stats["customer_contact"],
+            "total_sales": stats["total_sales"],
+            "total_revenue": stats["total_revenue"],
+            "avg_revenue": avg_revenue,
+            "first_sale_date": stats["first_sale_date"],
+            "last_sale_date": stats["last_sale_date"],
+            "is_returning": is_returning,
+            "reservations": stats["reservations"],
+            "extra_sales": stats["extra_sales"]
+        })
+    
+    # Toplam istatistikler
+    total_customers = len(customer_list)
+    returning_customers = sum(1 for c in customer_list if c["is_returning"])
+    new_customers = total_customers - returning_customers
+    total_revenue = {"EUR": 0.0, "USD": 0.0, "TRY": 0.0}
+    for customer in customer_list:
+        for curr in ["EUR", "USD", "TRY"]:
+            total_revenue[curr] += customer["total_revenue"][curr]
+    
+    # Sıralama: Toplam gelire göre
+    customer_list.sort(key=lambda x: sum(x["total_revenue"].values()), reverse=True)
+    
+    return {
+        "total_customers": total_customers,
+        "returning_customers": returning_customers,
+        "new_customers": new_customers,
+        "total_revenue": total_revenue,
+        "customers": customer_list
+    }
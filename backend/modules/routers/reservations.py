@@ -0,0 +1,1048 @@
+"""
+Reservation endpoints and reservation price quotes.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import BaseModel
+
+from ..audit import create_activity_log
+from ..auth import get_current_user
+from ..balances import apply_cari_delta, merge_deltas
+from ..cash_position import sync_cash_position
+from ..database import db
+from ..ledger import invalidate_checkpoints
+from ..lookups import collect_ids, prefetch_by_ids
+from ..models import (
+    CariCustomer, CustomerDetail, MunferitCustomer, Notification, PriceMatrixRequest, Reservation,
+    ReservationCreate, Transaction
+)
+from ..pagination import fetch_page, page_size, set_page_headers
+from ..reservation_pricing import calculate_price_matrix, calculate_reservation_price
+from ..rollups import sync_reservation_rollup
+from ..vouchers import allocate_voucher_code
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["reservations"])
+
+# ==================== RESERVATIONS ====================
+
+@router.get("/reservations")
+async def get_reservations(
+    response: Response,
+    status: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    query = {"company_id": current_user["company_id"]}
+    
+    # Status filtresi
+    if status and status != "all":
+        query["status"] = status
+    elif status != "all":
+        # Varsayılan: cancelled hariç göster (gerçek davranışı korumak için)
+        query["status"] = {"$ne": "cancelled"}
+    
+    if date_from and date_to:
+        if "date" in query:
+            query["date"] = {"$gte": date_from, "$lte": date_to, **query["date"]} if isinstance(query["date"], dict) else {"$gte": date_from, "$lte": date_to}
+        else:
+            query["date"] = {"$gte": date_from, "$lte": date_to}
+    elif date_from:
+        if "date" in query:
+            query["date"]["$gte"] = date_from
+        else:
+            query["date"] = {"$gte": date_from}
+    elif date_to:
+        if "date" in query:
+            query["date"]["$lte"] = date_to
+        else:
+            query["date"] = {"$lte": date_to}
+    
+    reservations, next_cursor, total = await fetch_page(
+        db.reservations, query, "date",
+        limit=page_size(limit, 1000), cursor=cursor, include_total=include_total
+    )
+    set_page_headers(response, next_cursor, total)
+    
+    # Cari hesaplarını tek sorguda getir
+    caris = await prefetch_by_ids(
+        db.cari_accounts,
+        collect_ids(reservations, "cari_id"),
+        projection={"name": 1, "is_munferit": 1}
+    )
+    munferit_reservation_ids = [
+        r.get("id") for r in reservations
+        if caris.get(r.get("cari_id")) and (
+            caris[r["cari_id"]].get("is_munferit") or caris[r["cari_id"]].get("name") == "Münferit"
+        )
+    ]
+    
+    # Münferit rezervasyonlar için ödeme kontrolü (tek sorgu)
+    paid_reservation_ids = set()
+    if munferit_reservation_ids:
+        paid_reservation_ids = set(await db.transactions.distinct("reference_id", {
+            "company_id": current_user["company_id"],
+            "reference_id": {"$in": munferit_reservation_ids},
+            "reference_type": "reservation",
+            "transaction_type": "payment"
+        }))
+    munferit_reservation_ids = set(munferit_reservation_ids)
+    
+    for reservation in reservations:
+        if reservation.get("id") in munferit_reservation_ids:
+            reservation["has_payment"] = reservation.get("id") in paid_reservation_ids
+        else:
+            # Cari firma için ödeme kontrolü gerekmez (tutar direkt cari hesabına yansıyor)
+            reservation["has_payment"] = True
+    
+    return reservations
+
+@router.get("/reservations/calculate-price")
+async def calculate_price(
+    tour_type_id: str,
+    date: str,
+    vehicle_count: int,
+    cari_id: Optional[str] = None,
+    person_count: int = 1,
+    current_user: dict = Depends(get_current_user)
+):
+    """Rezervasyon fiyatını hesapla - frontend için (pricing_model'e göre)"""
+    try:
+        # Boş string'i None'a çevir
+        if cari_id == "" or cari_id is None:
+            cari_id = None
+        
+        total_price, currency = await calculate_reservation_price(
+            company_id=current_user["company_id"],
+            cari_id=cari_id,
+            tour_type_id=tour_type_id,
+            date=date,
+            vehicle_count=vehicle_count,
+            person_count=person_count
+        )
+        return {
+            "price": total_price,
+            "currency": currency
+        }
+    except Exception as e:
+        logger.error(f"Fiyat hesaplama hatası: {e}")
+        raise HTTPException(status_code=500, detail="Fiyat hesaplanamadı")
+
+class ReservationPriceRequest(BaseModel):
+    tour_type_id: str
+    date: str
+    vehicle_count: int
+    cari_id: Optional[str] = None
+    person_count: int = 1
+
+
+@router.post("/reservations/calculate-price")
+async def calculate_price_post(
+    payload: ReservationPriceRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Rezervasyon fiyatını hesapla (POST versiyonu) - frontend ile uyum için.
+    """
+    try:
+        cari_id = payload.cari_id or None
+
+        total_price, currency = await calculate_reservation_price(
+            company_id=current_user["company_id"],
+            cari_id=cari_id,
+            tour_type_id=payload.tour_type_id,
+            date=payload.date,
+            vehicle_count=payload.vehicle_count,
+            person_count=payload.person_count,
+        )
+        return {
+            "price": total_price,
+            "currency": currency,
+        }
+    except Exception as e:
+        logger.error(f"Fiyat hesaplama hatası (POST): {e}")
+        raise HTTPException(status_code=500, detail="Fiyat hesaplanamadı")
+
+
+@router.post("/reservations/calculate-price/bulk")
+async def calculate_price_bulk(
+    payload: PriceMatrixRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """Fiyat takvimi için toplu fiyat: tarih aralığı × tur tipleri tek istekte"""
+    try:
+        return await calculate_price_matrix(
+            company_id=current_user["company_id"],
+            cari_id=payload.cari_id or None,
+            date_from=payload.date_from,
+            date_to=payload.date_to,
+            tour_type_ids=payload.tour_type_ids,
+            vehicle_count=payload.vehicle_count,
+            person_count=payload.person_count
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Toplu fiyat hesaplama hatası: {e}")
+        raise HTTPException(status_code=500, detail="Fiyat hesaplanamadı")
+
+@router.get("/reservations/pending")
+async def get_pending_cari_reservations(
+    current_user: dict = Depends(get_current_user)
+):
+    """Pending approval cari rezervasyonlarını listele"""
+    reservations = await db.reservations.find({
+        "company_id": current_user["company_id"],
+        "status": "pending_approval",
+        "reservation_source": "cari"
+    }, {"_id": 0}).sort("date", -1).to_list(1000)
+    
+    tour_types = await prefetch_by_ids(db.tour_types, collect_ids(reservations, "tour_type_id"), projection={"name": 1})
+    caris = await prefetch_by_ids(db.cari_accounts, collect_ids(reservations, "cari_id"), projection={"name": 1})
+    
+    for reservation in reservations:
+        tour_type = tour_types.get(reservation.get("tour_type_id"))
+        if tour_type:
+            reservation["tour_type_name"] = tour_type.get("name")
+        
+        cari = caris.get(reservation.get("cari_id"))
+        if cari:
+            reservation["cari_name"] = cari.get("name")
+    
+    return reservations
+
+@router.post("/reservations")
+async def create_reservation(data: ReservationCreate, current_user: dict = Depends(get_current_user)):
+    if data.vehicle_count is None:
+        data.vehicle_count = 1
+    try:
+        # Get user info for logging
+        user = await db.users.find_one({"id": current_user["user_id"]})
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        # Get cari info
+        cari = await db.cari_accounts.find_one({"id": data.cari_id})
+        if not cari:
+            raise HTTPException(status_code=404, detail="Cari account not found")
+        
+        # Get tour type name if provided
+        tour_type_name = None
+        if data.tour_type_id:
+            tour_type = await db.tour_types.find_one({"id": data.tour_type_id})
+            if tour_type:
+                tour_type_name = tour_type["name"]
+        
+        # Otomatik voucher kodu (sayaçtan, benzersizlik kontrolü gerekmez)
+        voucher_code = await allocate_voucher_code(db)
+        
+        # Customer details'i parse et
+        customer_details_obj = None
+        if data.customer_details:
+            try:
+                customer_details_obj = CustomerDetail(**data.customer_details)
+            except Exception as e:
+                logger.error(f"Customer details parse error: {str(e)}")
+                customer_details_obj = None
+        
+        # Create reservation
+        reservation = Reservation(
+            company_id=current_user["company_id"],
+            cari_id=data.cari_id,
+            cari_name=cari["name"],
+            date=data.date,
+            time=data.time,
+            tour_type_id=data.tour_type_id,
+            tour_type_name=tour_type_name,
+            customer_name=data.customer_name,
+            customer_contact=data.customer_contact,
+            customer_details=customer_details_obj,
+            person_count=data.person_count,
+            vehicle_count=data.vehicle_count if hasattr(data, 'vehicle_count') and data.vehicle_count else 1,
+            pickup_location=data.pickup_location or cari.get("pickup_location"),
+            pickup_maps_link=data.pickup_maps_link or cari.get("pickup_maps_link"),
+            price=data.price,
+            currency=data.currency,
+            exchange_rate=data.exchange_rate,
+            notes=data.notes,
+            status="confirmed",
+            voucher_code=voucher_code,
+            created_by=current_user["user_id"]
+        )
+        
+        reservation_doc = reservation.model_dump()
+        reservation_doc['created_at'] = reservation_doc['created_at'].isoformat()
+        reservation_doc['updated_at'] = reservation_doc['updated_at'].isoformat()
+        # Customer details'i dict olarak kaydet
+        if reservation_doc.get('customer_details'):
+            reservation_doc['customer_details'] = reservation_doc['customer_details'].model_dump() if hasattr(reservation_doc['customer_details'], 'model_dump') else reservation_doc['customer_details']
+        await db.reservations.insert_one(reservation_doc)
+        await sync_reservation_rollup(db, reservation_doc["id"], None)
+        
+        # Müşteriyi kaydet (Cari veya Münferit)
+        is_munferit = cari.get("is_munferit", False)
+        if is_munferit:
+            # Münferit müşteri kaydet/güncelle
+            existing_customer = await db.munferit_customers.find_one({
+                "company_id": current_user["company_id"],
+                "customer_name": data.customer_name
+            })
+            
+            if existing_customer:
+                # Güncelle
+                await db.munferit_customers.update_one(
+                    {"id": existing_customer["id"]},
+                    {
+                        "$set": {
+                            "customer_contact": data.customer_contact or existing_customer.get("customer_contact"),
+                            "phone": customer_details_obj.phone if customer_details_obj else existing_customer.get("phone"),
+                            "email": customer_details_obj.email if customer_details_obj else existing_customer.get("email"),
+                            "nationality": customer_details_obj.nationality if customer_details_obj else existing_customer.get("nationality"),
+                            "id_number": customer_details_obj.id_number if customer_details_obj else existing_customer.get("id_number"),
+                            "birth_date": customer_details_obj.birth_date if customer_details_obj else existing_customer.get("birth_date"),
+                            "last_sale_date": data.date,
+                            "total_sales": existing_customer.get("total_sales", 0) + 1,
+                            "updated_at": datetime.now(timezone.utc).isoformat()
+                        }
+                    }
+                )
+            else:
+                # Yeni müşteri oluştur
+                munferit_customer = MunferitCustomer(
+                    company_id=current_user["company_id"],
+                    customer_name=data.customer_name,
+                    customer_contact=data.customer_contact,
+                    phone=customer_details_obj.phone if customer_details_obj else None,
+                    email=customer_details_obj.email if customer_details_obj else None,
+                    nationality=customer_details_obj.nationality if customer_details_obj else None,
+                    id_number=customer_details_obj.id_number if customer_details_obj else None,
+                    birth_date=customer_details_obj.birth_date if customer_details_obj else None,
+                    first_sale_date=data.date,
+                    last_sale_date=data.date,
+                    total_sales=1
+                )
+                customer_doc = munferit_customer.model_dump()
+                customer_doc['created_at'] = customer_doc['created_at'].isoformat()
+                customer_doc['updated_at'] = customer_doc['updated_at'].isoformat()
+                await db.munferit_customers.insert_one(customer_doc)
+        else:
+            # Cari müşteri kaydet/güncelle
+            existing_customer = await db.cari_customers.find_one({
+            "company_id": current_user["company_id"],
+            "cari_id": data.cari_id,
+            "customer_name": data.customer_name
+        })
+        
+        if existing_customer:
+            # Güncelle
+            await db.cari_customers.update_one(
+                {"id": existing_customer["id"]},
+                {
+                    "$set": {
+                        "customer_contact": data.customer_contact or existing_customer.get("customer_contact"),
+                        "phone": customer_details_obj.phone if customer_details_obj else existing_customer.get("phone"),
+                        "email": customer_details_obj.email if customer_details_obj else existing_customer.get("email"),
+                        "nationality": customer_details_obj.nationality if customer_details_obj else existing_customer.get("nationality"),
+                        "id_number": customer_details_obj.id_number if customer_details_obj else existing_customer.get("id_number"),
+                        "birth_date": customer_details_obj.birth_date if customer_details_obj else existing_customer.get("birth_date"),
+                        "last_reservation_date": data.date,
+                        "total_reservations": existing_customer.get("total_reservations", 0) + 1,
+                        "updated_at": datetime.now(timezone.utc).isoformat()
+                    }
+                }
+            )
+        else:
+            # Yeni müşteri oluştur
+            cari_customer = CariCustomer(
+                company_id=current_user["company_id"],
+                cari_id=data.cari_id,
+                customer_name=data.customer_name,
+                customer_contact=data.customer_contact,
+                phone=customer_details_obj.phone if customer_details_obj else None,
+                email=customer_details_obj.email if customer_details_obj else None,
+                nationality=customer_details_obj.nationality if customer_details_obj else None,
+                id_number=customer_details_obj.id_number if customer_details_obj else None,
+                birth_date=customer_details_obj.birth_date if customer_details_obj else None,
+                first_reservation_date=data.date,
+                last_reservation_date=data.date,
+                total_reservations=1
+            )
+            customer_doc = cari_customer.model_dump()
+            customer_doc['created_at'] = customer_doc['created_at'].isoformat()
+            customer_doc['updated_at'] = customer_doc['updated_at'].isoformat()
+            await db.cari_customers.insert_one(customer_doc)
+        
+        # Create activity log
+        await create_activity_log(
+            company_id=current_user["company_id"],
+            user_id=current_user["user_id"],
+            username=user.get("username", ""),
+            full_name=user.get("full_name", ""),
+            action="create",
+            entity_type="reservation",
+            entity_id=reservation.id,
+            entity_name=f"{data.customer_name} - {data.date} {data.time}",
+            description=f"Rezervasyon oluşturuldu: {data.customer_name}, {data.date} {data.time}, {data.price} {data.currency}"
+        )
+        
+        # Münferit cari için transaction oluşturma (tahsilat eklenene kadar beklemeli)
+        # Cari firma için transaction oluştur (debit - borç)
+        is_munferit_transaction = cari.get("is_munferit", False) or cari.get("name") == "Münferit"
+        if not is_munferit_transaction:
+            # Create transaction (debit - borç) - Sadece cari firmalar için
+            transaction = Transaction(
+                company_id=current_user["company_id"],
+                cari_id=data.cari_id,
+                transaction_type="debit",
+                amount=data.price,
+                currency=data.currency,
+                exchange_rate=data.exchange_rate,
+                description=f"Rezervasyon - {data.customer_name} - {data.date} {data.time}",
+                reference_id=reservation.id,
+                reference_type="reservation",
+                date=data.date,
+                created_by=current_user["user_id"]
+            )
+            
+            transaction_doc = transaction.model_dump()
+            transaction_doc['created_at'] = transaction_doc['created_at'].isoformat()
+            await db.transactions.insert_one(transaction_doc)
+            await sync_cash_position(db, "transactions", None, transaction_doc)
+            
+            # Update cari balance
+            balance_field = f"balance_{data.currency.lower()}"
+            await db.cari_accounts.update_one(
+                {"id": data.cari_id},
+                {"$inc": {balance_field: data.price}}
+            )
+        # Münferit için transaction oluşturulmaz, tahsilat eklenene kadar bekler
+        
+        return reservation_doc
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Rezervasyon oluşturma hatası: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Rezervasyon oluşturulurken bir hata oluştu")
+
+@router.put("/reservations/{reservation_id}")
+async def update_reservation(reservation_id: str, data: dict, current_user: dict = Depends(get_current_user)):
+    # Get user info for logging
+    user = await db.users.find_one({"id": current_user["user_id"]})
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Get existing reservation
+    existing = await db.reservations.find_one({"id": reservation_id, "company_id": current_user["company_id"]})
+    if not existing:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    
+    # Track changes for logging
+    changes = {}
+    if "price" in data and data["price"] != existing.get("price"):
+        changes["price"] = {"old": existing.get("price"), "new": data["price"]}
+    if "currency" in data and data["currency"] != existing.get("currency"):
+        changes["currency"] = {"old": existing.get("currency"), "new": data["currency"]}
+    if "status" in data and data["status"] != existing.get("status"):
+        changes["status"] = {"old": existing.get("status"), "new": data["status"]}
+    if "customer_name" in data and data["customer_name"] != existing.get("customer_name"):
+        changes["customer_name"] = {"old": existing.get("customer_name"), "new": data["customer_name"]}
+    if "date" in data and data["date"] != existing.get("date"):
+        changes["date"] = {"old": existing.get("date"), "new": data["date"]}
+    if "time" in data and data["time"] != existing.get("time"):
+        changes["time"] = {"old": existing.get("time"), "new": data["time"]}
+    
+    # If price changed, update transaction and balance
+    if "price" in data or "currency" in data:
+        old_price = existing["price"]
+        old_currency = existing["currency"]
+        new_price = data.get("price", old_price)
+        new_currency = data.get("currency", old_currency)
+        
+        if old_price != new_price or old_currency != new_currency:
+            # Revert old balance
+            old_balance_field = f"balance_{old_currency.lower()}"
+            await db.cari_accounts.update_one(
+                {"id": existing["cari_id"]},
+                {"$inc": {old_balance_field: -old_price}}
+            )
+            
+            # Apply new balance
+            new_balance_field = f"balance_{new_currency.lower()}"
+            await db.cari_accounts.update_one(
+                {"id": existing["cari_id"]},
+                {"$inc": {new_balance_field: new_price}}
+            )
+            
+            # Update transaction
+            await db.transactions.update_one(
+                {"reference_id": reservation_id, "reference_type": "reservation"},
+                {"$set": {"amount": new_price, "currency": new_currency}}
+            )
+            await invalidate_checkpoints(db, [existing["cari_id"]])
+    
+    data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    result = await db.reservations.update_one(
+        {"id": reservation_id, "company_id": current_user["company_id"]},
+        {"$set": data}
+    )
+    
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    await sync_reservation_rollup(db, reservation_id, existing)
+    
+    # Create activity log
+    entity_name = f"{existing.get('customer_name', '')} - {existing.get('date', '')} {existing.get('time', '')}"
+    description = f"Rezervasyon güncellendi: {existing.get('customer_name', '')}"
+    if changes:
+        change_list = []
+        for key, value in changes.items():
+            change_list.append(f"{key}: {value.get('old')} → {value.get('new')}")
+        description += f" (Değişiklikler: {', '.join(change_list)})"
+    
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=user.get("username", ""),
+        full_name=user.get("full_name", ""),
+        action="update",
+        entity_type="reservation",
+        entity_id=reservation_id,
+        entity_name=entity_name,
+        description=description,
+        changes=changes if changes else None,
+        ip_address=current_user.get("ip_address")
+    )
+    
+    return {"message": "Reservation updated"}
+
+@router.put("/reservations/{reservation_id}/cancel")
+async def cancel_reservation(
+    reservation_id: str,
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Rezervasyonu iptal et - önce orijinal tutar geri alınır, sonra no-show bedeli eklenir"""
+    reservation = await db.reservations.find_one({
+        "id": reservation_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if not reservation:
+        raise HTTPException(status_code=404, detail="Rezervasyon bulunamadı")
+    
+    if reservation.get("status") == "cancelled":
+        raise HTTPException(status_code=400, detail="Rezervasyon zaten iptal edilmiş")
+    
+    cancellation_reason = data.get("cancellation_reason", "")
+    apply_no_show = data.get("apply_no_show", False)
+    no_show_amount = data.get("no_show_amount")
+    no_show_currency = data.get("no_show_currency", "EUR")
+    
+    update_data = {
+        "status": "cancelled",
+        "cancellation_reason": cancellation_reason,
+        "cancelled_at": datetime.now(timezone.utc).isoformat(),
+        "no_show_applied": apply_no_show,
+        "no_show_amount": no_show_amount if apply_no_show else None,
+        "no_show_currency": no_show_currency if apply_no_show else None,
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    }
+    
+    # Rezervasyon bilgileri
+    cari_id = reservation.get("cari_id")
+    reservation_price = reservation.get("price", 0)
+    reservation_currency = reservation.get("currency", "EUR")
+    
+    if cari_id:
+        # Cari hesabı bul
+        cari = await db.cari_accounts.find_one({"id": cari_id}, {"_id": 0, "id": 1})
+        if not cari:
+            raise HTTPException(status_code=404, detail="Cari hesap bulunamadı")
+    
+    # Rezervasyonu iptal durumuna al - eşzamanlı ikinci iptal burada durur
+    result = await db.reservations.update_one(
+        {"id": reservation_id, "company_id": current_user["company_id"], "status": {"$ne": "cancelled"}},
+        {"$set": update_data}
+    )
+    if result.modified_count == 0:
+        raise HTTPException(status_code=400, detail="Rezervasyon zaten iptal edilmiş")
+    await sync_reservation_rollup(db, reservation_id, reservation)
+    
+    if cari_id:
+        # ÖNCE: Orijinal rezervasyon tutarını geri al (cari artık bize borçlu değil)
+        # SONRA: No-show bedeli varsa ekle (cari tekrar bize borçlu olur)
+        # Tek $inc ile uygulanır; anahtar rezervasyonun bu versiyonuna özel
+        deltas = [{f"balance_{reservation_currency.lower()}": -reservation_price}]
+        if apply_no_show and no_show_amount and no_show_amount > 0:
+            deltas.append({f"balance_{no_show_currency.lower()}": no_show_amount})
+        await apply_cari_delta(
+            db, cari_id, merge_deltas(*deltas),
+            f"cancel_reservation:{reservation_id}:{reservation.get('updated_at', '')}"
+        )
+        
+        # Orijinal rezervasyon transaction'ını sil (rezervasyon tutarı geri alındı)
+        await db.transactions.delete_one({
+            "reference_id": reservation_id,
+            "reference_type": "reservation"
+        })
+        await invalidate_checkpoints(db, [cari_id])
+        
+        # No-show bedeli transaction'ı oluştur (eğer varsa)
+        if apply_no_show and no_show_amount and no_show_amount > 0:
+            transaction = Transaction(
+                company_id=current_user["company_id"],
+                cari_id=cari_id,
+                transaction_type="debt",  # Borç (cari bize borçlu)
+                amount=no_show_amount,
+                currency=no_show_currency,
+                exchange_rate=data.get("exchange_rate", 1.0),
+                reference_type="no_show_penalty",
+                reference_id=reservation_id,
+                description=f"No-show bedeli: {reservation.get('customer_name', 'Müşteri')} - {reservation.get('date', '')} {reservation.get('time', '')}",
+                date=datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+                created_by=current_user["user_id"]
+            )
+            transaction_doc = transaction.model_dump()
+            transaction_doc['created_at'] = transaction_doc['created_at'].isoformat()
+            await db.transactions.insert_one(transaction_doc)
+            await sync_cash_position(db, "transactions", None, transaction_doc)
+            
+            # Activity log (no-show ile iptal)
+            await create_activity_log(
+                company_id=current_user["company_id"],
+                user_id=current_user["user_id"],
+                username=current_user.get("username", ""),
+                full_name=current_user.get("full_name", ""),
+                action="cancel_reservation_no_show",
+                entity_type="reservation",
+                entity_id=reservation_id,
+                entity_name=f"{reservation.get('customer_name', '')} - {reservation.get('date', '')}",
+                description=f"Rezervasyon iptal edildi - Orijinal tutar ({reservation_price} {reservation_currency}) geri alındı, No-show bedeli ({no_show_amount} {no_show_currency}) eklendi",
+                changes={
+                    "reservation_amount_refunded": reservation_price,
+                    "reservation_currency": reservation_currency,
+                    "no_show_amount": no_show_amount,
+                    "no_show_currency": no_show_currency
+                }
+            )
+        else:
+            # Activity log (sadece iptal, no-show yok)
+            await create_activity_log(
+                company_id=current_user["company_id"],
+                user_id=current_user["user_id"],
+                username=current_user.get("username", ""),
+                full_name=current_user.get("full_name", ""),
+                action="cancel_reservation",
+                entity_type="reservation",
+                entity_id=reservation_id,
+                entity_name=f"{reservation.get('customer_name', '')} - {reservation.get('date', '')}",
+                description=f"Rezervasyon iptal edildi - Orijinal tutar ({reservation_price} {reservation_currency}) geri alındı: {cancellation_reason}",
+                changes={
+                    "reservation_amount_refunded": reservation_price,
+                    "reservation_currency": reservation_currency
+                }
+            )
+    else:
+        # Cari hesap yoksa sadece log
+        await create_activity_log(
+            company_id=current_user["company_id"],
+            user_id=current_user["user_id"],
+            username=current_user.get("username", ""),
+            full_name=current_user.get("full_name", ""),
+            action="cancel_reservation",
+            entity_type="reservation",
+            entity_id=reservation_id,
+            entity_name=f"{reservation.get('customer_name', '')} - {reservation.get('date', '')}",
+            description=f"Rezervasyon iptal edildi: {cancellation_reason}"
+        )
+    
+    return {"message": "Rezervasyon iptal edildi", "no_show_applied": apply_no_show}
+
+# ==================== ADMIN CARI RESERVATION ENDPOINTS ====================
+
+@router.post("/reservations/{reservation_id}/approve")
+async def approve_cari_reservation(
+    reservation_id: str,
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Cari rezervasyonunu onayla - pick-up saati zorunlu"""
+    reservation = await db.reservations.find_one({
+        "id": reservation_id,
+        "company_id": current_user["company_id"],
+        "status": "pending_approval",
+        "reservation_source": "cari"
+    })
+    
+    if not reservation:
+        raise HTTPException(status_code=404, detail="Pending reservation not found")
+    
+    # Pick-up saati zorunlu
+    pickup_time = data.get("pickup_time")
+    if not pickup_time or not pickup_time.strip():
+        raise HTTPException(status_code=400, detail="Pick-up saati zorunludur")
+    
+    # Rezervasyonu onayla
+    update_data = {
+        "status": "approved",
+        "approved_by": current_user["user_id"],
+        "approved_at": datetime.now(timezone.utc).isoformat(),
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    }
+    
+    # Pick-up saati varsa ekle
+    if pickup_time:
+        update_data["pickup_time"] = pickup_time.strip()
+    
+    # Sadece hâlâ onay bekleyen rezervasyon onaylanır - eşzamanlı ikinci onay burada durur
+    result = await db.reservations.update_one(
+        {"id": reservation_id, "status": "pending_approval"},
+        {"$set": update_data}
+    )
+    if result.modified_count == 0:
+        raise HTTPException(status_code=409, detail="Rezervasyon zaten işlenmiş")
+    await sync_reservation_rollup(db, reservation_id, reservation)
+    
+    # Transaction oluştur (debit - borç)
+    transaction = Transaction(
+        company_id=current_user["company_id"],
+        cari_id=reservation["cari_id"],
+        transaction_type="debit",
+        amount=reservation["price"],
+        currency=reservation["currency"],
+        exchange_rate=reservation.get("exchange_rate", 1.0),
+        description=f"Rezervasyon - {reservation.get('customer_name', '')} - {reservation.get('date', '')} {reservation.get('time', '')}",
+        reference_id=reservation_id,
+        reference_type="reservation",
+        date=reservation["date"],
+        created_by=current_user["user_id"]
+    )
+    
+    transaction_doc = transaction.model_dump()
+    transaction_doc['created_at'] = transaction_doc['created_at'].isoformat()
+    await db.transactions.insert_one(transaction_doc)
+    await sync_cash_position(db, "transactions", None, transaction_doc)
+    
+    # Cari bakiyesini güncelle
+    await apply_cari_delta(
+        db, reservation["cari_id"],
+        {f"balance_{reservation['currency'].lower()}": reservation["price"]},
+        f"approve_reservation:{reservation_id}"
+    )
+    
+    # Activity log
+    user = await db.users.find_one({"id": current_user["user_id"]})
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=user.get("username", "") if user else "",
+        full_name=user.get("full_name", "") if user else "",
+        action="admin_approve",
+        entity_type="reservation",
+        entity_id=reservation_id,
+        entity_name=f"{reservation.get('customer_name', '')} - {reservation.get('date', '')}",
+        description=f"Cari rezervasyon onaylandı: {reservation.get('customer_name', '')}, {reservation.get('price', 0)} {reservation.get('currency', 'EUR')}",
+        ip_address=current_user.get("ip_address")
+    )
+    
+    # Cari'ye bildirim gönder (eğer created_by_cari varsa)
+    if reservation.get("created_by_cari"):
+        cari_panel = await db.caris.find_one({"id": reservation.get("created_by_cari")})
+        if cari_panel:
+            # Pick-up saati bilgisini mesaja ekle
+            pickup_time_msg = f"Pick-up saati: {pickup_time}" if pickup_time else ""
+            message = f"Rezervasyonunuz onaylandı: {reservation.get('customer_name', '')} - {reservation.get('date', '')} {reservation.get('time', '')}"
+            if pickup_time_msg:
+                message += f" | {pickup_time_msg}"
+            
+            # Cari panel bildirimi için notification oluştur
+            notification = Notification(
+                company_id=current_user["company_id"],
+                user_id=None,  # Cari panel için user_id yok
+                type="reservation_approved",
+                title="Rezervasyon Onaylandı",
+                message=message,
+                entity_type="reservation",
+                entity_id=reservation_id
+            )
+            notification_doc = notification.model_dump()
+            notification_doc['created_at'] = notification_doc['created_at'].isoformat()
+            await db.notifications.insert_one(notification_doc)
+    
+    return {"message": "Reservation approved successfully"}
+
+@router.post("/reservations/{reservation_id}/reject")
+async def reject_cari_reservation(
+    reservation_id: str,
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Cari rezervasyonunu reddet"""
+    reservation = await db.reservations.find_one({
+        "id": reservation_id,
+        "company_id": current_user["company_id"],
+        "status": "pending_approval",
+        "reservation_source": "cari"
+    })
+    
+    if not reservation:
+        raise HTTPException(status_code=404, detail="Pending reservation not found")
+    
+    reason = data.get("reason", "")
+    
+    # Rezervasyonu reddet
+    await db.reservations.update_one(
+        {"id": reservation_id},
+        {
+            "$set": {
+                "status": "rejected",
+                "notes": f"{reservation.get('notes', '')}\n[REJECTED] {reason}".strip(),
+                "updated_at": datetime.now(timezone.utc).isoformat()
+            }
+        }
+    )
+    await sync_reservation_rollup(db, reservation_id, reservation)
+    
+    # Activity log
+    user = await db.users.find_one({"id": current_user["user_id"]})
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=user.get("username", "") if user else "",
+        full_name=user.get("full_name", "") if user else "",
+        action="admin_reject",
+        entity_type="reservation",
+        entity_id=reservation_id,
+        entity_name=f"{reservation.get('customer_name', '')} - {reservation.get('date', '')}",
+        description=f"Cari rezervasyon reddedildi: {reservation.get('customer_name', '')} - Sebep: {reason}",
+        changes={"reason": reason},
+        ip_address=current_user.get("ip_address")
+    )
+    
+    return {"message": "Reservation rejected"}
+
+@router.post("/reservations/{reservation_id}/edit-and-approve")
+async def edit_and_approve_cari_reservation(
+    reservation_id: str,
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Cari rezervasyonunu düzenle ve onayla"""
+    reservation = await db.reservations.find_one({
+        "id": reservation_id,
+        "company_id": current_user["company_id"],
+        "status": "pending_approval",
+        "reservation_source": "cari"
+    })
+    
+    if not reservation:
+        raise HTTPException(status_code=404, detail="Pending reservation not found")
+    
+    # Backward compatibility: atv_count -> vehicle_count
+    if "atv_count" in data and "vehicle_count" not in data:
+        data["vehicle_count"] = data.pop("atv_count")
+    elif "atv_count" in data:
+        data.pop("atv_count")
+    
+    # İzin verilen alanlar (price ve cari alanları değiştirilemez)
+    allowed_fields = [
+        "customer_name", "date", "time", "tour_type_id", "person_count",
+        "vehicle_count", "pickup_location", "pickup_maps_link", "notes"
+    ]
+    
+    update_data = {}
+    changes = {}
+    
+    for field in allowed_fields:
+        if field in data:
+            old_value = reservation.get(field) or reservation.get("atv_count" if field == "vehicle_count" else field)
+            new_value = data[field]
+            if old_value != new_value:
+                update_data[field] = new_value
+                changes[field] = {"old": old_value, "new": new_value}
+    
+    # Tour type name güncelle
+    if "tour_type_id" in update_data:
+        tour_type = await db.tour_types.find_one({"id": update_data["tour_type_id"]})
+        if tour_type:
+            update_data["tour_type_name"] = tour_type.get("name")
+    
+    # Rezervasyonu güncelle ve onayla
+    update_data.update({
+        "status": "approved",
+        "approved_by": current_user["user_id"],
+        "approved_at": datetime.now(timezone.utc).isoformat(),
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    })
+    
+    # Sadece hâlâ onay bekleyen rezervasyon onaylanır - eşzamanlı ikinci onay burada durur
+    result = await db.reservations.update_one(
+        {"id": reservation_id, "status": "pending_approval"},
+        {"$set": update_data}
+    )
+    if result.modified_count == 0:
+        raise HTTPException(status_code=409, detail="Rezervasyon zaten işlenmiş")
+    await sync_reservation_rollup(db, reservation_id, reservation)
+    
+    # Transaction oluştur (debit - borç)
+    transaction = Transaction(
+        company_id=current_user["company_id"],
+        cari_id=reservation["cari_id"],
+        transaction_type="debit",
+        amount=reservation["price"],  # Orijinal fiyat (değiştirilemez)
+        currency=reservation["currency"],
+        exchange_rate=reservation.get("exchange_rate", 1.0),
+        description=f"Rezervasyon - {update_data.get('customer_name', reservation.get('customer_name', ''))} - {update_data.get('date', reservation.get('date', ''))} {update_data.get('time', reservation.get('time', ''))}",
+        reference_id=reservation_id,
+        reference_type="reservation",
+        date=update_data.get("date", reservation["date"]),
+        created_by=current_user["user_id"]
+    )
+    
+    transaction_doc = transaction.model_dump()
+    transaction_doc['created_at'] = transaction_doc['created_at'].isoformat()
+    await db.transactions.insert_one(transaction_doc)
+    await sync_cash_position(db, "transactions", None, transaction_doc)
+    
+    # Cari bakiyesini güncelle
+    await apply_cari_delta(
+        db, reservation["cari_id"],
+        {f"balance_{reservation['currency'].lower()}": reservation["price"]},
+        f"approve_reservation:{reservation_id}"
+    )
+    
+    # Activity log
+    user = await db.users.find_one({"id": current_user["user_id"]})
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=user.get("username", "") if user else "",
+        full_name=user.get("full_name", "") if user else "",
+        action="admin_edit_and_approve",
+        entity_type="reservation",
+        entity_id=reservation_id,
+        entity_name=f"{update_data.get('customer_name', reservation.get('customer_name', ''))} - {update_data.get('date', reservation.get('date', ''))}",
+        description=f"Cari rezervasyon düzenlendi ve onaylandı: {reservation.get('customer_name', '')}",
+        changes=changes if changes else None,
+        ip_address=current_user.get("ip_address")
+    )
+    
+    return {"message": "Reservation edited and approved successfully"}
+
+@router.delete("/reservations/{reservation_id}")
+async def delete_reservation(reservation_id: str, current_user: dict = Depends(get_current_user)):
+    # Get user info for logging
+    user = await db.users.find_one({"id": current_user["user_id"]})
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    reservation = await db.reservations.find_one({"id": reservation_id, "company_id": current_user["company_id"]})
+    if not reservation:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    
+    # Create activity log before deletion
+    entity_name = f"{reservation.get('customer_name', '')} - {reservation.get('date', '')} {reservation.get('time', '')}"
+    description = f"Rezervasyon silindi: {reservation.get('customer_name', '')}, {reservation.get('date', '')} {reservation.get('time', '')}, {reservation.get('price', 0)} {reservation.get('currency', 'EUR')}"
+    
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=user.get("username", ""),
+        full_name=user.get("full_name", ""),
+        action="delete",
+        entity_type="reservation",
+        entity_id=reservation_id,
+        entity_name=entity_name,
+        description=description
+    )
+    
+    # Revert balance
+    balance_field = f"balance_{reservation['currency'].lower()}"
+    await db.cari_accounts.update_one(
+        {"id": reservation["cari_id"]},
+        {"$inc": {balance_field: -reservation["price"]}}
+    )
+    
+    # Delete transaction
+    await db.transactions.delete_one({"reference_id": reservation_id, "reference_type": "reservation"})
+    await invalidate_checkpoints(db, [reservation["cari_id"]])
+    
+    # Delete reservation
+    await db.reservations.delete_one({"id": reservation_id})
+    await sync_reservation_rollup(db, reservation_id, reservation)
+    
+    return {"message": "Reservation deleted"}
+
+@router.post("/reservations/{reservation_id}/voucher")
+async def generate_reservation_voucher(reservation_id: str, current_user: dict = Depends(get_current_user)):
+    """Rezervasyon için voucher oluştur veya mevcut voucher'ı getir"""
+    try:
+        reservation = await db.reservations.find_one({"id": reservation_id, "company_id": current_user["company_id"]}, {"_id": 0})
+        if not reservation:
+            raise HTTPException(status_code=404, detail="Reservation not found")
+        
+        # Eğer voucher_code yoksa oluştur
+        if not reservation.get("voucher_code"):
+            voucher_code = await allocate_voucher_code(db)
+            
+            await db.reservations.update_one(
+                {"id": reservation_id, "company_id": current_user["company_id"]},
+                {"$set": {"voucher_code": voucher_code}}
+            )
+            reservation["voucher_code"] = voucher_code
+        
+        # Tour type name'i ekle (eğer yoksa)
+        if reservation.get("tour_type_id") and not reservation.get("tour_type_name"):
+            tour_type = await db.tour_types.find_one({"id": reservation["tour_type_id"]}, {"_id": 0})
+            if tour_type:
+                reservation["tour_type_name"] = tour_type.get("name", "Bilinmeyen")
+        
+        # Cari name'i ekle (eğer yoksa)
+        if reservation.get("cari_id") and not reservation.get("cari_name"):
+            cari = await db.cari_accounts.find_one({"id": reservation["cari_id"]}, {"_id": 0})
+            if cari:
+                reservation["cari_name"] = cari.get("name", "Bilinmeyen")
+        
+        # Company bilgilerini getir
+        company = await db.companies.find_one({"id": current_user["company_id"]}, {"_id": 0})
+        if not company:
+            # Company yoksa minimal bilgi oluştur
+            company = {
+                "id": current_user["company_id"],
+                "company_name": "Firma Adı",
+                "phone": "",
+                "address": "",
+                "email": "",
+                "website": ""
+            }
+        
+        # Eksik alanları doldur
+        reservation.setdefault("date", "")
+        reservation.setdefault("time", "")
+        reservation.setdefault("customer_name", "Belirtilmedi / Not Provided")
+        reservation.setdefault("cari_name", "Belirtilmedi / Not Provided")
+        reservation.setdefault("tour_type_name", "Belirtilmedi / Not Provided")
+        reservation.setdefault("atv_count", 0)
+        reservation.setdefault("price", 0)
+        reservation.setdefault("currency", "EUR")
+        reservation.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+        
+        return {
+            "reservation": reservation,
+            "company": company
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail="Voucher oluşturulurken hata oluştu")
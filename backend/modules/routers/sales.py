@@ -0,0 +1,648 @@
+"""
+Extra sale and service purchase endpoints.
+"""
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+
+from ..audit import create_activity_log
+from ..auth import get_current_user
+from ..balances import merge_deltas
+from ..cash_position import CASH_PROJECTION, sync_cash_position
+from ..database import db
+from ..ledger import invalidate_checkpoints
+from ..models import CariCustomer, CustomerDetail, ExtraSale, MunferitCustomer, ServicePurchase, Transaction
+from ..pagination import fetch_page, page_size, set_page_headers
+from ..vouchers import allocate_voucher_code
+
+router = APIRouter(tags=["sales"])
+
+# ==================== EXTRA SALES ====================
+
+@router.get("/extra-sales")
+async def get_extra_sales(
+    response: Response,
+    status: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    query = {"company_id": current_user["company_id"]}
+    
+    # Status filtresi
+    if status and status != "all":
+        query["status"] = status
+    elif status != "all":
+        # Varsayılan: cancelled hariç göster
+        query["status"] = {"$ne": "cancelled"}
+    
+    if date_from and date_to:
+        if "date" in query:
+            query["date"] = {"$gte": date_from, "$lte": date_to, **query["date"]} if isinstance(query["date"], dict) else {"$gte": date_from, "$lte": date_to}
+        else:
+            query["date"] = {"$gte": date_from, "$lte": date_to}
+    elif date_from:
+        if "date" in query:
+            query["date"]["$gte"] = date_from
+        else:
+            query["date"] = {"$gte": date_from}
+    elif date_to:
+        if "date" in query:
+            query["date"]["$lte"] = date_to
+        else:
+            query["date"] = {"$lte": date_to}
+    
+    extra_sales, next_cursor, total = await fetch_page(
+        db.extra_sales, query, "date",
+        limit=page_size(limit, 1000), cursor=cursor, include_total=include_total
+    )
+    set_page_headers(response, next_cursor, total)
+    return extra_sales
+
+@router.post("/extra-sales")
+async def create_extra_sale(data: dict, current_user: dict = Depends(get_current_user)):
+    # Get user info for logging
+    user = await db.users.find_one({"id": current_user["user_id"]})
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Get cari name
+    cari = await db.cari_accounts.find_one({"id": data["cari_id"]})
+    if not cari:
+        raise HTTPException(status_code=404, detail="Cari account not found")
+    
+    data["cari_name"] = cari["name"]
+    is_munferit = cari.get("is_munferit", False)
+    
+    # Get supplier name if provided
+    if data.get("supplier_id"):
+        supplier = await db.cari_accounts.find_one({"id": data["supplier_id"]})
+        if supplier:
+            data["supplier_name"] = supplier["name"]
+    
+    # Customer details'i parse et
+    customer_details_obj = None
+    if data.get("customer_details"):
+        customer_details_obj = CustomerDetail(**data["customer_details"])
+        data["customer_details"] = customer_details_obj
+    
+    extra_sale = ExtraSale(company_id=current_user["company_id"], created_by=current_user["user_id"], **data)
+    extra_sale_doc = extra_sale.model_dump()
+    extra_sale_doc['created_at'] = extra_sale_doc['created_at'].isoformat()
+    # Customer details'i dict olarak kaydet
+    if extra_sale_doc.get('customer_details'):
+        extra_sale_doc['customer_details'] = extra_sale_doc['customer_details'].model_dump() if hasattr(extra_sale_doc['customer_details'], 'model_dump') else extra_sale_doc['customer_details']
+    await db.extra_sales.insert_one(extra_sale_doc)
+    await sync_cash_position(db, "extra_sales", None, extra_sale_doc)
+    
+    # Müşteriyi kaydet (Cari veya Münferit)
+    if is_munferit:
+        # Münferit müşteri kaydet/güncelle
+        existing_customer = await db.munferit_customers.find_one({
+            "company_id": current_user["company_id"],
+            "customer_name": data.get("customer_name")
+        })
+        
+        if existing_customer:
+            # Güncelle
+            await db.munferit_customers.update_one(
+                {"id": existing_customer["id"]},
+                {
+                    "$set": {
+                        "customer_contact": data.get("customer_contact") or existing_customer.get("customer_contact"),
+                        "phone": customer_details_obj.phone if customer_details_obj else existing_customer.get("phone"),
+                        "email": customer_details_obj.email if customer_details_obj else existing_customer.get("email"),
+                        "nationality": customer_details_obj.nationality if customer_details_obj else existing_customer.get("nationality"),
+                        "id_number": customer_details_obj.id_number if customer_details_obj else existing_customer.get("id_number"),
+                        "birth_date": customer_details_obj.birth_date if customer_details_obj else existing_customer.get("birth_date"),
+                        "last_sale_date": data.get("date"),
+                        "total_sales": existing_customer.get("total_sales", 0) + 1,
+                        "updated_at": datetime.now(timezone.utc).isoformat()
+                    }
+                }
+            )
+        else:
+            # Yeni müşteri oluştur
+            munferit_customer = MunferitCustomer(
+                company_id=current_user["company_id"],
+                customer_name=data.get("customer_name"),
+                customer_contact=data.get("customer_contact"),
+                phone=customer_details_obj.phone if customer_details_obj else None,
+                email=customer_details_obj.email if customer_details_obj else None,
+                nationality=customer_details_obj.nationality if customer_details_obj else None,
+                id_number=customer_details_obj.id_number if customer_details_obj else None,
+                birth_date=customer_details_obj.birth_date if customer_details_obj else None,
+                first_sale_date=data.get("date"),
+                last_sale_date=data.get("date"),
+                total_sales=1
+            )
+            customer_doc = munferit_customer.model_dump()
+            customer_doc['created_at'] = customer_doc['created_at'].isoformat()
+            customer_doc['updated_at'] = customer_doc['updated_at'].isoformat()
+            await db.munferit_customers.insert_one(customer_doc)
+    else:
+        # Cari müşteri kaydet/güncelle
+        existing_customer = await db.cari_customers.find_one({
+            "company_id": current_user["company_id"],
+            "cari_id": data["cari_id"],
+            "customer_name": data.get("customer_name")
+        })
+        
+        if existing_customer:
+            # Güncelle - satış alanlarını kullan
+            await db.cari_customers.update_one(
+                {"id": existing_customer["id"]},
+                {
+                    "$set": {
+                        "customer_contact": data.get("customer_contact") or existing_customer.get("customer_contact"),
+                        "phone": customer_details_obj.phone if customer_details_obj else existing_customer.get("phone"),
+                        "email": customer_details_obj.email if customer_details_obj else existing_customer.get("email"),
+                        "nationality": customer_details_obj.nationality if customer_details_obj else existing_customer.get("nationality"),
+                        "id_number": customer_details_obj.id_number if customer_details_obj else existing_customer.get("id_number"),
+                        "birth_date": customer_details_obj.birth_date if customer_details_obj else existing_customer.get("birth_date"),
+                        "last_sale_date": data.get("date"),
+                        "total_sales": existing_customer.get("total_sales", 0) + 1,
+                        "updated_at": datetime.now(timezone.utc).isoformat()
+                    }
+                }
+            )
+        else:
+            # Yeni müşteri oluştur - satış alanlarını kullan
+            cari_customer = CariCustomer(
+                company_id=current_user["company_id"],
+                cari_id=data["cari_id"],
+                customer_name=data.get("customer_name"),
+                customer_contact=data.get("customer_contact"),
+                phone=customer_details_obj.phone if customer_details_obj else None,
+                email=customer_details_obj.email if customer_details_obj else None,
+                nationality=customer_details_obj.nationality if customer_details_obj else None,
+                id_number=customer_details_obj.id_number if customer_details_obj else None,
+                birth_date=customer_details_obj.birth_date if customer_details_obj else None,
+                first_sale_date=data.get("date"),
+                last_sale_date=data.get("date"),
+                total_sales=1
+            )
+            customer_doc = cari_customer.model_dump()
+            customer_doc['created_at'] = customer_doc['created_at'].isoformat()
+            customer_doc['updated_at'] = customer_doc['updated_at'].isoformat()
+            await db.cari_customers.insert_one(customer_doc)
+    
+    # Create activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=user.get("username", ""),
+        full_name=user.get("full_name", ""),
+        action="create",
+        entity_type="extra_sale",
+        entity_id=extra_sale.id,
+        entity_name=f"{data.get('customer_name', '')} - {data.get('product_name', '')}",
+        description=f"Açık satış oluşturuldu: {data.get('product_name', '')}, {data.get('customer_name', '')}, {data.get('sale_price', 0)} {data.get('currency', 'EUR')}",
+        current_user=current_user
+    )
+    
+    # Münferit cari için gelir transaction'ı oluştur (tahsilat mantığı)
+    if is_munferit and data.get("payment_type_id"):
+        payment_type = await db.payment_types.find_one({"id": data.get("payment_type_id")}, {"_id": 0})
+        if payment_type:
+            payment_code = payment_type.get("code")
+            
+            # Payment transaction oluştur (pozitif amount ile - gelir)
+            transaction_doc = {
+                "id": str(uuid.uuid4()),
+                "company_id": current_user["company_id"],
+                "cari_id": data["cari_id"],
+                "transaction_type": "payment",
+                "amount": data.get("sale_price", 0),  # Pozitif tutar (gelir)
+                "net_amount": data.get("sale_price", 0),
+                "currency": data.get("currency", "EUR"),
+                "exchange_rate": data.get("exchange_rate", 1.0),
+                "payment_type_id": data.get("payment_type_id"),
+                "payment_type_name": payment_type.get("name"),
+                "payment_method": payment_code,
+                "description": f"Açık Satış - {data.get('product_name', '')} - {data.get('customer_name', '')}",
+                "date": data.get("date", datetime.now(timezone.utc).strftime("%Y-%m-%d")),
+                "time": data.get("time", datetime.now(timezone.utc).strftime("%H:%M")),
+                "reference_id": extra_sale.id,
+                "reference_type": "extra_sale",
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "created_by": current_user["user_id"]
+            }
+            
+            # Cash account seç (payment_type'a göre)
+            cash_account = None
+            if payment_code == "cash":
+                # Nakit kasası bul
+                cash_account = await db.cash_accounts.find_one({
+                    "company_id": current_user["company_id"],
+                    "account_type": "cash",
+                    "currency": data.get("currency", "EUR"),
+                    "is_active": True
+                }, {"_id": 0})
+            elif payment_code == "bank_transfer":
+                # Banka hesabı cash_account'u bul
+                cash_account = await db.cash_accounts.find_one({
+                    "company_id": current_user["company_id"],
+                    "account_type": "bank_account",
+                    "currency": data.get("currency", "EUR"),
+                    "is_active": True
+                }, {"_id": 0})
+            
+            if cash_account:
+                transaction_doc["cash_account_id"] = cash_account["id"]
+                
+                # Banka hesabı için bank_account_id de ekle
+                if payment_code == "bank_transfer":
+                    bank_account = await db.bank_accounts.find_one({
+                        "company_id": current_user["company_id"],
+                        "account_type": "bank_account",
+                        "currency": data.get("currency", "EUR"),
+                        "is_active": True
+                    }, {"_id": 0})
+                    if bank_account:
+                        transaction_doc["bank_account_id"] = bank_account["id"]
+                
+                await db.transactions.insert_one(transaction_doc)
+                await sync_cash_position(db, "transactions", None, transaction_doc)
+                
+                # Cash account bakiyesini güncelle (gelir = bakiye artar)
+                await db.cash_accounts.update_one(
+                    {"id": cash_account["id"]},
+                    {"$inc": {"current_balance": transaction_doc["amount"]}}
+                )
+    else:
+        # Normal cari için debit transaction (mevcut mantık)
+        sale_transaction = Transaction(
+            company_id=current_user["company_id"],
+            cari_id=data["cari_id"],
+            transaction_type="debit",
+            amount=data["sale_price"],
+            currency=data.get("currency", "EUR"),
+            exchange_rate=data.get("exchange_rate", 1.0),
+            description=f"Açık Satış - {data['product_name']}",
+            reference_id=extra_sale.id,
+            reference_type="extra_sale",
+            date=data["date"],
+            created_by=current_user["user_id"]
+        )
+        sale_transaction_doc = sale_transaction.model_dump()
+        sale_transaction_doc['created_at'] = sale_transaction_doc['created_at'].isoformat()
+        await db.transactions.insert_one(sale_transaction_doc)
+        await sync_cash_position(db, "transactions", None, sale_transaction_doc)
+        
+        # Update cari balance
+        balance_field = f"balance_{data.get('currency', 'EUR').lower()}"
+        await db.cari_accounts.update_one(
+            {"id": data["cari_id"]},
+            {"$inc": {balance_field: data["sale_price"]}}
+        )
+    
+    return extra_sale
+
+@router.put("/extra-sales/{sale_id}/cancel")
+async def cancel_extra_sale(
+    sale_id: str,
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Açık satışı iptal et - önce orijinal tutar geri alınır, sonra no-show bedeli eklenir"""
+    sale = await db.extra_sales.find_one({
+        "id": sale_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if not sale:
+        raise HTTPException(status_code=404, detail="Satış bulunamadı")
+    
+    if sale.get("status") == "cancelled":
+        raise HTTPException(status_code=400, detail="Satış zaten iptal edilmiş")
+    
+    cancellation_reason = data.get("cancellation_reason", "")
+    apply_no_show = data.get("apply_no_show", False)
+    no_show_amount = data.get("no_show_amount")
+    no_show_currency = data.get("no_show_currency", "EUR")
+    
+    update_data = {
+        "status": "cancelled",
+        "cancellation_reason": cancellation_reason,
+        "cancelled_at": datetime.now(timezone.utc).isoformat(),
+        "no_show_applied": apply_no_show,
+        "no_show_amount": no_show_amount if apply_no_show else None,
+        "no_show_currency": no_show_currency if apply_no_show else None,
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    }
+    
+    # Satış bilgileri
+    cari_id = sale.get("cari_id")
+    sale_price = sale.get("sale_price", 0)
+    sale_currency = sale.get("currency", "EUR")
+    
+    if cari_id:
+        # Cari hesabı bul
+        cari = await db.cari_accounts.find_one({"id": cari_id})
+        if not cari:
+            raise HTTPException(status_code=404, detail="Cari hesap bulunamadı")
+        
+        # ÖNCE: Orijinal satış tutarını geri al (cari artık bize borçlu değil)
+        # SONRA: No-show bedeli varsa ekle (cari tekrar bize borçlu olur)
+        deltas = [{f"balance_{sale_currency.lower()}": -sale_price}]
+        if apply_no_show and no_show_amount and no_show_amount > 0:
+            deltas.append({f"balance_{no_show_currency.lower()}": no_show_amount})
+        balance_deltas = merge_deltas(*deltas)
+        if balance_deltas:
+            await db.cari_accounts.update_one({"id": cari_id}, {"$inc": balance_deltas})
+        
+        # Orijinal satış transaction'ını sil (satış tutarı geri alındı)
+        deleted_transaction = await db.transactions.find_one_and_delete({
+            "reference_id": sale_id,
+            "reference_type": "extra_sale"
+        }, CASH_PROJECTION)
+        await sync_cash_position(db, "transactions", deleted_transaction, None)
+        await invalidate_checkpoints(db, [cari_id])
+        
+        # No-show bedeli transaction'ı oluştur (eğer varsa)
+        if apply_no_show and no_show_amount and no_show_amount > 0:
+            transaction = Transaction(
+                company_id=current_user["company_id"],
+                cari_id=cari_id,
+                transaction_type="debt",  # Borç (cari bize borçlu)
+                amount=no_show_amount,
+                currency=no_show_currency,
+                exchange_rate=data.get("exchange_rate", 1.0),
+                reference_type="no_show_penalty",
+                reference_id=sale_id,
+                description=f"No-show bedeli: {sale.get('customer_name', 'Müşteri')} - {sale.get('product_name', '')} - {sale.get('date', '')}",
+                date=datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+                created_by=current_user["user_id"]
+            )
+            transaction_doc = transaction.model_dump()
+            transaction_doc['created_at'] = transaction_doc['created_at'].isoformat()
+            await db.transactions.insert_one(transaction_doc)
+            await sync_cash_position(db, "transactions", None, transaction_doc)
+            
+            # Activity log (no-show ile iptal)
+            await create_activity_log(
+                company_id=current_user["company_id"],
+                user_id=current_user["user_id"],
+                username=current_user.get("username", ""),
+                full_name=current_user.get("full_name", ""),
+                action="cancel_extra_sale_no_show",
+                entity_type="extra_sale",
+                entity_id=sale_id,
+                entity_name=f"{sale.get('customer_name', '')} - {sale.get('product_name', '')}",
+                description=f"Açık satış iptal edildi - Orijinal tutar ({sale_price} {sale_currency}) geri alındı, No-show bedeli ({no_show_amount} {no_show_currency}) eklendi",
+                changes={
+                    "sale_amount_refunded": sale_price,
+                    "sale_currency": sale_currency,
+                    "no_show_amount": no_show_amount,
+                    "no_show_currency": no_show_currency
+                }
+            )
+        else:
+            # Activity log (sadece iptal, no-show yok)
+            await create_activity_log(
+                company_id=current_user["company_id"],
+                user_id=current_user["user_id"],
+                username=current_user.get("username", ""),
+                full_name=current_user.get("full_name", ""),
+                action="cancel_extra_sale",
+                entity_type="extra_sale",
+                entity_id=sale_id,
+                entity_name=f"{sale.get('customer_name', '')} - {sale.get('product_name', '')}",
+                description=f"Açık satış iptal edildi - Orijinal tutar ({sale_price} {sale_currency}) geri alındı: {cancellation_reason}",
+                changes={
+                    "sale_amount_refunded": sale_price,
+                    "sale_currency": sale_currency
+                }
+            )
+    else:
+        # Cari hesap yoksa sadece log
+        await create_activity_log(
+            company_id=current_user["company_id"],
+            user_id=current_user["user_id"],
+            username=current_user.get("username", ""),
+            full_name=current_user.get("full_name", ""),
+            action="cancel_extra_sale",
+            entity_type="extra_sale",
+            entity_id=sale_id,
+            entity_name=f"{sale.get('customer_name', '')} - {sale.get('product_name', '')}",
+            description=f"Açık satış iptal edildi: {cancellation_reason}"
+        )
+    
+    # Satışı güncelle
+    await db.extra_sales.update_one(
+        {"id": sale_id, "company_id": current_user["company_id"]},
+        {"$set": update_data}
+    )
+    
+    return {"message": "Açık satış iptal edildi", "no_show_applied": apply_no_show}
+
+@router.delete("/extra-sales/{sale_id}")
+async def delete_extra_sale(sale_id: str, current_user: dict = Depends(get_current_user)):
+    # Get user info for logging
+    user = await db.users.find_one({"id": current_user["user_id"]})
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    sale = await db.extra_sales.find_one({"id": sale_id, "company_id": current_user["company_id"]})
+    if not sale:
+        raise HTTPException(status_code=404, detail="Extra sale not found")
+    
+    # Revert balance
+    balance_field = f"balance_{sale['currency'].lower()}"
+    await db.cari_accounts.update_one(
+        {"id": sale["cari_id"]},
+        {"$inc": {balance_field: -sale["sale_price"]}}
+    )
+    
+    # Delete transaction
+    deleted_transaction = await db.transactions.find_one_and_delete(
+        {"reference_id": sale_id, "reference_type": "extra_sale"}, CASH_PROJECTION
+    )
+    await sync_cash_position(db, "transactions", deleted_transaction, None)
+    await invalidate_checkpoints(db, [sale["cari_id"]])
+    
+    # Create activity log before deletion
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=user.get("username", ""),
+        full_name=user.get("full_name", ""),
+        action="delete",
+        entity_type="extra_sale",
+        entity_id=sale_id,
+        entity_name=f"{sale.get('customer_name', '')} - {sale.get('product_name', '')}",
+        description=f"Açık satış silindi: {sale.get('product_name', '')}, {sale.get('customer_name', '')}, {sale.get('sale_price', 0)} {sale.get('currency', 'EUR')}"
+    )
+    
+    # Delete sale
+    await db.extra_sales.delete_one({"id": sale_id})
+    await sync_cash_position(db, "extra_sales", sale, None)
+    
+    return {"message": "Extra sale deleted"}
+
+@router.post("/extra-sales/{sale_id}/voucher")
+async def generate_extra_sale_voucher(sale_id: str, current_user: dict = Depends(get_current_user)):
+    """Extra sale için voucher oluştur veya mevcut voucher'ı getir"""
+    try:
+        sale = await db.extra_sales.find_one({"id": sale_id, "company_id": current_user["company_id"]}, {"_id": 0})
+        if not sale:
+            raise HTTPException(status_code=404, detail="Extra sale not found")
+        
+        # Eğer voucher_code yoksa oluştur
+        if not sale.get("voucher_code"):
+            voucher_code = await allocate_voucher_code(db)
+            
+            await db.extra_sales.update_one(
+                {"id": sale_id, "company_id": current_user["company_id"]},
+                {"$set": {"voucher_code": voucher_code}}
+            )
+            sale["voucher_code"] = voucher_code
+        
+        # Cari name'i ekle (eğer yoksa)
+        if sale.get("cari_id") and not sale.get("cari_name"):
+            cari = await db.cari_accounts.find_one({"id": sale["cari_id"]}, {"_id": 0})
+            if cari:
+                sale["cari_name"] = cari.get("name", "Bilinmeyen")
+        
+        # Company bilgilerini getir
+        company = await db.companies.find_one({"id": current_user["company_id"]}, {"_id": 0})
+        if not company:
+            # Company yoksa minimal bilgi oluştur
+            company = {
+                "id": current_user["company_id"],
+                "company_name": "Firma Adı",
+                "phone": "",
+                "address": "",
+                "email": "",
+                "website": ""
+            }
+        
+        # Eksik alanları doldur
+        sale.setdefault("date", "")
+        sale.setdefault("time", "")
+        sale.setdefault("product_name", "Açık Satış")
+        sale.setdefault("customer_name", "Belirtilmedi / Not Provided")
+        sale.setdefault("cari_name", "Belirtilmedi / Not Provided")
+        sale.setdefault("person_count", 0)
+        sale.setdefault("sale_price", 0)
+        sale.setdefault("currency", "EUR")
+        sale.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+        
+        return {
+            "sale": sale,
+            "company": company
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail="Voucher oluşturulurken hata oluştu")
+
+# ==================== SERVICE PURCHASES ====================
+
+@router.get("/service-purchases")
+async def get_service_purchases(current_user: dict = Depends(get_current_user)):
+    purchases = await db.service_purchases.find({"company_id": current_user["company_id"]}, {"_id": 0}).sort("date", -1).to_list(1000)
+    return purchases
+
+@router.post("/service-purchases")
+async def create_service_purchase(data: dict, current_user: dict = Depends(get_current_user)):
+    # Get supplier name
+    supplier = await db.cari_accounts.find_one({"id": data["supplier_id"]})
+    if not supplier:
+        raise HTTPException(status_code=404, detail="Supplier not found")
+    
+    data["supplier_name"] = supplier["name"]
+    
+    purchase = ServicePurchase(company_id=current_user["company_id"], created_by=current_user["user_id"], **data)
+    purchase_doc = purchase.model_dump()
+    purchase_doc['created_at'] = purchase_doc['created_at'].isoformat()
+    await db.service_purchases.insert_one(purchase_doc)
+    
+    # Create transaction (expense - gider - biz cariye borçluyuz)
+    transaction = Transaction(
+        company_id=current_user["company_id"],
+        cari_id=data["supplier_id"],
+        transaction_type="expense",  # Gider (biz cariye borçluyuz)
+        amount=data["amount"],
+        currency=data.get("currency", "EUR"),
+        exchange_rate=data.get("exchange_rate", 1.0),
+        description=f"Hizmet Alımı - {data['service_description']}",
+        reference_id=purchase.id,
+        reference_type="service_purchase",
+        date=data["date"],
+        created_by=current_user["user_id"]
+    )
+    transaction_doc = transaction.model_dump()
+    transaction_doc['created_at'] = transaction_doc['created_at'].isoformat()
+    await db.transactions.insert_one(transaction_doc)
+    await sync_cash_position(db, "transactions", None, transaction_doc)
+    
+    # Update supplier balance (negative - we owe them)
+    # Biz cari firmaya borçlu oluruz = bakiye AZALIR
+    balance_field = f"balance_{data.get('currency', 'EUR').lower()}"
+    await db.cari_accounts.update_one(
+        {"id": data["supplier_id"]},
+        {"$inc": {balance_field: -data["amount"]}}
+    )
+    
+    return purchase
+
+@router.delete("/service-purchases/{purchase_id}")
+async def delete_service_purchase(purchase_id: str, current_user: dict = Depends(get_current_user)):
+    """Hizmet alımını sil - bakiye geri alınır"""
+    purchase = await db.service_purchases.find_one({
+        "id": purchase_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if not purchase:
+        raise HTTPException(status_code=404, detail="Hizmet alımı bulunamadı")
+    
+    # Hizmet alımı geri alınır = bakiye ARTAR (negatif yönde azalır)
+    supplier_id = purchase.get("supplier_id")
+    amount = purchase.get("amount", 0)
+    currency = purchase.get("currency", "EUR")
+    
+    if supplier_id:
+        cari = await db.cari_accounts.find_one({"id": supplier_id})
+        if not cari:
+            raise HTTPException(status_code=404, detail="Tedarikçi cari hesap bulunamadı")
+        
+        # Geri alma = bakiye artar (borç azalır)
+        await db.cari_accounts.update_one(
+            {"id": supplier_id},
+            {"$inc": {f"balance_{currency.lower()}": amount}}
+        )
+        
+        # Transaction'ı sil
+        await db.transactions.delete_one({
+            "reference_id": purchase_id,
+            "reference_type": "service_purchase"
+        })
+        await invalidate_checkpoints(db, [supplier_id])
+        
+        # Activity log
+        await create_activity_log(
+            company_id=current_user["company_id"],
+            user_id=current_user["user_id"],
+            username=current_user.get("username", ""),
+            full_name=current_user.get("full_name", ""),
+            action="delete",
+            entity_type="service_purchase",
+            entity_id=purchase_id,
+            entity_name=f"{purchase.get('service_description', '')} - {purchase.get('date', '')}",
+            description=f"Hizmet alımı silindi: {purchase.get('service_description', '')}, {amount} {currency}"
+        )
+    
+    # Service purchase'ı sil
+    await db.service_purchases.delete_one({"id": purchase_id})
+    
+    return {"message": "Hizmet alımı silindi"}
@@ -0,0 +1,1364 @@
+"""
+Staff, role, salary, overtime and leave endpoints.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pymongo import ReturnDocument
+
+from ..audit import create_activity_log
+from ..auth import get_current_user, invalidate_user_auth_state
+from ..balances import apply_cari_delta
+from ..cash_position import sync_cash_position
+from ..database import db
+from ..models import CariAccount, Leave, Overtime, SalaryTransaction, StaffRole, Transaction
+from ..pagination import fetch_page, page_size, set_page_headers
+from ..passwords import hash_password_async
+
+router = APIRouter(tags=["staff"])
+
+# ==================== STAFF ROLES ====================
+
+@router.get("/staff-roles")
+async def get_staff_roles(current_user: dict = Depends(get_current_user)):
+    """Personel rollerini getir"""
+    roles = await db.staff_roles.find(
+        {"company_id": current_user["company_id"], "is_active": True},
+        {"_id": 0}
+    ).sort("order", 1).to_list(100)
+    return roles
+
+@router.post("/staff-roles")
+async def create_staff_role(
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Yeni personel rolü oluştur"""
+    role = StaffRole(company_id=current_user["company_id"], **data)
+    role_doc = role.model_dump()
+    role_doc['created_at'] = role_doc['created_at'].isoformat()
+    await db.staff_roles.insert_one(role_doc)
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="create",
+        entity_type="staff_role",
+        entity_id=role.id,
+        entity_name=role.name,
+        description=f"Yeni personel rolü oluşturuldu: {role.name}",
+        changes=data
+    )
+    
+    return role
+
+@router.put("/staff-roles/{role_id}")
+async def update_staff_role(
+    role_id: str,
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Personel rolünü güncelle"""
+    existing = await db.staff_roles.find_one({
+        "id": role_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if not existing:
+        raise HTTPException(status_code=404, detail="Rol bulunamadı")
+    
+    result = await db.staff_roles.update_one(
+        {"id": role_id, "company_id": current_user["company_id"]},
+        {"$set": data}
+    )
+    
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Rol bulunamadı")
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="update",
+        entity_type="staff_role",
+        entity_id=role_id,
+        entity_name=existing.get("name", "Personel Rolü"),
+        description=f"Personel rolü güncellendi: {existing.get('name', '')}",
+        changes=data
+    )
+    
+    return {"message": "Rol güncellendi"}
+
+@router.delete("/staff-roles/{role_id}")
+async def delete_staff_role(
+    role_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Personel rolünü sil"""
+    # Bu role ait personel var mı kontrol et
+    staff_count = await db.users.count_documents({
+        "company_id": current_user["company_id"],
+        "role_id": role_id
+    })
+    
+    if staff_count > 0:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Bu role ait {staff_count} personel bulunmaktadır. Önce personelleri silin veya rollerini değiştirin."
+        )
+    
+    existing = await db.staff_roles.find_one({
+        "id": role_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    result = await db.staff_roles.delete_one({
+        "id": role_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Rol bulunamadı")
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="delete",
+        entity_type="staff_role",
+        entity_id=role_id,
+        entity_name=existing.get("name", "Personel Rolü") if existing else "Personel Rolü",
+        description=f"Personel rolü silindi: {existing.get('name', '') if existing else ''}"
+    )
+    
+    return {"message": "Rol silindi"}
+
+# ==================== USERS (PERSONNEL) ====================
+
+@router.get("/users")
+async def get_users(
+    response: Response,
+    role_id: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """Personelleri getir - roller ve filtreleme ile"""
+    query = {"company_id": current_user["company_id"]}
+    
+    if role_id:
+        query["role_id"] = role_id
+    
+    if is_active is not None:
+        query["is_active"] = is_active
+    
+    users, next_cursor, total = await fetch_page(
+        db.users, query, "full_name", direction=1,
+        limit=page_size(limit, 1000), cursor=cursor,
+        projection={"_id": 0, "password": 0}, include_total=include_total
+    )
+    set_page_headers(response, next_cursor, total)
+    
+    # Rolleri populate et
+    roles = await db.staff_roles.find(
+        {"company_id": current_user["company_id"]},
+        {"_id": 0}
+    ).to_list(100)
+    role_map = {role["id"]: role for role in roles}
+    
+    for user in users:
+        if user.get("role_id"):
+            role = role_map.get(user["role_id"])
+            if role:
+                user["role_name"] = role.get("name")
+                user["role_color"] = role.get("color", "#3EA6FF")
+    
+    return users
+
+@router.get("/users/statistics")
+async def get_user_statistics(current_user: dict = Depends(get_current_user)):
+    """Personel istatistiklerini getir"""
+    # Rol bazlı personel sayıları
+    roles = await db.staff_roles.find(
+        {"company_id": current_user["company_id"], "is_active": True},
+        {"_id": 0}
+    ).sort("order", 1).to_list(100)
+    
+    role_stats = []
+    total_active = 0
+    total_inactive = 0
+    
+    for role in roles:
+        active_count = await db.users.count_documents({
+            "company_id": current_user["company_id"],
+            "role_id": role["id"],
+            "is_active": True
+        })
+        inactive_count = await db.users.count_documents({
+            "company_id": current_user["company_id"],
+            "role_id": role["id"],
+            "is_active": False
+        })
+        
+        role_stats.append({
+            "role_id": role["id"],
+            "role_name": role["name"],
+            "role_color": role.get("color", "#3EA6FF"),
+            "active_count": active_count,
+            "inactive_count": inactive_count,
+            "total_count": active_count + inactive_count
+        })
+        
+        total_active += active_count
+        total_inactive += inactive_count
+    
+    # Kategorisiz personeller
+    uncategorized_active = await db.users.count_documents({
+        "company_id": current_user["company_id"],
+        "$or": [
+            {"role_id": {"$exists": False}},
+            {"role_id": None}
+        ],
+        "is_active": True
+    })
+    uncategorized_inactive = await db.users.count_documents({
+        "company_id": current_user["company_id"],
+        "$or": [
+            {"role_id": {"$exists": False}},
+            {"role_id": None}
+        ],
+        "is_active": False
+    })
+    if uncategorized_active > 0 or uncategorized_inactive > 0:
+        role_stats.append({
+            "role_id": None,
+            "role_name": "Kategorisiz",
+            "role_color": "#A5A5A5",
+            "active_count": uncategorized_active,
+            "inactive_count": uncategorized_inactive,
+            "total_count": uncategorized_active + uncategorized_inactive
+        })
+        total_active += uncategorized_active
+        total_inactive += uncategorized_inactive
+    
+    # Web panel aktif personel sayısı
+    web_panel_active = await db.users.count_documents({
+        "company_id": current_user["company_id"],
+        "web_panel_active": True,
+        "is_active": True
+    })
+    
+    return {
+        "total_active": total_active,
+        "total_inactive": total_inactive,
+        "total_staff": total_active + total_inactive,
+        "web_panel_active": web_panel_active,
+        "role_stats": role_stats
+    }
+
+@router.post("/users")
+async def create_user(data: dict, current_user: dict = Depends(get_current_user)):
+    """Yeni personel oluştur"""
+    # Validation
+    if not data.get("full_name"):
+        raise HTTPException(status_code=400, detail="Ad Soyad zorunludur")
+    
+    # Web panel aktifse username ve password zorunlu
+    if data.get("web_panel_active"):
+        if not data.get("username"):
+            raise HTTPException(status_code=400, detail="Web panel aktifse kullanıcı adı zorunludur")
+        if not data.get("password"):
+            raise HTTPException(status_code=400, detail="Web panel aktifse şifre zorunludur")
+        
+        # Username kontrolü
+        existing = await db.users.find_one({"username": data["username"]})
+        if existing:
+            raise HTTPException(status_code=400, detail="Bu kullanıcı adı zaten kullanılıyor")
+    
+    # User oluştur
+    user_data = {
+        "id": str(uuid.uuid4()),
+        "company_id": current_user["company_id"],
+        "full_name": data["full_name"],
+        "email": data.get("email"),
+        "phone": data.get("phone"),
+        "address": data.get("address"),
+        "role_id": data.get("role_id"),
+        "tc_no": data.get("tc_no"),
+        "birth_date": data.get("birth_date"),
+        "gender": data.get("gender"),
+        "nationality": data.get("nationality"),
+        "emergency_contact_name": data.get("emergency_contact_name"),
+        "emergency_contact_phone": data.get("emergency_contact_phone"),
+        "employee_id": data.get("employee_id"),
+        "hire_date": data.get("hire_date"),
+        "termination_date": data.get("termination_date"),
+        "is_active": data.get("is_active", True),
+        "gross_salary": data.get("gross_salary"),
+        "net_salary": data.get("net_salary"),
+        "salary_currency": data.get("salary_currency", "TRY"),
+        "advance_limit": data.get("advance_limit"),
+        "languages": data.get("languages", []),
+        "skills": data.get("skills", []),
+        "education_level": data.get("education_level"),
+        "education_field": data.get("education_field"),
+        "driving_license_class": data.get("driving_license_class"),
+        "driving_license_no": data.get("driving_license_no"),
+        "driving_license_expiry": data.get("driving_license_expiry"),
+        "web_panel_active": data.get("web_panel_active", False),
+        "permissions": data.get("permissions", {}),
+        "is_admin": data.get("is_admin", False),
+        "notes": data.get("notes"),
+        "avatar_url": data.get("avatar_url"),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "updated_at": None
+    }
+    
+    # Web panel aktifse username ve password ekle
+    if data.get("web_panel_active"):
+        user_data["username"] = data["username"]
+        user_data["password"] = await hash_password_async(data["password"])
+    
+    await db.users.insert_one(user_data)
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="create",
+        entity_type="user",
+        entity_id=user_data["id"],
+        entity_name=user_data["full_name"],
+        description=f"Yeni personel oluşturuldu: {user_data['full_name']}",
+        changes=data
+    )
+    
+    return {"message": "Personel oluşturuldu", "id": user_data["id"]}
+
+# ==================== STAFF MANAGEMENT (ADMIN ONLY) ====================
+
+@router.post("/staff")
+async def create_staff(data: dict, current_user: dict = Depends(get_current_user)):
+    """
+    Create a new staff member (user) - All authenticated users can create staff.
+    Security constraints:
+    - Forces role='user' (cannot create super_admin or admin)
+    - Forces companyId from JWT (cannot assign user to different company)
+    - Allows permissions object to be set
+    """
+    # Validation
+    if not data.get("full_name"):
+        raise HTTPException(status_code=400, detail="Full name is required")
+    
+    # Web panel active requires username and password
+    if data.get("web_panel_active"):
+        if not data.get("username"):
+            raise HTTPException(status_code=400, detail="Username is required when web panel is active")
+        if not data.get("password"):
+            raise HTTPException(status_code=400, detail="Password is required when web panel is active")
+        
+        # Check username uniqueness
+        existing = await db.users.find_one({"username": data["username"]})
+        if existing:
+            raise HTTPException(status_code=400, detail="Username already exists")
+    
+    # SECURITY: Force role to 'user' - admin cannot create super_admin or admin
+    forced_role = "user"
+    
+    # SECURITY: Force companyId from JWT - admin cannot assign user to different company
+    forced_company_id = current_user["company_id"]
+    
+    # Create user data
+    user_data = {
+        "id": str(uuid.uuid4()),
+        "company_id": forced_company_id,  # SECURITY: Forced from JWT
+        "full_name": data["full_name"],
+        "email": data.get("email"),
+        "phone": data.get("phone"),
+        "address": data.get("address"),
+        "role_id": data.get("role_id"),  # Staff role (not user role)
+        "tc_no": data.get("tc_no"),
+        "birth_date": data.get("birth_date"),
+        "gender": data.get("gender"),
+        "nationality": data.get("nationality"),
+        "emergency_contact_name": data.get("emergency_contact_name"),
+        "emergency_contact_phone": data.get("emergency_contact_phone"),
+        "employee_id": data.get("employee_id"),
+        "hire_date": data.get("hire_date"),
+        "termination_date": data.get("termination_date"),
+        "is_active": data.get("is_active", True),
+        "gross_salary": data.get("gross_salary"),
+        "net_salary": data.get("net_salary"),
+        "salary_currency": data.get("salary_currency", "TRY"),
+        "advance_limit": data.get("advance_limit"),
+        "languages": data.get("languages", []),
+        "skills": data.get("skills", []),
+        "education_level": data.get("education_level"),
+        "education_field": data.get("education_field"),
+        "driving_license_class": data.get("driving_license_class"),
+        "driving_license_no": data.get("driving_license_no"),
+        "driving_license_expiry": data.get("driving_license_expiry"),
+        "web_panel_active": data.get("web_panel_active", False),
+        "permissions": data.get("permissions", {}),  # Allow permissions to be set
+        "role": forced_role,  # SECURITY: Always 'user', never 'admin' or 'super_admin'
+        "is_admin": False,  # SECURITY: Always False
+        "notes": data.get("notes"),
+        "avatar_url": data.get("avatar_url"),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "updated_at": None
+    }
+    
+    # Add username and password if web panel is active
+    if data.get("web_panel_active"):
+        user_data["username"] = data["username"]
+        user_data["password"] = await hash_password_async(data["password"])
+    
+    await db.users.insert_one(user_data)
+    
+    # Activity log
+    await create_activity_log(
+        company_id=forced_company_id,
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="create",
+        entity_type="staff",
+        entity_id=user_data["id"],
+        entity_name=user_data["full_name"],
+        description=f"Yeni personel oluşturuldu: {user_data['full_name']}",
+        changes={"role": forced_role, "company_id": forced_company_id}
+    )
+    
+    # Return user without sensitive data
+    user_data.pop("password", None)
+    user_data.pop("password_hash", None)
+    return {"message": "Staff member created successfully", "user": user_data}
+
+@router.get("/staff")
+async def get_staff(
+    role_id: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get all staff members for the user's company - All authenticated users can view staff.
+    Only returns users with role='user' (not admins or super_admins)
+    """
+    query = {
+        "company_id": current_user["company_id"],
+        "role": "user"  # Only return regular users, not admins
+    }
+    
+    if role_id:
+        query["role_id"] = role_id
+    if is_active is not None:
+        query["is_active"] = is_active
+    
+    users = await db.users.find(
+        query,
+        {"_id": 0, "password": 0, "password_hash": 0}
+    ).sort("full_name", 1).to_list(1000)
+    
+    # Add role information if role_id exists
+    roles = await db.staff_roles.find(
+        {"company_id": current_user["company_id"], "is_active": True},
+        {"_id": 0}
+    ).to_list(100)
+    role_map = {role["id"]: role for role in roles}
+    
+    for user in users:
+        if user.get("role_id"):
+            role = role_map.get(user["role_id"])
+            if role:
+                user["role_name"] = role.get("name")
+                user["role_color"] = role.get("color", "#3EA6FF")
+    
+    return users
+
+@router.put("/staff/{staff_id}")
+async def update_staff(staff_id: str, data: dict, current_user: dict = Depends(get_current_user)):
+    """
+    Update a staff member - All authenticated users can update staff.
+    Security constraints:
+    - Cannot change role to 'admin' or 'super_admin'
+    - Cannot change companyId
+    - Can update permissions
+    """
+    # Find staff member - must belong to admin's company and be a regular user
+    staff = await db.users.find_one({
+        "id": staff_id,
+        "company_id": current_user["company_id"],
+        "role": "user"  # Only allow updating regular users
+    })
+    
+    if not staff:
+        raise HTTPException(status_code=404, detail="Staff member not found")
+    
+    # SECURITY: Prevent role escalation - remove role and is_admin from data if present
+    if "role" in data:
+        if data["role"] not in ["user"]:
+            raise HTTPException(status_code=403, detail="Cannot change role to admin or super_admin")
+        # Force to 'user' even if somehow passed
+        data["role"] = "user"
+    
+    if "is_admin" in data:
+        if data["is_admin"]:
+            raise HTTPException(status_code=403, detail="Cannot set is_admin to True")
+        data["is_admin"] = False
+    
+    # SECURITY: Prevent company_id change
+    if "company_id" in data:
+        if data["company_id"] != current_user["company_id"]:
+            raise HTTPException(status_code=403, detail="Cannot change company_id")
+        # Remove from update data since it's already correct
+        data.pop("company_id")
+    
+    # Full name validation
+    if "full_name" in data and not data["full_name"]:
+        raise HTTPException(status_code=400, detail="Full name is required")
+    
+    # Web panel active requires username
+    if data.get("web_panel_active") and not staff.get("username"):
+        if not data.get("username"):
+            raise HTTPException(status_code=400, detail="Username is required when web panel is active")
+        if not data.get("password"):
+            raise HTTPException(status_code=400, detail="Password is required when web panel is active")
+        
+        # Check username uniqueness
+        existing = await db.users.find_one({"username": data["username"], "id": {"$ne": staff_id}})
+        if existing:
+            raise HTTPException(status_code=400, detail="Username already exists")
+    
+    # Hash password if provided
+    update_doc = {"$set": data}
+    if "password" in data and data["password"]:
+        data["password"] = await hash_password_async(data["password"])
+        # Şifre değişti - eski oturumları geçersiz kıl
+        update_doc["$inc"] = {"token_version": 1}
+    
+    data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    
+    await db.users.update_one(
+        {"id": staff_id, "company_id": current_user["company_id"]},
+        update_doc
+    )
+    invalidate_user_auth_state(staff_id)
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="update",
+        entity_type="staff",
+        entity_id=staff_id,
+        entity_name=staff.get("full_name", "Staff"),
+        description=f"Personel güncellendi: {staff.get('full_name', '')}",
+        changes=data
+    )
+    
+    return {"message": "Staff member updated successfully"}
+
+@router.delete("/staff/{staff_id}")
+async def delete_staff(staff_id: str, current_user: dict = Depends(get_current_user)):
+    """
+    Delete a staff member - All authenticated users can delete staff.
+    Security constraints:
+    - Can only delete users from user's company
+    - Can only delete users with role='user'
+    """
+    # Find staff member - must belong to admin's company and be a regular user
+    staff = await db.users.find_one({
+        "id": staff_id,
+        "company_id": current_user["company_id"],
+        "role": "user"  # Only allow deleting regular users
+    })
+    
+    if not staff:
+        raise HTTPException(status_code=404, detail="Staff member not found")
+    
+    # Prevent deleting yourself (if somehow a user tries to delete themselves)
+    if staff_id == current_user["user_id"]:
+        raise HTTPException(status_code=403, detail="Cannot delete yourself")
+    
+    # Delete staff member
+    result = await db.users.delete_one({
+        "id": staff_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Staff member not found")
+    invalidate_user_auth_state(staff_id)
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="delete",
+        entity_type="staff",
+        entity_id=staff_id,
+        entity_name=staff.get("full_name", "Staff"),
+        description=f"Personel silindi: {staff.get('full_name', '')}"
+    )
+    
+    return {"message": "Staff member deleted successfully"}
+
+@router.put("/users/{user_id}")
+async def update_user(user_id: str, data: dict, current_user: dict = Depends(get_current_user)):
+    """Personeli güncelle"""
+    user = await db.users.find_one({"id": user_id, "company_id": current_user["company_id"]})
+    if not user:
+        raise HTTPException(status_code=404, detail="Personel bulunamadı")
+    
+    # Full name validation
+    if "full_name" in data and not data["full_name"]:
+        raise HTTPException(status_code=400, detail="Ad Soyad zorunludur")
+    
+    # Web panel aktif ediliyorsa username kontrolü
+    if data.get("web_panel_active") and not user.get("username"):
+        if not data.get("username"):
+            raise HTTPException(status_code=400, detail="Web panel aktifse kullanıcı adı zorunludur")
+        if not data.get("password"):
+            raise HTTPException(status_code=400, detail="Web panel aktifse şifre zorunludur")
+        
+        # Username kontrolü
+        existing = await db.users.find_one({"username": data["username"], "id": {"$ne": user_id}})
+        if existing:
+            raise HTTPException(status_code=400, detail="Bu kullanıcı adı zaten kullanılıyor")
+    
+    # Şifre güncelleme
+    update_doc = {"$set": data}
+    if "password" in data and data["password"]:
+        data["password"] = await hash_password_async(data["password"])
+        # Şifre değişti - eski oturumları geçersiz kıl
+        update_doc["$inc"] = {"token_version": 1}
+    
+    data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    
+    await db.users.update_one(
+        {"id": user_id, "company_id": current_user["company_id"]},
+        update_doc
+    )
+    invalidate_user_auth_state(user_id)
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="update",
+        entity_type="user",
+        entity_id=user_id,
+        entity_name=user.get("full_name", "Personel"),
+        description=f"Personel güncellendi: {user.get('full_name', '')}",
+        changes=data
+    )
+    
+    return {"message": "Personel güncellendi"}
+
+@router.put("/users/{user_id}/toggle-active")
+async def toggle_user_active(user_id: str, current_user: dict = Depends(get_current_user)):
+    """Personelin aktif/pasif durumunu değiştir"""
+    user = await db.users.find_one({"id": user_id, "company_id": current_user["company_id"]})
+    if not user:
+        raise HTTPException(status_code=404, detail="Personel bulunamadı")
+    
+    new_status = not user.get("is_active", True)
+    
+    update_data = {
+        "is_active": new_status,
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    }
+    
+    # Pasif yapılıyorsa işten ayrılma tarihini ekle
+    if not new_status and not user.get("termination_date"):
+        update_data["termination_date"] = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        # Web panel erişimini de kapat
+        update_data["web_panel_active"] = False
+    
+    # Aktif yapılıyorsa işten ayrılma tarihini kaldır
+    if new_status:
+        update_data["termination_date"] = None
+    
+    await db.users.update_one(
+        {"id": user_id, "company_id": current_user["company_id"]},
+        {"$set": update_data}
+    )
+    invalidate_user_auth_state(user_id)
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="update",
+        entity_type="user",
+        entity_id=user_id,
+        entity_name=user.get("full_name", "Personel"),
+        description=f"Personel {'aktif' if new_status else 'pasif'} yapıldı: {user.get('full_name', '')}",
+        changes={"is_active": new_status}
+    )
+    
+    return {"message": f"Personel {'aktif' if new_status else 'pasif'} yapıldı", "is_active": new_status}
+
+@router.delete("/users/{user_id}")
+async def delete_user(user_id: str, current_user: dict = Depends(get_current_user)):
+    if not current_user["is_admin"]:
+        raise HTTPException(status_code=403, detail="Only admins can delete users")
+    
+    if user_id == current_user["user_id"]:
+        raise HTTPException(status_code=400, detail="Cannot delete yourself")
+    
+    result = await db.users.delete_one({"id": user_id, "company_id": current_user["company_id"]})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="User not found")
+    invalidate_user_auth_state(user_id)
+    return {"message": "User deleted"}
+
+# ==================== STAFF SALARY MANAGEMENT ====================
+
+@router.get("/users/{user_id}/detail")
+async def get_user_detail(user_id: str, current_user: dict = Depends(get_current_user)):
+    """Personel detay bilgilerini getir - maaş, fazla mesai, izin bilgileri ile"""
+    user = await db.users.find_one({
+        "id": user_id,
+        "company_id": current_user["company_id"]
+    }, {"_id": 0, "password": 0})
+    
+    if not user:
+        raise HTTPException(status_code=404, detail="Personel bulunamadı")
+    
+    # Salary transactions
+    salary_transactions = await db.salary_transactions.find(
+        {"user_id": user_id, "company_id": current_user["company_id"]},
+        {"_id": 0}
+    ).sort("payment_date", -1).to_list(100)
+    
+    # Overtime records
+    overtime_records = await db.overtimes.find(
+        {"user_id": user_id, "company_id": current_user["company_id"]},
+        {"_id": 0}
+    ).sort("date", -1).to_list(100)
+    
+    unpaid_overtime = [o for o in overtime_records if not o.get("is_paid")]
+    unpaid_overtime_hours = sum(o.get("hours", 0) for o in unpaid_overtime)
+    
+    # Leave records
+    leave_records = await db.leaves.find(
+        {"user_id": user_id, "company_id": current_user["company_id"]},
+        {"_id": 0}
+    ).sort("start_date", -1).to_list(100)
+    
+    # Bu yıl kullanılan izin günleri
+    current_year = datetime.now(timezone.utc).year
+    year_leaves = [l for l in leave_records if l.get("start_date", "")[:4] == str(current_year)]
+    used_leave_days = sum(l.get("days", 0) for l in year_leaves if l.get("is_paid", False))
+    
+    # Maaş ödeme durumu kontrolü
+    today = datetime.now(timezone.utc)
+    salary_payment_day = user.get("salary_payment_day")
+    last_paid_date = user.get("last_salary_paid_date")
+    
+    is_salary_due = False
+    if salary_payment_day and user.get("net_salary"):
+        # Bu ayın maaş gününü kontrol et
+        current_month = today.month
+        current_year = today.year
+        try:
+            salary_due_date = datetime(current_year, current_month, salary_payment_day, tzinfo=timezone.utc)
+        except ValueError:
+            # Ayın son günü (örn: 31. günü olmayan aylar için)
+            last_day = (datetime(current_year, current_month + 1, 1) - timedelta(days=1)).day
+            salary_due_date = datetime(current_year, current_month, min(salary_payment_day, last_day), tzinfo=timezone.utc)
+        
+        # Maaş günü geçmişse ve henüz ödenmemişse
+        if today >= salary_due_date:
+            if not last_paid_date or last_paid_date < salary_due_date.strftime("%Y-%m-%d"):
+                is_salary_due = True
+    
+    return {
+        "user": user,
+        "salary_transactions": salary_transactions,
+        "overtime_records": overtime_records,
+        "unpaid_overtime_hours": unpaid_overtime_hours,
+        "leave_records": leave_records,
+        "used_leave_days": used_leave_days,
+        "is_salary_due": is_salary_due,
+        "current_balance": user.get("current_balance", 0),
+        "current_balance_currency": user.get("current_balance_currency", "TRY")
+    }
+
+@router.post("/users/{user_id}/pay-salary")
+async def pay_salary(
+    user_id: str,
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Personel maaşını öde - bakiye sıfırlanır ve cari hesaba eklenir"""
+    user = await db.users.find_one({
+        "id": user_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if not user:
+        raise HTTPException(status_code=404, detail="Personel bulunamadı")
+    
+    if not user.get("is_active", True):
+        raise HTTPException(status_code=400, detail="Pasif personel için maaş ödenemez")
+    
+    amount = data.get("amount") or user.get("net_salary", 0)
+    currency = data.get("currency") or user.get("salary_currency", "TRY")
+    payment_date = data.get("payment_date") or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    description = data.get("description") or f"Maaş ödemesi - {user.get('full_name', '')}"
+    
+    if amount <= 0:
+        raise HTTPException(status_code=400, detail="Maaş tutarı 0'dan büyük olmalıdır")
+    
+    # Cari hesaba ekle - Personel maaş cari hesabı bul veya oluştur
+    staff_cari = await db.cari_accounts.find_one({
+        "company_id": current_user["company_id"],
+        "staff_user_id": user_id
+    })
+    
+    if not staff_cari:
+        # Personel için cari hesap oluştur (eşzamanlı ödemede tek hesap açılır)
+        staff_cari = CariAccount(
+            company_id=current_user["company_id"],
+            name=f"Personel: {user.get('full_name', '')}",
+            is_staff_payment=True,
+            staff_user_id=user_id
+        )
+        staff_cari_doc = staff_cari.model_dump()
+        staff_cari_doc['created_at'] = staff_cari_doc['created_at'].isoformat()
+        staff_cari = await db.cari_accounts.find_one_and_update(
+            {"company_id": current_user["company_id"], "staff_user_id": user_id},
+            {"$setOnInsert": staff_cari_doc},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    staff_cari_id = staff_cari["id"]
+    
+    # Cari hesap bakiyesini güncelle (maaş ödemesi = gider = biz borçluyuz)
+    # İstemci aynı ödemeyi tekrar gönderirse (çift tıklama, retry) anahtar zaten kayıtlıdır, ödeme tekrar işlenmez.
+    # idempotency_key gönderilmezse anahtar istekten türetilir: aynı gün aynı tutarda ikinci bir ödeme
+    # için istemci yeni bir idempotency_key göndermelidir (StaffManagement ödeme penceresi her açılışta üretir)
+    request_key = data.get("idempotency_key") or f"{payment_date}:{amount}:{currency}"
+    payment_key = f"pay_salary:{user_id}:{request_key}"
+    if not await apply_cari_delta(db, staff_cari_id, {f"balance_{currency.lower()}": -amount}, payment_key):
+        return {
+            "message": "Maaş ödemesi zaten işlendi",
+            "amount": amount,
+            "currency": currency,
+            "new_balance": 0.0
+        }
+    
+    # Ödeme tutarı bakiyeden düş - bakiye sıfırlanır
+    new_balance = 0.0
+    
+    # Salary transaction oluştur
+    salary_transaction = SalaryTransaction(
+        company_id=current_user["company_id"],
+        user_id=user_id,
+        transaction_type="salary_payment",
+        amount=amount,
+        currency=currency,
+        exchange_rate=data.get("exchange_rate", 1.0),
+        description=description,
+        payment_date=payment_date,
+        created_by=current_user["user_id"]
+    )
+    salary_transaction_doc = salary_transaction.model_dump()
+    salary_transaction_doc['created_at'] = salary_transaction_doc['created_at'].isoformat()
+    await db.salary_transactions.insert_one(salary_transaction_doc)
+    
+    # Personel bakiyesini güncelle
+    await db.users.update_one(
+        {"id": user_id, "company_id": current_user["company_id"]},
+        {"$set": {
+            "current_balance": new_balance,
+            "current_balance_currency": currency,
+            "last_salary_paid_date": payment_date,
+            "last_salary_paid_amount": amount,
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }}
+    )
+    
+    # Transaction kaydı oluştur (cari hesap için)
+    transaction = Transaction(
+        company_id=current_user["company_id"],
+        cari_id=staff_cari_id,
+        transaction_type="expense",
+        amount=amount,
+        currency=currency,
+        exchange_rate=data.get("exchange_rate", 1.0),
+        reference_type="salary_payment",
+        reference_id=user_id,
+        description=f"Maaş ödemesi: {user.get('full_name', '')} - {description}",
+        date=payment_date,
+        created_by=current_user["user_id"]
+    )
+    transaction_doc = transaction.model_dump()
+    transaction_doc['created_at'] = transaction_doc['created_at'].isoformat()
+    await db.transactions.insert_one(transaction_doc)
+    await sync_cash_position(db, "transactions", None, transaction_doc)
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="pay_salary",
+        entity_type="user",
+        entity_id=user_id,
+        entity_name=user.get("full_name", ""),
+        description=f"Maaş ödemesi: {amount} {currency}",
+        changes={"amount": amount, "currency": currency, "payment_date": payment_date}
+    )
+    
+    return {
+        "message": "Maaş ödendi",
+        "amount": amount,
+        "currency": currency,
+        "new_balance": new_balance
+    }
+
+@router.post("/users/{user_id}/add-advance")
+async def add_advance(
+    user_id: str,
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Personel avans ekle - bakiye artar ve cari hesaba eklenir"""
+    user = await db.users.find_one({
+        "id": user_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if not user:
+        raise HTTPException(status_code=404, detail="Personel bulunamadı")
+    
+    amount = data.get("amount", 0)
+    currency = data.get("currency") or user.get("salary_currency", "TRY")
+    payment_date = data.get("payment_date") or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    description = data.get("description") or f"Avans ödemesi - {user.get('full_name', '')}"
+    
+    if amount <= 0:
+        raise HTTPException(status_code=400, detail="Avans tutarı 0'dan büyük olmalıdır")
+    
+    # Avans limiti kontrolü
+    advance_limit = user.get("advance_limit")
+    current_balance = user.get("current_balance", 0) or 0
+    balance_currency = user.get("current_balance_currency", "TRY")
+    
+    # Avans limiti kontrolü (sadece aynı para biriminde)
+    if advance_limit and currency == balance_currency:
+        if current_balance + amount > advance_limit:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Avans limiti ({advance_limit} {currency}) aşıldı. Mevcut bakiye: {current_balance} {balance_currency}"
+            )
+    
+    # Yeni bakiye hesapla
+    # Avans = personel bize borçlu (pozitif bakiye artar)
+    if balance_currency == currency:
+        new_balance = current_balance + amount
+    else:
+        # Para birimi farklıysa sadece yeni para biriminde bakiye oluştur
+        new_balance = amount
+        balance_currency = currency
+    
+    # Salary transaction oluştur
+    salary_transaction = SalaryTransaction(
+        company_id=current_user["company_id"],
+        user_id=user_id,
+        transaction_type="advance_payment",
+        amount=amount,
+        currency=currency,
+        exchange_rate=data.get("exchange_rate", 1.0),
+        description=description,
+        payment_date=payment_date,
+        created_by=current_user["user_id"]
+    )
+    salary_transaction_doc = salary_transaction.model_dump()
+    salary_transaction_doc['created_at'] = salary_transaction_doc['created_at'].isoformat()
+    await db.salary_transactions.insert_one(salary_transaction_doc)
+    
+    # Personel bakiyesini güncelle
+    await db.users.update_one(
+        {"id": user_id, "company_id": current_user["company_id"]},
+        {"$set": {
+            "current_balance": new_balance,
+            "current_balance_currency": balance_currency,
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }}
+    )
+    
+    # Cari hesaba ekle
+    staff_cari = await db.cari_accounts.find_one({
+        "company_id": current_user["company_id"],
+        "staff_user_id": user_id
+    })
+    
+    if not staff_cari:
+        staff_cari = CariAccount(
+            company_id=current_user["company_id"],
+            name=f"Personel: {user.get('full_name', '')}",
+            is_staff_payment=True,
+            staff_user_id=user_id
+        )
+        staff_cari_doc = staff_cari.model_dump()
+        staff_cari_doc['created_at'] = staff_cari_doc['created_at'].isoformat()
+        await db.cari_accounts.insert_one(staff_cari_doc)
+        staff_cari_id = staff_cari.id
+    else:
+        staff_cari_id = staff_cari["id"]
+    
+    # Cari hesap bakiyesini güncelle (avans = gider = biz borçluyuz)
+    await db.cari_accounts.update_one(
+        {"id": staff_cari_id},
+        {"$inc": {f"balance_{currency.lower()}": -amount}}
+    )
+    
+    # Transaction kaydı
+    transaction = Transaction(
+        company_id=current_user["company_id"],
+        cari_id=staff_cari_id,
+        transaction_type="expense",
+        amount=amount,
+        currency=currency,
+        exchange_rate=data.get("exchange_rate", 1.0),
+        reference_type="advance_payment",
+        reference_id=user_id,
+        description=f"Avans ödemesi: {user.get('full_name', '')} - {description}",
+        date=payment_date,
+        created_by=current_user["user_id"]
+    )
+    transaction_doc = transaction.model_dump()
+    transaction_doc['created_at'] = transaction_doc['created_at'].isoformat()
+    await db.transactions.insert_one(transaction_doc)
+    await sync_cash_position(db, "transactions", None, transaction_doc)
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="add_advance",
+        entity_type="user",
+        entity_id=user_id,
+        entity_name=user.get("full_name", ""),
+        description=f"Avans eklendi: {amount} {currency}",
+        changes={"amount": amount, "currency": currency, "payment_date": payment_date}
+    )
+    
+    return {
+        "message": "Avans eklendi",
+        "amount": amount,
+        "currency": currency,
+        "new_balance": new_balance
+    }
+
+@router.get("/users/{user_id}/overtime")
+async def get_user_overtime(user_id: str, current_user: dict = Depends(get_current_user)):
+    """Personel fazla mesai kayıtlarını getir"""
+    overtime_records = await db.overtimes.find(
+        {"user_id": user_id, "company_id": current_user["company_id"]},
+        {"_id": 0}
+    ).sort("date", -1).to_list(100)
+    return overtime_records
+
+@router.post("/users/{user_id}/overtime")
+async def add_overtime(
+    user_id: str,
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Personel fazla mesai ekle"""
+    user = await db.users.find_one({"id": user_id, "company_id": current_user["company_id"]})
+    if not user:
+        raise HTTPException(status_code=404, detail="Personel bulunamadı")
+    
+    hours = data.get("hours", 0)
+    hourly_rate = data.get("hourly_rate")
+    currency = data.get("currency") or user.get("salary_currency", "TRY")
+    
+    # Saatlik ücret yoksa net maaştan hesapla (ayda 160 saat varsayımı)
+    if not hourly_rate and user.get("net_salary"):
+        hourly_rate = user.get("net_salary") / 160
+    
+    amount = hours * (hourly_rate or 0)
+    
+    overtime = Overtime(
+        company_id=current_user["company_id"],
+        user_id=user_id,
+        date=data.get("date", datetime.now(timezone.utc).strftime("%Y-%m-%d")),
+        hours=hours,
+        hourly_rate=hourly_rate,
+        amount=amount,
+        currency=currency,
+        description=data.get("description"),
+        created_by=current_user["user_id"]
+    )
+    overtime_doc = overtime.model_dump()
+    overtime_doc['created_at'] = overtime_doc['created_at'].isoformat()
+    await db.overtimes.insert_one(overtime_doc)
+    
+    return overtime
+
+@router.put("/users/{user_id}/overtime/{overtime_id}/pay")
+async def pay_overtime(
+    user_id: str,
+    overtime_id: str,
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Fazla mesai ödemesi yap - bakiye artar ve cari hesaba eklenir"""
+    overtime = await db.overtimes.find_one({
+        "id": overtime_id,
+        "user_id": user_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if not overtime:
+        raise HTTPException(status_code=404, detail="Fazla mesai kaydı bulunamadı")
+    
+    if overtime.get("is_paid"):
+        raise HTTPException(status_code=400, detail="Bu fazla mesai zaten ödenmiş")
+    
+    user = await db.users.find_one({"id": user_id, "company_id": current_user["company_id"]})
+    if not user:
+        raise HTTPException(status_code=404, detail="Personel bulunamadı")
+    
+    amount = overtime.get("amount", 0)
+    currency = overtime.get("currency", "TRY")
+    payment_date = data.get("payment_date") or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    
+    # Personel bakiyesini artır (fazla mesai = ek ödeme = personel alacaklı)
+    current_balance = user.get("current_balance", 0) or 0
+    balance_currency = user.get("current_balance_currency", "TRY")
+    
+    if balance_currency == currency:
+        new_balance = current_balance - amount  # Negatif = personel alacaklı
+    else:
+        new_balance = -amount
+        balance_currency = currency
+    
+    # Salary transaction oluştur
+    salary_transaction = SalaryTransaction(
+        company_id=current_user["company_id"],
+        user_id=user_id,
+        transaction_type="overtime_payment",
+        amount=amount,
+        currency=currency,
+        exchange_rate=data.get("exchange_rate", 1.0),
+        description=f"Fazla mesai ödemesi: {overtime.get('hours', 0)} saat",
+        payment_date=payment_date,
+        reference_id=overtime_id,
+        created_by=current_user["user_id"]
+    )
+    salary_transaction_doc = salary_transaction.model_dump()
+    salary_transaction_doc['created_at'] = salary_transaction_doc['created_at'].isoformat()
+    await db.salary_transactions.insert_one(salary_transaction_doc)
+    
+    # Fazla mesaiyi ödendi olarak işaretle
+    await db.overtimes.update_one(
+        {"id": overtime_id},
+        {"$set": {
+            "is_paid": True,
+            "paid_at": datetime.now(timezone.utc).isoformat()
+        }}
+    )
+    
+    # Personel bakiyesini güncelle
+    await db.users.update_one(
+        {"id": user_id},
+        {"$set": {
+            "current_balance": new_balance,
+            "current_balance_currency": balance_currency,
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }}
+    )
+    
+    # Cari hesaba ekle
+    staff_cari = await db.cari_accounts.find_one({
+        "company_id": current_user["company_id"],
+        "staff_user_id": user_id
+    })
+    
+    if not staff_cari:
+        staff_cari = CariAccount(
+            company_id=current_user["company_id"],
+            name=f"Personel: {user.get('full_name', '')}",
+            is_staff_payment=True,
+            staff_user_id=user_id
+        )
+        staff_cari_doc = staff_cari.model_dump()
+        staff_cari_doc['created_at'] = staff_cari_doc['created_at'].isoformat()
+        await db.cari_accounts.insert_one(staff_cari_doc)
+        staff_cari_id = staff_cari.id
+    else:
+        staff_cari_id = staff_cari["id"]
+    
+    await db.cari_accounts.update_one(
+        {"id": staff_cari_id},
+        {"$inc": {f"balance_{currency.lower()}": -amount}}
+    )
+    
+    # Transaction kaydı
+    transaction = Transaction(
+        company_id=current_user["company_id"],
+        cari_id=staff_cari_id,
+        transaction_type="expense",
+        amount=amount,
+        currency=currency,
+        exchange_rate=data.get("exchange_rate", 1.0),
+        reference_type="overtime_payment",
+        reference_id=overtime_id,
+        description=f"Fazla mesai ödemesi: {user.get('full_name', '')}",
+        date=payment_date,
+        created_by=current_user["user_id"]
+    )
+    transaction_doc = transaction.model_dump()
+    transaction_doc['created_at'] = transaction_doc['created_at'].isoformat()
+    await db.transactions.insert_one(transaction_doc)
+    await sync_cash_position(db, "transactions", None, transaction_doc)
+    
+    return {"message": "Fazla mesai ödemesi yapıldı", "amount": amount}
+
+@router.get("/users/{user_id}/leaves")
+async def get_user_leaves(user_id: str, current_user: dict = Depends(get_current_user)):
+    """Personel izin kayıtlarını getir"""
+    leave_records = await db.leaves.find(
+        {"user_id": user_id, "company_id": current_user["company_id"]},
+        {"_id": 0}
+    ).sort("start_date", -1).to_list(100)
+    return leave_records
+
+@router.post("/users/{user_id}/leaves")
+async def add_leave(
+    user_id: str,
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Personel izin ekle"""
+    user = await db.users.find_one({"id": user_id, "company_id": current_user["company_id"]})
+    if not user:
+        raise HTTPException(status_code=404, detail="Personel bulunamadı")
+    
+    # Tarih aralığından gün sayısını hesapla
+    start_date = datetime.strptime(data.get("start_date"), "%Y-%m-%d")
+    end_date = datetime.strptime(data.get("end_date"), "%Y-%m-%d")
+    days = (end_date - start_date).days + 1
+    
+    leave = Leave(
+        company_id=current_user["company_id"],
+        user_id=user_id,
+        leave_type=data.get("leave_type", "annual"),
+        start_date=data.get("start_date"),
+        end_date=data.get("end_date"),
+        days=days,
+        is_paid=data.get("is_paid", False),
+        description=data.get("description"),
+        created_by=current_user["user_id"]
+    )
+    leave_doc = leave.model_dump()
+    leave_doc['created_at'] = leave_doc['created_at'].isoformat()
+    await db.leaves.insert_one(leave_doc)
+    
+    return leave
+
+@router.post("/staff/process-monthly-salaries")
+async def process_monthly_salaries(
+    month: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Belirlenen maaş günü gelince personelleri otomatik olarak alacaklı yap"""
+    if not month:
+        month = datetime.now(timezone.utc).strftime("%Y-%m")
+    
+    year, month_num = month.split("-")
+    year = int(year)
+    month_num = int(month_num)
+    
+    # Tüm aktif personelleri getir
+    users = await db.users.find({
+        "company_id": current_user["company_id"],
+        "is_active": True,
+        "salary_payment_day": {"$exists": True, "$ne": None},
+        "net_salary": {"$exists": True, "$ne": None, "$gt": 0}
+    }, {"_id": 0}).to_list(1000)
+    
+    processed = []
+    
+    for user in users:
+        salary_payment_day = user.get("salary_payment_day")
+        net_salary = user.get("net_salary")
+        salary_currency = user.get("salary_currency", "TRY")
+        
+        if not salary_payment_day or not net_salary:
+            continue
+        
+        # Bu ayın maaş günü
+        try:
+            salary_due_date = datetime(year, month_num, salary_payment_day, tzinfo=timezone.utc)
+        except ValueError:
+            # Ayın son günü (örn: 31. günü olmayan aylar için)
+            last_day = (datetime(year, month_num + 1, 1) - timedelta(days=1)).day
+            salary_due_date = datetime(year, month_num, min(salary_payment_day, last_day), tzinfo=timezone.utc)
+        
+        last_paid_date = user.get("last_salary_paid_date")
+        
+        # Bu ayın maaşı henüz ödenmemişse ve maaş günü geçmişse
+        if (not last_paid_date or last_paid_date < salary_due_date.strftime("%Y-%m-%d")):
+            # Personel bakiyesini artır (maş ödenmemiş = personel alacaklı = negatif bakiye)
+            current_balance = user.get("current_balance", 0) or 0
+            balance_currency = user.get("current_balance_currency", "TRY")
+            
+            if balance_currency == salary_currency:
+                new_balance = current_balance - net_salary  # Negatif = personel alacaklı
+            else:
+                new_balance = -net_salary
+                balance_currency = salary_currency
+            
+            # Personel bakiyesini güncelle
+            await db.users.update_one(
+                {"id": user["id"]},
+                {"$set": {
+                    "current_balance": new_balance,
+                    "current_balance_currency": balance_currency,
+                    "updated_at": datetime.now(timezone.utc).isoformat()
+                }}
+            )
+            
+            processed.append({
+                "user_id": user["id"],
+                "user_name": user.get("full_name"),
+                "amount": net_salary,
+                "currency": salary_currency
+            })
+    
+    return {
+        "message": f"{len(processed)} personel için maaş borçlandırması yapıldı",
+        "processed": processed
+    }
@@ -0,0 +1,732 @@
+"""
+Transaction, check and settlement endpoints.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+
+from ..audit import create_activity_log
+from ..auth import get_current_user
+from ..balances import apply_balance_delta, apply_cari_delta, merge_deltas
+from ..cash_position import sync_cash_position
+from ..database import db
+from ..ledger import invalidate_checkpoints
+from ..lookups import collect_ids, prefetch_by_ids
+from ..models import Transaction
+from ..pagination import fetch_page, page_size, set_page_headers
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["transactions"])
+
+# ==================== TRANSACTIONS (PAYMENTS) ====================
+
+@router.post("/transactions")
+async def create_transaction(data: dict, current_user: dict = Depends(get_current_user)):
+    # Get user info for logging
+    user = await db.users.find_one({"id": current_user["user_id"]})
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Get cari info for logging
+    cari = await db.cari_accounts.find_one({"id": data.get("cari_id")})
+    cari_name = cari.get("name", "") if cari else ""
+    
+    # Get payment type name and code if provided
+    payment_type_name = None
+    payment_code = None
+    if data.get("payment_type_id"):
+        payment_type = await db.payment_types.find_one({"id": data.get("payment_type_id")})
+        if payment_type:
+            payment_type_name = payment_type["name"]
+            payment_code = payment_type.get("code")
+    
+    transaction = Transaction(
+        company_id=current_user["company_id"],
+        cari_id=data.get("cari_id"),
+        transaction_type=data.get("transaction_type"),
+        amount=data.get("amount"),
+        currency=data.get("currency"),
+        exchange_rate=data.get("exchange_rate", 1.0),
+        payment_type_id=data.get("payment_type_id"),
+        payment_type_name=payment_type_name,
+        description=data.get("description"),
+        reference_id=data.get("reference_id"),
+        reference_type=data.get("reference_type"),
+        date=data.get("date"),
+        time=data.get("time"),  # Saat bilgisini ekle
+        created_by=current_user["user_id"]
+    )
+    
+    transaction_doc = transaction.model_dump()
+    transaction_doc['created_at'] = transaction_doc['created_at'].isoformat()
+    
+    # Payment transaction'ları için ödeme tipine göre işlemler
+    if data.get("transaction_type") == "payment" and payment_code:
+        transaction_amount = data.get("amount", 0)
+        transaction_currency = data.get("currency", "TRY")
+        transaction_date_str = data.get("date")
+        
+        # 1. NAKİT ÖDEMELERİ
+        if payment_code == "cash":
+            # payment_method ayarla
+            transaction_doc['payment_method'] = "cash"
+            
+            # Cash account oluştur veya güncelle (her para birimi için ayrı)
+            cash_account = await db.cash_accounts.find_one({
+                "company_id": current_user["company_id"],
+                "account_type": "cash",
+                "currency": transaction_currency,
+                "is_active": True
+            }, {"_id": 0})
+            
+            if not cash_account:
+                # Yeni cash account oluştur
+                import uuid
+                cash_account_id = str(uuid.uuid4())
+                cash_account_doc = {
+                    "id": cash_account_id,
+                    "company_id": current_user["company_id"],
+                    "account_type": "cash",
+                    "account_name": f"Nakit - {transaction_currency}",
+                    "currency": transaction_currency,
+                    "balance": transaction_amount,
+                    "is_active": True,
+                    "order": 0
+                }
+                await db.cash_accounts.insert_one(cash_account_doc)
+                transaction_doc['cash_account_id'] = cash_account_id
+                logger.info(f"Yeni cash account oluşturuldu: {cash_account_id} - {transaction_currency}")
+            else:
+                # Mevcut cash account'u güncelle
+                cash_account_id = cash_account["id"]
+                await db.cash_accounts.update_one(
+                    {"id": cash_account_id},
+                    {"$inc": {"balance": transaction_amount}}
+                )
+                transaction_doc['cash_account_id'] = cash_account_id
+                logger.info(f"Cash account güncellendi: {cash_account_id} - +{transaction_amount} {transaction_currency}")
+            
+            # Nakit ödemeleri için net_amount = amount (komisyon yok)
+            transaction_doc['net_amount'] = transaction_amount
+            transaction_doc['is_settled'] = True  # Nakit ödemeleri hemen kullanılabilir
+        
+        # 2. HAVALE ÖDEMELERİ
+        elif payment_code == "bank_transfer":
+            # payment_method ayarla
+            transaction_doc['payment_method'] = "bank_transfer"
+            
+            bank_account_id = data.get('bank_account_id')
+            if bank_account_id:
+                # Banka hesabını al
+                bank_account = await db.bank_accounts.find_one({"id": bank_account_id}, {"_id": 0})
+                if bank_account:
+                    transaction_doc['bank_account_id'] = bank_account_id
+                    
+                    # Cash account oluştur veya güncelle (bank_account_id ve currency'ye göre)
+                    cash_account = await db.cash_accounts.find_one({
+                        "company_id": current_user["company_id"],
+                        "account_type": "bank_account",
+                        "bank_account_id": bank_account_id,
+                        "currency": transaction_currency,
+                        "is_active": True
+                    }, {"_id": 0})
+                    
+                    if not cash_account:
+                        # Yeni cash account oluştur
+                        import uuid
+                        cash_account_id = str(uuid.uuid4())
+                        cash_account_doc = {
+                            "id": cash_account_id,
+                            "company_id": current_user["company_id"],
+                            "account_type": "bank_account",
+                            "bank_account_id": bank_account_id,
+                            "account_name": bank_account.get("account_name", "Banka Hesabı"),
+                            "currency": transaction_currency,
+                            "balance": transaction_amount,
+                            "is_active": True,
+                            "order": 0
+                        }
+                        await db.cash_accounts.insert_one(cash_account_doc)
+                        transaction_doc['cash_account_id'] = cash_account_id
+                        logger.info(f"Yeni bank account cash account oluşturuldu: {cash_account_id} - {transaction_currency}")
+                    else:
+                        # Mevcut cash account'u güncelle
+                        cash_account_id = cash_account["id"]
+                        await db.cash_accounts.update_one(
+                            {"id": cash_account_id},
+                            {"$inc": {"balance": transaction_amount}}
+                        )
+                        transaction_doc['cash_account_id'] = cash_account_id
+                        logger.info(f"Bank account cash account güncellendi: {cash_account_id} - +{transaction_amount} {transaction_currency}")
+            
+            # Havale ödemeleri için net_amount = amount (komisyon yok)
+            transaction_doc['net_amount'] = transaction_amount
+            transaction_doc['is_settled'] = True  # Havale ödemeleri hemen kullanılabilir
+        
+        # 3. KREDİ KARTI ÖDEMELERİ
+        elif payment_code == "credit_card":
+            # payment_method ayarla
+            transaction_doc['payment_method'] = "credit_card"
+            
+            bank_account_id = data.get('bank_account_id')
+            if bank_account_id:
+                # Banka hesabını al
+                bank_account = await db.bank_accounts.find_one({"id": bank_account_id}, {"_id": 0})
+                if bank_account:
+                    transaction_doc['bank_account_id'] = bank_account_id
+                    
+                    # Banka hesabının tanımlamalarından değerleri al (dinamik olarak)
+                    valor_days = bank_account.get("valor_days")  # Gün cinsinden
+                    commission_rate = bank_account.get("commission_rate")  # Yüzde cinsinden
+                    
+                    # Komisyon hesapla (bank_account tanımlamalarından dinamik)
+                    if commission_rate is not None and commission_rate > 0:
+                        commission_amount = (transaction_amount * commission_rate) / 100
+                        net_amount = transaction_amount - commission_amount
+                        transaction_doc['commission_amount'] = round(commission_amount, 2)
+                        transaction_doc['net_amount'] = round(net_amount, 2)
+                        logger.info(f"Komisyon hesaplandı (bank_account: {bank_account_id}): {transaction_amount} * {commission_rate}% = {transaction_doc['commission_amount']}, Net: {transaction_doc['net_amount']}")
+                    else:
+                        # Komisyon yoksa, net_amount = amount
+                        transaction_doc['commission_amount'] = 0.0
+                        transaction_doc['net_amount'] = transaction_amount
+                        logger.info(f"Komisyon yok (bank_account: {bank_account_id}), net_amount = amount: {transaction_amount}")
+                    
+                    # Valör tarihi hesapla (bank_account tanımlamalarından dinamik)
+                    if valor_days is not None and valor_days > 0:
+                        from datetime import timedelta
+                        transaction_date = datetime.strptime(transaction_date_str, "%Y-%m-%d")
+                        valor_date = transaction_date + timedelta(days=valor_days)
+                        transaction_doc['valor_date'] = valor_date.strftime("%Y-%m-%d")
+                        transaction_doc['is_settled'] = False  # Valör süresi dolana kadar vadedeki tutarda
+                        logger.info(f"Valör tarihi hesaplandı (bank_account: {bank_account_id}): {transaction_date_str} + {valor_days} gün = {transaction_doc['valor_date']}")
+                    elif commission_rate is not None and commission_rate > 0:
+                        # Valör süresi yoksa ama komisyon varsa, 1 gün sonra kullanılabilir
+                        from datetime import timedelta
+                        transaction_date = datetime.strptime(transaction_date_str, "%Y-%m-%d")
+                        valor_date = transaction_date + timedelta(days=1)
+                        transaction_doc['valor_date'] = valor_date.strftime("%Y-%m-%d")
+                        transaction_doc['is_settled'] = False
+                        logger.info(f"Valör tarihi komisyon nedeniyle 1 gün olarak ayarlandı (bank_account: {bank_account_id}): {transaction_doc['valor_date']}")
+                    else:
+                        # Ne valör süresi ne de komisyon yoksa, hemen kullanılabilir
+                        transaction_doc['valor_date'] = None
+                        transaction_doc['is_settled'] = True
+                        logger.info(f"Valör süresi ve komisyon yok (bank_account: {bank_account_id}), hemen kullanılabilir")
+        
+        # 4. ÇEK/SENET ÖDEMELERİ
+        elif payment_code == "check_promissory":
+            # payment_method ayarla
+            transaction_doc['payment_method'] = "check_promissory"
+            
+            due_date = data.get('due_date')
+            if due_date:
+                transaction_doc['due_date'] = due_date
+                transaction_doc['is_settled'] = False  # Vade tarihi gelene kadar vadedeki tutarda
+                
+                # Check/Promissory kaydı oluştur
+                import uuid
+                check_id = str(uuid.uuid4())
+                check_doc = {
+                    "id": check_id,
+                    "company_id": current_user["company_id"],
+                    "transaction_id": transaction.id,
+                    "cari_id": data.get("cari_id"),
+                    "amount": transaction_amount,
+                    "currency": transaction_currency,
+                    "due_date": due_date,
+                    "check_number": data.get("check_number", ""),
+                    "bank_name": data.get("bank_name", ""),
+                    "is_collected": False,
+                    "collected_at": None,
+                    "created_at": datetime.now(timezone.utc).isoformat()
+                }
+                await db.check_promissories.insert_one(check_doc)
+                logger.info(f"Check/Promissory kaydı oluşturuldu: {check_id} - Vade: {due_date}")
+            
+            # Çek/Senet ödemeleri için net_amount = amount (komisyon yok)
+            transaction_doc['net_amount'] = transaction_amount
+        
+        # 5. CARİYE AKTAR ve MAHSUP - payment_method ayarla ama cash account'a ekleme
+        elif payment_code == "transfer_to_cari":
+            transaction_doc['payment_method'] = "transfer_to_cari"
+            transaction_doc['net_amount'] = transaction_amount
+            # Cash account'a eklenmez, sadece cari hesaba aktarılır
+        elif payment_code == "write_off":
+            transaction_doc['payment_method'] = "write_off"
+            transaction_doc['net_amount'] = transaction_amount
+            # Cash account'a eklenmez
+    
+    # payment_method yoksa payment_code'dan ayarla
+    if transaction_doc.get('payment_method') is None and payment_code:
+        transaction_doc['payment_method'] = payment_code
+    
+    await db.transactions.insert_one(transaction_doc)
+    await sync_cash_position(db, "transactions", None, transaction_doc)
+    
+    # Create activity log
+    transaction_type_label = "Tahsilat" if data.get("transaction_type") == "credit" else "Ödeme"
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=user.get("username", ""),
+        full_name=user.get("full_name", ""),
+        action="payment",
+        entity_type="transaction",
+        entity_id=transaction.id,
+        entity_name=cari_name,
+        description=f"{transaction_type_label}: {cari_name}, {data.get('amount')} {data.get('currency')}, {data.get('date')}",
+        current_user=current_user
+    )
+    
+    # Update balance
+    balance_field = f"balance_{data.get('currency', 'TRY').lower()}"
+    transaction_amount = data.get("amount", 0)
+    cari_id = data.get("cari_id")
+    if data.get("transaction_type") == "payment":  # Tahsilat - balance azalır
+        await db.cari_accounts.update_one(
+            {"id": cari_id},
+            {"$inc": {balance_field: -transaction_amount}}
+        )
+    elif data.get("transaction_type") == "credit":  # Alacak - balance azalır
+        await db.cari_accounts.update_one(
+            {"id": cari_id},
+            {"$inc": {balance_field: -transaction_amount}}
+        )
+    else:  # debit, refund - balance artar
+        await db.cari_accounts.update_one(
+            {"id": cari_id},
+            {"$inc": {balance_field: transaction_amount}}
+        )
+    
+    return transaction
+
+# ==================== TRANSACTIONS ====================
+
+@router.get("/transactions")
+async def get_transactions(
+    response: Response,
+    transaction_type: Optional[str] = None,
+    payment_method: Optional[str] = None,
+    cari_id: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """Transaction'ları getir - Filtreleme ile"""
+    query = {"company_id": current_user["company_id"]}
+    
+    if transaction_type:
+        query["transaction_type"] = transaction_type
+    
+    if payment_method:
+        query["payment_method"] = payment_method
+    
+    if cari_id:
+        query["cari_id"] = cari_id
+    
+    transactions, next_cursor, total = await fetch_page(
+        db.transactions, query, "date",
+        limit=page_size(limit, 10000), cursor=cursor, include_total=include_total
+    )
+    set_page_headers(response, next_cursor, total)
+    
+    # Cari ve banka hesaplarını tek sorguda getir
+    caris = await prefetch_by_ids(db.cari_accounts, collect_ids(transactions, "cari_id"), projection={"name": 1})
+    bank_accounts = await prefetch_by_ids(
+        db.bank_accounts, collect_ids(transactions, "bank_account_id"),
+        projection={"account_name": 1, "bank_name": 1}
+    )
+    
+    # Cari bilgilerini populate et
+    for transaction in transactions:
+        if transaction.get("cari_id"):
+            cari = caris.get(transaction.get("cari_id"))
+            if cari:
+                transaction["cari_name"] = cari.get("name")
+        
+        # Bank account bilgilerini populate et
+        if transaction.get("bank_account_id"):
+            bank_account = bank_accounts.get(transaction.get("bank_account_id"))
+            if bank_account:
+                transaction["bank_account_name"] = bank_account.get("account_name")
+                transaction["bank_name"] = bank_account.get("bank_name")
+    
+    return transactions
+
+# ==================== CHECK/PROMISSORY ====================
+
+@router.get("/check-promissories")
+async def get_check_promissories(
+    is_collected: Optional[bool] = None,
+    due_date_from: Optional[str] = None,
+    due_date_to: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Çek/Senet listesini getir"""
+    query = {"company_id": current_user["company_id"]}
+    
+    if is_collected is not None:
+        query["is_collected"] = is_collected
+    
+    if due_date_from or due_date_to:
+        query["due_date"] = {}
+        if due_date_from:
+            query["due_date"]["$gte"] = due_date_from
+        if due_date_to:
+            query["due_date"]["$lte"] = due_date_to
+    
+    checks = await db.check_promissories.find(query, {"_id": 0}).sort("due_date", 1).to_list(1000)
+    
+    # Cari bilgilerini populate et
+    for check in checks:
+        cari = await db.cari_accounts.find_one({"id": check.get("cari_id")}, {"_id": 0})
+        if cari:
+            check["cari_name"] = cari.get("name")
+    
+    return checks
+
+@router.put("/check-promissories/{check_id}/collect")
+async def collect_check_promissory(
+    check_id: str,
+    data: dict,  # { collection_date: str, cash_account_id: str }
+    current_user: dict = Depends(get_current_user)
+):
+    """Çek/Senet tahsil et - Kasa hesabına aktar"""
+    check = await db.check_promissories.find_one({
+        "id": check_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if not check:
+        raise HTTPException(status_code=404, detail="Çek/Senet bulunamadı")
+    
+    if check.get("is_collected"):
+        raise HTTPException(status_code=400, detail="Bu çek/senet zaten tahsil edilmiş")
+    
+    cash_account_id = data.get("cash_account_id")
+    if not cash_account_id:
+        raise HTTPException(status_code=400, detail="Kasa hesabı seçilmelidir")
+    
+    # Kasa bakiyesini artır
+    await db.cash_accounts.update_one(
+        {"id": cash_account_id},
+        {"$inc": {"current_balance": check["amount"]}}
+    )
+    
+    # Çek/Senet'i işaretle
+    await db.check_promissories.update_one(
+        {"id": check_id},
+        {"$set": {
+            "is_collected": True,
+            "collected_at": datetime.now(timezone.utc).isoformat()
+        }}
+    )
+    
+    # Transaction'ı güncelle
+    await db.transactions.update_one(
+        {"id": check["transaction_id"]},
+        {"$set": {
+            "cash_account_id": cash_account_id,
+            "is_settled": True,
+            "settled_at": datetime.now(timezone.utc).isoformat()
+        }}
+    )
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="collect_check",
+        entity_type="check_promissory",
+        entity_id=check_id,
+        entity_name=f"Çek/Senet - {check.get('check_number', '')}",
+        description=f"Çek/Senet tahsil edildi: {check.get('amount', 0)} {check.get('currency', 'TRY')}"
+    )
+    
+    return {"message": "Çek/Senet tahsil edildi"}
+
+@router.post("/transactions/process-settlements")
+async def process_settlements(
+    date: Optional[str] = None,  # YYYY-MM-DD, None ise bugün
+    current_user: dict = Depends(get_current_user)
+):
+    """Valör süresi dolan tahsilatları kasa hesabına yerleştir"""
+    if not date:
+        date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    
+    # Valör süresi dolmuş ama henüz yerleştirilmemiş settlement'ları bul
+    settlements = await db.payment_settlements.find({
+        "company_id": current_user["company_id"],
+        "settlement_date": {"$lte": date},
+        "is_settled": False
+    }, {"_id": 0}).to_list(1000)
+    
+    processed = []
+    
+    for settlement in settlements:
+        # CashAccount'u bul
+        bank_account = await db.bank_accounts.find_one({
+            "id": settlement["bank_account_id"]
+        })
+        
+        if not bank_account:
+            continue
+        
+        cash_account = await db.cash_accounts.find_one({
+            "bank_account_id": settlement["bank_account_id"],
+            "company_id": current_user["company_id"]
+        })
+        
+        if not cash_account:
+            continue
+        
+        # Kasa bakiyesini artır
+        await db.cash_accounts.update_one(
+            {"id": cash_account["id"]},
+            {"$inc": {"current_balance": settlement["net_amount"]}}
+        )
+        
+        # Settlement'ı işaretle
+        await db.payment_settlements.update_one(
+            {"id": settlement["id"]},
+            {"$set": {
+                "is_settled": True,
+                "settled_at": datetime.now(timezone.utc).isoformat()
+            }}
+        )
+        
+        # Transaction'ı güncelle
+        await db.transactions.update_one(
+            {"id": settlement["transaction_id"]},
+            {"$set": {
+                "is_settled": True,
+                "settled_at": datetime.now(timezone.utc).isoformat()
+            }}
+        )
+        
+        processed.append({
+            "settlement_id": settlement["id"],
+            "transaction_id": settlement["transaction_id"],
+            "amount": settlement["net_amount"],
+            "currency": settlement["currency"]
+        })
+    
+    return {
+        "message": f"{len(processed)} tahsilat yerleştirildi",
+        "processed": processed
+    }
+
+@router.put("/transactions/{transaction_id}")
+async def update_transaction(
+    transaction_id: str,
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Transaction'ı güncelle - Cari bakiyesini de güncelle"""
+    # Mevcut transaction'ı bul
+    existing = await db.transactions.find_one({
+        "id": transaction_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if not existing:
+        raise HTTPException(status_code=404, detail="Transaction bulunamadı")
+    
+    # Referans tipi kontrolü - rezervasyon, hizmet al vb. kaynaklı transaction'lar düzenlenemez
+    # Ancak reference_type null ise veya "manual" ise güncellemeye izin ver
+    # Ayrıca sadece reference_id ve reference_type ekleniyorsa (rezervasyon ile ilişkilendirme) izin ver
+    reference_type = existing.get("reference_type")
+    new_reference_type = data.get("reference_type")
+    
+    # Eğer mevcut reference_type null veya "manual" ise ve yeni reference_type "reservation" ise
+    # (rezervasyon ile ilişkilendirme durumu) izin ver
+    if reference_type and reference_type not in ["manual", "outgoing_payment"]:
+        # Sadece reference_id ve reference_type ekleniyorsa (rezervasyon ile ilişkilendirme) izin ver
+        if new_reference_type == "reservation" and "reference_id" in data:
+            # Sadece reference_id ve reference_type güncelleniyorsa izin ver
+            allowed_fields = {"reference_id", "reference_type", "description"}
+            if set(data.keys()).issubset(allowed_fields):
+                pass  # İzin ver - rezervasyon ile ilişkilendirme
+            else:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Bu transaction bir {reference_type} kaynağından oluşturulmuş. Kaynak işlem üzerinden düzenlenmelidir."
+                )
+        else:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Bu transaction bir {reference_type} kaynağından oluşturulmuş. Kaynak işlem üzerinden düzenlenmelidir."
+            )
+    
+    cari_id = existing.get("cari_id")
+    if not cari_id:
+        raise HTTPException(status_code=400, detail="Cari ID bulunamadı")
+    
+    # Cari hesabı bul
+    cari = await db.cari_accounts.find_one({"id": cari_id})
+    if not cari:
+        raise HTTPException(status_code=404, detail="Cari hesap bulunamadı")
+    
+    # Eski tutar geri alınır, yeni tutar uygulanır (payment: bakiye azaltır, debit: artırır, credit: azaltır)
+    balance_signs = {"payment": -1, "debit": 1, "credit": -1}
+    old_amount = existing.get("amount", 0)
+    old_currency = existing.get("currency", "TRY")
+    old_transaction_type = existing.get("transaction_type")
+    
+    new_amount = data.get("amount", old_amount)
+    new_currency = data.get("currency", old_currency)
+    new_transaction_type = data.get("transaction_type", old_transaction_type)
+    
+    balance_deltas = merge_deltas(
+        {f"balance_{old_currency.lower()}": -balance_signs.get(old_transaction_type, 0) * old_amount},
+        {f"balance_{new_currency.lower()}": balance_signs.get(new_transaction_type, 0) * new_amount}
+    )
+    
+    # Transaction'ı güncelle
+    update_data = {
+        "amount": new_amount,
+        "currency": new_currency,
+        "transaction_type": new_transaction_type,
+        "description": data.get("description", existing.get("description")),
+        "date": data.get("date", existing.get("date")),
+        "payment_type_id": data.get("payment_type_id", existing.get("payment_type_id")),
+        "bank_account_id": data.get("bank_account_id", existing.get("bank_account_id")),
+        "transfer_to_cari_id": data.get("transfer_to_cari_id", existing.get("transfer_to_cari_id")),
+        "due_date": data.get("due_date", existing.get("due_date")),
+        "check_number": data.get("check_number", existing.get("check_number")),
+        "bank_name": data.get("bank_name", existing.get("bank_name")),
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    }
+    
+    # Null değerleri kaldır
+    update_data = {k: v for k, v in update_data.items() if v is not None}
+    
+    # Sadece okunan versiyon güncellenir - eşzamanlı iki düzenlemeden biri 409 alır
+    result = await db.transactions.update_one(
+        {"id": transaction_id, "updated_at": existing.get("updated_at")},
+        {"$set": update_data}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=409, detail="Transaction başka bir işlem tarafından güncellendi, tekrar deneyin")
+    
+    # Bakiye farkı tek $inc ile, bu versiyona özel anahtarla uygulanır
+    await apply_cari_delta(
+        db, cari_id, balance_deltas,
+        f"update_transaction:{transaction_id}:{existing.get('updated_at') or existing.get('created_at', '')}"
+    )
+    await invalidate_checkpoints(db, [cari_id])
+    await sync_cash_position(
+        db, "transactions", existing, {**existing, **update_data},
+        f"cash_position:transactions:{transaction_id}:update:{existing.get('updated_at') or existing.get('created_at', '')}"
+    )
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="update",
+        entity_type="transaction",
+        entity_id=transaction_id,
+        entity_name="Transaction",
+        description=f"Transaction güncellendi: {old_amount} {old_currency} → {new_amount} {new_currency}",
+        changes=data
+    )
+    
+    return {"message": "Transaction güncellendi"}
+
+@router.delete("/transactions/{transaction_id}")
+async def delete_transaction(
+    transaction_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Transaction'ı sil - Cari bakiyesini de güncelle"""
+    # Mevcut transaction'ı bul
+    existing = await db.transactions.find_one({
+        "id": transaction_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if not existing:
+        raise HTTPException(status_code=404, detail="Transaction bulunamadı")
+    
+    # Referans tipi kontrolü - rezervasyon, hizmet al vb. kaynaklı transaction'lar silinemez
+    reference_type = existing.get("reference_type")
+    if reference_type and reference_type not in ["manual", "outgoing_payment"]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Bu transaction bir {reference_type} kaynağından oluşturulmuş. Kaynak işlem üzerinden silinmelidir."
+        )
+    
+    cari_id = existing.get("cari_id")
+    if not cari_id:
+        raise HTTPException(status_code=400, detail="Cari ID bulunamadı")
+    
+    # Cari hesabı bul
+    cari = await db.cari_accounts.find_one({"id": cari_id})
+    if not cari:
+        raise HTTPException(status_code=404, detail="Cari hesap bulunamadı")
+    
+    amount = existing.get("amount", 0)
+    currency = existing.get("currency", "TRY")
+    transaction_type = existing.get("transaction_type")
+    
+    # Transaction'ı önce sil - eşzamanlı ikinci silme burada durur, bakiye bir kez geri alınır
+    result = await db.transactions.delete_one({"id": transaction_id})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Transaction silinemedi")
+    await invalidate_checkpoints(db, [cari_id])
+    await sync_cash_position(db, "transactions", existing, None)
+    
+    # Tutarı geri al (tahsilat ve alacak bakiyeyi artırır, borç azaltır)
+    reverse_signs = {"payment": 1, "debit": -1, "credit": 1}
+    await apply_cari_delta(
+        db, cari_id,
+        {f"balance_{currency.lower()}": reverse_signs.get(transaction_type, 0) * amount},
+        f"delete_transaction:{transaction_id}"
+    )
+    
+    # İlgili kayıtları temizle
+    # Check/Promissory kaydı varsa sil
+    if existing.get("payment_type_id"):
+        payment_type = await db.payment_types.find_one({"id": existing.get("payment_type_id")})
+        if payment_type and payment_type.get("code") == "check_promissory":
+            await db.check_promissories.delete_one({"transaction_id": transaction_id})
+    
+    # Payment Settlement kaydı varsa sil
+    await db.payment_settlements.delete_one({"transaction_id": transaction_id})
+    
+    # Cash Account bakiyesini güncelle (eğer cash_account_id varsa)
+    cash_account_id = existing.get("cash_account_id")
+    if cash_account_id:
+        if transaction_type == "payment":
+            # Tahsilat geri alındı, kasa bakiyesini azalt
+            net_amount = existing.get("net_amount") or amount
+            await apply_balance_delta(
+                db, "cash_accounts", {"id": cash_account_id},
+                {"current_balance": -net_amount},
+                f"delete_transaction:{transaction_id}:cash"
+            )
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="delete",
+        entity_type="transaction",
+        entity_id=transaction_id,
+        entity_name="Transaction",
+        description=f"Transaction silindi: {amount} {currency}"
+    )
+    
+    return {"message": "Transaction silindi"}
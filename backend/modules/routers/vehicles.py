@@ -0,0 +1,341 @@
+"""
+Vehicle endpoints.
+"""
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from ..audit import create_activity_log
+from ..auth import get_current_user
+from ..database import db
+from ..models import Vehicle
+
+router = APIRouter(tags=["vehicles"])
+
+# ==================== VEHICLES / INVENTORY ====================
+
+@router.get("/inventory")
+async def get_inventory(
+    category_id: Optional[str] = None,
+    warning_type: Optional[str] = None,  # 'expired', '1month', '3months'
+    current_user: dict = Depends(get_current_user)
+):
+    """Araç envanterini getir - kategoriler ve uyarılar ile"""
+    query = {"company_id": current_user["company_id"]}
+    
+    if category_id:
+        query["category_id"] = category_id
+    
+    vehicles = await db.vehicles.find(query, {"_id": 0}).sort("plate_number", 1).to_list(1000)
+    
+    # Kategorileri populate et
+    categories = await db.vehicle_categories.find(
+        {"company_id": current_user["company_id"]},
+        {"_id": 0}
+    ).to_list(100)
+    category_map = {cat["id"]: cat["name"] for cat in categories}
+    
+    # Uyarıları hesapla
+    today = datetime.now(timezone.utc).date()
+    result = []
+    
+    for vehicle in vehicles:
+        warnings = []
+        
+        # Sigorta uyarısı
+        if vehicle.get("insurance_expiry"):
+            expiry_date = datetime.strptime(vehicle["insurance_expiry"], "%Y-%m-%d").date()
+            days_left = (expiry_date - today).days
+            
+            if days_left < 0:
+                warnings.append({"type": "insurance", "status": "expired", "days": days_left})
+            elif days_left <= 30:
+                warnings.append({"type": "insurance", "status": "1month", "days": days_left})
+            elif days_left <= 90:
+                warnings.append({"type": "insurance", "status": "3months", "days": days_left})
+        
+        # Muayene uyarısı
+        if vehicle.get("inspection_expiry"):
+            expiry_date = datetime.strptime(vehicle["inspection_expiry"], "%Y-%m-%d").date()
+            days_left = (expiry_date - today).days
+            
+            if days_left < 0:
+                warnings.append({"type": "inspection", "status": "expired", "days": days_left})
+            elif days_left <= 30:
+                warnings.append({"type": "inspection", "status": "1month", "days": days_left})
+            elif days_left <= 90:
+                warnings.append({"type": "inspection", "status": "3months", "days": days_left})
+        
+        # Uyarı filtreleme
+        if warning_type:
+            if warning_type == "expired":
+                warnings = [w for w in warnings if w["status"] == "expired"]
+            elif warning_type == "1month":
+                warnings = [w for w in warnings if w["status"] in ["expired", "1month"]]
+            elif warning_type == "3months":
+                warnings = [w for w in warnings if w["status"] in ["expired", "1month", "3months"]]
+            
+            if not warnings:
+                continue  # Bu uyarı filtresine uymuyor, atla
+        
+        vehicle["warnings"] = warnings
+        vehicle["category_name"] = category_map.get(vehicle.get("category_id"), vehicle.get("vehicle_type", "Diğer"))
+        result.append(vehicle)
+    
+    return result
+
+@router.get("/inventory/statistics")
+async def get_inventory_statistics(current_user: dict = Depends(get_current_user)):
+    """Envanter istatistiklerini getir"""
+    # Kategori bazlı araç sayıları
+    categories = await db.vehicle_categories.find(
+        {"company_id": current_user["company_id"], "is_active": True},
+        {"_id": 0}
+    ).sort("order", 1).to_list(100)
+    
+    category_stats = []
+    total_vehicles = 0
+    
+    for category in categories:
+        count = await db.vehicles.count_documents({
+            "company_id": current_user["company_id"],
+            "category_id": category["id"]
+        })
+        category_stats.append({
+            "category_id": category["id"],
+            "category_name": category["name"],
+            "count": count
+        })
+        total_vehicles += count
+    
+    # Kategorisiz araçlar
+    uncategorized_count = await db.vehicles.count_documents({
+        "company_id": current_user["company_id"],
+        "$or": [
+            {"category_id": {"$exists": False}},
+            {"category_id": None}
+        ]
+    })
+    if uncategorized_count > 0:
+        category_stats.append({
+            "category_id": None,
+            "category_name": "Kategorisiz",
+            "count": uncategorized_count
+        })
+        total_vehicles += uncategorized_count
+    
+    # Uyarı istatistikleri
+    today = datetime.now(timezone.utc).date()
+    vehicles = await db.vehicles.find(
+        {"company_id": current_user["company_id"]},
+        {"_id": 0, "insurance_expiry": 1, "inspection_expiry": 1}
+    ).to_list(1000)
+    
+    expired_count = 0
+    one_month_count = 0
+    three_months_count = 0
+    vehicles_with_warnings = set()
+    
+    for vehicle in vehicles:
+        for expiry_field in ["insurance_expiry", "inspection_expiry"]:
+            if vehicle.get(expiry_field):
+                expiry_date = datetime.strptime(vehicle[expiry_field], "%Y-%m-%d").date()
+                days_left = (expiry_date - today).days
+                
+                if days_left < 0:
+                    expired_count += 1
+                    vehicles_with_warnings.add(vehicle.get("id"))
+                    break
+                elif days_left <= 30:
+                    one_month_count += 1
+                    vehicles_with_warnings.add(vehicle.get("id"))
+                    break
+                elif days_left <= 90:
+                    three_months_count += 1
+                    vehicles_with_warnings.add(vehicle.get("id"))
+                    break
+    
+    return {
+        "total_vehicles": total_vehicles,
+        "category_stats": category_stats,
+        "warning_stats": {
+            "expired": expired_count,
+            "one_month": one_month_count,
+            "three_months": three_months_count,
+            "total_warnings": len(vehicles_with_warnings)
+        }
+    }
+
+@router.post("/inventory")
+async def create_vehicle_inventory(
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Yeni araç ekle"""
+    # Eğer category_id varsa ve vehicle_type yoksa, kategori adını vehicle_type olarak kullan
+    if data.get("category_id") and not data.get("vehicle_type"):
+        category = await db.vehicle_categories.find_one({
+            "id": data["category_id"],
+            "company_id": current_user["company_id"]
+        })
+        if category:
+            data["vehicle_type"] = category.get("name", "Diğer")
+    
+    # Eğer hiç vehicle_type yoksa varsayılan değer
+    if not data.get("vehicle_type"):
+        data["vehicle_type"] = "Diğer"
+    
+    vehicle = Vehicle(company_id=current_user["company_id"], **data)
+    vehicle_doc = vehicle.model_dump()
+    vehicle_doc['created_at'] = vehicle_doc['created_at'].isoformat()
+    await db.vehicles.insert_one(vehicle_doc)
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="create",
+        entity_type="vehicle",
+        entity_id=vehicle.id,
+        entity_name=f"{vehicle.plate_number}",
+        description=f"Yeni araç eklendi: {vehicle.plate_number}",
+        changes=data
+    )
+    
+    return vehicle
+
+@router.put("/inventory/{vehicle_id}")
+async def update_vehicle_inventory(
+    vehicle_id: str,
+    data: dict,
+    current_user: dict = Depends(get_current_user)
+):
+    """Aracı güncelle"""
+    existing = await db.vehicles.find_one({
+        "id": vehicle_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if not existing:
+        raise HTTPException(status_code=404, detail="Araç bulunamadı")
+    
+    # Eğer category_id güncelleniyorsa ve vehicle_type yoksa, kategori adını vehicle_type olarak kullan
+    if data.get("category_id") and not data.get("vehicle_type"):
+        category = await db.vehicle_categories.find_one({
+            "id": data["category_id"],
+            "company_id": current_user["company_id"]
+        })
+        if category:
+            data["vehicle_type"] = category.get("name", existing.get("vehicle_type", "Diğer"))
+    
+    result = await db.vehicles.update_one(
+        {"id": vehicle_id, "company_id": current_user["company_id"]},
+        {"$set": data}
+    )
+    
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Araç bulunamadı")
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="update",
+        entity_type="vehicle",
+        entity_id=vehicle_id,
+        entity_name=existing.get("plate_number", "Araç"),
+        description=f"Araç güncellendi: {existing.get('plate_number', '')}",
+        changes=data
+    )
+    
+    return {"message": "Araç güncellendi"}
+
+@router.delete("/inventory/{vehicle_id}")
+async def delete_vehicle_inventory(
+    vehicle_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Aracı sil"""
+    existing = await db.vehicles.find_one({
+        "id": vehicle_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if not existing:
+        raise HTTPException(status_code=404, detail="Araç bulunamadı")
+    
+    result = await db.vehicles.delete_one({
+        "id": vehicle_id,
+        "company_id": current_user["company_id"]
+    })
+    
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Araç bulunamadı")
+    
+    # Activity log
+    await create_activity_log(
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+        username=current_user.get("username", ""),
+        full_name=current_user.get("full_name", ""),
+        action="delete",
+        entity_type="vehicle",
+        entity_id=vehicle_id,
+        entity_name=existing.get("plate_number", "Araç"),
+        description=f"Araç silindi: {existing.get('plate_number', '')}"
+    )
+    
+    return {"message": "Araç silindi"}
+
+# ==================== VEHICLES (Backward Compatibility) ====================
+
+@router.get("/vehicles")
+async def get_vehicles(filter_days: Optional[int] = None, current_user: dict = Depends(get_current_user)):
+    """Araçları getir (backward compatibility)"""
+    vehicles = await db.vehicles.find({"company_id": current_user["company_id"]}, {"_id": 0}).to_list(1000)
+    
+    if filter_days:
+        from datetime import date, timedelta
+        threshold_date = (date.today() + timedelta(days=filter_days)).isoformat()
+        filtered = []
+        for v in vehicles:
+            if v.get("insurance_expiry") and v["insurance_expiry"] <= threshold_date:
+                filtered.append(v)
+            elif v.get("inspection_expiry") and v["inspection_expiry"] <= threshold_date:
+                filtered.append(v)
+        return filtered
+    
+    return vehicles
+
+@router.post("/vehicles")
+async def create_vehicle(data: dict, current_user: dict = Depends(get_current_user)):
+    """Araç oluştur (backward compatibility)"""
+    vehicle = Vehicle(company_id=current_user["company_id"], **data)
+    vehicle_doc = vehicle.model_dump()
+    vehicle_doc['created_at'] = vehicle_doc['created_at'].isoformat()
+    await db.vehicles.insert_one(vehicle_doc)
+    return vehicle
+
+@router.put("/vehicles/{vehicle_id}")
+async def update_vehicle(vehicle_id: str, data: dict, current_user: dict = Depends(get_current_user)):
+    """Araç güncelle (backward compatibility)"""
+    result = await db.vehicles.update_one(
+        {"id": vehicle_id, "company_id": current_user["company_id"]},
+        {"$set": data}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Vehicle not found")
+    return {"message": "Vehicle updated"}
+
+@router.delete("/vehicles/{vehicle_id}")
+async def delete_vehicle(vehicle_id: str, current_user: dict = Depends(get_current_user)):
+    """Araç sil (backward compatibility)"""
+    result = await db.vehicles.delete_one({"id": vehicle_id, "company_id": current_user["company_id"]})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Vehicle not found")
+    return {"message": "Vehicle deleted"}
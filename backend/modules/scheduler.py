@@ -3,13 +3,64 @@ Background scheduler for cleanup jobs
 """
 import logging
 import os
+import uuid
 from datetime import datetime, timezone, timedelta
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from pymongo.errors import DuplicateKeyError
+
+from .activity_logs import ACTIVITY_LOG_ARCHIVE_DAYS, archive_activity_logs
+from .cash_position import reconcile_cash_positions
+from .currency_rates import CURRENCY_RATES_REFRESH_MINUTES, refresh_currency_rates
 
 logger = logging.getLogger(__name__)
 
 scheduler = AsyncIOScheduler()
 
+# Her worker aynı cron job'larını kurar; lease'i alan çalıştırır. Bu süreden eski lease (ölen worker) devralınır
+JOB_LEASE_SECONDS = int(os.environ.get("JOB_LEASE_SECONDS", "3600"))
+
+# Bu process'in lease sahibi kimliği
+WORKER_ID = uuid.uuid4().hex
+
+
+async def claim_job_lease(db, job_name: str, lease_seconds: int = JOB_LEASE_SECONDS) -> bool:
+    """
+    ``job_leases``'te job'ı bu process için işaretle (``claim_migration`` gibi tek koşullu upsert).
+
+    Returns:
+        True: lease alındı, False: başka bir worker çalıştırıyor
+    """
+    now = datetime.now(timezone.utc)
+    try:
+        await db.job_leases.find_one_and_update(
+            {"_id": job_name, "$or": [{"expires_at": {"$lt": now}}, {"owner": WORKER_ID}]},
+            {"$set": {"owner": WORKER_ID, "started_at": now, "expires_at": now + timedelta(seconds=lease_seconds)}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return False
+    return True
+
+
+async def release_job_lease(db, job_name: str) -> None:
+    await db.job_leases.update_one(
+        {"_id": job_name, "owner": WORKER_ID},
+        {"$set": {"expires_at": datetime.now(timezone.utc), "finished_at": datetime.now(timezone.utc)}}
+    )
+
+
+async def reconcile_cash_positions_job(db):
+    """Günlük kasa pozisyonu reconcile - worker başına değil, lease'i alan tek worker'da"""
+    if not await claim_job_lease(db, "reconcile_cash_positions"):
+        logger.info("reconcile_cash_positions is running on another worker, skipped")
+        return
+    try:
+        await reconcile_cash_positions(db)
+    except Exception as e:
+        logger.error(f"Error in reconcile_cash_positions: {e}")
+    finally:
+        await release_job_lease(db, "reconcile_cash_positions")
+
 async def cleanup_expired_companies(db):
     """
     Clean up data for companies that have been expired for more than 90 days.
@@ -39,8 +90,8 @@ async def cleanup_expired_companies(db):
                         "payment_settlements", "notifications", "check_promissories", "extra_sales",
                         "service_purchases", "seasonal_prices", "salary_transactions", "overtimes",
                         "leaves", "vehicle_categories", "vehicles", "expense_categories",
-                        "income_categories", "incomes", "expenses", "activity_logs",
-                        "cash_exchanges", "cash_transfers", "staff_roles"
+                        "income_categories", "incomes", "expenses", "activity_logs", "activity_logs_archive",
+                        "cash_exchanges", "cash_transfers", "staff_roles", "daily_rollups", "cash_positions"
                     ]
 
                     for collection_name in collections_to_clean:
@@ -69,6 +120,20 @@ def start_scheduler(db=None):
         # Run cleanup daily at 3 AM
         scheduler.add_job(cleanup_expired_companies, 'cron', hour=3, args=[db])
         logger.info("Scheduled cleanup_expired_companies job")
+        # Kasa pozisyonlarını geçmişle karşılaştır ve düzelt
+        scheduler.add_job(reconcile_cash_positions_job, 'cron', hour=4, args=[db])
+        logger.info("Scheduled reconcile_cash_positions job")
+        if ACTIVITY_LOG_ARCHIVE_DAYS:
+            # Eski activity log'ları sıkıştırılmış arşive taşı
+            scheduler.add_job(archive_activity_logs, 'cron', hour=2, args=[db])
+            logger.info("Scheduled archive_activity_logs job")
+        if CURRENCY_RATES_REFRESH_MINUTES:
+            # Döviz kurları: ilk çalışma hemen (startup'ı bekletmeden), sonra her aralıkta
+            scheduler.add_job(
+                refresh_currency_rates, 'interval', minutes=CURRENCY_RATES_REFRESH_MINUTES, args=[db],
+                next_run_time=datetime.now(timezone.utc), max_instances=1, coalesce=True
+            )
+            logger.info("Scheduled refresh_currency_rates job")
 
     scheduler.start()
     logger.info("Background scheduler started")
@@ -0,0 +1,79 @@
+"""
+Voucher code allocation.
+
+Codes come from an atomic counter per prefix (``VCHR``, ``B2B``) in the
+``voucher_counters`` collection instead of random digits probed against
+``reservations`` / ``extra_sales`` with ``find_one``. Each process reserves
+a block of ``VOUCHER_BLOCK_SIZE`` numbers with one ``$inc`` and hands them
+out from memory, so most allocations need no round trip at all. Blocks of
+different workers never overlap; numbers left in a block when a process
+stops are simply skipped.
+
+The counter is global per prefix, so new codes are unique across companies
+even though the ``(company_id, voucher_code)`` unique index (the backstop
+against manual edits and imports) only enforces it within a company: legacy
+random codes already repeat between companies. Numbering starts at
+``VOUCHER_SEQUENCE_START`` (7 digits) so new codes can never collide with
+the legacy random 4 and 6 digit codes.
+"""
+import asyncio
+import os
+from typing import Dict, Tuple
+
+from pymongo import ReturnDocument
+
+VOUCHER_SEQUENCE_START = 1000000
+VOUCHER_BLOCK_SIZE = max(1, int(os.environ.get("VOUCHER_BLOCK_SIZE", "20")))
+
+DEFAULT_PREFIX = "VCHR"
+B2B_PREFIX = "B2B"
+
+
+def format_voucher_code(prefix: str, number: int) -> str:
+    return f"{prefix}-{number}"
+
+
+class VoucherAllocator:
+    """Prefix başına sayaçtan blok ayırıp voucher numaralarını bellekten dağıtır"""
+
+    def __init__(self, block_size: int = VOUCHER_BLOCK_SIZE, start: int = VOUCHER_SEQUENCE_START):
+        self.block_size = block_size
+        self.start = start
+        # prefix -> (sıradaki numara, bloğun son numarası)
+        self._blocks: Dict[str, Tuple[int, int]] = {}
+        self._lock = asyncio.Lock()
+        self.reservations = 0
+
+    async def _reserve_block(self, db, prefix: str) -> Tuple[int, int]:
+        counter = await db.voucher_counters.find_one_and_update(
+            {"_id": prefix},
+            {"$inc": {"seq": self.block_size}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self.reservations += 1
+        last = self.start + counter["seq"] - 1
+        return last - self.block_size + 1, last
+
+    async def allocate(self, db, prefix: str = DEFAULT_PREFIX) -> str:
+        """Benzersiz voucher kodu - format: PREFIX-NNNNNNN"""
+        async with self._lock:
+            number, last = self._blocks.get(prefix, (1, 0))
+            if number > last:
+                number, last = await self._reserve_block(db, prefix)
+            self._blocks[prefix] = (number + 1, last)
+        return format_voucher_code(prefix, number)
+
+    def stats(self):
+        return {
+            "block_size": self.block_size,
+            "block_reservations": self.reservations,
+            "remaining": {prefix: last - number + 1 for prefix, (number, last) in self._blocks.items()},
+        }
+
+
+voucher_allocator = VoucherAllocator()
+
+
+async def allocate_voucher_code(db, prefix: str = DEFAULT_PREFIX) -> str:
+    return await voucher_allocator.allocate(db, prefix)
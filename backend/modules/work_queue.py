@@ -0,0 +1,212 @@
+"""
+In-process background writer for fire-and-forget inserts.
+
+Login activity (with its geo-IP lookup) and activity logs are not needed to
+answer the request that produced them. ``BackgroundWriter`` takes them off
+the request path: items go into a bounded ``asyncio.Queue``, worker tasks
+group them per collection into ``insert_many`` batches, retry transient
+failures with backoff and drain what is left on shutdown. When the queue is
+full new items are dropped and counted instead of slowing requests down.
+Activity logs use their own instance (``modules.activity_logs``).
+"""
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY_ERROR = 11000
+
+# Kuyruk öğesi: (koleksiyon adı, doküman veya dokümanı üreten coroutine fonksiyonu, fabrika mı)
+QueueItem = Tuple[str, Any, bool]
+
+
+class BackgroundWriter:
+    """Sınırlı kuyruk + toplu insert_many yazıcı"""
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 0.2,
+        workers: int = 2,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5
+    ):
+        self.name = name
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._db = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._closing = False
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.retries = 0
+        self.batches = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks) and not self._closing
+
+    def start(self, db) -> None:
+        """Startup'ta çağrılır; worker task'larını mevcut event loop'ta başlatır"""
+        if self._tasks:
+            return
+        self._db = db
+        self._closing = False
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"{self.name}-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Background writer '{self.name}' started with {self.workers} workers")
+
+    def submit(self, collection: str, doc: dict) -> bool:
+        """
+        Hazır dokümanı kuyruğa ekle. Kuyruk doluysa kayıt düşürülür ve sayılır.
+        Yazıcı çalışmıyorsa (startup öncesi, shutdown sırasında, script'ler) False döner;
+        bu durumda çağıran dokümanı kendisi yazmalıdır.
+        """
+        return self._put((collection, doc, False))
+
+    def submit_factory(self, collection: str, factory: Callable[[], Awaitable[Optional[dict]]]) -> bool:
+        """
+        Dokümanı worker'da üretilecek şekilde kuyruğa ekle (ör. geo-IP sorgusu gerektiren kayıtlar).
+        Fabrika None dönerse kayıt atlanır.
+        """
+        return self._put((collection, factory, True))
+
+    def _put(self, item: QueueItem) -> bool:
+        if not self.running:
+            return False
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(f"Background writer '{self.name}' queue full, dropped {self.dropped} items so far")
+            return True
+        self.enqueued += 1
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                self._take_available(batch)
+                if len(batch) < self.batch_size and self.flush_interval > 0 and not self._closing:
+                    # Kısa süre bekleyip gelenleri aynı batch'e al
+                    await asyncio.sleep(self.flush_interval)
+                    self._take_available(batch)
+                await self._write_batch(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += len(batch)
+                logger.error(f"Background writer '{self.name}' batch failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _take_available(self, batch: List[QueueItem]) -> None:
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                return
+
+    async def _write_batch(self, batch: List[QueueItem]) -> None:
+        factories = [(collection, payload) for collection, payload, is_factory in batch if is_factory]
+        produced = await asyncio.gather(*(factory() for _, factory in factories), return_exceptions=True)
+
+        grouped: Dict[str, List[dict]] = {}
+        for collection, payload, is_factory in batch:
+            if not is_factory:
+                grouped.setdefault(collection, []).append(payload)
+        for (collection, _), doc in zip(factories, produced):
+            if isinstance(doc, Exception):
+                self.failed += 1
+                logger.error(f"Background writer '{self.name}' could not build {collection} document: {doc}")
+            elif doc is not None:
+                grouped.setdefault(collection, []).append(doc)
+
+        for collection, docs in grouped.items():
+            await self._insert_with_retry(collection, docs)
+        self.batches += 1
+
+    async def _insert_with_retry(self, collection: str, docs: List[dict]) -> None:
+        pending = docs
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._db[collection].insert_many(pending, ordered=False)
+                self.written += len(pending)
+                return
+            except BulkWriteError as e:
+                details = e.details or {}
+                self.written += details.get("nInserted", 0)
+                # Önceki denemede yazılmış dokümanlar duplicate key verir - bunlar başarılı sayılır
+                write_errors = details.get("writeErrors", [])
+                duplicates = [err for err in write_errors if err.get("code") == DUPLICATE_KEY_ERROR]
+                self.written += len(duplicates)
+                pending = [pending[err["index"]] for err in write_errors if err.get("code") != DUPLICATE_KEY_ERROR]
+                if not pending:
+                    return
+                error = e
+            except Exception as e:
+                error = e
+
+            if attempt < self.max_retries:
+                self.retries += 1
+                await asyncio.sleep(self.retry_backoff * (2 ** attempt))
+
+        self.failed += len(pending)
+        logger.error(f"Background writer '{self.name}' gave up on {len(pending)} {collection} documents: {error}")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Yeni kayıt almayı durdur, kuyruktakileri yaz (en fazla timeout saniye), worker'ları kapat"""
+        if not self._tasks:
+            return
+        self._closing = True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Background writer '{self.name}' shutdown timed out, {self._queue.qsize()} items lost")
+            self.dropped += self._queue.qsize()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "running": self.running,
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "maxsize": self.maxsize,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "retries": self.retries,
+            "batches": self.batches,
+        }
+
+
+background_writer = BackgroundWriter(
+    "background_writes",
+    maxsize=int(os.environ.get("BACKGROUND_QUEUE_MAXSIZE", "10000")),
+    batch_size=int(os.environ.get("BACKGROUND_QUEUE_BATCH_SIZE", "200")),
+    flush_interval=float(os.environ.get("BACKGROUND_QUEUE_FLUSH_SECONDS", "0.2")),
+    workers=int(os.environ.get("BACKGROUND_QUEUE_WORKERS", "2"))
+)
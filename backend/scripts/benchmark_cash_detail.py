@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+/cash/detail toplamlarını sentetik bir şirket üzerinde ölç
+Kullanım:
+    python benchmark_cash_detail.py                          # 50.000 transaction
+    python benchmark_cash_detail.py --transactions 200000 --runs 5
+    python benchmark_cash_detail.py --keep                   # benchmark veritabanını silme
+
+Ayrı bir veritabanına (varsayılan: <DB_NAME>_benchmark) ödeme tipleri, banka ve
+kasa hesapları, çek/senet kayıtları ve payment transaction'ları yazar. Sonra
+toplamları iki yoldan hesaplar ve süreleri karşılaştırır:
+  python    -> tüm transaction'ları çekip Python'da topla (eski yol)
+  pipeline  -> modules.cash tek aggregation
+İki yolun sonuçları da karşılaştırılır; farklıysa script hata koduyla çıkar.
+"""
+
+import asyncio
+import sys
+import os
+import time
+import random
+import argparse
+import statistics
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Backend dizinine ekle
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+from modules.cash import build_cash_detail_pipeline, shape_cash_summary, collected_payments_match
+from modules.indexes import reconcile_indexes
+from modules.lookups import collect_ids, prefetch_by_ids
+
+load_dotenv(ROOT_DIR / '.env')
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+DB_NAME = os.environ.get("DB_NAME", "tourcast")
+
+COMPANY_ID = "benchmark-company"
+PAYMENT_CODES = ["cash", "bank_transfer", "credit_card", "online_payment", "mail_order",
+                 "check_promissory", "exchange", "transfer", "write_off"]
+CURRENCIES = ["EUR", "USD", "TRY"]
+
+
+async def seed(db, transactions: int, batch_size: int = 5000):
+    rng = random.Random(42)
+    today = datetime.now(timezone.utc).date()
+
+    payment_types = [{"id": str(uuid.uuid4()), "company_id": COMPANY_ID, "code": code} for code in PAYMENT_CODES]
+    bank_accounts = [
+        {"id": str(uuid.uuid4()), "company_id": COMPANY_ID, "account_name": f"POS {i}", "bank_name": "Banka",
+         "commission_rate": rng.choice([0, 1.5, 2.75]), "valor_days": rng.choice([0, 1, 30])}
+        for i in range(5)
+    ]
+    cash_accounts = [
+        {"id": str(uuid.uuid4()), "company_id": COMPANY_ID, "is_active": True, "order": i,
+         "account_type": rng.choice(["cash", "bank_account", "credit_card"]), "currency": currency}
+        for i, currency in enumerate(CURRENCIES * 2)
+    ]
+    await db.payment_types.insert_many(payment_types)
+    await db.bank_accounts.insert_many(bank_accounts)
+    await db.cash_accounts.insert_many(cash_accounts)
+
+    batch, checks = [], []
+    for i in range(transactions):
+        payment_type = rng.choice(payment_types)
+        day = today - timedelta(days=rng.randint(0, 730))
+        amount = round(rng.uniform(10, 2000), 2)
+        doc = {
+            "id": str(uuid.uuid4()),
+            "company_id": COMPANY_ID,
+            "transaction_type": "payment",
+            "payment_type_id": payment_type["id"],
+            "payment_method": payment_type["code"],
+            "amount": amount,
+            "currency": rng.choice(CURRENCIES),
+            "date": day.isoformat(),
+            "cari_id": f"cari-{rng.randint(1, 500)}",
+            "cash_account_id": rng.choice(cash_accounts)["id"],
+        }
+        if payment_type["code"] in ("credit_card", "bank_transfer"):
+            doc["bank_account_id"] = rng.choice(bank_accounts)["id"]
+        if payment_type["code"] in ("online_payment", "mail_order") and rng.random() < 0.5:
+            doc["valor_date"] = (day + timedelta(days=rng.randint(0, 60))).isoformat()
+            doc["is_settled"] = rng.random() < 0.5
+        if payment_type["code"] == "check_promissory":
+            checks.append({
+                "id": str(uuid.uuid4()), "company_id": COMPANY_ID, "transaction_id": doc["id"],
+                "due_date": (day + timedelta(days=rng.randint(0, 120))).isoformat(),
+                "is_collected": rng.random() < 0.5, "amount": amount, "currency": doc["currency"],
+            })
+        if rng.random() < 0.02:
+            doc["reference_type"] = "outgoing_payment"
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            await db.transactions.insert_many(batch)
+            batch = []
+    if batch:
+        await db.transactions.insert_many(batch)
+    if checks:
+        await db.check_promissories.insert_many(checks)
+    return [acc["id"] for acc in cash_accounts]
+
+
+async def totals_in_python(db, account_ids, today: str):
+    """Eski /cash/detail toplam hesabı: tüm transaction'lar Python'a gelir"""
+    transactions = await db.transactions.find(collected_payments_match(COMPANY_ID), {"_id": 0}).to_list(None)
+    payment_types = await prefetch_by_ids(db.payment_types, collect_ids(transactions, "payment_type_id"), projection={"code": 1})
+    bank_accounts = await prefetch_by_ids(db.bank_accounts, collect_ids(transactions, "bank_account_id"))
+    checks = await prefetch_by_ids(db.check_promissories, collect_ids(transactions, "id"), key="transaction_id")
+
+    totals = {name: {c: 0 for c in CURRENCIES} for name in ("total_collected", "total_amounts", "available_amounts", "pending_amounts")}
+    for t in transactions:
+        currency = t.get("currency", "TRY")
+        totals["total_collected"][currency] += t.get("amount", 0)
+        payment_type = payment_types.get(t.get("payment_type_id"))
+        code = (payment_type.get("code") if payment_type else None) or t.get("payment_method")
+        if not code or code in ("transfer_to_cari", "write_off"):
+            continue
+        amount = t.get("net_amount") or t.get("amount", 0)
+        valor_date = t.get("valor_date")
+        if code in ("exchange", "transfer"):
+            totals["available_amounts"][currency] += amount
+            totals["total_amounts"][currency] += amount
+        elif code == "check_promissory":
+            check = checks.get(t.get("id"))
+            if check:
+                if check.get("due_date"):
+                    bucket = "available" if check["due_date"] <= today and check.get("is_collected", False) else "pending"
+                    totals[f"{bucket}_amounts"][currency] += amount
+                totals["total_amounts"][currency] += amount
+        elif code == "credit_card":
+            net_amount = t.get("net_amount")
+            bank = bank_accounts.get(t.get("bank_account_id"))
+            if bank:
+                if t.get("commission_amount") is None and bank.get("commission_rate"):
+                    net_amount = amount - amount * bank["commission_rate"] / 100
+                if not valor_date and bank.get("valor_days"):
+                    valor_date = (datetime.strptime(t["date"], "%Y-%m-%d") + timedelta(days=bank["valor_days"])).strftime("%Y-%m-%d")
+            totals["total_amounts"][currency] += amount
+            bucket = "pending" if valor_date and valor_date > today else "available"
+            totals[f"{bucket}_amounts"][currency] += net_amount or amount
+        else:
+            totals["total_amounts"][currency] += amount
+            if code in ("cash", "bank_transfer") or (t.get("is_settled", True) and (not valor_date or valor_date <= today)):
+                totals["available_amounts"][currency] += amount
+            else:
+                totals["pending_amounts"][currency] += amount
+
+    accounts = {}
+    async for t in db.transactions.find({"cash_account_id": {"$in": account_ids}, "transaction_type": "payment"}, {"_id": 0}):
+        amount = t.get("net_amount") or t.get("amount", 0)
+        entry = accounts.setdefault(t["cash_account_id"], {"total": 0, "available": 0, "pending": 0})
+        entry["total"] += amount
+        valor_date = t.get("valor_date")
+        entry["available" if t.get("is_settled", True) and (not valor_date or valor_date <= today) else "pending"] += amount
+    totals["accounts"] = accounts
+    return totals
+
+
+async def totals_in_pipeline(db, account_ids, today: str):
+    facets = await db.transactions.aggregate(build_cash_detail_pipeline(COMPANY_ID, account_ids, today)).to_list(1)
+    return shape_cash_summary(facets[0] if facets else {})
+
+
+def rounded(value):
+    if isinstance(value, dict):
+        return {k: rounded(v) for k, v in value.items()}
+    return round(value, 2)
+
+
+async def timed(fn, runs: int, *args):
+    durations, result = [], None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = await fn(*args)
+        durations.append((time.perf_counter() - started) * 1000)
+    return result, durations
+
+
+async def run(db_name: str, transactions: int, runs: int, keep: bool):
+    if db_name == DB_NAME:
+        print(f"❌ {db_name} uygulama veritabanı; benchmark ayrı bir veritabanında çalışmalı (--db)")
+        return 2
+    client = AsyncIOMotorClient(MONGO_URL)
+    await client.drop_database(db_name)
+    db = client[db_name]
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    try:
+        await reconcile_indexes(db, collections=["transactions", "payment_types", "bank_accounts", "check_promissories"], create_missing=True)
+        started = time.perf_counter()
+        account_ids = await seed(db, transactions)
+        print(f"🌱 {transactions} transaction yazıldı ({time.perf_counter() - started:.1f}s) → {db_name}")
+
+        python_result, python_ms = await timed(totals_in_python, runs, db, account_ids, today)
+        pipeline_result, pipeline_ms = await timed(totals_in_pipeline, runs, db, account_ids, today)
+
+        for name, durations in (("python", python_ms), ("pipeline", pipeline_ms)):
+            print(f"⏱️  {name:<9} median: {statistics.median(durations):.1f}ms  max: {max(durations):.1f}ms  (n={runs})")
+
+        if rounded(python_result) != rounded(pipeline_result):
+            print("❌ Sonuçlar farklı")
+            print(f"   python:   {rounded(python_result)}")
+            print(f"   pipeline: {rounded(pipeline_result)}")
+            return 1
+        print("✅ Sonuçlar aynı")
+        return 0
+    finally:
+        if not keep:
+            await client.drop_database(db_name)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="/cash/detail aggregation benchmark'ı")
+    parser.add_argument("--transactions", type=int, default=50000, help="Sentetik transaction sayısı")
+    parser.add_argument("--runs", type=int, default=3, help="Her yol için tekrar sayısı")
+    parser.add_argument("--db", dest="db_name", default=f"{DB_NAME}_benchmark", help="Benchmark veritabanı (silinip yeniden oluşturulur)")
+    parser.add_argument("--keep", action="store_true", help="Bitince veritabanını silme")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args.db_name, args.transactions, args.runs, args.keep)))
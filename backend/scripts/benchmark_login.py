@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Login yükü altında ilgisiz endpoint gecikmesini ölç
+Kullanım:
+    python benchmark_login.py                      # blocking ve pool modlarını karşılaştır
+    python benchmark_login.py --mode pool --logins 200 --concurrency 50
+
+Aynı process içinde küçük bir FastAPI uygulaması kurar: /login bcrypt doğrulaması
+yapar, /ping hiçbir şey yapmaz. Eşzamanlı login'ler sürerken /ping isteklerinin
+p50/p99 gecikmesi raporlanır. "blocking" modu bcrypt'i event loop üzerinde çalıştırır
+(eski davranış), "pool" modu modules.passwords thread havuzunu kullanır.
+Veritabanı gerekmez; istekler doğrudan ASGI arayüzü üzerinden gönderilir.
+"""
+
+import asyncio
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+
+# Backend dizinine ekle
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from fastapi import FastAPI
+
+from modules.passwords import (
+    hash_password,
+    verify_password,
+    verify_password_async,
+    get_password_pool_stats,
+    shutdown_password_pool,
+)
+
+PASSWORD = "benchmark-password"
+
+
+def build_app(mode: str, password_hash: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login():
+        if mode == "blocking":
+            ok = verify_password(PASSWORD, password_hash)
+        else:
+            ok = await verify_password_async(PASSWORD, password_hash)
+        return {"ok": ok}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def asgi_request(app, method: str, path: str) -> int:
+    """Minimal ASGI HTTP isteği - dönen status kodu"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"benchmark")],
+        "client": ("127.0.0.1", 0),
+        "server": ("benchmark", 80),
+    }
+    status = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    await app(scope, receive, send)
+    return status.get("code", 0)
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_mode(mode: str, logins: int, concurrency: int, ping_interval: float, password_hash: str) -> dict:
+    app = build_app(mode, password_hash)
+    semaphore = asyncio.Semaphore(concurrency)
+    ping_latencies = []
+    done = asyncio.Event()
+
+    async def one_login():
+        async with semaphore:
+            await asgi_request(app, "POST", "/login")
+
+    async def pinger():
+        # Sabit aralıklı istek: gecikme planlanan gönderim anından ölçülür, böylece
+        # event loop bloklandığında bekleyen istekler de sonuca yansır
+        scheduled = time.perf_counter()
+        while not done.is_set():
+            scheduled += ping_interval
+            await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            await asgi_request(app, "GET", "/ping")
+            ping_latencies.append((time.perf_counter() - scheduled) * 1000)
+
+    ping_tasks = [asyncio.create_task(pinger())]
+    started = time.perf_counter()
+    await asyncio.gather(*(one_login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await asyncio.gather(*ping_tasks)
+
+    return {
+        "mode": mode,
+        "logins": logins,
+        "elapsed_s": elapsed,
+        "logins_per_s": logins / elapsed,
+        "ping_count": len(ping_latencies),
+        "ping_p50_ms": statistics.median(ping_latencies) if ping_latencies else 0.0,
+        "ping_p99_ms": percentile(ping_latencies, 99) if ping_latencies else 0.0,
+        "ping_max_ms": max(ping_latencies) if ping_latencies else 0.0,
+    }
+
+
+async def run(modes, logins: int, concurrency: int, ping_interval: float):
+    password_hash = hash_password(PASSWORD)
+    results = []
+    try:
+        for mode in modes:
+            result = await run_mode(mode, logins, concurrency, ping_interval, password_hash)
+            results.append(result)
+            print(f"⏱️  {mode:<8} login: {result['logins']} adet / {result['elapsed_s']:.2f}s "
+                  f"({result['logins_per_s']:.1f}/s)  "
+                  f"/ping p50: {result['ping_p50_ms']:.2f}ms  p99: {result['ping_p99_ms']:.2f}ms  "
+                  f"max: {result['ping_max_ms']:.2f}ms  (n={result['ping_count']})")
+        print()
+        print(f"Havuz: {get_password_pool_stats()}")
+    finally:
+        shutdown_password_pool()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="bcrypt login yükü altında event loop gecikmesi benchmark'ı")
+    parser.add_argument("--mode", choices=["blocking", "pool", "both"], default="both")
+    parser.add_argument("--logins", type=int, default=40, help="Toplam login sayısı")
+    parser.add_argument("--concurrency", type=int, default=20, help="Aynı anda süren login sayısı")
+    parser.add_argument("--ping-interval", type=float, default=0.005, help="/ping istekleri arası bekleme (sn)")
+    args = parser.parse_args()
+
+    modes = ["blocking", "pool"] if args.mode == "both" else [args.mode]
+    asyncio.run(run(modes, args.logins, args.concurrency, args.ping_interval))
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+server.py import ve uygulama hazır olma süresini ölç, sürüm bazında kaydet
+Kullanım:
+    python benchmark_startup.py                        # import + ready, 5 tekrar
+    python benchmark_startup.py --no-ready --top 15    # sadece import, en pahalı 15 modül
+    python benchmark_startup.py --output startup.jsonl # sonucu dosyaya ekle, öncekiyle karşılaştır
+
+import: her tekrar yeni bir Python process'inde "import server" süresi.
+ready : uvicorn başlatıldıktan sonra ilk HTTP cevabına kadar geçen süre
+        (startup event'leri bitmeden uvicorn istek kabul etmez). MONGO_URL'deki
+        veritabanına erişim gerekir; startup index reconcile çalıştırır.
+Kayıtlar sürüm (git describe) ile birlikte JSON satırı olarak eklenir.
+"""
+
+import sys
+import json
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import urllib.request
+import urllib.error
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Backend dizini
+ROOT_DIR = Path(__file__).parent.parent
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import server; print(time.perf_counter() - t)"
+
+
+def release() -> str:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=ROOT_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def measure_import() -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT_DIR,
+        capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def heaviest_imports(top: int):
+    """-X importtime çıktısından kümülatif süresi en yüksek üst seviye paketler (ms)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server"], cwd=ROOT_DIR,
+        capture_output=True, text=True, check=True
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        if cumulative.strip().isdigit() and "." not in name and name != "server":
+            modules[name] = max(modules.get(name, 0), int(cumulative) / 1000)
+    return sorted(modules.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_ready(timeout: float) -> float:
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/docs", timeout=1)
+                return time.perf_counter() - started
+            except urllib.error.HTTPError:
+                # Herhangi bir HTTP cevabı uygulamanın hazır olduğunu gösterir
+                return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                time.sleep(0.05)
+        raise RuntimeError(f"uvicorn not ready after {timeout}s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def summarize(samples):
+    return {
+        "median": round(statistics.median(samples), 3),
+        "max": round(max(samples), 3),
+        "n": len(samples),
+    }
+
+
+def previous_record(output: Path):
+    if not output.exists():
+        return None
+    lines = [line for line in output.read_text(encoding="utf-8").splitlines() if line.strip()]
+    return json.loads(lines[-1]) if lines else None
+
+
+def run(runs: int, ready: bool, timeout: float, top: int, output) -> int:
+    record = {
+        "release": release(),
+        "measured_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+    }
+
+    import_samples = [measure_import() for _ in range(runs)]
+    record["import_seconds"] = summarize(import_samples)
+    print(f"⏱️  import  median: {record['import_seconds']['median']:.3f}s  max: {record['import_seconds']['max']:.3f}s  (n={runs})")
+
+    if ready:
+        try:
+            ready_samples = [measure_ready(timeout) for _ in range(runs)]
+        except RuntimeError as e:
+            print(f"❌ ready ölçülemedi: {e}")
+            return 1
+        record["ready_seconds"] = summarize(ready_samples)
+        print(f"⏱️  ready   median: {record['ready_seconds']['median']:.3f}s  max: {record['ready_seconds']['max']:.3f}s  (n={runs})")
+
+    if top:
+        print("📦 En pahalı import'lar (kümülatif)")
+        for name, ms in heaviest_imports(top):
+            print(f"   {ms:8.1f}ms  {name}")
+
+    if output:
+        output = Path(output)
+        previous = previous_record(output)
+        if previous:
+            for key in ("import_seconds", "ready_seconds"):
+                if key in previous and key in record:
+                    delta = record[key]["median"] - previous[key]["median"]
+                    print(f"📈 {key}: {delta:+.3f}s ({previous['release']} → {record['release']})")
+        with output.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"💾 {output} dosyasına eklendi")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Startup süresi benchmark'ı")
+    parser.add_argument("--runs", type=int, default=5, help="Tekrar sayısı")
+    parser.add_argument("--no-ready", dest="ready", action="store_false", help="Sadece import süresini ölç")
+    parser.add_argument("--timeout", type=float, default=60, help="Hazır olma için en fazla bekleme (s)")
+    parser.add_argument("--top", type=int, default=0, help="En pahalı N import'u listele")
+    parser.add_argument("--output", help="Sonucu JSON satırı olarak ekle (sürümler arası karşılaştırma)")
+    args = parser.parse_args()
+
+    sys.exit(run(args.runs, args.ready, args.timeout, args.top, args.output))
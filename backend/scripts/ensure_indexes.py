@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Index registry'yi veritabanıyla eşitle ve raporla
+Kullanım:
+    python ensure_indexes.py                 # sadece rapor (değişiklik yapmaz)
+    python ensure_indexes.py --apply         # eksik index'leri oluştur, çakışanları yeniden oluştur
+    python ensure_indexes.py --apply --drop-extra
+    python ensure_indexes.py --apply --force-replace   # yanına kurulamayan çakışanları düşür + kur (ör. TTL kaldırma)
+    python ensure_indexes.py --explain       # en sık sorgu şekilleri için explain-plan kontrolü
+"""
+
+import asyncio
+import sys
+import os
+import argparse
+from pathlib import Path
+
+# Backend dizinine ekle
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+from modules.indexes import reconcile_indexes, summarize_report, explain_query_shapes
+
+load_dotenv(ROOT_DIR / '.env')
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+DB_NAME = os.environ.get("DB_NAME", "tourcast")
+
+
+async def run(apply: bool, drop_extra: bool, explain: bool, collections, force_replace: bool = False):
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[DB_NAME]
+    exit_code = 0
+
+    try:
+        report = await reconcile_indexes(
+            db,
+            collections=collections,
+            create_missing=apply,
+            fix_conflicts=apply,
+            drop_extra=apply and drop_extra,
+            force_replace=apply and force_replace
+        )
+
+        for collection_name, collection_report in report.items():
+            print(f"📁 {collection_name}")
+            for name in collection_report["ok"]:
+                print(f"   ✅ {name}")
+            for name in collection_report["missing"]:
+                print(f"   {'➕ oluşturuldu' if apply else '❌ eksik'}: {name}")
+            for name in collection_report["conflicting"]:
+                print(f"   {'🔁 yeniden oluşturuldu' if apply else '⚠️  seçenekler farklı'}: {name}")
+            for name in collection_report["extra"]:
+                print(f"   {'🗑️  düşürüldü' if apply and drop_extra else 'ℹ️  registry dışı'}: {name}")
+            for error in collection_report["errors"]:
+                print(f"   💥 hata: {error}")
+
+        summary = summarize_report(report)
+        print()
+        print(f"Eksik: {summary['missing']}  Çakışan: {summary['conflicting']}  "
+              f"Fazla: {summary['extra']}  Hata: {summary['errors']}")
+
+        if summary["errors"] or (not apply and (summary["missing"] or summary["conflicting"])):
+            exit_code = 1
+
+        if explain:
+            print()
+            print("🔍 Explain-plan kontrolü")
+            for result in await explain_query_shapes(db):
+                if result.get("error"):
+                    print(f"   💥 {result['name']}: {result['error']}")
+                    exit_code = 1
+                elif result["collection_scan"]:
+                    print(f"   ❌ {result['name']} ({result['collection']}): COLLSCAN")
+                    exit_code = 1
+                else:
+                    print(f"   ✅ {result['name']} ({result['collection']}): {result['index']}")
+    finally:
+        client.close()
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MongoDB index registry eşitleme aracı")
+    parser.add_argument("--apply", action="store_true", help="Eksik/çakışan index'leri düzelt")
+    parser.add_argument("--drop-extra", action="store_true", help="Registry dışındaki index'leri düşür (--apply ile)")
+    parser.add_argument("--force-replace", action="store_true",
+                        help="Yanına kurulamayan çakışan index'i düşürüp yeniden kur; kurulamazsa eskisi geri kurulur (--apply ile)")
+    parser.add_argument("--explain", action="store_true", help="Sorgu şekillerini explain et, COLLSCAN varsa hata ver")
+    parser.add_argument("--collection", action="append", dest="collections", help="Sadece bu koleksiyon (tekrarlanabilir)")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args.apply, args.drop_extra, args.explain, args.collections, args.force_replace)))
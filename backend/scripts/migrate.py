@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+schema_migrations migration'larını çalıştır / listele
+Kullanım:
+    python migrate.py                                    # bekleyen tüm migration'lar
+    python migrate.py --list                             # durum listesi
+    python migrate.py --only 0002_reservation_cari_panel_fields
+    python migrate.py --auto                             # sadece startup'ta otomatik çalışanlar
+    python migrate.py --only 0003_cari_panel_accounts --rerun   # tamamlanmış olanı baştan çalıştır
+
+Yarıda kalan migration kaldığı _id'den devam eder. Başka bir process'te
+çalışan (heartbeat'i taze) migration atlanır.
+"""
+
+import asyncio
+import sys
+import os
+import argparse
+from pathlib import Path
+
+# Backend dizinine ekle
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+from modules.migrations import run_migrations, migration_status
+
+load_dotenv(ROOT_DIR / '.env')
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+DB_NAME = os.environ.get("DB_NAME", "tourcast")
+
+STATUS_ICONS = {"done": "✅", "running": "⏳", "failed": "💥", "pending": "⬜", "skipped": "⏭️ "}
+
+
+async def run(only, auto_only: bool = False, list_only: bool = False, rerun: bool = False) -> int:
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[DB_NAME]
+
+    try:
+        if list_only:
+            for row in await migration_status(db):
+                auto = " (auto)" if row["auto"] else ""
+                print(f"{STATUS_ICONS.get(row['status'], '?')} {row['id']}{auto}: {row['description']} "
+                      f"[{row['status']}, {row['processed']} doküman]")
+            return 0
+
+        results = await run_migrations(db, only=only, auto_only=auto_only, rerun=rerun)
+        if not results:
+            print("ℹ️  Çalıştırılacak migration yok")
+        for migration_id, result in results.items():
+            print(f"{STATUS_ICONS.get(result, '?')} {migration_id}: {result}")
+        return 1 if "failed" in results.values() else 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Veri migration aracı (schema_migrations)")
+    parser.add_argument("--only", nargs="+", help="Sadece bu migration id'leri")
+    parser.add_argument("--auto", dest="auto_only", action="store_true", help="Sadece otomatik migration'lar")
+    parser.add_argument("--list", dest="list_only", action="store_true", help="Durumları listele")
+    parser.add_argument("--rerun", action="store_true", help="Tamamlanmış migration'ları baştan çalıştır")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args.only, args.auto_only, args.list_only, args.rerun)))
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+daily_rollups koleksiyonunu ham rezervasyonlardan yeniden oluştur
+Kullanım:
+    python rebuild_daily_rollups.py                                   # tüm şirketler, tüm tarihler
+    python rebuild_daily_rollups.py --company <company_id>
+    python rebuild_daily_rollups.py --from 2025-01-01 --to 2025-01-31
+"""
+
+import asyncio
+import sys
+import os
+import argparse
+from pathlib import Path
+
+# Backend dizinine ekle
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+from modules.indexes import reconcile_indexes
+from modules.rollups import rebuild_rollups
+
+load_dotenv(ROOT_DIR / '.env')
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+DB_NAME = os.environ.get("DB_NAME", "tourcast")
+
+
+async def run(company_id, date_from, date_to):
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[DB_NAME]
+
+    try:
+        # Bucket upsert'leri unique index'e dayanır
+        await reconcile_indexes(db, collections=["daily_rollups"], create_missing=True)
+        written = await rebuild_rollups(db, company_id=company_id, date_from=date_from, date_to=date_to)
+        scope = company_id or "tüm şirketler"
+        period = f"{date_from or '...'} → {date_to or '...'}"
+        print(f"✅ {scope} ({period}): {written} rollup bucket yazıldı")
+    finally:
+        client.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="daily_rollups yeniden oluşturma aracı")
+    parser.add_argument("--company", dest="company_id", help="Sadece bu şirket")
+    parser.add_argument("--from", dest="date_from", help="Başlangıç tarihi (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", help="Bitiş tarihi (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args.company_id, args.date_from, args.date_to)))
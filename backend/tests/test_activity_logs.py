@@ -0,0 +1,85 @@
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from pymongo.errors import BulkWriteError
+from backend.modules.activity_logs import (
+    ARCHIVE_COLLECTION,
+    archive_activity_logs,
+    build_activity_log,
+    log_collection,
+    record_activity_log,
+)
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *args):
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, n):
+        return self.docs
+
+def archive_db(batches, archive_insert=None):
+    hot = MagicMock()
+    hot.find.side_effect = [Cursor(batch) for batch in batches]
+    hot.delete_many = AsyncMock()
+    archive = MagicMock()
+    archive.insert_many = archive_insert or AsyncMock()
+    db = MagicMock()
+    db.activity_logs = hot
+    db.__getitem__.side_effect = lambda name: archive if name == ARCHIVE_COLLECTION else MagicMock()
+    db.list_collection_names = AsyncMock(return_value=[ARCHIVE_COLLECTION])
+    return db, hot, archive
+
+def test_build_activity_log_stores_datetime():
+    doc = build_activity_log("comp1", "u1", "ali", "Ali", "create", "reservation", "r1", description="x")
+    assert isinstance(doc["created_at"], datetime)
+    assert doc["company_id"] == "comp1" and doc["changes"] is None and doc["id"]
+
+def test_log_collection():
+    assert log_collection() == "activity_logs"
+    assert log_collection(archive=True) == ARCHIVE_COLLECTION
+
+@pytest.mark.asyncio
+async def test_record_writes_directly_when_writer_not_running():
+    db = MagicMock()
+    db.activity_logs.insert_one = AsyncMock()
+    await record_activity_log(db, {"id": "1"})
+    db.activity_logs.insert_one.assert_awaited_once_with({"id": "1"})
+
+@pytest.mark.asyncio
+async def test_archive_disabled_by_default():
+    db = MagicMock()
+    assert await archive_activity_logs(db, older_than_days=0) == 0
+    db.activity_logs.find.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_archive_moves_batches_until_short_batch():
+    db, hot, archive = archive_db([[{"_id": 1}, {"_id": 2}], [{"_id": 3}]])
+
+    moved = await archive_activity_logs(db, older_than_days=90, batch_size=2)
+
+    assert moved == 3
+    assert archive.insert_many.await_count == 2
+    assert hot.delete_many.await_args_list[1].args[0] == {"_id": {"$in": [3]}}
+
+@pytest.mark.asyncio
+async def test_archive_skips_documents_copied_by_interrupted_run():
+    duplicate = BulkWriteError({"writeErrors": [{"index": 0, "code": 11000}]})
+    db, hot, _ = archive_db([[{"_id": 1}]], archive_insert=AsyncMock(side_effect=duplicate))
+
+    assert await archive_activity_logs(db, older_than_days=90, batch_size=10) == 1
+    hot.delete_many.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_archive_keeps_hot_logs_when_copy_fails():
+    failure = BulkWriteError({"writeErrors": [{"index": 0, "code": 121}]})
+    db, hot, _ = archive_db([[{"_id": 1}]], archive_insert=AsyncMock(side_effect=failure))
+
+    assert await archive_activity_logs(db, older_than_days=90) == 0
+    hot.delete_many.assert_not_awaited()
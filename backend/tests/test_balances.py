@@ -0,0 +1,134 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from pymongo.errors import DuplicateKeyError
+from backend.modules.balances import apply_balance_delta, apply_cari_delta, merge_deltas
+
+class FakeCollection:
+    """Her yazımdan önce event loop'a dönen (gerçek I/O gibi araya girilebilen) bellek içi koleksiyon"""
+
+    def __init__(self, unique_field=None):
+        self.docs = []
+        self.unique_field = unique_field
+
+    async def insert_one(self, doc):
+        await asyncio.sleep(0)
+        if self.unique_field and any(d[self.unique_field] == doc[self.unique_field] for d in self.docs):
+            raise DuplicateKeyError("duplicate key")
+        self.docs.append(dict(doc))
+
+    async def update_one(self, match, update):
+        await asyncio.sleep(0)
+        for doc in self.docs:
+            if all(doc.get(k) == v for k, v in match.items()):
+                for field, value in update.get("$inc", {}).items():
+                    doc[field] = doc.get(field, 0) + value
+                doc.update(update.get("$set", {}))
+                return SimpleNamespace(modified_count=1)
+        return SimpleNamespace(modified_count=0)
+
+class FakeDB:
+    def __init__(self):
+        self.balance_operations = FakeCollection(unique_field="key")
+        self.cari_accounts = FakeCollection()
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+def test_merge_deltas_sums_same_field_and_drops_zero():
+    assert merge_deltas({"balance_eur": -100}, {"balance_eur": 30, "balance_usd": 0}) == {"balance_eur": -70}
+
+@pytest.mark.asyncio
+async def test_concurrent_increments_are_not_lost():
+    db = FakeDB()
+    db.cari_accounts.docs.append({"id": "c1", "balance_eur": 0})
+
+    await asyncio.gather(*(
+        apply_cari_delta(db, "c1", {"balance_eur": 10}, f"op-{i}") for i in range(200)
+    ))
+
+    assert db.cari_accounts.docs[0]["balance_eur"] == 2000
+    assert all(op["state"] == "applied" for op in db.balance_operations.docs)
+
+@pytest.mark.asyncio
+async def test_repeated_operation_is_applied_once():
+    db = FakeDB()
+    db.cari_accounts.docs.append({"id": "c1", "balance_eur": 500, "balance_usd": 0})
+
+    # Aynı iptal isteği 50 kez eşzamanlı gelir (retry / çift tıklama)
+    results = await asyncio.gather(*(
+        apply_cari_delta(db, "c1", {"balance_eur": -100, "balance_usd": 25}, "cancel_reservation:r1:v1")
+        for _ in range(50)
+    ))
+
+    assert results.count(True) == 1
+    assert db.cari_accounts.docs[0] == {"id": "c1", "balance_eur": 400, "balance_usd": 25}
+
+@pytest.mark.asyncio
+async def test_empty_delta_is_not_recorded():
+    db = FakeDB()
+    assert await apply_balance_delta(db, "cari_accounts", {"id": "c1"}, {"balance_eur": 0}, "noop") is False
+    assert db.balance_operations.docs == []
+
+@pytest.mark.asyncio
+async def test_retry_applies_operation_left_pending():
+    db = FakeDB()
+    db.cari_accounts.docs.append({"id": "c1", "balance_eur": 500})
+    # İlk deneme kaydı yazdıktan sonra düştü
+    db.balance_operations.docs.append({"key": "payment:p1", "state": "pending"})
+
+    assert await apply_cari_delta(db, "c1", {"balance_eur": -100}, "payment:p1") is True
+    assert await apply_cari_delta(db, "c1", {"balance_eur": -100}, "payment:p1") is False
+
+    assert db.cari_accounts.docs[0]["balance_eur"] == 400
+    assert db.balance_operations.docs[0]["state"] == "applied"
+
+@pytest.mark.asyncio
+async def test_operation_being_applied_is_not_reapplied():
+    db = FakeDB()
+    db.cari_accounts.docs.append({"id": "c1", "balance_eur": 500})
+    db.balance_operations.docs.append({"key": "payment:p1", "state": "applying"})
+
+    assert await apply_cari_delta(db, "c1", {"balance_eur": -100}, "payment:p1") is False
+    assert db.cari_accounts.docs[0]["balance_eur"] == 500
+
+def test_applied_operations_expire():
+    from backend.modules.indexes import INDEX_REGISTRY
+    ttl = [spec for spec in INDEX_REGISTRY["balance_operations"] if "expireAfterSeconds" in spec["options"]]
+    assert ttl[0]["keys"] == [("applied_at", 1)]
+    assert ttl[0]["options"]["partialFilterExpression"] == {"state": "applied"}
+
+@pytest.mark.asyncio
+async def test_pay_salary_without_key_is_applied_once(monkeypatch):
+    from unittest.mock import AsyncMock
+    from backend.modules.routers import staff
+
+    class StaffCollection(FakeCollection):
+        async def find_one(self, match, projection=None):
+            return next((d for d in self.docs if all(d.get(k) == v for k, v in match.items())), None)
+
+    db = FakeDB()
+    for name in ("users", "salary_transactions", "transactions"):
+        setattr(db, name, StaffCollection())
+    db.cari_accounts = StaffCollection()
+    db.users.docs.append({"id": "u1", "company_id": "c1", "full_name": "Ali", "is_active": True})
+    db.cari_accounts.docs.append({"id": "sc1", "company_id": "c1", "staff_user_id": "u1", "balance_try": 0})
+    monkeypatch.setattr(staff, "db", db)
+    monkeypatch.setattr(staff, "sync_cash_position", AsyncMock())
+    monkeypatch.setattr(staff, "create_activity_log", AsyncMock())
+
+    current_user = {"company_id": "c1", "user_id": "admin"}
+    data = {"amount": 1000, "currency": "TRY", "payment_date": "2026-10-17"}
+    # Çift tıklama: aynı istek anahtarsız iki kez gelir
+    first = await staff.pay_salary("u1", dict(data), current_user=current_user)
+    second = await staff.pay_salary("u1", dict(data), current_user=current_user)
+
+    assert first["message"] == "Maaş ödendi"
+    assert second["message"] == "Maaş ödemesi zaten işlendi"
+    assert db.cari_accounts.docs[0]["balance_try"] == -1000
+    assert len(db.salary_transactions.docs) == 1
+    assert len(db.transactions.docs) == 1
+
+    # Yeni anahtarla gönderilen ikinci ödeme işlenir
+    await staff.pay_salary("u1", {**data, "idempotency_key": "k2"}, current_user=current_user)
+    assert db.cari_accounts.docs[0]["balance_try"] == -2000
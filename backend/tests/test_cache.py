@@ -0,0 +1,71 @@
+import pytest
+from unittest.mock import AsyncMock
+from backend.modules.cache import (
+    TTLCache,
+    TenantReferenceCache,
+    begin_request_scope,
+    end_request_scope,
+)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_ttl_expiry_and_counters():
+    clock = FakeClock()
+    cache = TTLCache("test_ttl", maxsize=10, ttl=5, timer=clock)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    clock.now = 6
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["expirations"] == 1
+
+def test_lru_eviction_keeps_recently_used():
+    cache = TTLCache("test_lru", maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+@pytest.mark.asyncio
+async def test_get_or_load_caches_and_invalidates_per_company():
+    cache = TenantReferenceCache("test_tenant", ttl=60)
+    loader = AsyncMock(return_value=[{"id": "t1", "name": "ATV"}])
+
+    first = await cache.get_or_load("comp1", "tour_types", loader)
+    second = await cache.get_or_load("comp1", "tour_types", loader)
+
+    assert first == second
+    assert first is not second  # her çağıran kendi kopyasını alır
+    assert loader.await_count == 1
+
+    cache.invalidate_company("comp1", "tour_types")
+    await cache.get_or_load("comp1", "tour_types", loader)
+    assert loader.await_count == 2
+
+@pytest.mark.asyncio
+async def test_request_scope_returns_same_snapshot():
+    cache = TenantReferenceCache("test_request", ttl=60)
+    loader = AsyncMock(return_value={"id": "comp1", "busy_hour_threshold": 5})
+
+    token = begin_request_scope()
+    try:
+        first = await cache.get_or_load("comp1", "company", loader)
+        second = await cache.get_or_load("comp1", "company", loader)
+    finally:
+        end_request_scope(token)
+
+    assert first is second
+    assert cache.stats()["request_hits"] == 1
@@ -0,0 +1,200 @@
+import os
+import pytest
+from datetime import datetime, timedelta
+from backend.modules.cash import build_cash_detail_pipeline, shape_cash_summary, collected_payments_match
+
+# Pipeline'ı gerçek MongoDB'de çalıştırmak için (mongomock $type, $dateFromString vb. desteklemiyor)
+MONGO_TEST_URL = os.environ.get("MONGO_TEST_URL")
+
+def test_cash_detail_pipeline_is_one_match_plus_facet():
+    pipeline = build_cash_detail_pipeline("comp1", ["acc1"], "2025-07-30")
+
+    assert pipeline[0]["$match"] == {"company_id": "comp1", "transaction_type": "payment"}
+    facet = pipeline[1]["$facet"]
+    assert set(facet) == {"summary", "accounts"}
+    assert facet["summary"][0]["$match"] == collected_payments_match("comp1")
+    lookups = [stage["$lookup"]["from"] for stage in facet["summary"] if "$lookup" in stage]
+    assert lookups == ["payment_types", "bank_accounts", "check_promissories"]
+    assert facet["summary"][-1]["$group"]["_id"] == {"currency": "$currency", "bucket": "$bucket"}
+    assert facet["accounts"][0]["$match"] == {"cash_account_id": {"$in": ["acc1"]}}
+
+def test_shape_cash_summary():
+    facets = {
+        "summary": [
+            {"_id": {"currency": "EUR", "bucket": "available"}, "collected": 100, "total": 100, "bucket_amount": 97},
+            {"_id": {"currency": "EUR", "bucket": "pending"}, "collected": 50, "total": 50, "bucket_amount": 50},
+            # Sayılmayan ödeme (write_off) sadece tahsil edilene girer
+            {"_id": {"currency": "TRY", "bucket": None}, "collected": 300, "total": 0, "bucket_amount": 300},
+        ],
+        "accounts": [{"_id": "acc1", "total": 150, "available": 100, "pending": 50}],
+    }
+
+    result = shape_cash_summary(facets)
+
+    assert result["total_collected"] == {"EUR": 150, "USD": 0, "TRY": 300}
+    assert result["total_amounts"] == {"EUR": 150, "USD": 0, "TRY": 0}
+    assert result["available_amounts"] == {"EUR": 97, "USD": 0, "TRY": 0}
+    assert result["pending_amounts"] == {"EUR": 50, "USD": 0, "TRY": 0}
+    assert result["accounts"] == {"acc1": {"total": 150, "available": 100, "pending": 50}}
+
+def test_shape_cash_summary_empty():
+    result = shape_cash_summary({})
+    assert result["available_amounts"] == {"EUR": 0, "USD": 0, "TRY": 0}
+    assert result["accounts"] == {}
+
+# ==================== ESKİ DÖNGÜ / PIPELINE EŞDEĞERLİĞİ ====================
+
+TODAY = "2026-10-17"
+
+PAYMENT_TYPES = [
+    {"id": "pt-cc", "code": "credit_card"},
+    {"id": "pt-cash", "code": "cash"},
+    {"id": "pt-empty", "code": ""},  # payment_method'a düşer
+]
+BANK_ACCOUNTS = [
+    {"id": "b1", "commission_rate": 2, "valor_days": 30},
+]
+CHECKS = [
+    {"id": "ch1", "transaction_id": "t-check-due", "due_date": "2026-10-01", "is_collected": True},
+    {"id": "ch2", "transaction_id": "t-check-waiting", "due_date": "2026-11-01", "is_collected": False},
+    {"id": "ch3", "transaction_id": "t-check-no-due"},
+]
+
+def _payment(id, method, amount, currency="EUR", **fields):
+    return {"id": id, "company_id": "comp1", "transaction_type": "payment", "payment_method": method,
+            "amount": amount, "currency": currency, **fields}
+
+TRANSACTIONS = [
+    _payment("t-cash", "cash", 100, payment_type_id="pt-cash", cash_account_id="a1"),
+    # Komisyon ve valör banka tanımından: 200 - %2 = 196, valör 2026-11-09
+    _payment("t-cc-derived", "credit_card", 200, "TRY", payment_type_id="pt-cc", bank_account_id="b1",
+             date="2026-10-10", cash_account_id="a2"),
+    _payment("t-cc-past", "credit_card", 300, "TRY", payment_type_id="pt-cc", bank_account_id="b1", date="2026-08-01"),
+    _payment("t-cc-own", "credit_card", 150, "USD", payment_type_id="pt-cc", bank_account_id="b1",
+             commission_amount=3, net_amount=147, valor_date="2026-10-20"),
+    _payment("t-online-pending", "online_payment", 80, valor_date="2026-10-30", is_settled=False, cash_account_id="a1"),
+    _payment("t-online-settled", "online_payment", 70, valor_date="2026-10-01", is_settled=True, cash_account_id="a1"),
+    _payment("t-mail-null", "mail_order", 60, "USD", is_settled=None),
+    _payment("t-check-due", "check_promissory", 500, "TRY"),
+    _payment("t-check-waiting", "check_promissory", 400),
+    _payment("t-check-no-due", "check_promissory", 250, "USD"),
+    _payment("t-check-missing", "check_promissory", 90),
+    _payment("t-write-off", "write_off", 40),
+    _payment("t-exchange", "exchange", 120, "USD"),
+    # currency alanı yok -> TRY
+    {k: v for k, v in _payment("t-no-currency", "bank_transfer", 30, "TRY").items() if k != "currency"},
+    _payment("t-outgoing", "cash", 999, reference_type="outgoing_payment", cash_account_id="a1"),
+    _payment("t-zero-net", "cash", 50, net_amount=0, cash_account_id="a1"),
+    _payment("t-empty-code", "transfer", 10, "TRY", payment_type_id="pt-empty"),
+    {"id": "t-no-method", "company_id": "comp1", "transaction_type": "payment", "amount": 5, "currency": "EUR"},
+    {**_payment("t-other-company", "cash", 777), "company_id": "comp2"},
+]
+
+# Eski döngünün bu satırlardaki çıktısı
+EXPECTED = {
+    "total_collected": {"EUR": 830, "USD": 580, "TRY": 1040},
+    "total_amounts": {"EUR": 700, "USD": 577, "TRY": 1040},
+    "available_amounts": {"EUR": 220, "USD": 120, "TRY": 834},
+    "pending_amounts": {"EUR": 480, "USD": 207, "TRY": 196},
+    "accounts": {
+        "a1": {"total": 1299, "available": 1219, "pending": 80},
+        "a2": {"total": 200, "available": 200, "pending": 0},
+    },
+}
+
+def _matches_collected(t):
+    return (t.get("company_id") == "comp1" and t.get("transaction_type") == "payment"
+            and t.get("payment_method") is not None and t.get("reference_type") != "outgoing_payment")
+
+def legacy_cash_totals(transactions, payment_types, bank_accounts, checks, account_ids, today):
+    """/cash/detail'in aggregation'dan önceki Python döngüsü (server.py, davranışı değiştirmeden)"""
+    payment_types = {pt["id"]: pt for pt in payment_types}
+    bank_accounts = {b["id"]: b for b in bank_accounts}
+    checks = {c["transaction_id"]: c for c in checks}
+    totals = {name: {"EUR": 0, "USD": 0, "TRY": 0}
+              for name in ("total_collected", "total_amounts", "available_amounts", "pending_amounts")}
+
+    collected = [dict(t) for t in transactions if _matches_collected(t)]
+    for t in collected:
+        totals["total_collected"][t.get("currency", "TRY")] += t.get("amount", 0)
+
+    for t in collected:
+        payment_type = payment_types.get(t.get("payment_type_id"))
+        code = (payment_type.get("code") if payment_type else None) or t.get("payment_method")
+        if not code or code in ["transfer_to_cari", "write_off"]:
+            continue
+        currency = t.get("currency", "TRY")
+        amount = t.get("net_amount") or t.get("amount", 0)
+        valor_date = t.get("valor_date")
+        is_settled = t.get("is_settled", True)
+
+        if code in ("exchange", "transfer"):
+            totals["available_amounts"][currency] += amount
+            totals["total_amounts"][currency] += amount
+        elif code == "check_promissory":
+            check = checks.get(t.get("id"))
+            if check:
+                due_date = check.get("due_date")
+                if due_date:
+                    if due_date <= today and check.get("is_collected", False):
+                        totals["available_amounts"][currency] += amount
+                    else:
+                        totals["pending_amounts"][currency] += amount
+                totals["total_amounts"][currency] += amount
+        elif code == "credit_card":
+            bank = bank_accounts.get(t.get("bank_account_id"))
+            if bank:
+                if t.get("commission_amount") is None and bank.get("commission_rate"):
+                    t["commission_amount"] = amount * bank["commission_rate"] / 100
+                    t["net_amount"] = amount - t["commission_amount"]
+                if not valor_date and bank.get("valor_days"):
+                    valor_date = (datetime.strptime(t["date"], "%Y-%m-%d") + timedelta(days=bank["valor_days"])).strftime("%Y-%m-%d")
+            totals["total_amounts"][currency] += amount
+            bucket = "pending" if valor_date and valor_date > today else "available"
+            totals[f"{bucket}_amounts"][currency] += t.get("net_amount") or amount
+        else:
+            totals["total_amounts"][currency] += amount
+            if code in ("cash", "bank_transfer") or (is_settled and (not valor_date or valor_date <= today)):
+                totals["available_amounts"][currency] += amount
+            else:
+                totals["pending_amounts"][currency] += amount
+
+    accounts = {}
+    for t in transactions:
+        if t.get("cash_account_id") not in account_ids or t.get("transaction_type") != "payment":
+            continue
+        amount = t.get("net_amount") or t.get("amount", 0)
+        entry = accounts.setdefault(t["cash_account_id"], {"total": 0, "available": 0, "pending": 0})
+        entry["total"] += amount
+        valor_date = t.get("valor_date")
+        entry["available" if t.get("is_settled", True) and (not valor_date or valor_date <= today) else "pending"] += amount
+    totals["accounts"] = accounts
+    return totals
+
+def test_legacy_loop_matches_recorded_output():
+    result = legacy_cash_totals(TRANSACTIONS, PAYMENT_TYPES, BANK_ACCOUNTS, CHECKS, ["a1", "a2", "a3"], TODAY)
+    assert result == EXPECTED
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not MONGO_TEST_URL, reason="MONGO_TEST_URL ile erişilebilir bir MongoDB gerekli")
+async def test_pipeline_matches_legacy_loop_on_mongodb():
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(MONGO_TEST_URL)
+    db = client["test_cash_detail_pipeline"]
+    await client.drop_database(db.name)
+    try:
+        await db.payment_types.insert_many([dict(doc) for doc in PAYMENT_TYPES])
+        await db.bank_accounts.insert_many([dict(doc) for doc in BANK_ACCOUNTS])
+        await db.check_promissories.insert_many([dict(doc) for doc in CHECKS])
+        await db.transactions.insert_many([dict(doc) for doc in TRANSACTIONS])
+
+        facets = await db.transactions.aggregate(
+            build_cash_detail_pipeline("comp1", ["a1", "a2", "a3"], TODAY)
+        ).to_list(1)
+        result = shape_cash_summary(facets[0])
+    finally:
+        await client.drop_database(db.name)
+        client.close()
+
+    assert result == EXPECTED
@@ -0,0 +1,115 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from types import SimpleNamespace
+from backend.modules import cash_position
+from backend.modules.cash_position import cash_contribution, position_delta, build_cash_position_pipeline
+
+def test_contribution_rules_match_cash_endpoint():
+    assert cash_contribution("reservations", {"currency": "EUR", "price": 100, "status": "confirmed"}) == {"EUR": 100}
+    assert cash_contribution("reservations", {"currency": "EUR", "price": 100, "status": "cancelled"}) == {}
+    assert cash_contribution("extra_sales", {"currency": "USD", "sale_price": 40}) == {"USD": 40}
+    assert cash_contribution("transactions", {"currency": "TRY", "amount": 50, "transaction_type": "payment"}) == {"TRY": 50}
+    assert cash_contribution("transactions", {"currency": "TRY", "amount": 50, "transaction_type": "payment",
+                                              "reference_type": "outgoing_payment"}) == {"TRY": -50}
+    assert cash_contribution("transactions", {"currency": "EUR", "amount": -20, "transaction_type": "exchange_out",
+                                              "reference_type": "currency_exchange"}) == {"EUR": -20}
+    assert cash_contribution("transactions", {"currency": "EUR", "amount": 80, "transaction_type": "debit"}) == {}
+    assert cash_contribution("expenses", {"currency": "TRY", "amount": 30}) == {"TRY": -30}
+    assert cash_contribution("incomes", {"currency": "GBP", "amount": 30}) == {}
+
+def test_position_delta_for_currency_change_and_cancel():
+    before = {"currency": "EUR", "price": 100, "status": "confirmed"}
+    assert position_delta("reservations", before, {**before, "currency": "USD"}) == {"EUR": -100, "USD": 100}
+    assert position_delta("reservations", before, {**before, "status": "cancelled"}) == {"EUR": -100}
+    assert position_delta("reservations", before, {**before, "notes": "x"}) == {}
+
+def test_pipeline_unions_every_source():
+    pipeline = build_cash_position_pipeline("comp1")
+    unions = [stage["$unionWith"]["coll"] for stage in pipeline if "$unionWith" in stage]
+    assert unions == ["extra_sales", "transactions", "transactions", "transactions", "incomes", "expenses"]
+    assert pipeline[-1]["$group"] == {"_id": "$currency", "total": {"$sum": "$amount"}}
+
+@pytest.mark.asyncio
+async def test_apply_cash_delta_increments_position_and_version(monkeypatch):
+    apply = AsyncMock(return_value=True)
+    monkeypatch.setattr(cash_position, "apply_balance_delta", apply)
+    doc = {"id": "e1", "company_id": "comp1", "currency": "TRY", "amount": 30}
+
+    assert await cash_position.apply_cash_delta(object(), "expenses", None, doc) is True
+    _, collection, match, deltas, key = apply.call_args.args
+    assert (collection, match) == ("cash_positions", {"company_id": "comp1"})
+    assert deltas == {"balance.TRY": -30.0, "version": 1}
+    assert key == "cash_position:expenses:e1:insert"
+
+    apply.reset_mock()
+    assert await cash_position.apply_cash_delta(object(), "expenses", doc, {**doc, "notes": "x"}) is False
+    apply.assert_not_called()
+
+class AsyncRows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __aiter__(self):
+        async def gen():
+            for row in self.rows:
+                yield row
+        return gen()
+
+@pytest.mark.asyncio
+async def test_reconcile_skips_position_changed_during_run(monkeypatch):
+    db = SimpleNamespace(cash_positions=MagicMock())
+    db.cash_positions.find.return_value = AsyncRows([
+        {"company_id": "comp1", "version": 7, "balance": {"EUR": 120.0, "USD": 0.0, "TRY": 0.0}},
+    ])
+    db.cash_positions.update_one = AsyncMock(return_value=SimpleNamespace(matched_count=0))
+    monkeypatch.setattr(cash_position, "compute_cash_position", AsyncMock(return_value={"EUR": 100.0, "USD": 0.0, "TRY": 0.0}))
+
+    drifted = await cash_position.reconcile_cash_positions(db)
+
+    assert drifted[0]["difference"] == {"EUR": 20.0, "USD": 0.0, "TRY": 0.0}
+    assert db.cash_positions.update_one.call_args.args[0] == {"company_id": "comp1", "version": 7}
+
+@pytest.mark.asyncio
+async def test_first_read_recomputes_when_delta_lands_during_computation(monkeypatch):
+    db = SimpleNamespace(cash_positions=MagicMock())
+    # İlk okuma: doküman yok; sonra version 0, hesaplama sırasında bir delta version'ı 1 yapar
+    db.cash_positions.find_one = AsyncMock(side_effect=[None, {"version": 0}, {"version": 1}])
+    db.cash_positions.update_one = AsyncMock(side_effect=[
+        SimpleNamespace(matched_count=1),  # computing dokümanı (upsert)
+        SimpleNamespace(matched_count=0),  # version değişti
+        SimpleNamespace(matched_count=1),
+    ])
+    compute = AsyncMock(side_effect=[
+        {"EUR": 100.0, "USD": 0.0, "TRY": 0.0},
+        {"EUR": 150.0, "USD": 0.0, "TRY": 0.0},
+    ])
+    monkeypatch.setattr(cash_position, "compute_cash_position", compute)
+
+    balance = await cash_position.get_cash_position(db, "comp1")
+
+    assert balance["EUR"] == 150.0
+    placeholder = db.cash_positions.update_one.call_args_list[0]
+    assert placeholder.args[1]["$setOnInsert"]["computing"] is True
+    assert placeholder.kwargs == {"upsert": True}
+    final_match, final_update = db.cash_positions.update_one.call_args.args
+    assert final_match == {"company_id": "comp1", "version": 1}
+    assert final_update["$set"]["computing"] is False
+
+@pytest.mark.asyncio
+async def test_reconcile_job_runs_only_with_lease(monkeypatch):
+    from pymongo.errors import DuplicateKeyError
+    from backend.modules import scheduler
+
+    reconcile = AsyncMock(return_value=[])
+    monkeypatch.setattr(scheduler, "reconcile_cash_positions", reconcile)
+    db = SimpleNamespace(job_leases=MagicMock())
+    db.job_leases.update_one = AsyncMock()
+
+    db.job_leases.find_one_and_update = AsyncMock(side_effect=DuplicateKeyError("held"))
+    await scheduler.reconcile_cash_positions_job(db)
+    reconcile.assert_not_awaited()
+
+    db.job_leases.find_one_and_update = AsyncMock(return_value={"_id": "reconcile_cash_positions"})
+    await scheduler.reconcile_cash_positions_job(db)
+    reconcile.assert_awaited_once_with(db)
+    assert db.job_leases.update_one.await_args.args[0]["_id"] == "reconcile_cash_positions"
@@ -0,0 +1,135 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+from types import SimpleNamespace
+from backend.modules.currency_rates import (
+    CurrencyRateService, parse_tcmb_rates, parse_fallback_rates, rates_equal, DEFAULT_RATES
+)
+
+TCMB_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<Tarih_Date>
+  <Currency Kod="USD"><ForexBuying>34.1</ForexBuying></Currency>
+  <Currency Kod="EUR"><ForexBuying>36.5</ForexBuying></Currency>
+</Tarih_Date>"""
+
+class FakeDB:
+    """currency_rate_history + companies için bellek içi taklit"""
+
+    def __init__(self, history=None):
+        self.history = MagicMock()
+        self.history.find_one = AsyncMock(return_value=history)
+        self.history.insert_one = AsyncMock()
+        self.history.update_one = AsyncMock()
+        self.companies = MagicMock()
+        self.companies.update_many = AsyncMock(return_value=SimpleNamespace(modified_count=2))
+
+    def __getitem__(self, name):
+        assert name == "currency_rate_history"
+        return self.history
+
+def tcmb_client(status_code=200, content=TCMB_XML):
+    client = SimpleNamespace()
+    client.get = AsyncMock(return_value=SimpleNamespace(status_code=status_code, content=content))
+    return client
+
+def test_parse_tcmb_and_fallback():
+    assert parse_tcmb_rates(TCMB_XML) == {"TRY": 1.0, "EUR": 36.5, "USD": 34.1}
+    assert parse_tcmb_rates(b"<Tarih_Date></Tarih_Date>") is None
+    rates = parse_fallback_rates({"rates": {"EUR": 0.025, "USD": 0.03}})
+    assert rates["EUR"] == pytest.approx(40.0)
+    assert parse_fallback_rates({"rates": {}}) is None
+
+def test_snapshot_before_first_fetch_is_fallback():
+    snapshot = CurrencyRateService().snapshot()
+    assert snapshot["success"] is False
+    assert snapshot["rates"] == DEFAULT_RATES
+    assert snapshot["version"] is None
+
+@pytest.mark.asyncio
+async def test_refresh_records_new_version_and_skips_locked_companies():
+    db = FakeDB()
+    service = CurrencyRateService(interval_minutes=60)
+
+    snapshot = await service.refresh(db, client=tcmb_client())
+
+    assert snapshot["success"] is True
+    assert snapshot["version"] == 1
+    assert snapshot["source"] == "TCMB"
+    assert db.history.insert_one.await_args.args[0]["rates"] == {"TRY": 1.0, "EUR": 36.5, "USD": 34.1}
+    query, update = db.companies.update_many.await_args.args
+    assert query == {"currency_rates_locked": {"$ne": True}, "currency_rates_version": {"$ne": 1}}
+    assert update["$set"]["currency_rates_version"] == 1
+
+@pytest.mark.asyncio
+async def test_unchanged_rates_do_not_create_a_version():
+    stale = datetime.now(timezone.utc) - timedelta(hours=2)
+    latest = {"version": 7, "rates": {"TRY": 1.0, "EUR": 36.5, "USD": 34.1}, "source": "TCMB",
+              "date": "2026-01-01", "fetched_at": stale, "checked_at": stale}
+    db = FakeDB(history=latest)
+    service = CurrencyRateService(interval_minutes=60)
+
+    snapshot = await service.refresh(db, client=tcmb_client())
+
+    assert snapshot["version"] == 7
+    db.history.insert_one.assert_not_awaited()
+    db.history.update_one.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_recent_version_is_adopted_without_fetching():
+    now = datetime.now(timezone.utc).replace(tzinfo=None)  # Motor naive datetime döndürür
+    latest = {"version": 3, "rates": {"TRY": 1.0, "EUR": 36.0, "USD": 34.0}, "source": "TCMB",
+              "date": "2026-01-01", "fetched_at": now, "checked_at": now}
+    db = FakeDB(history=latest)
+    client = tcmb_client()
+    service = CurrencyRateService(interval_minutes=60)
+
+    snapshot = await service.refresh(db, client=client)
+
+    client.get.assert_not_awaited()
+    assert snapshot["version"] == 3
+    assert snapshot["rates"]["EUR"] == 36.0
+
+@pytest.mark.asyncio
+async def test_failed_fetch_keeps_last_known_version():
+    stale = datetime.now(timezone.utc) - timedelta(hours=2)
+    latest = {"version": 4, "rates": {"TRY": 1.0, "EUR": 36.0, "USD": 34.0}, "source": "TCMB",
+              "date": "2026-01-01", "fetched_at": stale, "checked_at": stale}
+    db = FakeDB(history=latest)
+    service = CurrencyRateService(interval_minutes=60)
+
+    snapshot = await service.refresh(db, client=tcmb_client(status_code=503))
+
+    assert snapshot["success"] is True
+    assert snapshot["version"] == 4
+    assert service.failures == 1
+
+def test_rates_equal_uses_precision():
+    assert rates_equal({"EUR": 36.50001}, {"EUR": 36.5})
+    assert not rates_equal({"EUR": 36.6}, {"EUR": 36.5})
+
+@pytest.mark.asyncio
+async def test_disabled_schedule_refreshes_on_request():
+    db = FakeDB()
+    client = tcmb_client()
+    service = CurrencyRateService(interval_minutes=0)
+
+    snapshot = await service.current(db, client=client)
+    assert snapshot["success"] is True
+    assert snapshot["version"] == 1
+
+    # Okuma bellekten, "güncelle" isteği kaynağa gider
+    await service.current(db, client=client)
+    assert client.get.await_count == 1
+    await service.current(db, refresh=True, client=client)
+    assert client.get.await_count == 2
+
+@pytest.mark.asyncio
+async def test_scheduled_service_serves_memory_after_first_refresh():
+    db = FakeDB()
+    client = tcmb_client()
+    service = CurrencyRateService(interval_minutes=60)
+
+    await service.current(db, refresh=True, client=client)
+    await service.current(db, refresh=True, client=client)
+
+    assert client.get.await_count == 1
@@ -0,0 +1,101 @@
+import csv
+import io
+import json
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+from fastapi import HTTPException
+from backend.modules import exports
+
+class AsyncRows:
+    def __init__(self, rows):
+        self.rows = rows
+        self.consumed = 0
+
+    def __aiter__(self):
+        async def gen():
+            for row in self.rows:
+                self.consumed += 1
+                yield row
+        return gen()
+
+async def collect(body):
+    return b"".join([chunk async for chunk in body]).decode("utf-8")
+
+def test_string_date_range_and_datetime_range():
+    spec = exports.get_dataset("transactions")
+    assert exports.build_export_query(spec, "c1", "2024-01-01", "2024-12-31") == {
+        "company_id": "c1", "date": {"$gte": "2024-01-01", "$lte": "2024-12-31"}
+    }
+    logs = exports.build_export_query(exports.get_dataset("activity_logs"), "c1", date_to="2024-01-31")
+    assert logs["created_at"]["$lte"] == datetime(2024, 1, 31, 23, 59, 59, 999999, tzinfo=timezone.utc)
+
+def test_invalid_input_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        exports.build_export_query(exports.get_dataset("expenses"), "c1", "31.01.2024")
+    assert exc.value.status_code == 400
+    with pytest.raises(HTTPException):
+        exports.parse_fields(exports.get_dataset("expenses"), "amount,$where")
+    with pytest.raises(HTTPException) as exc:
+        exports.get_dataset("users")
+    assert exc.value.status_code == 404
+
+@pytest.mark.asyncio
+async def test_ndjson_streams_in_chunks(monkeypatch):
+    monkeypatch.setattr(exports, "EXPORT_CHUNK_ROWS", 2)
+    rows = AsyncRows([{"id": str(i), "created_at": datetime(2024, 1, 1, tzinfo=timezone.utc)} for i in range(5)])
+
+    chunks = [chunk async for chunk in exports.iter_ndjson(rows)]
+
+    assert len(chunks) == 3
+    lines = b"".join(chunks).decode("utf-8").splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ["0", "1", "2", "3", "4"]
+    assert json.loads(lines[0])["created_at"] == "2024-01-01T00:00:00+00:00"
+
+@pytest.mark.asyncio
+async def test_csv_uses_requested_columns_and_flattens_nested():
+    rows = AsyncRows([
+        {"id": "r1", "customer_name": "Ayşe", "customer_details": {"phone": "555"}},
+        {"id": "r2"},
+    ])
+
+    text = await collect(exports.iter_csv(rows, ["id", "customer_name", "customer_details.phone", "customer_details"]))
+
+    parsed = list(csv.reader(io.StringIO(text.lstrip("\ufeff"))))
+    assert parsed[0] == ["id", "customer_name", "customer_details.phone", "customer_details"]
+    assert parsed[1] == ["r1", "Ayşe", "555", '{"phone": "555"}']
+    assert parsed[2] == ["r2", "", "", ""]
+
+def test_export_response_projects_and_sorts():
+    cursor = MagicMock()
+    cursor.sort.return_value = cursor
+    cursor.batch_size.return_value = cursor
+    db = {"reservations": MagicMock()}
+    db["reservations"].find.return_value = cursor
+
+    response = exports.export_response(db, "reservations", "c1", fmt="csv", date_from="2024-01-01", fields="id,price")
+
+    query, projection = db["reservations"].find.call_args.args
+    assert query == {"company_id": "c1", "date": {"$gte": "2024-01-01"}}
+    assert projection == {"_id": 0, "id": 1, "price": 1}
+    cursor.sort.assert_called_once_with([("date", 1), ("id", 1)])
+    assert response.media_type.startswith("text/csv")
+    assert 'reservations_2024-01-01_end.csv' in response.headers["content-disposition"]
+
+def test_activity_log_export_reads_archive():
+    cursor = MagicMock()
+    cursor.sort.return_value = cursor
+    cursor.batch_size.return_value = cursor
+    db = {"activity_logs_archive": MagicMock()}
+    db["activity_logs_archive"].find.return_value = cursor
+
+    response = exports.export_response(db, "activity_logs", "c1", date_from="2023-01-01", archive=True)
+
+    query, _ = db["activity_logs_archive"].find.call_args.args
+    assert query["company_id"] == "c1"
+    cursor.sort.assert_called_once_with([("created_at", 1), ("id", 1)])
+    assert 'activity_logs_archive_2023-01-01_end.ndjson' in response.headers["content-disposition"]
+
+    with pytest.raises(HTTPException) as exc:
+        exports.export_response(db, "reservations", "c1", archive=True)
+    assert exc.value.status_code == 400
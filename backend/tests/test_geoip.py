@@ -0,0 +1,59 @@
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+from backend.modules.geoip import GeoIPResolver, OfflineGeoDatabase, UNKNOWN_LOCATION
+
+def _client_returning(status_code, payload=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = payload or {}
+    client = MagicMock()
+    client.get = AsyncMock(return_value=response)
+    return client
+
+@pytest.mark.asyncio
+async def test_lookup_is_cached_after_first_network_call():
+    client = _client_returning(200, {"city": "Antalya", "region": "Antalya", "country_name": "Turkey"})
+    resolver = GeoIPResolver(mode="online", offline_file=None, persist=False, client=client)
+
+    assert await resolver.lookup("85.105.1.1") == "Antalya, Antalya, Turkey"
+    assert await resolver.lookup("85.105.1.1") == "Antalya, Antalya, Turkey"
+    assert client.get.await_count == 1
+
+@pytest.mark.asyncio
+async def test_rate_limit_is_negatively_cached():
+    client = _client_returning(429)
+    resolver = GeoIPResolver(mode="online", offline_file=None, persist=False, client=client)
+
+    assert await resolver.lookup("85.105.1.2") == UNKNOWN_LOCATION
+    assert await resolver.lookup("85.105.1.2") == UNKNOWN_LOCATION
+    assert client.get.await_count == 1
+    assert resolver.stats()["negative_results"] == 1
+
+@pytest.mark.asyncio
+async def test_offline_mode_never_uses_network(tmp_path):
+    csv_file = tmp_path / "geo.csv"
+    csv_file.write_text(
+        "network,city,region,country\n"
+        "85.105.0.0/16,Fethiye,Muğla,Turkey\n",
+        encoding="utf-8"
+    )
+    client = _client_returning(200)
+    resolver = GeoIPResolver(mode="offline", offline_file=str(csv_file), persist=False, client=client)
+
+    assert await resolver.lookup("85.105.20.30") == "Fethiye, Muğla, Turkey"
+    assert await resolver.lookup("8.8.8.8") == UNKNOWN_LOCATION
+    client.get.assert_not_awaited()
+
+def test_offline_csv_supports_explicit_ranges(tmp_path):
+    csv_file = tmp_path / "ranges.csv"
+    csv_file.write_text(
+        "start_ip,end_ip,city,region,country\n"
+        "10.0.0.0,10.0.0.255,Ofis,,\n"
+        "2001:db8::,2001:db8::ffff,Lab,,\n",
+        encoding="utf-8"
+    )
+    db = OfflineGeoDatabase(str(csv_file))
+
+    assert db.lookup("10.0.0.42") == "Ofis"
+    assert db.lookup("2001:db8::1") == "Lab"
+    assert db.lookup("10.0.1.1") is None
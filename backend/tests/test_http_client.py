@@ -0,0 +1,65 @@
+import pytest
+import requests
+from unittest.mock import MagicMock
+from backend.modules.http_client import AsyncHTTPClient, CircuitBreaker, CircuitOpenError
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_breaker_opens_after_threshold_and_half_opens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, timer=clock)
+
+    breaker.record_failure()
+    breaker.before_request("example.com")
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("example.com")
+
+    # Süre dolunca tek deneme isteğine izin verilir
+    clock.now = 31
+    breaker.before_request("example.com")
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("example.com")
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+@pytest.mark.asyncio
+async def test_client_uses_host_timeout_and_trips_breaker():
+    client = AsyncHTTPClient(host_timeouts={"ipapi.co": 3}, failure_threshold=1)
+    session = MagicMock()
+    session.request.side_effect = requests.ConnectTimeout("slow")
+    client._session = session
+
+    with pytest.raises(requests.ConnectTimeout):
+        await client.get("https://ipapi.co/1.2.3.4/json/")
+    assert session.request.call_args.kwargs["timeout"][1] == 3
+
+    # Host devre dışı - istek thread havuzuna hiç gitmez
+    with pytest.raises(CircuitOpenError):
+        await client.get("https://ipapi.co/5.6.7.8/json/")
+    assert session.request.call_count == 1
+    assert client.stats()["hosts"]["ipapi.co"]["state"] == "open"
+    client.close()
+
+def test_breakers_are_bounded_and_idle_hosts_expire():
+    clock = FakeClock()
+    client = AsyncHTTPClient(max_breakers=2, breaker_ttl=300, reset_timeout=60)
+    client._breakers._timer = clock
+
+    for host in ("a.example", "b.example", "c.example"):
+        client.breaker_for(host)
+    assert sorted(client.stats()["hosts"]) == ["b.example", "c.example"]
+
+    # Kullanılan host'un süresi yenilenir, kullanılmayan düşer
+    clock.now = 200
+    client.breaker_for("c.example")
+    clock.now = 400
+    assert list(client.stats()["hosts"]) == ["c.example"]
+    assert client.breaker_for("b.example") is not None
+    assert len(client._breakers) <= 2
@@ -0,0 +1,98 @@
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+from backend.modules.indexes import (
+    INDEX_REGISTRY,
+    diff_indexes,
+    index_name,
+    reconcile_indexes,
+    summarize_report,
+)
+
+def test_index_name_matches_mongo_default():
+    assert index_name([("company_id", 1), ("date", -1), ("status", 1)]) == "company_id_1_date_-1_status_1"
+
+def test_diff_indexes_reports_missing_extra_and_conflicting():
+    expected = [
+        {"keys": [("id", 1)], "options": {"unique": True}},
+        {"keys": [("created_at", 1)], "options": {"expireAfterSeconds": 2592000}},
+        {"keys": [("company_id", 1), ("date", -1)], "options": {}},
+    ]
+    existing = {
+        "_id_": {"key": [("_id", 1)]},
+        "id_1": {"key": [("id", 1)], "unique": True},
+        # TTL süresi farklı -> çakışma
+        "created_at_1": {"key": [("created_at", 1)], "expireAfterSeconds": 86400},
+        "legacy_name_1": {"key": [("legacy_name", 1)]},
+    }
+
+    result = diff_indexes(expected, existing)
+
+    assert result["ok"] == ["id_1"]
+    assert result["conflicting"] == ["created_at_1"]
+    assert result["missing"] == ["company_id_1_date_-1"]
+    assert result["extra"] == ["legacy_name_1"]
+
+def test_registry_has_unique_id_and_voucher_constraints():
+    reservation_specs = INDEX_REGISTRY["reservations"]
+    unique_keys = [spec["keys"] for spec in reservation_specs if spec["options"].get("unique")]
+    assert [("id", 1)] in unique_keys
+    # Eski random kodlar şirketler arasında tekrar edebilir: şirket içinde benzersiz
+    assert [("company_id", 1), ("voucher_code", 1)] in unique_keys
+    assert [("voucher_code", 1)] not in unique_keys
+
+@pytest.mark.asyncio
+async def test_reconcile_creates_missing_without_dropping_extra():
+    collection = MagicMock()
+    collection.index_information = AsyncMock(return_value={
+        "_id_": {"key": [("_id", 1)]},
+        "old_field_1": {"key": [("old_field", 1)]},
+    })
+    collection.create_indexes = AsyncMock()
+    collection.drop_index = AsyncMock()
+    db = MagicMock()
+    db.__getitem__.return_value = collection
+
+    report = await reconcile_indexes(db, collections=["tour_types"])
+
+    assert set(report["tour_types"]["missing"]) == {"id_1", "company_id_1"}
+    assert collection.create_indexes.await_count == 2
+    collection.drop_index.assert_not_awaited()
+    assert summarize_report(report)["extra"] == 1
+
+@pytest.mark.asyncio
+async def test_replace_index_builds_new_index_before_dropping_old():
+    from pymongo.errors import OperationFailure
+    from backend.modules.indexes import replace_index
+    calls = []
+    collection = MagicMock()
+    collection.create_indexes = AsyncMock(side_effect=lambda models: calls.append(("create", models[0].document["name"])))
+    collection.drop_index = AsyncMock(side_effect=lambda name: calls.append(("drop", name)))
+    spec = {"keys": [("code", 1)], "options": {"unique": True}}
+
+    await replace_index(collection, "code_1", {"key": [("code", 1)]}, spec)
+    assert calls == [("create", "code_1_v2"), ("drop", "code_1")]
+
+    # Yeni index kurulamazsa eskisi düşürülmez
+    collection.create_indexes = AsyncMock(side_effect=OperationFailure("duplicate key", code=11000))
+    collection.drop_index.reset_mock()
+    with pytest.raises(OperationFailure):
+        await replace_index(collection, "code_1", {"key": [("code", 1)]}, spec, force=True)
+    collection.drop_index.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_startup_reconcile_reports_conflicts_without_dropping(monkeypatch):
+    from backend.modules.indexes import ensure_indexes
+    collection = MagicMock()
+    collection.index_information = AsyncMock(return_value={
+        "_id_": {"key": [("_id", 1)]},
+        "id_1": {"key": [("id", 1)]},  # unique değil -> çakışma
+    })
+    collection.create_indexes = AsyncMock()
+    collection.drop_index = AsyncMock()
+    db = MagicMock()
+    db.__getitem__.return_value = collection
+
+    report = await ensure_indexes(db)
+
+    assert "id_1" in report["tour_types"]["conflicting"]
+    collection.drop_index.assert_not_awaited()
@@ -0,0 +1,67 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from pymongo.errors import DuplicateKeyError
+from backend.modules import ledger
+
+class AsyncRows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __aiter__(self):
+        async def gen():
+            for row in self.rows:
+                yield row
+        return gen()
+
+def test_balance_pipeline_groups_by_cari_and_splits_checkpoint():
+    cutoff = ledger.ObjectId()
+    pipeline = ledger.build_balance_pipeline({"cari_id": {"$in": ["c1"]}}, cutoff)
+
+    assert pipeline[0]["$match"]["transaction_type"] == {"$in": list(ledger.TRANSACTION_SIGNS)}
+    group = pipeline[1]["$group"]
+    assert group["_id"] == "$cari_id"
+    assert set(group) == {"_id", "EUR", "USD", "TRY", "checkpoint_EUR", "checkpoint_USD", "checkpoint_TRY"}
+
+@pytest.mark.asyncio
+async def test_recompute_skips_checkpoint_invalidated_during_run():
+    db = SimpleNamespace(
+        cari_balance_checkpoints=MagicMock(),
+        transactions=MagicMock(),
+        cari_accounts=MagicMock(),
+    )
+    db.cari_balance_checkpoints.find.return_value = AsyncRows([{"cari_id": "c1", "version": 3}])
+    db.cari_balance_checkpoints.update_one = AsyncMock(side_effect=[None, DuplicateKeyError("dup")])
+    db.transactions.aggregate.return_value = AsyncRows([
+        {"_id": "c1", "EUR": 100.0, "USD": 0.0, "TRY": -50.0, "checkpoint_EUR": 80.0, "checkpoint_USD": 0.0, "checkpoint_TRY": 0.0},
+    ])
+    db.cari_accounts.bulk_write = AsyncMock()
+
+    balances = await ledger.recompute_balances(db, ["c1", "c2"])
+
+    assert balances["c1"] == {"balance_eur": 100.0, "balance_usd": 0.0, "balance_try": -50.0}
+    assert balances["c2"] == {"balance_eur": 0.0, "balance_usd": 0.0, "balance_try": 0.0}
+    assert len(db.cari_accounts.bulk_write.call_args.args[0]) == 2
+    first_filter, first_update = db.cari_balance_checkpoints.update_one.call_args_list[0].args
+    assert first_filter == {"cari_id": "c1", "version": 3}
+    assert first_update["$set"]["balance_eur"] == 80.0
+
+@pytest.mark.asyncio
+async def test_detect_drift_reports_without_writing(monkeypatch):
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=[
+        {"id": "c1", "name": "Acme", "balance_eur": 100.0, "balance_usd": 0, "balance_try": 0},
+        {"id": "c2", "name": "Beta", "balance_eur": 10.004},
+    ])
+    db = SimpleNamespace(cari_accounts=MagicMock())
+    db.cari_accounts.find.return_value = cursor
+    monkeypatch.setattr(ledger, "ledger_balances", AsyncMock(return_value={
+        "c1": {"balance_eur": 80.0, "balance_usd": 0.0, "balance_try": 0.0},
+        "c2": {"balance_eur": 10.0, "balance_usd": 0.0, "balance_try": 0.0},
+    }))
+
+    drifted = await ledger.detect_drift(db, "comp1")
+
+    assert [d["cari_id"] for d in drifted] == ["c1"]
+    assert drifted[0]["difference"]["balance_eur"] == 20.0
+    assert not db.cari_accounts.update_one.called
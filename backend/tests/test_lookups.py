@@ -0,0 +1,42 @@
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+from backend.modules.lookups import collect_ids, prefetch_by_ids
+
+def test_collect_ids_dedupes_and_skips_empty():
+    docs = [
+        {"cari_id": "c1", "tour_type_id": "t1"},
+        {"cari_id": "c2", "tour_type_id": None},
+        {"cari_id": "c1"},
+        {"cari_id": ""},
+    ]
+    assert collect_ids(docs, "cari_id") == ["c1", "c2"]
+    assert collect_ids(docs, "cari_id", "tour_type_id") == ["c1", "t1", "c2"]
+
+@pytest.mark.asyncio
+async def test_prefetch_by_ids_single_in_query():
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=[
+        {"id": "c1", "name": "Acme"},
+        {"id": "c2", "name": "Globex"},
+    ])
+    collection = MagicMock()
+    collection.find = MagicMock(return_value=cursor)
+
+    result = await prefetch_by_ids(
+        collection,
+        ["c1", "c2", "c1", None],
+        projection={"name": 1},
+        extra_filter={"company_id": "comp1"}
+    )
+
+    assert result == {"c1": {"id": "c1", "name": "Acme"}, "c2": {"id": "c2", "name": "Globex"}}
+    collection.find.assert_called_once_with(
+        {"id": {"$in": ["c1", "c2"]}, "company_id": "comp1"},
+        {"_id": 0, "name": 1, "id": 1}
+    )
+
+@pytest.mark.asyncio
+async def test_prefetch_by_ids_no_ids_skips_query():
+    collection = MagicMock()
+    assert await prefetch_by_ids(collection, [None, ""]) == {}
+    collection.find.assert_not_called()
@@ -0,0 +1,119 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+from pymongo.errors import DuplicateKeyError
+from backend.modules import migrations
+from backend.modules.migrations import (
+    MigrationProgress,
+    claim_migration,
+    migrate_activity_log_dates,
+    migrate_in_chunks,
+    parse_iso_datetime,
+    reservation_field_updates,
+    run_migrations,
+)
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *args):
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, n):
+        return self.docs
+
+def collection_over(docs):
+    """find(): _id > last_id filtresini uygulayan sahte koleksiyon"""
+    collection = MagicMock()
+
+    def find(query, projection=None):
+        after = query.get("_id", {}).get("$gt")
+        return Cursor([doc for doc in docs if after is None or doc["_id"] > after])
+
+    collection.find.side_effect = find
+    collection.bulk_write = AsyncMock()
+    return collection
+
+def progress_db():
+    db = MagicMock()
+    db.schema_migrations.update_one = AsyncMock()
+    return db
+
+def test_parse_iso_datetime_handles_z_and_naive():
+    assert parse_iso_datetime("2025-01-02T03:04:05Z") == datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    assert parse_iso_datetime("2025-01-02T03:04:05").tzinfo == timezone.utc
+    assert parse_iso_datetime("yesterday") is None
+
+def test_reservation_field_updates_keeps_existing_values():
+    assert reservation_field_updates({"status": "confirmed", "reservation_source": "cari", "created_by_cari": "c1",
+                                      "cari_code_snapshot": None, "approved_by": None, "approved_at": None}) == {}
+    updates = reservation_field_updates({"status": "legacy"})
+    assert updates["status"] == "approved"
+    assert updates["reservation_source"] == "system"
+    assert updates["approved_at"] is None
+
+@pytest.mark.asyncio
+async def test_chunks_save_progress_and_resume_after_last_id():
+    docs = [{"_id": i, "created_at": "2025-01-01T00:00:00Z"} for i in range(1, 6)]
+    collection = collection_over(docs)
+    progress = MigrationProgress(progress_db(), "m1", {"processed": 2, "last_id": 2})
+
+    async def build_ops(chunk):
+        return [chunk]
+
+    processed = await migrate_in_chunks(collection, {}, build_ops, progress, chunk_size=2)
+
+    assert processed == 3
+    assert progress.state == {"processed": 5, "last_id": 5}
+    written = [call.args[0][0] for call in collection.bulk_write.await_args_list]
+    assert [[doc["_id"] for doc in chunk] for chunk in written] == [[3, 4], [5]]
+
+@pytest.mark.asyncio
+async def test_activity_log_dates_skip_unparseable_values():
+    db = progress_db()
+    db.activity_logs = collection_over([
+        {"_id": 1, "id": "a", "created_at": "2025-01-01T00:00:00Z"},
+        {"_id": 2, "id": "b", "created_at": "bozuk"},
+    ])
+
+    await migrate_activity_log_dates(db, MigrationProgress(db, "0001"))
+
+    ops = db.activity_logs.bulk_write.await_args.args[0]
+    assert len(ops) == 1
+    assert ops[0]._filter == {"_id": 1}
+
+@pytest.mark.asyncio
+async def test_claim_returns_none_when_done_or_running_elsewhere():
+    db = MagicMock()
+    db.schema_migrations.find_one_and_update = AsyncMock(side_effect=DuplicateKeyError("dup"))
+    assert await claim_migration(db, "0001") is None
+
+    db.schema_migrations.find_one_and_update = AsyncMock(return_value={"_id": "0001", "progress": {"processed": 10}})
+    assert await claim_migration(db, "0001") == {"processed": 10}
+
+@pytest.mark.asyncio
+async def test_run_migrations_stops_after_failure(monkeypatch):
+    calls = []
+
+    async def ok(db, progress):
+        calls.append("ok")
+
+    async def boom(db, progress):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", [
+        {"id": "a", "description": "", "run": boom, "auto": True},
+        {"id": "b", "description": "", "run": ok, "auto": True},
+        {"id": "c", "description": "", "run": ok, "auto": False},
+    ])
+    monkeypatch.setattr(migrations, "claim_migration", AsyncMock(return_value={}))
+    db = progress_db()
+
+    assert await run_migrations(db, auto_only=True) == {"a": "failed"}
+    assert calls == []
+    assert db.schema_migrations.update_one.await_args.args[1]["$set"]["status"] == "failed"
@@ -0,0 +1,74 @@
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import HTTPException, Response
+from backend.modules import pagination
+
+def make_collection(rows, total=0):
+    cursor = MagicMock()
+    cursor.sort.return_value = cursor
+    cursor.limit.return_value = cursor
+    cursor.to_list = AsyncMock(return_value=rows)
+    collection = MagicMock()
+    collection.find.return_value = cursor
+    collection.count_documents = AsyncMock(return_value=total)
+    return collection, cursor
+
+def test_cursor_round_trip_keeps_datetime():
+    created = datetime(2024, 5, 1, 12, 30)
+    cursor = pagination.encode_cursor(created, "abc")
+    assert "=" not in cursor
+    assert pagination.decode_cursor(cursor) == (created, "abc")
+
+def test_invalid_cursor_is_400():
+    with pytest.raises(HTTPException) as exc:
+        pagination.decode_cursor("not-a-cursor")
+    assert exc.value.status_code == 400
+
+def test_page_size_is_clamped():
+    # limit verilmezse eski varsayılan korunur (cursor takip etmeyen istemciler)
+    assert pagination.page_size(None, 10000) == 10000
+    assert pagination.page_size(50000, 10000) == pagination.MAX_PAGE_SIZE
+    assert pagination.page_size(0, 50) == 50
+    assert pagination.page_size(-5, 50) == 1
+
+def test_keyset_filter_descending_includes_null_tail():
+    query = pagination.keyset_filter("date", -1, "2024-05-01", "r9")
+    assert query == {"$or": [
+        {"date": {"$lt": "2024-05-01"}},
+        {"date": "2024-05-01", "id": {"$lt": "r9"}},
+        {"date": None},
+    ]}
+    assert pagination.keyset_filter("date", -1, None, "r9") == {"date": None, "id": {"$lt": "r9"}}
+
+@pytest.mark.asyncio
+async def test_fetch_page_returns_next_cursor_when_more_rows():
+    rows = [{"id": f"r{i}", "date": f"2024-05-0{9 - i}"} for i in range(3)]
+    collection, cursor = make_collection(rows, total=42)
+
+    page, next_cursor, total = await pagination.fetch_page(
+        collection, {"company_id": "c1"}, "date", limit=2, include_total=True
+    )
+
+    assert [r["id"] for r in page] == ["r0", "r1"]
+    assert pagination.decode_cursor(next_cursor) == ("2024-05-08", "r1")
+    assert total == 42
+    cursor.sort.assert_called_once_with([("date", -1), ("id", -1)])
+    cursor.limit.assert_called_once_with(3)
+
+    response = Response()
+    pagination.set_page_headers(response, next_cursor, total)
+    assert response.headers[pagination.NEXT_CURSOR_HEADER] == next_cursor
+    assert response.headers[pagination.TOTAL_COUNT_HEADER] == "42"
+
+@pytest.mark.asyncio
+async def test_fetch_page_last_page_has_no_cursor():
+    collection, _ = make_collection([{"id": "r1", "date": "2024-05-01"}])
+    cursor = pagination.encode_cursor("2024-05-02", "r2")
+
+    page, next_cursor, total = await pagination.fetch_page(collection, {"company_id": "c1"}, "date", limit=2, cursor=cursor)
+
+    assert len(page) == 1 and next_cursor is None and total is None
+    query = collection.find.call_args.args[0]
+    assert query["$and"][0] == {"company_id": "c1"}
+    collection.count_documents.assert_not_called()
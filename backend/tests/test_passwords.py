@@ -0,0 +1,21 @@
+import pytest
+from backend.modules.passwords import (
+    hash_password_async,
+    verify_password_async,
+    get_password_pool_stats,
+)
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_run_in_pool():
+    hashed = await hash_password_async("s3cret")
+
+    assert await verify_password_async("s3cret", hashed)
+    assert not await verify_password_async("wrong", hashed)
+
+    stats = get_password_pool_stats()
+    assert stats["completed"] >= 3
+    assert stats["in_flight"] == 0
+
+@pytest.mark.asyncio
+async def test_verify_without_hash_is_false():
+    assert not await verify_password_async("s3cret", None)
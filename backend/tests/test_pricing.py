@@ -0,0 +1,58 @@
+import pytest
+from datetime import date
+from unittest.mock import AsyncMock
+from backend.modules.pricing import SeasonalPriceIndex
+
+PRICES = [
+    {"id": "summer", "start_date": "2025-06-01", "end_date": "2025-08-31", "currency": "EUR",
+     "tour_type_ids": ["atv"], "cari_prices": {"c1": 50, " c2 ": 55}},
+    # Daha sonra eklenen, çakışan aralık - ilk eklenen kazanır
+    {"id": "july", "start_date": "2025-07-01", "end_date": "2025-09-15", "currency": "USD",
+     "tour_type_ids": ["atv", "buggy"], "price_per_vehicle": 70, "cari_prices": {}},
+    {"id": "broken", "start_date": "2025-13-01", "end_date": "2025-14-01", "tour_type_ids": ["atv"]},
+]
+
+@pytest.mark.asyncio
+async def test_first_inserted_price_wins_on_overlap():
+    index = SeasonalPriceIndex(PRICES)
+
+    assert index.size == 2  # geçersiz tarihli kayıt atlanır
+    assert index.match("atv", date(2025, 7, 15)).id == "summer"
+    assert index.match("atv", date(2025, 9, 1)).id == "july"
+    assert index.match("buggy", date(2025, 7, 15)).id == "july"
+    assert index.match("atv", date(2025, 5, 31)) is None
+    assert index.match("atv", date(2025, 9, 16)) is None
+
+@pytest.mark.asyncio
+async def test_quote_uses_normalized_cari_prices():
+    index = SeasonalPriceIndex(PRICES)
+
+    quote = await index.quote("atv", date(2025, 6, 10), "c2")
+    assert (quote.price_per_unit, quote.currency, quote.source) == (55.0, "EUR", "cari_specific")
+
+    # Tabloda olmayan cari - tablodaki ilk fiyat genel fiyat olarak kullanılır
+    quote = await index.quote("atv", date(2025, 6, 10), "other")
+    assert (quote.price_per_unit, quote.source) == (50.0, "seasonal")
+
+    quote = await index.quote("buggy", date(2025, 6, 10), "c1")
+    assert (quote.price_per_unit, quote.source) == (0.0, "error_fallback")
+
+@pytest.mark.asyncio
+async def test_new_cari_price_only_loads_cari_when_needed():
+    index = SeasonalPriceIndex([
+        {"id": "new", "start_date": "2025-01-01", "end_date": "2025-12-31", "currency": "TRY",
+         "tour_type_ids": "atv", "price_per_vehicle": 100, "cari_prices": {"c1": 80},
+         "apply_to_new_caris": True},
+    ])
+    loader = AsyncMock(return_value=date(2025, 3, 1))
+
+    quote = await index.quote("atv", date(2025, 5, 1), "c1", loader)
+    assert quote.price_per_unit == 80.0
+    loader.assert_not_awaited()
+
+    quote = await index.quote("atv", date(2025, 5, 1), "fresh", loader)
+    assert (quote.price_per_unit, quote.source) == (80.0, "cari_specific")
+
+    loader.return_value = date(2024, 3, 1)
+    quote = await index.quote("atv", date(2025, 5, 1), "old", loader)
+    assert (quote.price_per_unit, quote.source) == (100.0, "seasonal")
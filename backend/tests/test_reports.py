@@ -0,0 +1,58 @@
+from backend.modules.reports import build_dashboard_pipeline, shape_dashboard_result
+
+def test_dashboard_pipeline_is_single_match_plus_facet():
+    pipeline = build_dashboard_pipeline("comp1", "2025-07-30", "2025-07-01", "2025-06-01", "2025-07-15")
+
+    match = pipeline[0]["$match"]
+    assert match["company_id"] == "comp1"
+    assert match["date"] == {"$gte": "2025-06-01", "$lte": "2025-07-30"}
+    assert set(pipeline[-1]["$facet"]) == {"today", "daily_trend", "top_cari_accounts", "top_tour_types"}
+
+def test_shape_dashboard_fills_missing_days_and_sums_today():
+    facets = {
+        "today": [
+            {"_id": "EUR", "reservations": 2, "atvs": 5, "revenue": 300},
+            {"_id": "TRY", "reservations": 1, "atvs": 1, "revenue": 1000},
+            {"_id": None, "reservations": 1, "atvs": 2, "revenue": 0},
+        ],
+        "daily_trend": [{"_id": "2025-07-30", "reservations": 4, "atvs": 8, "revenue": 300}],
+        "top_cari_accounts": [{"_id": "c1", "count": 3, "revenue": 450, "ref": {"name": "Acme"}}],
+        "top_tour_types": [{"_id": "t1", "count": 3, "ref": {"name": "ATV"}}],
+    }
+
+    result = shape_dashboard_result(facets, "2025-07-30", 3)
+
+    assert result["today"] == {"total_reservations": 4, "total_atvs": 8, "revenue": {"EUR": 300, "USD": 0, "TRY": 1000}}
+    assert [d["date"] for d in result["daily_trend"]] == ["2025-07-28", "2025-07-29", "2025-07-30"]
+    assert result["daily_trend"][0]["reservations"] == 0
+    assert result["daily_trend"][2]["atvs"] == 8
+    assert result["top_cari_accounts"] == [{"cari_name": "Acme", "reservation_count": 3, "revenue": 450}]
+    assert result["top_tour_types"] == [{"tour_type_name": "ATV", "count": 3}]
+
+def test_customer_payment_pipeline_unions_payments_into_one_group():
+    from backend.modules.reports import build_customer_payment_pipeline
+
+    pipeline = build_customer_payment_pipeline("comp1", ["Ali", "Ayşe"])
+
+    assert pipeline[0]["$match"]["customer_name"] == {"$in": ["Ali", "Ayşe"]}
+    union = pipeline[2]["$unionWith"]
+    assert union["coll"] == "transactions"
+    assert union["pipeline"][0]["$match"]["transaction_type"] == "payment"
+    assert pipeline[-1]["$group"]["_id"] == {"customer_name": "$customer_name", "currency": "$currency"}
+
+def test_shape_customer_payment_status():
+    from backend.modules.reports import shape_customer_payment_status
+
+    rows = [
+        {"_id": {"customer_name": "Ali", "currency": "EUR"}, "debt": 200.0, "paid": 150.0},
+        {"_id": {"customer_name": "Ali", "currency": "TRY"}, "debt": 0.0, "paid": 500.0},
+        {"_id": {"customer_name": "Ayşe", "currency": "USD"}, "debt": 100.0, "paid": 100.0},
+    ]
+
+    result = shape_customer_payment_status(rows, ["Ali", "Ayşe", "Veli"])
+
+    assert result["Ali"]["payment_status"] == "unpaid"
+    assert result["Ali"]["unpaid_amount"] == {"EUR": 50.0, "USD": 0.0, "TRY": 0.0}
+    assert result["Ali"]["total_payments"]["TRY"] == 500.0
+    assert result["Ayşe"]["has_unpaid"] is False
+    assert result["Veli"]["total_debt"] == {"EUR": 0.0, "USD": 0.0, "TRY": 0.0}
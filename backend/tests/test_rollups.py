@@ -0,0 +1,113 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from backend.modules import rollups
+from backend.modules.rollups import apply_reservation_delta, reservation_hour, rollup_key, rebuild_rollups, rollup_totals
+
+class FakeRollups:
+    """daily_rollups için $inc upsert ve count<=0 silme destekleyen bellek içi koleksiyon"""
+
+    def __init__(self):
+        self.buckets = {}
+
+    async def update_one(self, key, update, upsert=False):
+        bucket = self.buckets.setdefault(tuple(sorted(key.items(), key=lambda kv: kv[0])), {"count": 0, "atv_count": 0, "revenue": 0})
+        for field, value in update["$inc"].items():
+            bucket[field] += value
+
+    async def delete_one(self, query):
+        key = tuple(sorted(((k, v) for k, v in query.items() if k != "count"), key=lambda kv: kv[0]))
+        if key in self.buckets and self.buckets[key]["count"] <= 0:
+            del self.buckets[key]
+
+    def totals(self):
+        return [dict(key) | values for key, values in self.buckets.items()]
+
+RESERVATION = {"company_id": "comp1", "date": "2025-07-01", "status": "confirmed", "tour_type_id": "atv",
+               "cari_id": "c1", "pickup_location": "Hotel A", "time": "09:30", "currency": "EUR",
+               "price": 100, "atv_count": 2}
+
+def test_rollup_key_matches_report_hour_parsing():
+    assert reservation_hour("09:30") == 9
+    assert reservation_hour("9") == 0
+    assert reservation_hour("") is None
+    assert rollup_key({**RESERVATION, "cari_id": None})["cari_id"] == ""
+    assert rollup_key({"company_id": "comp1"}) is None
+
+@pytest.mark.asyncio
+async def test_create_update_cancel_and_delete_keep_buckets_consistent():
+    db = SimpleNamespace(daily_rollups=FakeRollups())
+
+    await apply_reservation_delta(db, None, RESERVATION)
+    await apply_reservation_delta(db, None, {**RESERVATION, "price": 50, "atv_count": 1})
+    [bucket] = db.daily_rollups.totals()
+    assert (bucket["count"], bucket["atv_count"], bucket["revenue"]) == (2, 3, 150)
+
+    # Aynı bucket içinde fiyat değişikliği - sadece fark uygulanır
+    await apply_reservation_delta(db, RESERVATION, {**RESERVATION, "price": 120})
+    [bucket] = db.daily_rollups.totals()
+    assert (bucket["count"], bucket["revenue"]) == (2, 170)
+
+    # İptal: eski bucket'tan düşülür, cancelled bucket'ına eklenir
+    updated = {**RESERVATION, "price": 120}
+    await apply_reservation_delta(db, updated, {**updated, "status": "cancelled"})
+    by_status = {b["status"]: b for b in db.daily_rollups.totals()}
+    assert by_status["confirmed"]["count"] == 1
+    assert by_status["cancelled"]["revenue"] == 120
+
+    # Silme: boşalan bucket kaldırılır
+    await apply_reservation_delta(db, {**updated, "status": "cancelled"}, None)
+    assert [b["status"] for b in db.daily_rollups.totals()] == ["confirmed"]
+
+class Cursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for row in self.rows:
+            yield row
+
+    async def to_list(self, length=None):
+        return self.rows
+
+@pytest.mark.asyncio
+async def test_rebuild_overwrites_buckets_instead_of_deleting_first():
+    key = {"company_id": "comp1", "date": "2025-07-01", "status": "confirmed", "tour_type_id": "atv",
+           "cari_id": "", "pickup_location": "", "hour": 9, "currency": "EUR"}
+    db = SimpleNamespace(reservations=MagicMock(), daily_rollups=MagicMock())
+    db.reservations.aggregate = MagicMock(return_value=Cursor([{"_id": key, "count": 2, "atv_count": 3, "revenue": 150}]))
+    db.daily_rollups.bulk_write = AsyncMock()
+    db.daily_rollups.delete_many = AsyncMock()
+
+    assert await rebuild_rollups(db, company_id="comp1") == 1
+
+    [op] = db.daily_rollups.bulk_write.await_args.args[0]
+    assert op._filter == key
+    assert op._doc["$set"]["count"] == 2
+    assert op._upsert is True
+    # Silme sadece sonda ve bu çalışmada/canlı yazımla güncellenmemiş bucket'lar için
+    stale = db.daily_rollups.delete_many.await_args.args[0]
+    assert stale["company_id"] == "comp1"
+    assert "$not" in stale["updated_at"]
+
+@pytest.mark.asyncio
+async def test_rollup_totals_reads_reservations_until_backfill_is_done(monkeypatch):
+    monkeypatch.setattr(rollups, "_backfill_done", False)
+    row = {"_id": {"currency": "EUR"}, "count": 1, "atv_count": 2, "revenue": 100}
+    db = SimpleNamespace(reservations=MagicMock(), daily_rollups=MagicMock(), schema_migrations=MagicMock())
+    db.reservations.aggregate = MagicMock(return_value=Cursor([row]))
+    db.daily_rollups.aggregate = MagicMock(return_value=Cursor([row]))
+    db.schema_migrations.find_one = AsyncMock(return_value=None)
+
+    rows = await rollup_totals(db, "comp1", "2025-07-01", "2025-07-31", ["currency"])
+    assert rows == [{"currency": "EUR", "count": 1, "atv_count": 2, "revenue": 100}]
+    db.daily_rollups.aggregate.assert_not_called()
+    pipeline = db.reservations.aggregate.call_args.args[0]
+    assert pipeline[0]["$match"]["company_id"] == "comp1"
+
+    db.schema_migrations.find_one = AsyncMock(return_value={"_id": rollups.ROLLUP_BACKFILL_MIGRATION})
+    await rollup_totals(db, "comp1", "2025-07-01", "2025-07-31", ["currency"])
+    db.daily_rollups.aggregate.assert_called_once()
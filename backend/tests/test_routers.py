@@ -0,0 +1,45 @@
+import pytest
+from fastapi import APIRouter, FastAPI
+from backend.modules import routers
+from backend.modules.routers import find_duplicate_routes, audit_routes, include_routers
+
+def _app_with_duplicate():
+    app = FastAPI()
+
+    @app.get("/items")
+    async def list_items():
+        return []
+
+    @app.post("/items")
+    async def create_item():
+        return {}
+
+    @app.get("/items")
+    async def list_items_again():
+        return []
+
+    return app
+
+def test_find_duplicate_routes_reports_method_and_path():
+    duplicates = find_duplicate_routes(_app_with_duplicate().routes)
+    assert len(duplicates) == 1
+    method, path, names = duplicates[0]
+    assert (method, path) == ("GET", "/items")
+    assert [name.rsplit(".", 1)[-1] for name in names] == ["list_items", "list_items_again"]
+
+def test_audit_routes_raises_on_duplicate():
+    with pytest.raises(RuntimeError, match="GET /items"):
+        audit_routes(_app_with_duplicate())
+
+def test_include_routers_skips_disabled(monkeypatch):
+    monkeypatch.setattr(routers, "DISABLED_ROUTERS", {"notifications"})
+    parent = APIRouter(prefix="/api")
+    included = include_routers(parent, ("exports", "notifications"))
+    assert included == ["exports"]
+    assert {route.path for route in parent.routes} == {"/api/exports/{dataset}"}
+
+def test_server_route_table_has_no_duplicates():
+    from backend.server import app
+    assert find_duplicate_routes(app.routes) == []
+    paths = {route.path for route in app.routes}
+    assert {"/api/income", "/api/expenses", "/api/activity-logs", "/api/notifications"} <= paths
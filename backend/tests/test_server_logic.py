@@ -1,7 +1,9 @@
 import pytest
 from unittest.mock import MagicMock, AsyncMock
 from datetime import datetime, timedelta, timezone
-from backend.server import get_admin_customers, generate_company_code, db
+from backend.modules.codes import generate_company_code
+from backend.modules.database import db
+from backend.modules.routers.admin import get_admin_customers
 
 @pytest.mark.asyncio
 async def test_generate_company_code_sequential():
@@ -128,3 +130,99 @@ async def test_get_admin_customers_remaining_days_and_status():
     results_expired = await get_admin_customers(status_filter="expired", current_user=mock_current_user)
     assert len(results_expired) == 1
     assert results_expired[0]["id"] == "c4"
+
+def _auth_request(token_data):
+    from fastapi.security import HTTPAuthorizationCredentials
+    from backend.modules.auth import create_access_token
+    request = MagicMock()
+    request.headers = {}
+    request.client.host = "127.0.0.1"
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token(token_data))
+    return request, credentials
+
+@pytest.mark.asyncio
+async def test_get_current_user_rejects_revoked_and_inactive(monkeypatch):
+    from fastapi import HTTPException
+    from backend.modules import auth
+
+    state = {"is_active": True, "token_version": 1, "role": "admin", "is_admin": True}
+    monkeypatch.setattr(auth, "get_user_auth_state", AsyncMock(return_value=state))
+
+    # Güncel versiyonlu token kabul edilir
+    request, credentials = _auth_request({"sub": "u1", "company_id": "c1", "role": "admin", "tv": 1})
+    user = await auth.get_current_user(request, credentials)
+    assert user["user_id"] == "u1"
+    assert user["role"] == "admin"
+
+    # Şifre değişikliğinden önceki token reddedilir
+    request, credentials = _auth_request({"sub": "u1", "company_id": "c1", "role": "admin", "tv": 0})
+    with pytest.raises(HTTPException) as exc:
+        await auth.get_current_user(request, credentials)
+    assert exc.value.detail == "Token revoked"
+
+    # Pasif kullanıcı reddedilir
+    state["is_active"] = False
+    request, credentials = _auth_request({"sub": "u1", "company_id": "c1", "role": "admin", "tv": 1})
+    with pytest.raises(HTTPException) as exc:
+        await auth.get_current_user(request, credentials)
+    assert exc.value.detail == "User account is inactive"
+
+@pytest.mark.asyncio
+async def test_calculate_price_matrix_applies_pricing_model(monkeypatch):
+    from backend.modules import reservation_pricing
+    from backend.modules.pricing import SeasonalPriceIndex
+
+    index = SeasonalPriceIndex([
+        {"id": "sp1", "start_date": "2025-07-01", "end_date": "2025-07-02", "currency": "EUR",
+         "tour_type_ids": ["atv", "safari"], "price_per_vehicle": 40, "cari_prices": {}},
+    ])
+    monkeypatch.setattr(reservation_pricing, "get_price_index", AsyncMock(return_value=index))
+    monkeypatch.setattr(reservation_pricing, "get_tour_types_cached", AsyncMock(return_value=[
+        {"id": "atv", "name": "ATV"},
+        {"id": "safari", "name": "Safari", "pricing_model": "person_based"},
+    ]))
+
+    matrix = await reservation_pricing.calculate_price_matrix(
+        "c1", None, "2025-06-30", "2025-07-02",
+        tour_type_ids=["atv", "safari", "missing"], vehicle_count=2, person_count=3
+    )
+
+    assert matrix["unknown_tour_type_ids"] == ["missing"]
+    assert matrix["prices"]["atv"]["2025-07-01"] == {"price": 80.0, "currency": "EUR", "source": "seasonal"}
+    assert matrix["prices"]["safari"]["2025-07-02"]["price"] == 120.0
+    assert matrix["prices"]["atv"]["2025-06-30"]["source"] == "error_fallback"
+
+@pytest.mark.asyncio
+async def test_server_public_ip_uses_first_successful_probe(monkeypatch):
+    from backend.modules import audit
+
+    async def fake_get(url):
+        if "ipify" in url:
+            raise ConnectionError("down")
+        response = MagicMock(status_code=200)
+        response.json.return_value = {"ip": "203.0.113.7"} if "my-ip" in url else {"ip_addr": "203.0.113.7"}
+        return response
+
+    monkeypatch.setattr(audit.http_client, "get", fake_get)
+    assert await audit.get_server_public_ip() == "203.0.113.7"
+
+    async def failing_get(url):
+        return MagicMock(status_code=503)
+
+    monkeypatch.setattr(audit.http_client, "get", failing_get)
+    assert await audit.get_server_public_ip() == "unknown"
+
+@pytest.mark.asyncio
+async def test_refresh_server_public_ip_keeps_configured_ip(monkeypatch):
+    from backend.modules import audit
+
+    lookup = AsyncMock(return_value="203.0.113.7")
+    monkeypatch.setattr(audit, "get_server_public_ip", lookup)
+    monkeypatch.setattr(audit, "SERVER_PUBLIC_IP", "198.51.100.1")
+    await audit.refresh_server_public_ip()
+    lookup.assert_not_awaited()
+    assert audit.SERVER_PUBLIC_IP == "198.51.100.1"
+
+    monkeypatch.setattr(audit, "SERVER_PUBLIC_IP", "unknown")
+    await audit.refresh_server_public_ip()
+    assert audit.SERVER_PUBLIC_IP == "203.0.113.7"
@@ -0,0 +1,49 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from types import SimpleNamespace
+from backend.modules.vouchers import VoucherAllocator, format_voucher_code
+
+def counter_db():
+    """voucher_counters.find_one_and_update'i bellekte taklit et"""
+    counters = {}
+
+    async def find_one_and_update(query, update, upsert, return_document):
+        counters[query["_id"]] = counters.get(query["_id"], 0) + update["$inc"]["seq"]
+        return {"_id": query["_id"], "seq": counters[query["_id"]]}
+
+    db = SimpleNamespace(voucher_counters=MagicMock())
+    db.voucher_counters.find_one_and_update = AsyncMock(side_effect=find_one_and_update)
+    return db
+
+def test_format_starts_above_legacy_codes():
+    assert format_voucher_code("VCHR", 1000000) == "VCHR-1000000"
+
+@pytest.mark.asyncio
+async def test_one_round_trip_per_block():
+    db = counter_db()
+    allocator = VoucherAllocator(block_size=5, start=1000000)
+
+    codes = [await allocator.allocate(db) for _ in range(12)]
+
+    assert codes[0] == "VCHR-1000000"
+    assert codes[-1] == "VCHR-1000011"
+    assert len(set(codes)) == 12
+    assert db.voucher_counters.find_one_and_update.await_count == 3
+
+@pytest.mark.asyncio
+async def test_prefixes_have_separate_counters():
+    db = counter_db()
+    allocator = VoucherAllocator(block_size=2, start=1000000)
+
+    assert await allocator.allocate(db, "B2B") == "B2B-1000000"
+    assert await allocator.allocate(db) == "VCHR-1000000"
+
+@pytest.mark.asyncio
+async def test_processes_get_disjoint_blocks():
+    db = counter_db()
+    first, second = VoucherAllocator(block_size=3), VoucherAllocator(block_size=3)
+
+    codes = await asyncio.gather(*[a.allocate(db) for a in (first, second) * 4])
+
+    assert len(set(codes)) == 8
@@ -0,0 +1,66 @@
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+from pymongo.errors import BulkWriteError
+from backend.modules.work_queue import BackgroundWriter
+
+def _db_with(collection):
+    db = MagicMock()
+    db.__getitem__.return_value = collection
+    return db
+
+@pytest.mark.asyncio
+async def test_items_are_batched_into_insert_many_and_drained_on_stop():
+    collection = MagicMock()
+    collection.insert_many = AsyncMock()
+    writer = BackgroundWriter("test_batch", workers=1, flush_interval=0.05)
+    writer.start(_db_with(collection))
+
+    for i in range(5):
+        assert writer.submit("activity_logs", {"id": str(i)})
+
+    async def build():
+        return {"id": "login"}
+    writer.submit_factory("login_activities", build)
+
+    await writer.stop()
+
+    inserted = [call.args[0] for call in collection.insert_many.await_args_list]
+    assert sorted(doc["id"] for docs in inserted for doc in docs) == ["0", "1", "2", "3", "4", "login"]
+    assert collection.insert_many.await_count == 2  # koleksiyon başına bir batch
+    assert writer.stats()["written"] == 6
+    assert not writer.submit("activity_logs", {"id": "late"})  # kapandıktan sonra çağıran yazar
+
+@pytest.mark.asyncio
+async def test_retry_skips_documents_already_written():
+    collection = MagicMock()
+    collection.insert_many = AsyncMock(side_effect=[
+        BulkWriteError({"nInserted": 1, "writeErrors": [{"index": 1, "code": 6}]}),
+        BulkWriteError({"nInserted": 0, "writeErrors": [{"index": 0, "code": 11000}]}),
+    ])
+    writer = BackgroundWriter("test_retry", workers=1, flush_interval=0, retry_backoff=0)
+    writer.start(_db_with(collection))
+
+    writer.submit("activity_logs", {"id": "a"})
+    writer.submit("activity_logs", {"id": "b"})
+    await writer.stop()
+
+    assert collection.insert_many.await_args_list[1].args[0] == [{"id": "b"}]
+    stats = writer.stats()
+    assert stats["retries"] == 1
+    assert stats["written"] == 2
+    assert stats["failed"] == 0
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_and_counts():
+    collection = MagicMock()
+    collection.insert_many = AsyncMock()
+    writer = BackgroundWriter("test_full", maxsize=2, workers=1, flush_interval=0)
+    writer.start(_db_with(collection))
+
+    # Worker'a sıra gelmeden kuyruğu doldur
+    for i in range(4):
+        writer.submit("activity_logs", {"id": str(i)})
+
+    assert writer.stats()["dropped"] == 2
+    await writer.stop()
+    assert writer.stats()["written"] == 2
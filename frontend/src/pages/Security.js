@@ -221,6 +221,10 @@ const Security = () => {
       const response = await axios.put(url, payload);
       console.log('Şifre değiştirme yanıtı:', response);
       
+      // Şifre değişince eski token'lar iptal edilir, yenisini sakla
+      if (response.data?.access_token) {
+        localStorage.setItem('token', response.data.access_token);
+      }
       toast.success('Şifre başarıyla değiştirildi');
       setShowChangePassword(false);
       setPasswordFormData({
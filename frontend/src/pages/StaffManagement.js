@@ -116,6 +116,13 @@ const getDefaultPermissions = () => {
   return defaultPerms;
 };
 
+// Maaş ödemesi penceresinin her açılışı için tek anahtar: çift tıklama / retry ödemeyi tekrar işlemez
+const newIdempotencyKey = () => (
+  window.crypto?.randomUUID
+    ? window.crypto.randomUUID()
+    : `${Date.now()}-${Math.random().toString(36).slice(2)}`
+);
+
 const StaffManagement = () => {
   const navigate = useNavigate();
   const { confirm, dialog } = useConfirmDialog();
@@ -2131,7 +2138,8 @@ const StaffManagement = () => {
                         amount: selectedStaff?.net_salary?.toString() || '',
                         currency: selectedStaff?.salary_currency || 'TRY',
                         payment_date: new Date().toISOString().split('T')[0],
-                        description: `Maaş ödemesi - ${format(new Date(), 'MMMM yyyy', { locale: tr })}`
+                        description: `Maaş ödemesi - ${format(new Date(), 'MMMM yyyy', { locale: tr })}`,
+                        idempotency_key: newIdempotencyKey()
                       });
                       setPaySalaryDialogOpen(true);
                     }}
@@ -2150,7 +2158,8 @@ const StaffManagement = () => {
                       amount: selectedStaff?.net_salary?.toString() || '',
                       currency: selectedStaff?.salary_currency || 'TRY',
                       payment_date: new Date().toISOString().split('T')[0],
-                      description: ''
+                      description: '',
+                      idempotency_key: newIdempotencyKey()
                     });
                     setPaySalaryDialogOpen(true);
                   }}